@@ -1,5 +1,7 @@
 """ Code to allow module store to interface with courseware index """
 
+import hashlib
+import json
 import logging
 import re
 from abc import ABCMeta, abstractmethod
@@ -27,6 +29,14 @@ from xmodule.modulestore import ModuleStoreEnum
 # how far back from the trigger point to look back in order to index
 REINDEX_AGE = timedelta(0, 60)  # 60 seconds
 
+# Maximum number of items sent to the search engine in a single bulk request
+# when indexing incrementally.
+INDEX_BATCH_SIZE = 500
+
+# Maximum number of indexed items of a structure fetched from the search engine
+# to find the items that changed; larger structures are fully reindexed.
+MAX_INDEXED_ITEMS_FETCHED = 10000
+
 log = logging.getLogger('edx.modulestore')
 
 
@@ -66,6 +76,10 @@ class SearchIndexerBase(object, metaclass=ABCMeta):
     INDEX_NAME = None
     DOCUMENT_TYPE = None
     ENABLE_INDEXING_KEY = None
+    ENABLE_INCREMENTAL_INDEXING_KEY = 'ENABLE_INCREMENTAL_SEARCH_INDEX'
+
+    # Field of the indexed items holding a digest of their indexed content
+    DIGEST_FIELD = 'content_digest'
 
     INDEX_EVENT = {
         'name': None,
@@ -79,6 +93,13 @@ class SearchIndexerBase(object, metaclass=ABCMeta):
         """
         return settings.FEATURES.get(cls.ENABLE_INDEXING_KEY, False)
 
+    @classmethod
+    def incremental_indexing_is_enabled(cls):
+        """
+        Checks to see if only changed items should be sent to the index
+        """
+        return settings.FEATURES.get(cls.ENABLE_INCREMENTAL_INDEXING_KEY, False)
+
     @classmethod
     @abstractmethod
     def normalize_structure_key(cls, structure_key):
@@ -114,7 +135,61 @@ class SearchIndexerBase(object, metaclass=ABCMeta):
         searcher.remove(cls.DOCUMENT_TYPE, result_ids)
 
     @classmethod
-    def index(cls, modulestore, structure_key, triggered_at=None, reindex_age=REINDEX_AGE):
+    def _index_digest(cls, item_index):
+        """ Returns a digest of the content of the given item index dictionary """
+        serialized_index = json.dumps(item_index, sort_keys=True, default=text_type)
+        return hashlib.sha1(serialized_index.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def _fetch_indexed_digests(cls, searcher, structure_key):
+        """
+        Returns a dictionary of the ids of the items of the structure present
+        in the search index to the digest of their indexed content, or None
+        if they can't all be fetched.
+        """
+        response = searcher.search(
+            doc_type=cls.DOCUMENT_TYPE,
+            field_dictionary=cls._get_location_info(structure_key),
+            size=MAX_INDEXED_ITEMS_FETCHED,
+        )
+        if response["total"] > len(response["results"]):
+            return None
+        return {result["data"]["id"]: result["data"].get(cls.DIGEST_FIELD) for result in response["results"]}
+
+    @classmethod
+    def _index_changed_items(cls, searcher, structure_key, items_index, indexed_items):
+        """
+        Sends the items of items_index whose content changed since they were
+        indexed to the search index in bulk, and removes the items that are
+        present in the search index but not in indexed_items.
+
+        Returns the number of items sent to the search index.
+        """
+        indexed_digests = cls._fetch_indexed_digests(searcher, structure_key)
+        if indexed_digests is None:
+            searcher.index(cls.DOCUMENT_TYPE, items_index)
+            cls.remove_deleted_items(searcher, structure_key, indexed_items)
+            return len(items_index)
+
+        changed_items = [
+            item_index for item_index in items_index
+            if indexed_digests.get(item_index['id']) != item_index[cls.DIGEST_FIELD]
+        ]
+        for batch_start in range(0, len(changed_items), INDEX_BATCH_SIZE):
+            searcher.index(cls.DOCUMENT_TYPE, changed_items[batch_start:batch_start + INDEX_BATCH_SIZE])
+
+        deleted_ids = [item_id for item_id in indexed_digests if item_id not in indexed_items]
+        if deleted_ids:
+            searcher.remove(cls.DOCUMENT_TYPE, deleted_ids)
+
+        log.info(
+            u'Incrementally indexed %s: %d items indexed, %d unchanged items skipped, %d items removed',
+            structure_key, len(changed_items), len(items_index) - len(changed_items), len(deleted_ids),
+        )
+        return len(changed_items)
+
+    @classmethod
+    def index(cls, modulestore, structure_key, triggered_at=None, reindex_age=REINDEX_AGE, incremental=None):
         """
         Process course for indexing
 
@@ -130,9 +205,16 @@ class SearchIndexerBase(object, metaclass=ABCMeta):
             which items may need to be removed from the index
             If None, then a full reindex takes place
 
+        incremental (bool) - if True, only the items whose indexed content changed
+            are sent to the index, and only the items that are no longer part of
+            the structure are removed from it.  Defaults to the value of the
+            ENABLE_INCREMENTAL_SEARCH_INDEX feature.
+
         Returns:
         Number of items that have been added to the index
         """
+        if incremental is None:
+            incremental = cls.incremental_indexing_is_enabled()
         error_list = []
         searcher = SearchEngine.get_search_engine(cls.INDEX_NAME)
         if not searcher:
@@ -237,6 +319,7 @@ class SearchIndexerBase(object, metaclass=ABCMeta):
                     item_index['start_date'] = item.start
                 item_index['content_groups'] = item_content_groups if item_content_groups else None
                 item_index.update(cls.supplemental_fields(item))
+                item_index[cls.DIGEST_FIELD] = cls._index_digest(item_index)
                 items_index.append(item_index)
                 indexed_count["count"] += 1
                 return item_content_groups
@@ -256,8 +339,13 @@ class SearchIndexerBase(object, metaclass=ABCMeta):
                 # Now index the content
                 for item in structure.get_children():
                     prepare_item_index(item, groups_usage_info=groups_usage_info)
-                searcher.index(cls.DOCUMENT_TYPE, items_index)
-                cls.remove_deleted_items(searcher, structure_key, indexed_items)
+                if incremental:
+                    indexed_count["count"] = cls._index_changed_items(
+                        searcher, structure_key, items_index, indexed_items
+                    )
+                else:
+                    searcher.index(cls.DOCUMENT_TYPE, items_index)
+                    cls.remove_deleted_items(searcher, structure_key, indexed_items)
         except Exception as err:  # pylint: disable=broad-except
             # broad exception so that index operation does not prevent the rest of the application from working
             log.exception(
@@ -50,7 +50,12 @@ from xmodule.exceptions import SerializationError
 from xmodule.modulestore import COURSE_ROOT, LIBRARY_ROOT
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import DuplicateCourseError, ItemNotFoundError
-from xmodule.modulestore.xml_exporter import export_course_to_xml, export_library_to_xml
+from xmodule.modulestore.xml_exporter import (
+    export_course_to_tar,
+    export_course_to_xml,
+    export_library_to_tar,
+    export_library_to_xml
+)
 from xmodule.modulestore.xml_importer import import_course_from_xml, import_library_from_xml
 
 User = get_user_model()
@@ -285,17 +290,30 @@ def create_export_tarball(course_module, course_key, context, status=None):
     root_dir = path(mkdtemp())
 
     try:
-        if isinstance(course_key, LibraryLocator):
-            export_library_to_xml(modulestore(), contentstore(), course_key, root_dir, name)
+        if settings.FEATURES.get('ENABLE_STREAMING_COURSE_EXPORT', False):
+            # Stream the exported xml and static assets straight into the tar file,
+            # so that exporting and compressing are a single step.
+            LOGGER.debug(u'tar file being generated at %s', export_file.name)
+            with tarfile.open(name=export_file.name, mode='w:gz') as tar_file:
+                if isinstance(course_key, LibraryLocator):
+                    export_library_to_tar(modulestore(), contentstore(), course_key, tar_file, name)
+                else:
+                    export_course_to_tar(modulestore(), contentstore(), course_module.id, tar_file, name)
+            if status:
+                status.set_state(u'Compressing')
+                status.increment_completed_steps()
         else:
-            export_course_to_xml(modulestore(), contentstore(), course_module.id, root_dir, name)
-
-        if status:
-            status.set_state(u'Compressing')
-            status.increment_completed_steps()
-        LOGGER.debug(u'tar file being generated at %s', export_file.name)
-        with tarfile.open(name=export_file.name, mode='w:gz') as tar_file:
-            tar_file.add(root_dir / name, arcname=name)
+            if isinstance(course_key, LibraryLocator):
+                export_library_to_xml(modulestore(), contentstore(), course_key, root_dir, name)
+            else:
+                export_course_to_xml(modulestore(), contentstore(), course_module.id, root_dir, name)
+
+            if status:
+                status.set_state(u'Compressing')
+                status.increment_completed_steps()
+            LOGGER.debug(u'tar file being generated at %s', export_file.name)
+            with tarfile.open(name=export_file.name, mode='w:gz') as tar_file:
+                tar_file.add(root_dir / name, arcname=name)
 
     except SerializationError as exc:
         LOGGER.exception(u'There was an error exporting %s', course_key, exc_info=True)
@@ -509,13 +527,19 @@ def import_olx(self, user_id, course_key_string, archive_path, archive_name, lan
         self.status.set_state(u'Updating')
         self.status.increment_completed_steps()
 
+        static_import_stats = {}
         courselike_items = import_func(
             modulestore(), user.id,
             settings.GITHUB_REPO_ROOT, [dirpath],
             load_error_modules=False,
             static_content_store=contentstore(),
-            target_id=courselike_key
+            target_id=courselike_key,
+            static_import_stats=static_import_stats,
         )
+        if static_import_stats:
+            UserTaskArtifact.objects.create(
+                status=self.status, name=u'Static Import Stats', text=json.dumps(static_import_stats)
+            )
 
         new_location = courselike_items[0].location
         LOGGER.debug(u'new course at %s', new_location)
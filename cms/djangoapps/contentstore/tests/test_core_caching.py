@@ -6,7 +6,16 @@ Tests core caching facilities.
 from django.test import TestCase
 from opaque_keys.edx.locator import AssetLocator, CourseLocator
 
-from openedx.core.djangoapps.contentserver.caching import del_cached_content, get_cached_content, set_cached_content
+from openedx.core.djangoapps.contentserver.caching import (
+    ASSET_NOT_FOUND,
+    del_cached_content,
+    get_cached_asset_metadata,
+    get_cached_content,
+    set_cached_asset_metadata,
+    set_cached_asset_not_found,
+    set_cached_content
+)
+from xmodule.contentstore.content import StaticContent
 
 
 class Content(object):
@@ -44,3 +53,23 @@ class CachingTestCase(TestCase):
                          'should not be stored in cache with unicodeLocation')
         self.assertEqual(None, get_cached_content(self.nonUnicodeLocation),
                          'should not be stored in cache with nonUnicodeLocation')
+
+    def test_metadata_put_and_get(self):
+        asset = StaticContent(
+            self.unicodeLocation, u'monsters.jpg', u'image/jpeg', b'my content', length=10, locked=True,
+            content_digest=u'digest',
+        )
+        set_cached_asset_metadata(asset)
+        metadata = get_cached_asset_metadata(self.nonUnicodeLocation)
+        self.assertIsNone(metadata.data, 'should not store the content')
+        self.assertEqual(
+            (metadata.content_type, metadata.length, metadata.locked, metadata.content_digest),
+            (u'image/jpeg', 10, True, u'digest'),
+        )
+
+    def test_delete_metadata(self):
+        set_cached_asset_not_found(self.unicodeLocation)
+        self.assertEqual(ASSET_NOT_FOUND, get_cached_asset_metadata(self.unicodeLocation))
+        del_cached_content(self.nonUnicodeLocation)
+        self.assertIsNone(get_cached_asset_metadata(self.unicodeLocation),
+                          'should not be stored in cache after the asset is uploaded')
@@ -350,6 +350,27 @@ class TestCoursewareSearchIndexer(MixedWithOptionsTestCase):
         response = self.search()
         self.assertEqual(response["total"], 3)
 
+    def _test_incremental_index(self, store):
+        """ test that only changed items are sent to the index """
+        self.publish_item(store, self.vertical.location)
+        self.assertEqual(self.reindex_course(store), 4)
+        self.assertEqual(CoursewareSearchIndexer.index(store, self.course.id, incremental=True), 0)
+
+        # only the updated item is indexed again
+        self.html_unit.display_name = "Updated Html Content"
+        self.update_item(store, self.html_unit)
+        self.publish_item(store, self.vertical.location)
+        self.assertEqual(CoursewareSearchIndexer.index(store, self.course.id, incremental=True), 1)
+        response = self.search()
+        self.assertEqual(response["total"], 4)
+
+        # deleted items are removed from the index
+        self.delete_item(store, self.html_unit.location)
+        self.publish_item(store, self.vertical.location)
+        self.assertEqual(CoursewareSearchIndexer.index(store, self.course.id, incremental=True), 0)
+        response = self.search()
+        self.assertEqual(response["total"], 3)
+
     def _test_start_date_propagation(self, store):
         """ make sure that the start date is applied at the right level """
         early_date = self.course.start
@@ -536,6 +557,10 @@ class TestCoursewareSearchIndexer(MixedWithOptionsTestCase):
     def test_deleting_item(self, store_type):
         self._perform_test_using_store(store_type, self._test_deleting_item)
 
+    @ddt.data(*WORKS_WITH_STORES)
+    def test_incremental_index(self, store_type):
+        self._perform_test_using_store(store_type, self._test_incremental_index)
+
     @ddt.data(*WORKS_WITH_STORES)
     def test_start_date_propagation(self, store_type):
         self._perform_test_using_store(store_type, self._test_start_date_propagation)
@@ -5,6 +5,7 @@ Unit tests for course import and export Celery tasks
 
 import copy
 import json
+import tarfile
 from uuid import uuid4
 
 import mock
@@ -16,7 +17,7 @@ from organizations.models import OrganizationCourse
 from organizations.tests.factories import OrganizationFactory
 from user_tasks.models import UserTaskArtifact, UserTaskStatus
 
-from cms.djangoapps.contentstore.tasks import export_olx, rerun_course
+from cms.djangoapps.contentstore.tasks import create_export_tarball, export_olx, rerun_course
 from cms.djangoapps.contentstore.tests.test_libraries import LibraryTestCase
 from cms.djangoapps.contentstore.tests.utils import CourseTestCase
 from common.djangoapps.course_action_state.models import CourseRerunState
@@ -80,6 +81,23 @@ class ExportCourseTestCase(CourseTestCase):
         result = export_olx.delay(nonstaff_user.id, key, u'en')
         self._assert_failed(result, u'Permission denied')
 
+    def test_streaming_export(self):
+        """
+        Verify that streaming an export into its tarball exports the same files
+        """
+        exported_files = {}
+        for streaming in (False, True):
+            features = dict(settings.FEATURES, ENABLE_STREAMING_COURSE_EXPORT=streaming)
+            with override_settings(FEATURES=features):
+                tarball = create_export_tarball(self.course, self.course.id, {})
+            with tarfile.open(tarball.name) as tar_file:
+                exported_files[streaming] = {
+                    member.name: tar_file.extractfile(member).read() for member in tar_file.getmembers()
+                    if member.isfile()
+                }
+        self.assertIn(u'{}/course.xml'.format(self.course.url_name), exported_files[True])
+        self.assertEqual(exported_files[True], exported_files[False])
+
     def _assert_failed(self, task_result, error_message):
         """
         Verify that a task failed with the specified error message
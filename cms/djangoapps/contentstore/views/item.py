@@ -349,6 +349,9 @@ def xblock_view_handler(request, usage_key_string, view_name):
         store = modulestore()
         xblock = store.get_item(usage_key)
         container_views = ['container_preview', 'reorderable_container_child_preview', 'container_child_preview']
+        if view_name in container_views:
+            # Load the definitions of all the blocks rendered in the container at once.
+            store.prefetch_definitions([xblock], depth=None)
 
         # wrap the generated fragment in the xmodule_editor div so that the javascript
         # can bind to it correctly
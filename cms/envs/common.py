@@ -149,6 +149,11 @@ BLOCK_STRUCTURES_SETTINGS = dict(
 
     # Backend storage options
     PRUNING_ACTIVE=False,
+
+    # Maximum number of deserialized collected block structures to keep
+    # in the memory of each process, or 0 to disable the per-process cache.
+    # The cache is only used when storage backing is enabled.
+    PROCESS_CACHE_SIZE=0,
 )
 
 ############################ FEATURE CONFIGURATION #############################
@@ -266,6 +271,12 @@ FEATURES = {
     # Enable content libraries (modulestore) search functionality
     'ENABLE_LIBRARY_INDEX': False,
 
+    # Only send the courseware and library items whose indexed content changed to the search index
+    'ENABLE_INCREMENTAL_SEARCH_INDEX': False,
+
+    # Stream course and library exports into their tar file instead of writing them to a temporary directory
+    'ENABLE_STREAMING_COURSE_EXPORT': False,
+
     # Enable content libraries (blockstore) indexing
     'ENABLE_CONTENT_LIBRARY_INDEX': False,
 
@@ -663,6 +674,9 @@ MIDDLEWARE = [
     # Cookie monitoring
     'openedx.core.lib.request_utils.CookieMonitoringMiddleware',
 
+    # Modulestore query profiling
+    'openedx.core.lib.modulestore_profiler.ModulestoreQueryProfilerMiddleware',
+
     'openedx.core.djangoapps.header_control.middleware.HeaderControlMiddleware',
     'django.middleware.cache.UpdateCacheMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -853,6 +867,18 @@ MODULESTORE = {
 # require student context.
 MODULESTORE_FIELD_OVERRIDE_PROVIDERS = ()
 
+# Profiler of the modulestore and contentstore queries made by each request.
+# See openedx.core.lib.modulestore_profiler.
+MODULESTORE_QUERY_PROFILER = {
+    'ENABLED': False,
+    # Add an X-Modulestore-Queries header summarizing the queries to responses.
+    'HEADER': False,
+    # Measure the size of each reply from MongoDB, which requires encoding it again.
+    'MEASURE_REPLY_SIZE': False,
+    # Log a summary of the queries of requests making at least this many round trips to MongoDB.
+    'LOG_THRESHOLD': 50,
+}
+
 DATABASES = {
     # edxapp's edxapp-migrate scripts and the edxapp_migrate play
     # will ensure that any DB not named read_replica will be migrated
@@ -916,6 +942,17 @@ CODE_JAIL = {
     # Keys should be course run ids.
     # Values should be dictionaries that look like 'limits'.
     "limit_overrides": {},
+
+    # Pool of warm sandboxed Pythons running jailed code in forked children,
+    # instead of spawning a sandboxed Python per execution.
+    # See common/lib/capa/capa/safe_exec/worker_pool.py.
+    'worker_pool': {
+        'ENABLED': False,
+        # How many workers does each process start?
+        'SIZE': 2,
+        # How many jobs does a worker run before it's replaced?
+        'MAX_JOBS': 100,
+    },
 }
 
 # Some courses are allowed to run unsafe code. This is a list of regexes, one
@@ -929,6 +966,11 @@ CODE_JAIL = {
 
 COURSES_WITH_UNSAFE_CODE = []
 
+# Maximum total size, in bytes of serialized XML, of the parsed and pre-processed
+# capa problem trees to keep in the memory of each process, so that problems aren't
+# parsed again for every learner, or 0 to disable the cache.
+CAPA_PARSED_PROBLEM_CACHE_MAX_BYTES = 0
+
 ############################ DJANGO_BUILTINS ################################
 # Change DEBUG in your environment settings files, not here
 DEBUG = False
@@ -1910,6 +1952,11 @@ CACHES = {
     },
 }
 
+# Maximum total size, in bytes of uncompressed pickles, of the split modulestore
+# course structures to keep in the memory of each process in front of the
+# 'course_structure_cache', or 0 to disable the per-process cache.
+COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES = 0
+
 ############################ OAUTH2 Provider ###################################
 
 
@@ -198,6 +198,9 @@ LOG_DIR = ENV_TOKENS['LOG_DIR']
 DATA_DIR = path(ENV_TOKENS.get('DATA_DIR', DATA_DIR))
 
 CACHES = ENV_TOKENS['CACHES']
+COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES = ENV_TOKENS.get(
+    'COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES', COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES
+)
 # Cache used for location mapping -- called many times with the same key/value
 # in a given request.
 if 'loc_cache' not in CACHES:
@@ -252,6 +255,9 @@ for name, value in ENV_TOKENS.get("CODE_JAIL", {}).items():
         CODE_JAIL[name] = value
 
 COURSES_WITH_UNSAFE_CODE = ENV_TOKENS.get("COURSES_WITH_UNSAFE_CODE", [])
+CAPA_PARSED_PROBLEM_CACHE_MAX_BYTES = ENV_TOKENS.get(
+    'CAPA_PARSED_PROBLEM_CACHE_MAX_BYTES', CAPA_PARSED_PROBLEM_CACHE_MAX_BYTES
+)
 
 # COMPREHENSIVE_THEME_LOCALE_PATHS contain the paths to themes locale directories e.g.
 # "COMPREHENSIVE_THEME_LOCALE_PATHS" : [
@@ -367,6 +373,7 @@ for name, database in DATABASES.items():
         })
 
 MODULESTORE = convert_module_store_setting_if_needed(AUTH_TOKENS.get('MODULESTORE', MODULESTORE))
+MODULESTORE_QUERY_PROFILER.update(ENV_TOKENS.get('MODULESTORE_QUERY_PROFILER', {}))
 
 MODULESTORE_FIELD_OVERRIDE_PROVIDERS = ENV_TOKENS.get(
     'MODULESTORE_FIELD_OVERRIDE_PROVIDERS',
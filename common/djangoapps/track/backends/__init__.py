@@ -25,3 +25,11 @@ class BaseBackend(six.with_metaclass(abc.ABCMeta, object)):
     def send(self, event):
         """Send event to tracker."""
         pass
+
+    def send_batch(self, events):
+        """
+        Send a list of events to tracker. Backends that can send several
+        events at once more efficiently should override this.
+        """
+        for event in events:
+            self.send(event)
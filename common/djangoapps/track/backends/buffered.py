@@ -0,0 +1,196 @@
+"""
+Buffered event tracker backend.
+
+Wraps another event tracker backend so that sending an event only adds it to
+a bounded in-memory queue, while a background thread sends the queued events
+to the wrapped backend in batches. This keeps the I/O done by backends such
+as the MongoDB backend out of the request thread.
+
+Example configuration::
+
+  TRACKING_BACKENDS = {
+      'mongo': {
+          'ENGINE': 'common.djangoapps.track.backends.buffered.BufferedBackend',
+          'OPTIONS': {
+              'backend': {
+                  'ENGINE': 'common.djangoapps.track.backends.mongodb.MongoBackend',
+                  'OPTIONS': {...},
+              },
+              'max_queue_size': 10000,
+              'batch_size': 100,
+          }
+      }
+  }
+
+"""
+
+
+import atexit
+import logging
+import os
+import threading
+
+from six.moves import queue
+
+from common.djangoapps.track.backends import BaseBackend
+
+log = logging.getLogger(__name__)
+
+
+class BufferedBackend(BaseBackend):
+    """
+    Event tracker backend that queues events in memory and sends them to a
+    wrapped backend in batches from a background thread.
+
+    When the queue is full, `send` waits for up to `put_timeout` seconds for
+    the background thread to make room (back-pressure) and then drops the
+    event. Queued events are flushed when the process exits.
+    """
+
+    def __init__(self, **kwargs):
+        """
+        :Parameters:
+
+          - `backend`: the configuration of the wrapped backend, a dict
+            with an `ENGINE` and optional `OPTIONS`, as in TRACKING_BACKENDS
+          - `max_queue_size`: maximum number of queued events
+          - `batch_size`: maximum number of events sent in a batch
+          - `flush_interval`: maximum number of seconds a batch waits
+            for more events before it's sent
+          - `put_timeout`: number of seconds `send` waits for room in a
+            full queue before dropping the event, 0 to drop it at once
+          - `close_timeout`: number of seconds to wait for the background
+            thread to send queued events when the process exits
+
+        """
+        super(BufferedBackend, self).__init__(**kwargs)
+
+        # Imported here, as the tracker module instantiates its backends,
+        # possibly including this one, when it's imported.
+        from common.djangoapps.track.tracker import _instantiate_backend_from_name
+
+        backend = kwargs['backend']
+        self.backend = _instantiate_backend_from_name(backend['ENGINE'], backend.get('OPTIONS', {}))
+
+        self.max_queue_size = kwargs.get('max_queue_size', 10000)
+        self.batch_size = kwargs.get('batch_size', 100)
+        self.flush_interval = kwargs.get('flush_interval', 1.0)
+        self.put_timeout = kwargs.get('put_timeout', 0)
+        self.close_timeout = kwargs.get('close_timeout', 5.0)
+
+        self.queue = queue.Queue(self.max_queue_size)
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        self._closing = threading.Event()
+        self._thread = None
+        self._pid = None
+
+        atexit.register(self.close)
+
+    def send(self, event):
+        """Queue the event to be sent by the background thread."""
+        self._ensure_thread()
+        try:
+            if self.put_timeout:
+                self.queue.put(event, timeout=self.put_timeout)
+            else:
+                self.queue.put_nowait(event)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                dropped = self.dropped
+            # Log the first dropped event, and then every thousandth one.
+            if dropped % 1000 == 1:
+                log.warning(
+                    u'Event tracker queue is full, %d events dropped so far (backend: %s)',
+                    dropped, type(self.backend).__name__,
+                )
+
+    def flush(self):
+        """Send all the queued events from the calling thread."""
+        batch = self._get_batch(block=False)
+        while batch:
+            self._send_batch(batch)
+            batch = self._get_batch(block=False)
+
+    def close(self):
+        """
+        Stop the background thread once it has sent the queued events, and
+        send any events that remain queued after `close_timeout` seconds.
+        """
+        self._closing.set()
+        thread = self._thread
+        if thread is not None and self._pid == os.getpid():
+            thread.join(self.close_timeout)
+        self.flush()
+
+    def stats(self):
+        """
+        Return a dict of the number of events that are queued, and the
+        cumulative number of events sent, dropped and failed to be sent.
+        """
+        return {
+            'queued': self.queue.qsize(),
+            'sent': self.sent,
+            'dropped': self.dropped,
+            'failed': self.failed,
+        }
+
+    def _ensure_thread(self):
+        """
+        Start the background thread if it isn't running in this process.
+        """
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            if self._pid is not None:
+                # Forked: the parent process sends the events it queued.
+                self.queue = queue.Queue(self.max_queue_size)
+            self._closing.clear()
+            self._thread = threading.Thread(target=self._run, name='BufferedBackend')
+            self._thread.daemon = True
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        """
+        Send the queued events in batches until the backend is closed.
+        """
+        while not self._closing.is_set():
+            batch = self._get_batch(block=True)
+            if batch:
+                self._send_batch(batch)
+        self.flush()
+
+    def _get_batch(self, block):
+        """
+        Return a list of up to `batch_size` queued events. If `block` is
+        True, wait for up to `flush_interval` seconds for the first event.
+        """
+        batch = []
+        try:
+            if block:
+                batch.append(self.queue.get(timeout=self.flush_interval))
+            while len(batch) < self.batch_size:
+                batch.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _send_batch(self, events):
+        """Send a batch of events to the wrapped backend."""
+        try:
+            self.backend.send_batch(events)
+        except Exception:  # pylint: disable=broad-except
+            with self._lock:
+                self.failed += len(events)
+            log.exception(
+                u'Error sending %d events to the %s event tracker backend', len(events), type(self.backend).__name__,
+            )
+        else:
+            with self._lock:
+                self.sent += len(events)
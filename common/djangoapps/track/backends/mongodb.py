@@ -98,3 +98,13 @@ class MongoBackend(BaseBackend):
             # during the next event.
             msg = 'Error inserting to MongoDB event tracker backend'
             log.exception(msg)
+
+    def send_batch(self, events):
+        """Insert the events in to the Mongo collection with a single request"""
+        try:
+            # insert_many sets the _id of the documents, so insert copies
+            # of the events to leave them unchanged.
+            self.collection.insert_many([dict(event) for event in events], ordered=False)
+        except (PyMongoError, BSONError):
+            msg = 'Error inserting to MongoDB event tracker backend'
+            log.exception(msg)
@@ -0,0 +1,76 @@
+"""Tests for the buffered event tracker backend."""
+
+
+import threading
+
+from django.test import TestCase
+
+from common.djangoapps.track.backends import BaseBackend
+from common.djangoapps.track.backends.buffered import BufferedBackend
+
+
+class BatchRecordingBackend(BaseBackend):
+    """A backend that records the batches of events it's sent."""
+    def __init__(self, **kwargs):
+        super(BatchRecordingBackend, self).__init__(**kwargs)
+        self.batches = []
+        self.can_send = threading.Event()
+        self.can_send.set()
+
+    def send(self, event):
+        self.send_batch([event])
+
+    def send_batch(self, events):
+        self.can_send.wait()
+        self.batches.append(list(events))
+
+
+class TestBufferedBackend(TestCase):
+    """Tests for BufferedBackend."""
+
+    def _create_backend(self, **options):
+        """
+        Returns a BufferedBackend wrapping a BatchRecordingBackend.
+        """
+        backend = BufferedBackend(
+            backend={'ENGINE': 'common.djangoapps.track.backends.tests.test_buffered.BatchRecordingBackend'},
+            **options
+        )
+        self.addCleanup(backend.close)
+        return backend
+
+    def test_send_in_batches(self):
+        backend = self._create_backend(batch_size=2, flush_interval=0.01)
+        events = [{'test': index} for index in range(5)]
+
+        for event in events:
+            backend.send(event)
+        backend.close()
+
+        batches = backend.backend.batches
+        self.assertEqual(sum(batches, []), events)
+        self.assertTrue(all(len(batch) <= 2 for batch in batches))
+        self.assertEqual(backend.stats(), {'queued': 0, 'sent': 5, 'dropped': 0, 'failed': 0})
+
+    def test_drop_when_full(self):
+        backend = self._create_backend(max_queue_size=2, batch_size=1)
+        # Block the background thread, so that the events stay queued.
+        backend.backend.can_send.clear()
+
+        for index in range(4):
+            backend.send({'test': index})
+        self.assertGreaterEqual(backend.dropped, 1)
+
+        backend.backend.can_send.set()
+        backend.close()
+        self.assertEqual(backend.sent + backend.dropped, 4)
+        self.assertEqual(backend.stats()['queued'], 0)
+
+    def test_failed_batch(self):
+        backend = self._create_backend()
+        backend.backend.send_batch = lambda events: 1 / 0
+
+        backend.send({'test': 1})
+        backend.close()
+
+        self.assertEqual(backend.stats(), {'queued': 0, 'sent': 0, 'dropped': 0, 'failed': 1})
@@ -36,3 +36,13 @@ class TestMongoBackend(TestCase):
 
         self.assertEqual(events[0], first_argument(calls[0]))
         self.assertEqual(events[1], first_argument(calls[1]))
+
+    def test_mongo_backend_send_batch(self):
+        events = [{'test': 1}, {'test': 2}]
+
+        self.backend.send_batch(events)
+
+        # Check that the events were inserted with a single request,
+        # without being changed
+        self.backend.collection.insert_many.assert_called_once_with(events, ordered=False)
+        self.assertEqual(events, [{'test': 1}, {'test': 2}])
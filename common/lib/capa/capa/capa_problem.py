@@ -14,6 +14,7 @@ This is used by capa_module.
 """
 
 
+import json
 import logging
 import os.path
 import re
@@ -32,6 +33,7 @@ import capa.inputtypes as inputtypes
 import capa.responsetypes as responsetypes
 import capa.xqueue_interface as xqueue_interface
 from capa.correctmap import CorrectMap
+from capa.parsed_problem_cache import ParsedProblem, get_parsed_problem_cache
 from capa.safe_exec import safe_exec
 from capa.util import contextualize_text, convert_files_to_filenames, get_course_id_from_capa_module
 from openedx.core.djangolib.markup import HTML, Text
@@ -184,26 +186,9 @@ class LoncapaProblem(object):
         problem_text = re.sub(r"endouttext\s*/", "/text", problem_text)
         self.problem_text = problem_text
 
-        # parse problem XML file into an element tree
-        if isinstance(problem_text, six.text_type):
-            # etree chokes on Unicode XML with an encoding declaration
-            problem_text = problem_text.encode('utf-8')
-        self.tree = etree.XML(problem_text)
-
-        try:
-            self.make_xml_compatible(self.tree)
-        except Exception:
-            capa_module = self.capa_module
-            log.exception(
-                "CAPAProblemError: %s, id:%s, data: %s",
-                capa_module.display_name,
-                self.problem_id,
-                capa_module.data
-            )
-            raise
-
-        # handle any <include file="foo"> tags
-        self._process_includes()
+        # Parse the XML tree, handle any <include file="foo"> tags, and assign IDs to the
+        # responses and inputs.  This doesn't depend on the seed, so it's cached.
+        self.tree, self.problem_data = self._parse_problem(problem_text)
 
         # construct script processor context (eg for customresponse problems)
         if minimal_init:
@@ -211,11 +196,11 @@ class LoncapaProblem(object):
         else:
             self.context = self._extract_context(self.tree)
 
-        # Pre-parse the XML tree: modifies it to add ID's and perform some in-place
-        # transformations.  This also creates the dict (self.responders) of Response
-        # instances for each question in the problem. The dict has keys = xml subtree of
-        # Response, values = Response instance
-        self.problem_data = self._preprocess_problem(self.tree, minimal_init)
+        # Pre-parse the XML tree: modifies it to perform some in-place transformations.
+        # This also creates the dict (self.responders) of Response instances for each
+        # question in the problem. The dict has keys = xml subtree of Response, values =
+        # Response instance
+        self._preprocess_problem(self.tree, minimal_init)
 
         if not minimal_init:
             if not self.student_answers:  # True when student_answers is an empty dict
@@ -236,6 +221,49 @@ class LoncapaProblem(object):
             if extract_tree:
                 self.extracted_tree = self._extract_html(self.tree)
 
+    def _parse_problem(self, problem_text):
+        """
+        Parse the problem XML, translate it for compatibility, handle its
+        includes and assign the IDs of its responses and inputs.
+
+        Returns the resulting tree and the accessibility data of the inputs,
+        from the parsed problem cache if it's enabled.  Problems with includes
+        aren't cached, since the included files may change.
+        """
+        cache = get_parsed_problem_cache()
+        if cache is not None:
+            cache_key = cache.key(self.problem_id, problem_text)
+            parsed_problem = cache.get(cache_key)
+            if parsed_problem is not None:
+                return parsed_problem
+
+        # parse problem XML file into an element tree
+        if isinstance(problem_text, six.text_type):
+            # etree chokes on Unicode XML with an encoding declaration
+            problem_text = problem_text.encode('utf-8')
+        self.tree = etree.XML(problem_text)
+
+        try:
+            self.make_xml_compatible(self.tree)
+        except Exception:
+            capa_module = self.capa_module
+            log.exception(
+                "CAPAProblemError: %s, id:%s, data: %s",
+                capa_module.display_name,
+                self.problem_id,
+                capa_module.data
+            )
+            raise
+
+        has_includes = self.tree.find('.//include') is not None
+        # handle any <include file="foo"> tags
+        self._process_includes()
+
+        problem_data = self._assign_ids(self.tree)
+        if cache is not None and not has_includes:
+            cache.set(cache_key, ParsedProblem(self.tree, problem_data))
+        return self.tree, problem_data
+
     def make_xml_compatible(self, tree):
         """
         Adjust tree xml in-place for compatibility before creating
@@ -497,6 +525,39 @@ class LoncapaProblem(object):
 
         return newcmap
 
+    def get_grading_key(self):
+        """
+        Returns a key identifying the grading of the current answers for rescoring:
+        problems with the same id and key get the same correctness map from
+        get_grade_from_current_answers(None), so the answers of many students can be
+        graded once.  Returns None if no such key can be computed, which is the case
+        for problems with Python scripts or with responses whose grading depends on
+        more than the answers and the seed, such as custom responses.
+
+        The key includes the seed, the saved answers, and the previous correctness map,
+        which is passed to the responses.  The attempt number and the anonymous student
+        id are only included when the problem refers to them, since they are different
+        for most students.
+        """
+        if self.context.get('script_code'):
+            return None
+        if not all(responder.graded_by_answers for responder in self.responders.values()):
+            return None
+        try:
+            key = [
+                self.problem_id,
+                self.seed,
+                json.dumps(self.student_answers, sort_keys=True),
+                json.dumps(self.correct_map.get_dict(), sort_keys=True),
+            ]
+        except (TypeError, ValueError):
+            return None
+        if 'attempt' in self.problem_text:
+            key.append(self.context.get('attempt'))
+        if 'anonymous_student_id' in self.problem_text:
+            key.append(self.capa_system.anonymous_student_id)
+        return tuple(key)
+
     def get_question_answers(self):
         """
         Returns a dict of answer_ids to answer values. If we cannot generate
@@ -1063,20 +1124,16 @@ class LoncapaProblem(object):
 
         return tree
 
-    def _preprocess_problem(self, tree, minimal_init):  # private
+    def _assign_ids(self, tree):  # private
         """
         Assign IDs to all the responses
         Assign sub-IDs to all entries (textline, schematic, etc.)
-        Annoted correctness and value
         In-place transformation
 
-        Also create capa Response instances for each responsetype and save as self.responders
-
-        Obtain all responder answers and save as self.responder_answers dict (key = response)
+        Returns the accessibility data of the inputs, keyed by input id.
         """
         response_id = 1
         problem_data = {}
-        self.responders = {}
         for response in tree.xpath('//' + "|//".join(responsetypes.registry.registered_tags())):
             responsetype_id = self.problem_id + "_" + str(response_id)
             # create and save ID for this response
@@ -1084,11 +1141,7 @@ class LoncapaProblem(object):
             response_id += 1
 
             answer_id = 1
-            input_tags = inputtypes.registry.registered_tags()
-            inputfields = tree.xpath(
-                "|".join(['//' + response.tag + '[@id=$id]//' + x for x in input_tags]),
-                id=responsetype_id
-            )
+            inputfields = self._get_inputfields(tree, response)
 
             # assign one answer_id for each input type
             for entry in inputfields:
@@ -1099,6 +1152,32 @@ class LoncapaProblem(object):
 
             self.response_a11y_data(response, inputfields, responsetype_id, problem_data)
 
+        return problem_data
+
+    def _get_inputfields(self, tree, response):  # private
+        """
+        Return the input elements of the given response.
+        """
+        input_tags = inputtypes.registry.registered_tags()
+        return tree.xpath(
+            "|".join(['//' + response.tag + '[@id=$id]//' + x for x in input_tags]),
+            id=response.get('id')
+        )
+
+    def _preprocess_problem(self, tree, minimal_init):  # private
+        """
+        Annoted correctness and value
+        In-place transformation
+
+        Create capa Response instances for each responsetype, whose IDs must
+        have been assigned by _assign_ids, and save as self.responders
+
+        Obtain all responder answers and save as self.responder_answers dict (key = response)
+        """
+        self.responders = {}
+        for response in tree.xpath('//' + "|//".join(responsetypes.registry.registered_tags())):
+            inputfields = self._get_inputfields(tree, response)
+
             # instantiate capa Response
             responsetype_cls = responsetypes.registry.get_class_for_tag(response.tag)
             responder = responsetype_cls(
@@ -1127,8 +1206,6 @@ class LoncapaProblem(object):
                 solution.attrib['id'] = "%s_solution_%i" % (self.problem_id, solution_id)
                 solution_id += 1
 
-        return problem_data
-
     def response_a11y_data(self, response, inputfields, responsetype_id, problem_data):
         """
         Construct data to be used for a11y.
@@ -0,0 +1,131 @@
+"""
+A process-local cache of parsed and pre-processed capa problem trees.
+
+Parsing a problem's XML, applying the compatibility translations and
+assigning the IDs of its responses and inputs don't depend on the learner
+or on the problem's seed, so LoncapaProblem caches the resulting tree and
+accessibility data, keyed by the problem's id and a hash of its XML, and
+gives each instance its own copy of the cached tree.  Running the problem's
+scripts and creating its responders, which depend on the seed, still happen
+for every instance.
+"""
+
+
+import hashlib
+from collections import OrderedDict, namedtuple
+from copy import deepcopy
+from threading import Lock
+
+import six
+from django.conf import settings
+from lxml import etree
+
+# The pre-processed tree of a problem, and the accessibility data of its inputs.
+ParsedProblem = namedtuple('ParsedProblem', ['tree', 'problem_data'])
+
+
+class ParsedProblemCache(object):
+    """
+    A thread-safe, least-recently-used cache of ParsedProblems in the memory
+    of the current process.
+
+    The cache is bounded by the total size of the cached trees, measured as
+    the length of their serialized XML.  Cached ParsedProblems are never
+    returned to callers, who get copies of them, since LoncapaProblem
+    modifies its tree.
+    """
+    def __init__(self, max_bytes):
+        """
+        Arguments:
+            max_bytes (int): The maximum total size of the cached trees.
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(problem_id, problem_text):
+        """
+        Return the cache key of the problem with the given id and XML.
+        """
+        if isinstance(problem_text, six.text_type):
+            problem_text = problem_text.encode('utf-8')
+        return u'{}:{}'.format(problem_id, hashlib.sha1(problem_text).hexdigest())
+
+    def get(self, key):
+        """
+        Return a copy of the cached ParsedProblem with the given key, or None.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries[key] = entry
+            self.hits += 1
+        parsed_problem = entry[0]
+        return ParsedProblem(deepcopy(parsed_problem.tree), deepcopy(parsed_problem.problem_data))
+
+    def set(self, key, parsed_problem):
+        """
+        Cache a copy of the given ParsedProblem, evicting the least recently
+        used problems as needed.  Problems larger than the cache are not cached.
+        """
+        size = len(etree.tostring(parsed_problem.tree))
+        if size > self.max_bytes:
+            return
+        parsed_problem = ParsedProblem(deepcopy(parsed_problem.tree), deepcopy(parsed_problem.problem_data))
+        with self._lock:
+            previous_entry = self._entries.pop(key, None)
+            if previous_entry is not None:
+                self.current_bytes -= previous_entry[1]
+            self._entries[key] = (parsed_problem, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Remove all cached problems and reset the metrics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """
+        Return a dict of the cache's current size and its cumulative hit, miss
+        and eviction counts.
+        """
+        return {
+            'problems': len(self._entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+_PARSED_PROBLEM_CACHE = None
+
+
+def get_parsed_problem_cache():
+    """
+    Return the process-wide ParsedProblemCache, or None if it's disabled,
+    which is the case when the CAPA_PARSED_PROBLEM_CACHE_MAX_BYTES django
+    setting is not a positive number.
+    """
+    global _PARSED_PROBLEM_CACHE  # pylint: disable=global-statement
+    max_bytes = getattr(settings, 'CAPA_PARSED_PROBLEM_CACHE_MAX_BYTES', 0)
+    if not max_bytes or max_bytes < 1:
+        return None
+    if _PARSED_PROBLEM_CACHE is None or _PARSED_PROBLEM_CACHE.max_bytes != max_bytes:
+        _PARSED_PROBLEM_CACHE = ParsedProblemCache(max_bytes)
+    return _PARSED_PROBLEM_CACHE
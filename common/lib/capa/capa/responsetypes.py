@@ -51,7 +51,9 @@ from openedx.core.lib.grade_utils import round_away_from_zero
 
 from . import correctmap
 from .registry import TagRegistry
+from .sampled_formula import parse_formula
 from .util import (
+    compare_many_with_tolerance,
     compare_with_tolerance,
     contextualize_text,
     convert_files_to_filenames,
@@ -163,6 +165,11 @@ class LoncapaResponse(six.with_metaclass(abc.ABCMeta, object)):
     # By default, we set this to False, allowing subclasses to override as appropriate.
     multi_device_support = False
 
+    # Whether the grading of this capa response type only depends on the student's
+    # answers and on the problem's seed, but not on other context such as graders
+    # run by Python code, so that equal answers to a problem can be graded once.
+    graded_by_answers = False
+
     def __init__(self, xml, inputfields, context, system, capa_module, minimal_init):
         """
         Init is passed the following arguments:
@@ -675,6 +682,7 @@ class ChoiceResponse(LoncapaResponse):
     allowed_inputfields = ['checkboxgroup', 'radiogroup']
     correct_choices = None
     multi_device_support = True
+    graded_by_answers = True
 
     def setup_response(self):
         self.assign_choice_names()
@@ -999,6 +1007,7 @@ class MultipleChoiceResponse(LoncapaResponse):
     allowed_inputfields = ['choicegroup']
     correct_choices = None
     multi_device_support = True
+    graded_by_answers = True
 
     def setup_response(self):
         """
@@ -1438,6 +1447,7 @@ class OptionResponse(LoncapaResponse):
     allowed_inputfields = ['optioninput']
     answer_fields = None
     multi_device_support = True
+    graded_by_answers = True
 
     def setup_response(self):
         self.answer_fields = self.inputfields
@@ -1513,6 +1523,7 @@ class NumericalResponse(LoncapaResponse):
     required_attributes = ['answer']
     max_inputfields = 1
     multi_device_support = True
+    graded_by_answers = True
 
     def __init__(self, *args, **kwargs):
         self.correct_answer = ''
@@ -1875,6 +1886,7 @@ class StringResponse(LoncapaResponse):
     max_inputfields = 1
     correct_answer = []
     multi_device_support = True
+    graded_by_answers = True
 
     def setup_response_backward(self):
         self.correct_answer = [
@@ -3041,6 +3053,7 @@ class FormulaResponse(LoncapaResponse):
     required_attributes = ['answer', 'samples']
     max_inputfields = 1
     multi_device_support = True
+    graded_by_answers = True
 
     def __init__(self, *args, **kwargs):
         self.correct_answer = ''
@@ -3092,66 +3105,64 @@ class FormulaResponse(LoncapaResponse):
         Takes in an answer and a list of dictionaries mapping variables to values.
         Each dictionary represents a test case for the answer.
         Returns a tuple of formula evaluation results.
+
+        The answer is parsed once, and evaluated for all the test cases at once
+        when possible (see capa.sampled_formula).
         """
         _ = edx_six.get_gettext(self.capa_system.i18n)
 
-        out = []
-        for var_dict in var_dict_list:
-            try:
-                out.append(evaluator(
-                    var_dict,
-                    dict(),
-                    answer,
-                    case_sensitive=self.case_sensitive,
-                ))
-            except UndefinedVariable as err:
-                log.debug(
-                    'formularesponse: undefined variable in formula=%s',
-                    html.escape(answer)
-                )
-                raise StudentInputError(
-                    err.args[0]
-                )
-            except UnmatchedParenthesis as err:
+        if not var_dict_list:
+            return []
+        try:
+            out = parse_formula(answer, self.case_sensitive).evaluate_samples(var_dict_list)
+        except UndefinedVariable as err:
+            log.debug(
+                'formularesponse: undefined variable in formula=%s',
+                html.escape(answer)
+            )
+            raise StudentInputError(
+                err.args[0]
+            )
+        except UnmatchedParenthesis as err:
+            log.debug(
+                'formularesponse: unmatched parenthesis in formula=%s',
+                html.escape(answer)
+            )
+            raise StudentInputError(
+                err.args[0]
+            )
+        except ValueError as err:
+            if 'factorial' in text_type(err):
+                # This is thrown when fact() or factorial() is used in a formularesponse answer
+                #   that tests on negative and/or non-integer inputs
+                # text_type(err) will be: `factorial() only accepts integral values` or
+                # `factorial() not defined for negative values`
                 log.debug(
-                    'formularesponse: unmatched parenthesis in formula=%s',
+                    ('formularesponse: factorial function used in response '
+                     'that tests negative and/or non-integer inputs. '
+                     'Provided answer was: %s'),
                     html.escape(answer)
                 )
                 raise StudentInputError(
-                    err.args[0]
+                    _("Factorial function not permitted in answer "
+                      "for this problem. Provided answer was: "
+                      "{bad_input}").format(bad_input=html.escape(answer))
                 )
-            except ValueError as err:
-                if 'factorial' in text_type(err):
-                    # This is thrown when fact() or factorial() is used in a formularesponse answer
-                    #   that tests on negative and/or non-integer inputs
-                    # text_type(err) will be: `factorial() only accepts integral values` or
-                    # `factorial() not defined for negative values`
-                    log.debug(
-                        ('formularesponse: factorial function used in response '
-                         'that tests negative and/or non-integer inputs. '
-                         'Provided answer was: %s'),
-                        html.escape(answer)
-                    )
-                    raise StudentInputError(
-                        _("Factorial function not permitted in answer "
-                          "for this problem. Provided answer was: "
-                          "{bad_input}").format(bad_input=html.escape(answer))
-                    )
-                # If non-factorial related ValueError thrown, handle it the same as any other Exception
-                log.debug('formularesponse: error %s in formula', err)
-                raise StudentInputError(
-                    _("Invalid input: Could not parse '{bad_input}' as a formula.").format(
-                        bad_input=html.escape(answer)
-                    )
+            # If non-factorial related ValueError thrown, handle it the same as any other Exception
+            log.debug('formularesponse: error %s in formula', err)
+            raise StudentInputError(
+                _("Invalid input: Could not parse '{bad_input}' as a formula.").format(
+                    bad_input=html.escape(answer)
                 )
-            except Exception as err:
-                # traceback.print_exc()
-                log.debug('formularesponse: error %s in formula', err)
-                raise StudentInputError(
-                    _("Invalid input: Could not parse '{bad_input}' as a formula").format(
-                        bad_input=html.escape(answer)
-                    )
+            )
+        except Exception as err:
+            # traceback.print_exc()
+            log.debug('formularesponse: error %s in formula', err)
+            raise StudentInputError(
+                _("Invalid input: Could not parse '{bad_input}' as a formula").format(
+                    bad_input=html.escape(answer)
                 )
+            )
         return out
 
     def randomize_variables(self, samples):
@@ -3185,8 +3196,7 @@ class FormulaResponse(LoncapaResponse):
         student_result = self.tupleize_answers(given, var_dict_list)
         instructor_result = self.tupleize_answers(expected, var_dict_list)
 
-        correct = all(compare_with_tolerance(student, instructor, self.tolerance)
-                      for student, instructor in zip(student_result, instructor_result))
+        correct = all(compare_many_with_tolerance(student_result, instructor_result, self.tolerance))
         if correct:
             return "correct"
         else:
@@ -3336,6 +3346,7 @@ class ImageResponse(LoncapaResponse):
     human_name = _('Image Mapped Input')
     tags = ['imageresponse']
     allowed_inputfields = ['imageinput']
+    graded_by_answers = True
 
     def __init__(self, *args, **kwargs):
         self.ielements = []
@@ -3587,6 +3598,7 @@ class ChoiceTextResponse(LoncapaResponse):
         'checkboxtextgroup',
         'radiotextgroup',
     ]
+    graded_by_answers = True
 
     def __init__(self, *args, **kwargs):
         self.correct_inputs = {}
@@ -2,6 +2,7 @@
 
 
 import hashlib
+import logging
 
 from codejail.safe_exec import SafeExecException, json_safe
 from codejail.safe_exec import not_safe_exec as codejail_not_safe_exec
@@ -9,7 +10,9 @@ from codejail.safe_exec import safe_exec as codejail_safe_exec
 import six
 from six import text_type
 
-from . import lazymod
+from . import lazymod, worker_pool
+
+log = logging.getLogger(__name__)
 
 # Establish the Python environment for Capa.
 # Capa assumes float-friendly division always.
@@ -55,6 +58,9 @@ for name, modname in ASSUMED_IMPORTS:
 
 LAZY_IMPORTS = "".join(LAZY_IMPORTS)
 
+# The modules imported once by the warm sandbox workers.
+PRELOADED_MODULES = ["random2", "six"] + [modname for _, modname in ASSUMED_IMPORTS]
+
 
 def update_hash(hasher, obj):
     """
@@ -79,6 +85,30 @@ def update_hash(hasher, obj):
         hasher.update(six.b(repr(obj)))
 
 
+def _pooled_safe_exec(code, globals_dict, python_path=None, extra_files=None, limit_overrides_context=None, slug=None):
+    """
+    Execute python code in a warm sandbox worker, or with codejail if no worker can run it.
+    """
+    try:
+        worker_pool.get_pool(PRELOADED_MODULES).run(
+            code,
+            globals_dict,
+            python_path=python_path,
+            extra_files=extra_files,
+            limit_overrides_context=limit_overrides_context,
+        )
+    except worker_pool.SandboxWorkerError as exc:
+        log.info(u"Running %s with codejail: %s", slug, exc)
+        codejail_safe_exec(
+            code,
+            globals_dict,
+            python_path=python_path,
+            extra_files=extra_files,
+            limit_overrides_context=limit_overrides_context,
+            slug=slug,
+        )
+
+
 def safe_exec(
     code,
     globals_dict,
@@ -144,6 +174,8 @@ def safe_exec(
     # Decide which code executor to use.
     if unsafely:
         exec_fn = codejail_not_safe_exec
+    elif worker_pool.is_enabled():
+        exec_fn = _pooled_safe_exec
     else:
         exec_fn = codejail_safe_exec
 
@@ -0,0 +1,297 @@
+"""
+A sandbox worker, run by the sandboxed Python to execute jobs for the
+worker pool in worker_pool.py.
+
+The source of this module is passed to the sandboxed Python with -c, along
+with the names of the modules to preload, so it can only use the standard
+library and the sandbox packages.
+
+The worker imports the preloaded modules once, then reads jobs from stdin
+and writes their results to stdout, each as a JSON object prefixed with its
+length.  Every job is run in a child process forked from the worker, which
+applies the job's resource limits before running the code, so that jobs
+inherit the preloaded modules but not each other's state or CPU time.
+
+Unlike codejail, which starts a new sandboxed Python for each run, the worker
+outlives its jobs and receives the code and globals of later jobs, so a job
+must not leave any process behind.  The child can't start processes or
+threads: its RLIMIT_NPROC is 0, whatever the job's NPROC limit, as a process
+could otherwise leave the child's process group with setsid and keep running
+next to the worker.  The limit isn't enforced for root, so the sandbox user
+must not be root.  The child also leads its own process group, which the
+worker kills once the job is done, or once it has run for longer than the
+job's REALTIME limit.  The worker exits when stdin is closed.
+"""
+
+
+import base64
+import errno
+import json
+import os
+import random
+import resource
+import select
+import shutil
+import signal
+import struct
+import sys
+import tempfile
+import time
+import traceback
+
+HEADER = struct.Struct('>I')
+
+# Types of the globals returned to the caller, as in codejail.safe_exec.
+RESULT_TYPES = (type(None), int, float, bytes, str, list, tuple, dict)
+
+# Seconds between checks that the child running a job is still alive.
+POLL_INTERVAL = 0.05
+
+
+def read_message(stream):
+    """
+    Returns the next message read from the binary stream, or None at the end of the stream.
+    """
+    header = stream.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return None
+    (length,) = HEADER.unpack(header)
+    return json.loads(stream.read(length).decode('utf-8'))
+
+
+def write_message(stream, message):
+    """
+    Writes the message to the binary stream.
+    """
+    data = json.dumps(message).encode('utf-8')
+    stream.write(HEADER.pack(len(data)) + data)
+    stream.flush()
+
+
+def preload(module_names):
+    """
+    Imports the given modules, and returns the names of those that could be imported.
+    """
+    # See TNL-6456; this must be set before numpy is imported.
+    os.environ["OPENBLAS_NUM_THREADS"] = "1"
+    preloaded = []
+    for module_name in module_names:
+        try:
+            __import__(module_name)
+        except Exception:  # pylint: disable=broad-except
+            continue
+        preloaded.append(module_name)
+    return preloaded
+
+
+def set_limits(limits):
+    """
+    Applies the job's resource limits to the current process, as codejail
+    does, except that the process can't start other processes.
+    """
+    if limits.get('CPU'):
+        resource.setrlimit(resource.RLIMIT_CPU, (limits['CPU'], limits['CPU'] + 1))
+    if limits.get('VMEM'):
+        resource.setrlimit(resource.RLIMIT_AS, (limits['VMEM'], limits['VMEM']))
+    # RLIMIT_NPROC limits the processes of the sandbox user, which already
+    # runs the worker and this process, so any fork or thread creation fails.
+    resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+    if 'FSIZE' in limits:
+        resource.setrlimit(resource.RLIMIT_FSIZE, (limits['FSIZE'], limits['FSIZE']))
+
+
+def reseed():
+    """
+    Reseeds the random number generators, whose state the children would
+    otherwise all inherit from the worker.
+    """
+    random.seed()
+    numpy = sys.modules.get('numpy')
+    if numpy is not None:
+        numpy.random.seed()
+
+
+def jsonable(value):
+    """
+    Returns whether the value can be returned to the caller.
+    """
+    if not isinstance(value, RESULT_TYPES):
+        return False
+    try:
+        json.dumps(value)
+    except Exception:  # pylint: disable=broad-except
+        return False
+    return True
+
+
+def format_exception():
+    """
+    Returns the traceback of the exception being handled, without the frame of the worker.
+    """
+    exc_type, exc_value, exc_traceback = sys.exc_info()
+    return ''.join(traceback.format_exception(exc_type, exc_value, exc_traceback.tb_next))
+
+
+def run_child(job, tmp_dir, result_fd):
+    """
+    Runs the job in the current, forked, process, and writes its result to result_fd.
+    """
+    for name, content in job['files']:
+        with open(os.path.join(tmp_dir, name), 'wb') as job_file:
+            job_file.write(base64.b64decode(content))
+    os.chdir(tmp_dir)
+    sys.path.extend(job['python_path'])
+
+    # The code's output must not be mixed with the worker's messages.
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+
+    set_limits(job['limits'])
+    reseed()
+
+    globals_dict = job['globals']
+    error = None
+    try:
+        exec(compile(job['code'], 'jailed_code', 'exec'), globals_dict)  # pylint: disable=exec-used
+    except SystemExit as exc:
+        if exc.code:
+            error = format_exception()
+    except BaseException:  # pylint: disable=broad-except
+        error = format_exception()
+
+    result = {
+        'globals': {
+            name: value for name, value in globals_dict.items()
+            if name != '__builtins__' and jsonable(value)
+        },
+        'error': error,
+    }
+    data = json.dumps(result).encode('utf-8')
+    data = HEADER.pack(len(data)) + data
+    while data:
+        data = data[os.write(result_fd, data):]
+
+
+def read_result(read_fd, pid, deadline):
+    """
+    Reads the result written by the child with the given pid to read_fd, and
+    waits for the child to exit, without reaping it.
+
+    Returns a (data, timed_out) tuple: the result, or None if the child
+    didn't write all of it, and whether the deadline was reached first.
+    Processes started by the child may keep the pipe open, so this doesn't
+    wait for the end of the pipe, but for the whole result and the exit of
+    the child.
+    """
+    data = b''
+    result = None
+    exited = False
+    while True:
+        if result is None and len(data) >= HEADER.size:
+            (length,) = HEADER.unpack(data[:HEADER.size])
+            if len(data) >= HEADER.size + length:
+                result = data[HEADER.size:HEADER.size + length]
+        if not exited:
+            exited = os.waitid(os.P_PID, pid, os.WEXITED | os.WNOHANG | os.WNOWAIT) is not None
+        if result is not None and exited:
+            return result, False
+
+        timeout = POLL_INTERVAL
+        if deadline is not None:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return result, True
+            timeout = min(timeout, remaining)
+
+        if result is not None:
+            # The child is exiting after writing its result.
+            time.sleep(timeout)
+            continue
+        if exited:
+            # Read what's left of the result, without waiting.
+            timeout = 0
+        readable, _, _ = select.select([read_fd], [], [], timeout)
+        if not readable:
+            if exited:
+                return None, False
+            continue
+        chunk = os.read(read_fd, 65536)
+        if chunk:
+            data += chunk
+        elif exited:
+            return None, False
+        else:
+            # Every process that had the pipe open closed it, so the child is exiting.
+            os.waitid(os.P_PID, pid, os.WEXITED | os.WNOWAIT)
+            exited = True
+
+
+def kill_process_group(pgid):
+    """
+    Kills the processes of the given process group, if any are left.
+    """
+    try:
+        os.killpg(pgid, signal.SIGKILL)
+    except OSError as exc:
+        if exc.errno not in (errno.ESRCH, errno.EPERM):
+            raise
+
+
+def run_job(job):
+    """
+    Runs the job in a forked child process, and returns its result.
+    """
+    tmp_dir = tempfile.mkdtemp(prefix='codejail-')
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        status = 1
+        try:
+            os.setsid()
+            run_child(job, tmp_dir, write_fd)
+            status = 0
+        finally:
+            os._exit(status)  # pylint: disable=protected-access
+
+    os.close(write_fd)
+    realtime = job['limits'].get('REALTIME')
+    deadline = time.time() + realtime if realtime else None
+    try:
+        data, timed_out = read_result(read_fd, pid, deadline)
+    finally:
+        os.close(read_fd)
+        # The child leads a process group, which includes any process it
+        # started, and isn't reaped yet, so the group can't have been reused.
+        kill_process_group(pid)
+        _, status = os.waitpid(pid, 0)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if timed_out:
+        return {'status': -signal.SIGKILL, 'error': 'Killed after {} seconds'.format(realtime)}
+    if os.WIFSIGNALED(status):
+        return {'status': -os.WTERMSIG(status), 'error': None}
+    if data is None or os.WEXITSTATUS(status):
+        return {'status': os.WEXITSTATUS(status) or 1, 'error': None}
+    result = json.loads(data.decode('utf-8'))
+    result['status'] = 1 if result['error'] else 0
+    return result
+
+
+def main():
+    """
+    Preloads the modules named by the arguments, then runs jobs until stdin is closed.
+    """
+    stdin = sys.stdin.buffer
+    stdout = sys.stdout.buffer
+    write_message(stdout, {'ready': True, 'preloaded': preload(sys.argv[1:])})
+    while True:
+        job = read_message(stdin)
+        if job is None:
+            break
+        write_message(stdout, run_job(job))
+
+
+if __name__ == '__main__':
+    main()
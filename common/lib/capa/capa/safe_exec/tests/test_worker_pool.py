@@ -0,0 +1,148 @@
+"""Test the sandbox workers of worker_pool.py"""
+
+
+import base64
+import io
+import os
+import time
+import unittest
+
+import ddt
+import pytest
+from codejail import jail_code
+from codejail.safe_exec import SafeExecException
+
+from capa.safe_exec import sandbox_worker
+from capa.safe_exec.safe_exec import PRELOADED_MODULES
+from capa.safe_exec.worker_pool import SandboxWorkerPool
+
+
+def _job(code, globals_dict=None, files=(), python_path=(), limits=None):
+    """
+    Returns a sandbox worker job.
+    """
+    return {
+        'code': code,
+        'globals': globals_dict or {},
+        'files': [(name, base64.b64encode(content).decode('ascii')) for name, content in files],
+        'python_path': list(python_path),
+        'limits': limits or {'CPU': 1, 'REALTIME': 3},
+    }
+
+
+def _wait_for_exit(pid, timeout=2):
+    """
+    Returns whether the process with the given pid exited, or is a zombie, within the timeout.
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with open('/proc/{}/stat'.format(pid)) as stat_file:
+                if stat_file.read().split(')')[-1].split()[0] == 'Z':
+                    return True
+        except IOError:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+@ddt.ddt
+class TestSandboxWorker(unittest.TestCase):
+    """
+    Test the jobs run by sandbox_worker.py, in forked children of the test process.
+    """
+    def test_messages(self):
+        stream = io.BytesIO()
+        sandbox_worker.write_message(stream, {'a': [1, 2]})
+        sandbox_worker.write_message(stream, {'b': None})
+        stream.seek(0)
+        self.assertEqual(sandbox_worker.read_message(stream), {'a': [1, 2]})
+        self.assertEqual(sandbox_worker.read_message(stream), {'b': None})
+        self.assertIsNone(sandbox_worker.read_message(stream))
+
+    def test_globals(self):
+        result = sandbox_worker.run_job(_job("b = a * 2\nc = object()", {'a': 17}))
+        self.assertEqual(result['status'], 0)
+        self.assertEqual(result['globals'], {'a': 17, 'b': 34})
+
+    def test_extra_files(self):
+        result = sandbox_worker.run_job(_job(
+            "import constant\nvalue = constant.VALUE\ntext = open('data.txt').read()",
+            files=[('constant.py', b'VALUE = 42\n'), ('data.txt', b'hello')],
+        ))
+        self.assertEqual(result['status'], 0)
+        self.assertEqual(result['globals']['value'], 42)
+        self.assertEqual(result['globals']['text'], 'hello')
+
+    def test_exception(self):
+        result = sandbox_worker.run_job(_job("raise ValueError('nope')"))
+        self.assertEqual(result['status'], 1)
+        self.assertIn("ValueError: nope", result['error'])
+
+    def test_realtime_limit(self):
+        result = sandbox_worker.run_job(_job("import time\ntime.sleep(10)", limits={'REALTIME': 0.5}))
+        self.assertLess(result['status'], 0)
+
+    def test_jobs_are_isolated(self):
+        sandbox_worker.run_job(_job("import sys\nsys.leaked = True"))
+        result = sandbox_worker.run_job(_job("import sys\nleaked = hasattr(sys, 'leaked')"))
+        self.assertFalse(result['globals']['leaked'])
+
+    @unittest.skipIf(os.geteuid() == 0, 'RLIMIT_NPROC is not enforced for root')
+    def test_jobs_cannot_start_processes(self):
+        # A grandchild that left the process group wouldn't be killed with it.
+        result = sandbox_worker.run_job(_job(
+            "import os, time\n"
+            "try:\n    pid = os.fork()\nexcept OSError:\n    pid = None\n"
+            "if pid == 0:\n    os.setsid()\n    time.sleep(5)\n    os._exit(0)",
+            limits={'CPU': 1, 'REALTIME': 3, 'NPROC': 15},
+        ))
+        self.assertEqual(result['status'], 0)
+        self.assertIsNone(result['globals']['pid'])
+
+    @unittest.skipUnless(os.geteuid() == 0, 'Only root can start processes in a job')
+    @ddt.data({'CPU': 1, 'REALTIME': 3}, {'CPU': 1})
+    def test_processes_started_by_jobs_are_killed(self, limits):
+        start_time = time.time()
+        result = sandbox_worker.run_job(_job(
+            "import os, time\npid = os.fork()\nif not pid:\n    time.sleep(5)\n    os._exit(0)",
+            limits=limits,
+        ))
+        self.assertLess(time.time() - start_time, 2)
+        self.assertEqual(result['status'], 0)
+        self.assertTrue(_wait_for_exit(result['globals']['pid']))
+
+    def test_random_generators_are_reseeded(self):
+        import numpy  # pylint: disable=unused-variable
+        code = "import random, numpy\nvalues = [random.random(), numpy.random.random()]"
+        first_values = sandbox_worker.run_job(_job(code))['globals']['values']
+        second_values = sandbox_worker.run_job(_job(code))['globals']['values']
+        self.assertNotEqual(first_values[0], second_values[0])
+        self.assertNotEqual(first_values[1], second_values[1])
+
+
+class TestSandboxWorkerPool(unittest.TestCase):
+    """
+    Test running jailed code in a SandboxWorkerPool.
+    """
+    def setUp(self):
+        super(TestSandboxWorkerPool, self).setUp()
+        if not jail_code.is_configured("python"):
+            pytest.skip()
+        self.pool = SandboxWorkerPool(size=1, max_jobs=2, preload=PRELOADED_MODULES)
+        self.addCleanup(self.pool.close)
+
+    def test_run(self):
+        globals_dict = {'a': 17}
+        self.pool.run("import numpy\nb = int(numpy.sum([a, a]))", globals_dict)
+        self.assertEqual(globals_dict['b'], 34)
+
+    def test_exception(self):
+        with self.assertRaises(SafeExecException):
+            self.pool.run("raise ValueError('nope')", {})
+
+    def test_recycling(self):
+        for _ in range(3):
+            self.pool.run("a = 1", {})
+        self.assertEqual(self.pool.stats()['recycled'], 1)
+        self.assertEqual(self.pool.stats()['jobs'], 3)
@@ -0,0 +1,299 @@
+"""
+Pool of warm sandbox workers for capa's safe_exec.
+
+Running jailed code with codejail spawns a new sandboxed Python for every
+execution, which then imports numpy, scipy and the other assumed imports,
+costing hundreds of milliseconds per check.  The pool instead keeps a few
+sandboxed Pythons running, as the same user and with the same Python as
+codejail, which import those modules once and fork a child process for each
+job (see sandbox_worker.py).  The children apply the same resource limits as
+codejail, including the limit overrides of the job's context, before
+running the code.
+
+Each worker is replaced after running a configurable number of jobs.  When
+no worker is idle, or a worker fails, safe_exec falls back to codejail.
+
+The pool is configured by the 'worker_pool' key of the CODE_JAIL setting:
+
+    ENABLED: Whether jailed code is run by the pool.
+    SIZE: The number of workers of each process.
+    MAX_JOBS: The number of jobs after which a worker is replaced.
+"""
+
+
+import atexit
+import base64
+import logging
+import os
+import select
+import subprocess
+import tempfile
+import threading
+
+from codejail import jail_code
+from codejail.safe_exec import SafeExecException, json_safe
+from django.conf import settings
+from six.moves import queue
+
+from . import sandbox_worker
+
+log = logging.getLogger(__name__)
+
+# The source of the worker, passed to the sandboxed Python with -c.
+_worker_py_file = sandbox_worker.__file__
+if _worker_py_file.endswith("c"):
+    _worker_py_file = _worker_py_file[:-1]
+
+with open(_worker_py_file) as f:
+    WORKER_CODE = f.read()
+
+# Number of seconds a worker may take to respond beyond the REALTIME limit
+# of a job, or to preload its modules, before it's considered stuck.
+WORKER_GRACE_TIME = 10
+
+
+class SandboxWorkerError(Exception):
+    """
+    A sandbox worker failed, independently of the code it ran.
+    """
+
+
+def _config():
+    """
+    Returns the worker pool configuration of the CODE_JAIL setting.
+    """
+    return (getattr(settings, 'CODE_JAIL', None) or {}).get('worker_pool', {})
+
+
+def is_enabled():
+    """
+    Returns whether jailed code is run by the pool.
+    """
+    return bool(_config().get('ENABLED', False)) and jail_code.is_configured('python')
+
+
+class SandboxWorker(object):
+    """
+    A sandboxed Python process running sandbox_worker.py.
+    """
+    def __init__(self, preload):
+        command = jail_code.COMMANDS['python']
+        cmdline = []
+        if command['user']:
+            cmdline.extend(['sudo', '-u', command['user']])
+        cmdline.extend(command['cmdline_start'])
+        cmdline.extend(['-c', WORKER_CODE])
+        cmdline.extend(preload)
+
+        self.jobs = 0
+        self.ready = False
+        self.process = subprocess.Popen(
+            cmdline,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=tempfile.gettempdir(),
+            env={},
+            close_fds=True,
+        )
+
+    def run(self, job, timeout):
+        """
+        Sends the job to the worker and returns its result, waiting for
+        at most `timeout` seconds, or forever if it's None.
+        """
+        if not self.ready:
+            self._read(WORKER_GRACE_TIME)
+            self.ready = True
+        self.jobs += 1
+        try:
+            sandbox_worker.write_message(self.process.stdin, job)
+        except (IOError, OSError) as exc:
+            raise SandboxWorkerError(u'Cannot send a job to the sandbox worker: {}'.format(exc))
+        return self._read(timeout)
+
+    def close(self):
+        """
+        Stops the worker.
+        """
+        try:
+            self.process.stdin.close()
+        except (IOError, OSError):
+            pass
+        if self.process.poll() is None:
+            try:
+                self.process.terminate()
+            except OSError:
+                pass
+
+    def _read(self, timeout):
+        """
+        Returns the next message of the worker.
+        """
+        readable, _, _ = select.select([self.process.stdout], [], [], timeout)
+        if not readable:
+            raise SandboxWorkerError(u'The sandbox worker did not respond in {} seconds'.format(timeout))
+        try:
+            message = sandbox_worker.read_message(self.process.stdout)
+        except ValueError as exc:
+            raise SandboxWorkerError(u'Invalid message from the sandbox worker: {}'.format(exc))
+        if message is None:
+            raise SandboxWorkerError(u'The sandbox worker exited with status {}'.format(self.process.poll()))
+        return message
+
+
+class SandboxWorkerPool(object):
+    """
+    Process-wide pool of sandbox workers.
+    """
+    def __init__(self, size, max_jobs, preload):
+        self.size = size
+        self.max_jobs = max_jobs
+        self.preload = preload
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._pid = None
+        self.jobs = 0
+        self.fallbacks = 0
+        self.recycled = 0
+
+    def run(self, code, globals_dict, python_path=None, extra_files=None, limit_overrides_context=None):
+        """
+        Runs the code in a worker like codejail.safe_exec.safe_exec does:
+        changes to the JSON-safe globals are made in globals_dict, and
+        SafeExecException is raised if the code fails.
+
+        Raises SandboxWorkerError if no worker is idle, or if the worker
+        fails, in which case the code should be run by codejail instead.
+        """
+        files = [
+            (name, base64.b64encode(content if isinstance(content, bytes) else content.encode('utf-8')).decode('ascii'))
+            for name, content in extra_files or ()
+        ]
+        file_names = {name for name, _ in files}
+        python_path = list(python_path or ())
+        if any(path not in file_names for path in python_path):
+            # codejail copies python_path entries from the file system.
+            raise SandboxWorkerError(u'The python_path entries must be extra files')
+
+        limits = jail_code.get_effective_limits(limit_overrides_context)
+        job = {
+            'code': code,
+            'globals': json_safe(globals_dict),
+            'files': files,
+            'python_path': python_path,
+            'limits': limits,
+        }
+        timeout = limits['REALTIME'] + WORKER_GRACE_TIME if limits.get('REALTIME') else None
+
+        worker = self._acquire()
+        try:
+            result = worker.run(job, timeout)
+        except SandboxWorkerError:
+            worker.close()
+            self._release(None)
+            with self._lock:
+                self.fallbacks += 1
+            raise
+        self._release(worker)
+
+        if result['status']:
+            raise SafeExecException(
+                u"Couldn't execute jailed code: stdout: {!r}, stderr: {!r} with status code: {}".format(
+                    b'', (result['error'] or '').encode('utf-8'), result['status'],
+                )
+            )
+        globals_dict.update(result['globals'])
+
+    def close(self):
+        """
+        Stops the idle workers of the pool.
+        """
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            worker.close()
+
+    def stats(self):
+        """
+        Returns a dict of the number of idle workers, and the cumulative
+        number of jobs run, of jobs that fell back to codejail and of
+        workers replaced.
+        """
+        return {
+            'idle': self._idle.qsize(),
+            'jobs': self.jobs,
+            'fallbacks': self.fallbacks,
+            'recycled': self.recycled,
+        }
+
+    def _acquire(self):
+        """
+        Returns an idle worker, starting the workers if they aren't running in this process.
+        """
+        self._ensure_workers()
+        try:
+            worker = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                self.fallbacks += 1
+            raise SandboxWorkerError(u'No sandbox worker is idle')
+        with self._lock:
+            self.jobs += 1
+        return worker
+
+    def _release(self, worker):
+        """
+        Returns the worker to the pool, replacing it if it's failed or has
+        run max_jobs jobs.
+        """
+        if worker is not None and worker.jobs < self.max_jobs:
+            self._idle.put(worker)
+            return
+        if worker is not None:
+            worker.close()
+            with self._lock:
+                self.recycled += 1
+        try:
+            self._idle.put(SandboxWorker(self.preload))
+        except OSError:
+            log.exception(u'Cannot start a sandbox worker')
+
+    def _ensure_workers(self):
+        """
+        Starts the workers if they aren't running in this process.
+        """
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # Forked: the workers belong to the parent process.
+                self._idle = queue.LifoQueue()
+            for _ in range(self.size):
+                try:
+                    self._idle.put(SandboxWorker(self.preload))
+                except OSError:
+                    log.exception(u'Cannot start a sandbox worker')
+            self._pid = os.getpid()
+
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_pool(preload):
+    """
+    Returns the SandboxWorkerPool of the process, whose workers preload the given modules.
+    """
+    global _POOL  # pylint: disable=global-statement
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                config = _config()
+                _POOL = SandboxWorkerPool(config.get('SIZE', 2), config.get('MAX_JOBS', 100), preload)
+                atexit.register(_POOL.close)
+    return _POOL
@@ -0,0 +1,220 @@
+"""
+Evaluation of formulas over many samples of their variables, for FormulaResponse.
+
+calc's `evaluator` parses the formula every time it's called, which is most
+of the cost of evaluating it.  A SampledFormula is parsed once, and then
+evaluated over all the samples at once, with each variable bound to a NumPy
+array of its sampled values.
+
+The results are the same as calling `evaluator` for each sample: formulas
+whose vectorized evaluation could differ from the evaluation of a single
+sample, because it involves complex numbers, the parallel operator, functions
+of a single value such as factorial, or floating point errors which raise
+exceptions for Python floats, are evaluated sample by sample instead, still
+without parsing them again.
+"""
+
+
+import operator
+from functools import lru_cache, reduce
+from itertools import repeat
+
+import numpy
+import six
+from calc.calc import (
+    ParseAugmenter,
+    add_defaults,
+    check_parens,
+    eval_atom,
+    eval_number,
+    eval_parallel,
+    eval_power,
+    eval_product,
+    eval_sum
+)
+
+# Number of parsed formulas kept by parse_formula.
+PARSED_FORMULAS_CACHE_SIZE = 512
+
+
+class _NotVectorizable(Exception):
+    """
+    The formula can't be evaluated over arrays of samples.
+    """
+
+
+def _eval_atom(parse_result):
+    """
+    Returns the value wrapped by the atom, which may be an array.
+    """
+    return next(k for k in parse_result if not isinstance(k, six.string_types))
+
+
+def _power(base, exponent):
+    """
+    Returns base ** exponent, either of which may be an array.
+
+    NumPy may compute the powers of arrays with vectorized instructions,
+    whose results can differ in the last digit from those of the power of
+    a single value, so arrays are exponentiated one value at a time, which
+    is still much cheaper than parsing the formula.
+    """
+    if not isinstance(base, numpy.ndarray) and not isinstance(exponent, numpy.ndarray):
+        return base ** exponent
+    bases = base.tolist() if isinstance(base, numpy.ndarray) else repeat(base)
+    exponents = exponent.tolist() if isinstance(exponent, numpy.ndarray) else repeat(exponent)
+    return numpy.array([b ** a for b, a in zip(bases, exponents)])
+
+
+def _eval_power(parse_result):
+    """
+    Exponentiates the values, which may be arrays, right to left.
+    """
+    values = reversed([k for k in parse_result if not isinstance(k, six.string_types)])
+    return reduce(lambda a, b: _power(b, a), values)
+
+
+def _eval_parallel(parse_result):
+    """
+    Returns the single value of the term; the parallel operator is only evaluated sample by sample.
+    """
+    if len(parse_result) == 1:
+        return parse_result[0]
+    raise _NotVectorizable
+
+
+def _eval_sum(parse_result):
+    """
+    Adds the values, which may be arrays, keeping in mind their sign.
+    """
+    total = 0.0
+    current_op = operator.add
+    for token in parse_result:
+        if isinstance(token, six.string_types):
+            current_op = operator.sub if token == '-' else operator.add
+        else:
+            total = current_op(total, token)
+    return total
+
+
+def _eval_product(parse_result):
+    """
+    Multiplies the values, which may be arrays.
+    """
+    prod = 1.0
+    current_op = operator.mul
+    for token in parse_result:
+        if isinstance(token, six.string_types):
+            current_op = operator.truediv if token == '/' else operator.mul
+        else:
+            prod = current_op(prod, token)
+    return prod
+
+
+class SampledFormula(object):
+    """
+    A formula parsed once, to be evaluated as calc's `evaluator` does.
+    """
+    def __init__(self, math_expr, case_sensitive=False):
+        self.math_expr = math_expr
+        self.case_sensitive = case_sensitive
+        self._interpreter = None
+        if math_expr.strip() != "":
+            check_parens(math_expr)
+            self._interpreter = ParseAugmenter(math_expr, case_sensitive)
+            self._interpreter.parse_algebra()
+
+    def evaluate(self, variables):
+        """
+        Returns the value of the formula for the given dict of variables,
+        as `evaluator(variables, {}, math_expr, case_sensitive)` does.
+        """
+        if self._interpreter is None:
+            return float('nan')
+        return self._reduce(variables, {
+            'number': eval_number,
+            'atom': eval_atom,
+            'power': eval_power,
+            'parallel': eval_parallel,
+            'product': eval_product,
+            'sum': eval_sum,
+        })
+
+    def evaluate_samples(self, var_dict_list):
+        """
+        Returns the list of the values of the formula for each of the given
+        dicts of variables, which must all have the same variables.
+        """
+        if self._interpreter is None:
+            return [float('nan')] * len(var_dict_list)
+        if len(var_dict_list) > 1:
+            values = self._evaluate_vectorized(var_dict_list)
+            if values is not None:
+                return values
+        return [self.evaluate(var_dict) for var_dict in var_dict_list]
+
+    def _evaluate_vectorized(self, var_dict_list):
+        """
+        Returns the list of the values of the formula for each of the given
+        dicts of variables, evaluated over arrays of their values, or None
+        if the results could differ from those of `evaluate`.
+        """
+        num_samples = len(var_dict_list)
+        variables = {}
+        for name in var_dict_list[0]:
+            values = numpy.array([var_dict[name] for var_dict in var_dict_list])
+            if values.dtype != numpy.float64:
+                return None
+            variables[name] = values
+
+        try:
+            # Floating point errors raise exceptions when evaluating Python
+            # floats, but only set flags when evaluating NumPy arrays.
+            with numpy.errstate(divide='raise', over='raise', invalid='raise'):
+                result = self._reduce(variables, {
+                    'number': eval_number,
+                    'atom': _eval_atom,
+                    'power': _eval_power,
+                    'parallel': _eval_parallel,
+                    'product': _eval_product,
+                    'sum': _eval_sum,
+                })
+        except Exception:  # pylint: disable=broad-except
+            return None
+
+        if numpy.ndim(result) == 0:
+            # The formula doesn't depend on the sampled variables.
+            if isinstance(result, (complex, numpy.complexfloating)):
+                return None
+            return [result] * num_samples
+        if not isinstance(result, numpy.ndarray) or result.dtype != numpy.float64 or result.shape != (num_samples,):
+            return None
+        return result.tolist()
+
+    def _reduce(self, variables, actions):
+        """
+        Evaluates the parse tree with the given variables and actions.
+        """
+        all_variables, all_functions = add_defaults(variables, {}, self.case_sensitive)
+        self._interpreter.check_variables(all_variables, all_functions)
+        if self.case_sensitive:
+            casify = lambda x: x
+        else:
+            casify = lambda x: x.lower()
+
+        actions = dict(
+            actions,
+            variable=lambda x: all_variables[casify(x[0])],
+            function=lambda x: all_functions[casify(x[0])](x[1]),
+        )
+        return self._interpreter.reduce_tree(actions)
+
+
+@lru_cache(maxsize=PARSED_FORMULAS_CACHE_SIZE)
+def parse_formula(math_expr, case_sensitive=False):
+    """
+    Returns the SampledFormula of the expression, parsing it only if it
+    wasn't parsed recently.  Raises the exceptions raised by `evaluator` for
+    expressions that can't be parsed.
+    """
+    return SampledFormula(math_expr, case_sensitive)
@@ -8,10 +8,12 @@ import unittest
 
 import ddt
 import six
+from django.test.utils import override_settings
 from lxml import etree
 from markupsafe import Markup
 from mock import patch
 
+from capa.parsed_problem_cache import ParsedProblem, ParsedProblemCache, get_parsed_problem_cache
 from capa.responsetypes import LoncapaProblemError
 from capa.tests.helpers import new_loncapa_problem
 from openedx.core.djangolib.markup import HTML
@@ -789,3 +791,58 @@ class CAPAProblemReportHelpersTest(unittest.TestCase):
         # Ensure that the answer is a string so that the dict returned from this
         # function can eventualy be serialized to json without issues.
         self.assertIsInstance(problem.get_question_answers()['1_solution_1'], six.text_type)
+
+
+@override_settings(CAPA_PARSED_PROBLEM_CACHE_MAX_BYTES=100000)
+class CAPAParsedProblemCacheTest(unittest.TestCase):
+    """ Test the cache of parsed problems """
+
+    xml = textwrap.dedent("""
+        <problem>
+            <script type="loncapa/python">
+                value = random.randint(1, 1000)
+            </script>
+            <p>What is $value?</p>
+            <stringresponse answer="$value">
+                <label>Enter the value</label>
+                <description>Only digits</description>
+                <textline size="40"/>
+            </stringresponse>
+            <solution><p>It's $value.</p></solution>
+        </problem>
+    """)
+
+    def setUp(self):
+        super(CAPAParsedProblemCacheTest, self).setUp()
+        self.cache = get_parsed_problem_cache()
+        self.cache.clear()
+
+    def test_cached_problem_is_the_same(self):
+        uncached_problem = new_loncapa_problem(self.xml, seed=1)
+        cached_problem = new_loncapa_problem(self.xml, seed=1)
+        self.assertEqual(self.cache.stats()['misses'], 1)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertIsNot(cached_problem.tree, uncached_problem.tree)
+        self.assertEqual(cached_problem.get_html(), uncached_problem.get_html())
+        self.assertEqual(cached_problem.problem_data, uncached_problem.problem_data)
+        self.assertEqual(list(cached_problem.responders.values())[0].id, '1_1')
+
+    def test_scripts_run_for_each_seed(self):
+        values = [new_loncapa_problem(self.xml, seed=seed).context['value'] for seed in range(5)]
+        self.assertEqual(self.cache.stats()['hits'], 4)
+        self.assertGreater(len(set(values)), 1)
+
+    def test_problem_id_is_part_of_the_key(self):
+        new_loncapa_problem(self.xml, problem_id='1')
+        problem = new_loncapa_problem(self.xml, problem_id='2')
+        self.assertEqual(self.cache.stats()['misses'], 2)
+        self.assertEqual(list(problem.responders.values())[0].id, '2_1')
+
+    def test_eviction(self):
+        cache = ParsedProblemCache(max_bytes=len('<problem id="0"/>') * 2)
+        for problem_id in range(3):
+            cache.set(str(problem_id), ParsedProblem(etree.XML('<problem id="{}"/>'.format(problem_id)), {}))
+        self.assertIsNone(cache.get('0'))
+        self.assertEqual(cache.get('2').tree.get('id'), '2')
+        self.assertEqual(cache.stats()['evictions'], 1)
+        self.assertEqual(cache.stats()['problems'], 2)
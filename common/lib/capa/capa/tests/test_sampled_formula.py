@@ -0,0 +1,51 @@
+"""
+Tests of capa.sampled_formula
+"""
+
+
+import random
+import unittest
+
+import ddt
+from calc import UndefinedVariable, evaluator
+
+from capa.sampled_formula import SampledFormula, parse_formula
+
+
+@ddt.ddt
+class SampledFormulaTest(unittest.TestCase):
+    """
+    Test that formulas evaluated over many samples give the same results as evaluator.
+    """
+    def setUp(self):
+        super(SampledFormulaTest, self).setUp()
+        rand = random.Random(0)
+        self.var_dict_list = [{'x': rand.uniform(-10, 10), 'y': rand.uniform(0.5, 3)} for _ in range(20)]
+
+    @ddt.data(
+        'x+2*y', '-x - y*3', 'sin(x)*cos(y)^2', 'x^y', 'y^x^0.5', 'e^y + pi', '(x+y)/(x-y)', 'sqrt(x)',
+        'ln(y)', 'x||y', 'x^-2*y', 'x*i', '2', 'sec(x)+cot(y)', 'arccot(x)', '5%*X', 'abs(x)^0.5',
+    )
+    def test_same_results_as_evaluator(self, formula):
+        expected = [evaluator(var_dict, {}, formula) for var_dict in self.var_dict_list]
+        self.assertEqual(SampledFormula(formula).evaluate_samples(self.var_dict_list), expected)
+
+    def test_case_sensitive(self):
+        with self.assertRaises(UndefinedVariable):
+            SampledFormula('X+y', case_sensitive=True).evaluate_samples(self.var_dict_list)
+
+    @ddt.data('x/0', 'fact(x)', 'z+1')
+    def test_same_errors_as_evaluator(self, formula):
+        with self.assertRaises(Exception) as expected:
+            evaluator(self.var_dict_list[0], {}, formula)
+        with self.assertRaises(type(expected.exception)):
+            SampledFormula(formula).evaluate_samples(self.var_dict_list)
+
+    def test_empty_formula(self):
+        values = SampledFormula(' ').evaluate_samples(self.var_dict_list)
+        self.assertEqual(len(values), len(self.var_dict_list))
+        self.assertTrue(all(value != value for value in values))
+
+    def test_parse_formula_cache(self):
+        self.assertIs(parse_formula('x+y'), parse_formula('x+y'))
+        self.assertIsNot(parse_formula('x+y'), parse_formula('x+y', True))
@@ -11,6 +11,7 @@ from lxml import etree
 
 from capa.tests.helpers import test_capa_system
 from capa.util import (
+    compare_many_with_tolerance,
     compare_with_tolerance,
     contextualize_text,
     get_inner_html_from_xpath,
@@ -119,6 +120,22 @@ class UtilTest(unittest.TestCase):
         result = compare_with_tolerance(111.0, complex(100.0, 0), '10%', True)
         self.assertTrue(result)
 
+    @ddt.data('0.001%', '10%', '0.5', 0.5, 0)
+    def test_compare_many_with_tolerance(self, tolerance):
+        instructor_values = [100.0, 100.0, 100.0, 100.0, 0.0, -5.0, float('inf'), float('nan')]
+        for student_values in (
+                [100.0, 100.4, 100.5, 109.9, 1e-300, -5.000001, float('inf'), float('nan')],
+                [100.0, 100.4, 100.5, 109.9, 1e-300, -5.000001, 3 + 4j, 1.0],
+        ):
+            self.assertEqual(
+                compare_many_with_tolerance(student_values, instructor_values, tolerance),
+                [
+                    compare_with_tolerance(student, instructor, tolerance)
+                    for student, instructor in zip(student_values, instructor_values)
+                ],
+            )
+        self.assertEqual(compare_many_with_tolerance([], [], tolerance), [])
+
     def test_sanitize_html(self):
         """
         Test for html sanitization with bleach.
@@ -9,6 +9,7 @@ from cmath import isinf, isnan
 from decimal import Decimal
 
 import bleach
+import numpy
 import six
 from calc import evaluator
 from lxml import etree
@@ -98,6 +99,64 @@ def compare_with_tolerance(student_complex, instructor_complex, tolerance=defaul
         return abs(student_complex - instructor_complex) <= tolerance
 
 
+def compare_many_with_tolerance(student_values, instructor_values, tolerance=default_tolerance,
+                                relative_tolerance=False):
+    """
+    Compare each of student_values to the corresponding instructor value as
+    compare_with_tolerance does, and return the list of the results.
+
+    The tolerance is evaluated once, and finite real values are compared in
+    bulk with NumPy.  As compare_with_tolerance compares real values as
+    Decimals, values whose difference is too close to the tolerance for the
+    floating point comparison to be exact, as well as complex, infinite or
+    NaN values, are compared with compare_with_tolerance instead.
+    """
+    def compare_one(index):
+        return compare_with_tolerance(student_values[index], instructor_values[index], tolerance, relative_tolerance)
+
+    num_values = len(student_values)
+    if num_values == 0:
+        return []
+
+    student = numpy.asarray(student_values)
+    instructor = numpy.asarray(instructor_values)
+    bulk_tolerance = tolerance
+    bulk_relative_tolerance = relative_tolerance
+    percent_tolerance = False
+    if isinstance(tolerance, str):
+        if tolerance == default_tolerance:
+            bulk_relative_tolerance = True
+        if tolerance.endswith('%'):
+            bulk_tolerance = evaluator(dict(), dict(), tolerance[:-1]) * 0.01
+            percent_tolerance = not bulk_relative_tolerance
+        else:
+            bulk_tolerance = evaluator(dict(), dict(), tolerance)
+    if (student.dtype != numpy.float64 or instructor.dtype != numpy.float64 or
+            student.shape != (num_values,) or instructor.shape != (num_values,) or
+            isinstance(bulk_tolerance, complex) or not numpy.isfinite(bulk_tolerance)):
+        return [compare_one(index) for index in range(num_values)]
+
+    with numpy.errstate(all='ignore'):
+        bulk_tolerance = numpy.full(num_values, bulk_tolerance, dtype=numpy.float64)
+        if percent_tolerance:
+            bulk_tolerance = bulk_tolerance * numpy.abs(instructor)
+        if bulk_relative_tolerance:
+            bulk_tolerance = bulk_tolerance * numpy.maximum(numpy.abs(student), numpy.abs(instructor))
+        difference = numpy.abs(student - instructor)
+        # Bound of the difference between the floating point and the Decimal
+        # computations, which both round each value by at most half an ulp.
+        margin = 1e-12 * (numpy.abs(student) + numpy.abs(instructor) + numpy.abs(bulk_tolerance))
+        finite = numpy.isfinite(student) & numpy.isfinite(instructor) & numpy.isfinite(margin)
+        exact = finite & (numpy.abs(difference - bulk_tolerance) > margin)
+        results = difference <= bulk_tolerance
+
+    nan = numpy.isnan(student) | numpy.isnan(instructor)
+    return [
+        bool(results[index]) if exact[index] else (False if nan[index] else compare_one(index))
+        for index in range(num_values)
+    ]
+
+
 def contextualize_text(text, context):  # private
     """
     Takes a string with variables. E.g. $a+$b.
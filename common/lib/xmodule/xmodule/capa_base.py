@@ -23,6 +23,7 @@ from xblock.fields import Boolean, Dict, Float, Integer, Scope, String, XMLStrin
 from xblock.scorable import ScorableXBlockMixin, Score
 
 from capa.capa_problem import LoncapaProblem, LoncapaSystem
+from capa.correctmap import CorrectMap
 from capa.inputtypes import Status
 from capa.responsetypes import LoncapaProblemError, ResponseError, StudentInputError
 from capa.util import convert_files_to_filenames, get_inner_html_from_xpath
@@ -1637,7 +1638,7 @@ class CapaMixin(ScorableXBlockMixin, CapaFields):
 
     # ScorableXBlockMixin methods
 
-    def rescore(self, only_if_higher=False):
+    def rescore(self, only_if_higher=False, grading_cache=None):
         """
         Checks whether the existing answers to a problem are correct.
 
@@ -1647,6 +1648,9 @@ class CapaMixin(ScorableXBlockMixin, CapaFields):
         If only_if_higher is True, the answer and grade are updated
         only if the resulting score is higher than before.
 
+        grading_cache is an optional dict shared by the rescoring of many
+        students' answers to this problem, see update_correctness.
+
         Returns a dict with one key:
             {'success' : 'correct' | 'incorrect' | AJAX alert msg string }
 
@@ -1678,7 +1682,7 @@ class CapaMixin(ScorableXBlockMixin, CapaFields):
         event_info['orig_score'] = orig_score.raw_earned
         event_info['orig_total'] = orig_score.raw_possible
         try:
-            self.update_correctness()
+            self.update_correctness(grading_cache)
             calculated_score = self.calculate_score()
         except (StudentInputError, ResponseError, LoncapaProblemError) as inst:
             log.warning("Input error in capa_module:problem_rescore", exc_info=True)
@@ -1728,16 +1732,30 @@ class CapaMixin(ScorableXBlockMixin, CapaFields):
         """
         return self.score
 
-    def update_correctness(self):
+    def update_correctness(self, grading_cache=None):
         """
         Updates correct map of the LCP.
         Operates by creating a new correctness map based on the current
         state of the LCP, and updating the old correctness map of the LCP.
+
+        If a grading_cache dict is given, the new correctness map is looked up
+        in it by the LCP's grading key, and stored in it once computed, so that
+        identical answers are graded only once.
         """
         # Make sure that the attempt number is always at least 1 for grading purposes,
         # even if the number of attempts have been reset and this problem is regraded.
         self.lcp.context['attempt'] = max(self.attempts, 1)
-        new_correct_map = self.lcp.get_grade_from_current_answers(None)
+        grading_key = self.lcp.get_grading_key() if grading_cache is not None else None
+        if grading_key is not None and grading_key in grading_cache:
+            new_correct_map = CorrectMap()
+            new_correct_map.set_dict(copy.deepcopy(grading_cache[grading_key][0]))
+            new_correct_map.set_overall_message(grading_cache[grading_key][1])
+        else:
+            new_correct_map = self.lcp.get_grade_from_current_answers(None)
+            if grading_key is not None:
+                grading_cache[grading_key] = (
+                    copy.deepcopy(new_correct_map.get_dict()), new_correct_map.get_overall_message()
+                )
         self.lcp.correct_map.update(new_correct_map)
 
     def calculate_score(self):
@@ -3,9 +3,16 @@
 from importlib import import_module
 
 from django.conf import settings
+from django.dispatch import Signal
+
+from xmodule.query_profiler import add_command_listener
 
 _CONTENTSTORE = {}
 
+# Sent with the location of an asset whenever the asset is saved, deleted or has
+# its attributes changed, so that anything caching it can drop its copy.
+ASSET_CHANGED = Signal(providing_args=['location'])
+
 
 def load_function(path):
     """
@@ -26,6 +33,8 @@ def contentstore(name='default'):
         if 'ADDITIONAL_OPTIONS' in settings.CONTENTSTORE:
             if name in settings.CONTENTSTORE['ADDITIONAL_OPTIONS']:
                 options.update(settings.CONTENTSTORE['ADDITIONAL_OPTIONS'][name])
+        if getattr(settings, 'MODULESTORE_QUERY_PROFILER', {}).get('ENABLED', False):
+            options = add_command_listener(options)
         _CONTENTSTORE[name] = class_(**options)
 
     return _CONTENTSTORE[name]
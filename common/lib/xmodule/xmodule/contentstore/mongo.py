@@ -16,6 +16,7 @@ from mongodb_proxy import autoretry_read
 from opaque_keys.edx.keys import AssetKey
 
 from xmodule.contentstore.content import XASSET_LOCATION_TAG
+from xmodule.contentstore.django import ASSET_CHANGED
 from xmodule.exceptions import NotFoundError
 from xmodule.modulestore.django import ASSET_IGNORE_REGEX
 from xmodule.mongo_utils import connect_to_mongodb, create_collection_index
@@ -90,7 +91,7 @@ class MongoContentStore(ContentStore):
         # The way to version files in gridFS is to not use the file id as the _id but just as the filename.
         # Then you can upload as many versions as you like and access by date or version. Because we use
         # the location as the _id, we must delete before adding (there's no replace method in gridFS)
-        self.delete(content_id)  # delete is a noop if the entry doesn't exist; so, don't waste time checking
+        self.fs.delete(content_id)  # delete is a noop if the entry doesn't exist; so, don't waste time checking
 
         thumbnail_location = content.thumbnail_location.to_deprecated_list_repr() if content.thumbnail_location else None
         with self.fs.new_file(_id=content_id, filename=six.text_type(content.location), content_type=content.content_type,
@@ -115,6 +116,7 @@ class MongoContentStore(ContentStore):
                 else:
                     fp.write(content.data)
 
+        ASSET_CHANGED.send(sender=self.__class__, location=content.location)
         return content
 
     def delete(self, location_or_id):
@@ -122,9 +124,15 @@ class MongoContentStore(ContentStore):
         Delete an asset.
         """
         if isinstance(location_or_id, AssetKey):
+            location = location_or_id
             location_or_id, _ = self.asset_db_key(location_or_id)
+        else:
+            fs_entry = self.fs_files.find_one({'_id': location_or_id}, {'filename': True})
+            location = AssetKey.from_string(fs_entry['filename']) if fs_entry else None
         # Deletes of non-existent files are considered successful
         self.fs.delete(location_or_id)
+        if location is not None:
+            ASSET_CHANGED.send(sender=self.__class__, location=location)
 
     @autoretry_read()
     def find(self, location, throw_on_not_found=True, as_stream=False):
@@ -175,19 +183,27 @@ class MongoContentStore(ContentStore):
             else:
                 return None
 
+    @staticmethod
+    def get_export_path(content):
+        """
+        Returns the path of the given content, relative to the directory of
+        the exported static content.
+        """
+        # Escape invalid char from filename.
+        export_name = escape_invalid_characters(name=content.name, invalid_char_list=['/', '\\'])
+        if content.import_path is not None:
+            return os.path.join(os.path.dirname(content.import_path), export_name)
+        return export_name
+
     def export(self, location, output_directory):
         content = self.find(location)
 
-        filename = content.name
-        if content.import_path is not None:
-            output_directory = output_directory + '/' + os.path.dirname(content.import_path)
+        export_path = output_directory + '/' + self.get_export_path(content)
+        output_directory, export_name = os.path.split(export_path)
 
         if not os.path.exists(output_directory):
             os.makedirs(output_directory)
 
-        # Escape invalid char from filename.
-        export_name = escape_invalid_characters(name=filename, invalid_char_list=['/', '\\'])
-
         disk_fs = OSFS(output_directory)
 
         with disk_fs.open(export_name, 'wb') as asset_file:
@@ -204,7 +220,6 @@ class MongoContentStore(ContentStore):
             assets_policy_file: the filename for the policy file which should be in the same
                 directory as the other policy files.
         """
-        policy = {}
         assets, __ = self.get_all_content_for_course(course_key)
 
         for asset in assets:
@@ -217,12 +232,22 @@ class MongoContentStore(ContentStore):
             # When debugging course exports, this might be a good place
             # to look. -- pmitros
             self.export(asset['asset_key'], output_directory)
+
+        with open(assets_policy_file, 'w') as f:
+            json.dump(self.get_assets_policy(assets), f, sort_keys=True, indent=4)
+
+    @staticmethod
+    def get_assets_policy(assets):
+        """
+        Returns the policy exported for the given assets, as returned by
+        get_all_content_for_course: a dict of their names to their attributes.
+        """
+        policy = {}
+        for asset in assets:
             for attr, value in six.iteritems(asset):
                 if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
                     policy.setdefault(asset['asset_key'].block_id, {})[attr] = value
-
-        with open(assets_policy_file, 'w') as f:
-            json.dump(policy, f, sort_keys=True, indent=4)
+        return policy
 
     def get_all_content_thumbnails_for_course(self, course_key):
         return self._get_all_content_for_course(course_key, get_thumbnails=True)[0]
@@ -383,6 +408,7 @@ class MongoContentStore(ContentStore):
         result = self.fs_files.update_one({'_id': asset_db_key}, {"$set": attr_dict}, upsert=False)
         if result.matched_count == 0:
             raise NotFoundError(asset_db_key)
+        ASSET_CHANGED.send(sender=self.__class__, location=location)
 
     @autoretry_read()
     def get_attrs(self, location):
@@ -436,6 +462,10 @@ class MongoContentStore(ContentStore):
             except FileExists:
                 self.fs.delete(file_id=asset_id)
                 self.create_asset(source_content, asset_id, asset, asset_key)
+            ASSET_CHANGED.send(
+                sender=self.__class__,
+                location=dest_course_key.make_asset_key(asset_key['category'], asset_key['name']),
+            )
 
     def create_asset(self, source_content, asset_id, asset, asset_key):
         """
@@ -467,8 +497,11 @@ class MongoContentStore(ContentStore):
         course_query = query_for_course(course_key)
         matching_assets = self.fs_files.find(course_query)
         for asset in matching_assets:
+            asset_id = asset.get('content_son', asset['_id'])
+            location = course_key.make_asset_key(asset_id['category'], asset_id['name'])
             asset_key = self.make_id_son(asset)
             self.fs.delete(asset_key)
+            ASSET_CHANGED.send(sender=self.__class__, location=location)
 
     # codifying the original order which pymongo used for the dicts coming out of location_to_dict
     # stability of order is more important than sanity of order as any changes to order make things
@@ -4,13 +4,15 @@ Code used to calculate learner grades.
 
 
 import abc
+import heapq
 import inspect
 import logging
 import random
 import sys
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict
 from datetime import datetime
 
+import numpy
 import six
 from contracts import contract
 from pytz import UTC
@@ -146,6 +148,63 @@ def aggregate_scores(scores):
     return all_total, graded_total
 
 
+def score_matrix_from_grade_sheets(grade_sheets):
+    """
+    Returns a (score_matrix, subsection_formats) tuple for the given list of
+    learners' grade sheets, to be passed to CourseGrader.grade_batch.
+
+    score_matrix is an array of the percent_graded of each learner (row) in
+    each subsection (column), and subsection_formats is the list of the
+    format of each column.  The columns of each format are in the order of
+    the grade sheets.  Subsections missing from a learner's grade sheet, for
+    example because they aren't visible to the learner, are NaN.
+
+    Raises ValueError if the grade sheets list the subsections of a format
+    in different orders.
+    """
+    # The distinct orders of the subsections of each format in the grade sheets.
+    orders = OrderedDict()
+    for grade_sheet in grade_sheets:
+        for section_format, subsection_grades in six.iteritems(grade_sheet):
+            orders.setdefault(section_format, OrderedDict())[tuple(subsection_grades)] = None
+
+    columns = []
+    for section_format, format_orders in six.iteritems(orders):
+        # Merge the orders, preferring the order of first appearance where they don't constrain it.
+        positions = OrderedDict()
+        successors = defaultdict(set)
+        predecessor_counts = defaultdict(int)
+        for order in format_orders:
+            for key in order:
+                positions.setdefault(key, len(positions))
+            for key, next_key in zip(order, order[1:]):
+                if next_key not in successors[key]:
+                    successors[key].add(next_key)
+                    predecessor_counts[next_key] += 1
+        available = [(position, key) for key, position in six.iteritems(positions) if not predecessor_counts[key]]
+        heapq.heapify(available)
+        merged = []
+        while available:
+            _, key = heapq.heappop(available)
+            merged.append(key)
+            for next_key in successors[key]:
+                predecessor_counts[next_key] -= 1
+                if not predecessor_counts[next_key]:
+                    heapq.heappush(available, (positions[next_key], next_key))
+        if len(merged) < len(positions):
+            raise ValueError(u"The grade sheets list the {} subsections in different orders.".format(section_format))
+        columns.extend((section_format, key) for key in merged)
+
+    column_indices = {column: index for index, column in enumerate(columns)}
+    score_matrix = numpy.full((len(grade_sheets), len(columns)), numpy.nan)
+    for row, grade_sheet in enumerate(grade_sheets):
+        for section_format, subsection_grades in six.iteritems(grade_sheet):
+            for key, subsection_grade in six.iteritems(subsection_grades):
+                score_matrix[row, column_indices[(section_format, key)]] = subsection_grade.percent_graded
+
+    return score_matrix, [section_format for section_format, _ in columns]
+
+
 def invalid_args(func, argdict):
     """
     Given a function and a dictionary of arguments, returns a set of arguments
@@ -243,6 +302,14 @@ class CourseGrader(six.with_metaclass(abc.ABCMeta, object)):
         '''Given a grade sheet, return a dict containing grading information'''
         raise NotImplementedError
 
+    def grade_batch(self, score_matrix, subsection_formats):
+        '''
+        Given a matrix of the subsection scores of many learners, as returned
+        by score_matrix_from_grade_sheets, return an array of their percents,
+        equal to the percent returned by grade() for each learner's grade sheet.
+        '''
+        raise NotImplementedError
+
 
 class WeightedSubsectionsGrader(CourseGrader):
     """
@@ -298,6 +365,14 @@ class WeightedSubsectionsGrader(CourseGrader):
             'grade_breakdown': grade_breakdown
         }
 
+    def grade_batch(self, score_matrix, subsection_formats):
+        score_matrix = numpy.asarray(score_matrix, dtype=float)
+        # Accumulate in the same order as grade(), so that the results are identical.
+        total_percents = numpy.zeros(score_matrix.shape[0])
+        for subgrader, _, weight in self.subgraders:
+            total_percents = total_percents + subgrader.grade_batch(score_matrix, subsection_formats) * weight
+        return total_percents
+
 
 class AssignmentFormatGrader(CourseGrader):
     """
@@ -376,6 +451,48 @@ class AssignmentFormatGrader(CourseGrader):
 
         return aggregate_score, dropped_indices
 
+    def grade_batch(self, score_matrix, subsection_formats):
+        score_matrix = numpy.asarray(score_matrix, dtype=float)
+        percents = score_matrix[:, [
+            index for index, section_format in enumerate(subsection_formats) if section_format == self.type
+        ]]
+        num_learners, num_subsections = percents.shape
+        present = ~numpy.isnan(percents)
+        counts = present.sum(axis=1)
+        sections_counts = numpy.maximum(int(float(self.min_count)), counts)
+
+        # Append the placeholder scores of 0 of the unreleased sections, as grade() does.
+        num_placeholders = sections_counts - counts
+        max_placeholders = int(num_placeholders.max()) if num_learners else 0
+        percents = numpy.hstack([percents, numpy.zeros((num_learners, max_placeholders))])
+        included = numpy.hstack([
+            present,
+            numpy.arange(max_placeholders) < num_placeholders[:, numpy.newaxis],
+        ])
+
+        kept = included
+        if self.drop_count > 0:
+            # Rank the sections by descending percent, breaking ties by their
+            # index like the stable sort of total_with_drops, and drop the last ones.
+            order = numpy.argsort(numpy.where(included, -percents, numpy.inf), axis=1, kind='stable')
+            ranks = numpy.empty_like(order)
+            numpy.put_along_axis(
+                ranks, order, numpy.broadcast_to(numpy.arange(order.shape[1]), order.shape), axis=1
+            )
+            kept = included & (ranks < (sections_counts - self.drop_count)[:, numpy.newaxis])
+
+        # Sum the kept percents in the order of the sections, as total_with_drops does.
+        total_percents = numpy.zeros(num_learners)
+        for index in range(num_subsections):
+            total_percents = numpy.where(kept[:, index], total_percents + percents[:, index], total_percents)
+
+        divisors = sections_counts - self.drop_count
+        return numpy.where(
+            divisors > 0,
+            total_percents / numpy.where(divisors > 0, divisors, 1),
+            total_percents,
+        )
+
     def grade(self, grade_sheet, generate_random_scores=False):
         scores = list(grade_sheet.get(self.type, {}).values())
         breakdown = []
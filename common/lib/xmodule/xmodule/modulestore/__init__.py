@@ -1255,6 +1255,16 @@ class ModuleStoreReadBase(BulkOperationsMixin, ModuleStoreRead):
         """
         return True
 
+    def prefetch_definitions(self, xblocks, depth=0):
+        """
+        Loads the definitions of the given xblocks and of their descendants down
+        to `depth` (None for all descendants), so that accessing their content
+        fields doesn't load them one at a time.
+
+        The default implementation does nothing, as only modulestores which load
+        definitions lazily benefit from it.
+        """
+
     def heartbeat(self):
         """
         Is this modulestore ready?
@@ -28,6 +28,7 @@ from edx_django_utils.cache import DEFAULT_REQUEST_CACHE
 from xmodule.contentstore.django import contentstore
 from xmodule.modulestore.draft_and_published import BranchSettingMixin
 from xmodule.modulestore.mixed import MixedModuleStore
+from xmodule.query_profiler import add_command_listener
 from xmodule.util.xmodule_django import get_current_request_hostname
 
 # We also may not always have the current request user (crum) module available
@@ -263,6 +264,10 @@ def create_modulestore_instance(
     if issubclass(class_, MixedModuleStore):
         _options['create_modulestore_instance'] = create_modulestore_instance
 
+    # Record the commands sent to the database in the active query profile, if any.
+    if doc_store_config and getattr(settings, 'MODULESTORE_QUERY_PROFILER', {}).get('ENABLED', False):
+        doc_store_config = add_command_listener(doc_store_config)
+
     if issubclass(class_, BranchSettingMixin):
         _options['branch_setting_func'] = _get_modulestore_branch_setting
 
@@ -9,6 +9,7 @@ In this way, courses can be served up via either SplitMongoModuleStore or MongoM
 import functools
 import itertools
 import logging
+from collections import defaultdict
 from contextlib import contextmanager
 
 import six
@@ -933,6 +934,18 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         store = self._verify_modulestore_support(location.course_key, 'convert_to_draft')
         return store.convert_to_draft(location, user_id)
 
+    def prefetch_definitions(self, xblocks, depth=0):
+        """
+        Loads the definitions of the given xblocks and of their descendants down
+        to `depth` in their modulestores. See ModuleStoreRead.prefetch_definitions.
+        """
+        xblocks_by_course = defaultdict(list)
+        for xblock in xblocks:
+            xblocks_by_course[xblock.location.course_key].append(xblock)
+        for course_key, course_xblocks in six.iteritems(xblocks_by_course):
+            store = self._get_modulestore_for_courselike(course_key)
+            store.prefetch_definitions(course_xblocks, depth)
+
     def has_changes(self, xblock):
         """
         Checks if the given block has unpublished changes
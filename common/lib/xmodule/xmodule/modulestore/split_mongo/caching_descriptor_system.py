@@ -85,6 +85,8 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
         self.module_data = module_data
         self.default_class = default_class
         self.local_modules = {}
+        # definition id -> definition loaded by prefetch_definitions
+        self.prefetched_definitions = {}
         self._services['library_tools'] = LibraryToolsService(modulestore, user_id=None)
 
     @lazy
@@ -144,6 +146,31 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
         self.modulestore.cache_block(course_key, version_guid, block_key, block)
         return block
 
+    def prefetch_definitions(self, block_keys, course_key, depth=0):
+        """
+        Loads the definitions of the given blocks and of their descendants down to
+        `depth` (None for all descendants) which aren't loaded yet, with a single
+        query, so that the blocks' lazy definition loaders don't each query their
+        definition. Blocks which were already loaded benefit from the prefetched
+        definitions too, as long as their definitions weren't accessed yet.
+
+        Returns the number of definitions loaded.
+        """
+        blocks = {}
+        for block_key in block_keys:
+            blocks = self.modulestore.descendants(self.course_entry.structure['blocks'], block_key, depth, blocks)
+        definition_ids = set()
+        for block_key, block_data in six.iteritems(blocks):
+            block_data = self.module_data.get(block_key, block_data)
+            if block_data.definition is None or block_data.definition_loaded:
+                continue
+            if block_data.definition not in self.prefetched_definitions:
+                definition_ids.add(block_data.definition)
+        if definition_ids:
+            for definition in self.modulestore.get_definitions(course_key, list(definition_ids)):
+                self.prefetched_definitions[definition['_id']] = definition
+        return len(definition_ids)
+
     @contract(block_key=BlockKey, course_key="CourseLocator | LibraryLocator")
     def get_module_data(self, block_key, course_key):
         """
@@ -201,6 +228,7 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
                 block_key.type,
                 definition_id,
                 convert_fields,
+                prefetched_definitions=self.prefetched_definitions,
             )
         else:
             definition_loader = None
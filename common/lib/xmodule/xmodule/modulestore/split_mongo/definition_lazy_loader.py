@@ -12,16 +12,19 @@ class DefinitionLazyLoader(object):
     object doesn't force access during init but waits until client wants the
     definition. Only works if the modulestore is a split mongo store.
     """
-    def __init__(self, modulestore, course_key, block_type, definition_id, field_converter):
+    def __init__(self, modulestore, course_key, block_type, definition_id, field_converter, prefetched_definitions=None):
         """
         Simple placeholder for yet-to-be-fetched data
         :param modulestore: the pymongo db connection with the definitions
         :param definition_locator: the id of the record in the above to fetch
+        :param prefetched_definitions: an optional dict of definition ids to the definitions
+            prefetched by the runtime, which is looked up before fetching from the modulestore
         """
         self.modulestore = modulestore
         self.course_key = course_key
         self.definition_locator = DefinitionLocator(block_type, definition_id)
         self.field_converter = field_converter
+        self.prefetched_definitions = prefetched_definitions
 
     def fetch(self):
         """
@@ -31,5 +34,9 @@ class DefinitionLazyLoader(object):
         # get_definition may return a cached value perhaps from another course or code path
         # so, we copy the result here so that updates don't cross-pollinate nor change the cached
         # value in such a way that we can't tell that the definition's been updated.
-        definition = self.modulestore.get_definition(self.course_key, self.definition_locator.definition_id)
+        definition = None
+        if self.prefetched_definitions is not None:
+            definition = self.prefetched_definitions.get(self.definition_locator.definition_id)
+        if definition is None:
+            definition = self.modulestore.get_definition(self.course_key, self.definition_locator.definition_id)
         return copy.deepcopy(definition)
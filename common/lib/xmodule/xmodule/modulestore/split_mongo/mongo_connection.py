@@ -8,7 +8,10 @@ import logging
 import math
 import re
 import zlib
+from collections import OrderedDict
+from copy import copy
 from contextlib import contextmanager
+from threading import Lock
 from time import time
 
 import pymongo
@@ -18,14 +21,16 @@ from six.moves import cPickle as pickle
 from contracts import check, new_contract
 from mongodb_proxy import autoretry_read
 # Import this just to export it
-from pymongo.errors import DuplicateKeyError  # pylint: disable=unused-import
+from pymongo.errors import BulkWriteError, DuplicateKeyError  # pylint: disable=unused-import
 
 from xmodule.exceptions import HeartbeatFailure
 from xmodule.modulestore import BlockData
+from xmodule.query_profiler import get_current_profile
 from xmodule.modulestore.split_mongo import BlockKey
 from xmodule.mongo_utils import connect_to_mongodb, create_collection_index
 
 try:
+    from django.conf import settings
     from django.core.cache import caches, InvalidCacheBackendError
     DJANGO_AVAILABLE = True
 except ImportError:
@@ -34,6 +39,12 @@ except ImportError:
 new_contract('BlockData', BlockData)
 log = logging.getLogger(__name__)
 
+# Maximum number of definitions inserted with a single insert_many
+DEFINITION_INSERT_BATCH_SIZE = 1000
+
+# Mongo error code of duplicate key errors
+DUPLICATE_KEY_ERROR_CODE = 11000
+
 
 def get_cache(alias):
     """
@@ -128,6 +139,7 @@ class QueryTimer(object):
             course_context: The course which the query is being made for.
         """
         tagger = Tagger(self._sample_rate)
+        operation = metric_name
         metric_name = "{}.{}".format(self._metric_base, metric_name)
 
         start = time()
@@ -138,6 +150,16 @@ class QueryTimer(object):
             tags = tagger.tags
             tags.append('course:{}'.format(course_context))
 
+            profile = get_current_profile()
+            if profile is not None:
+                measures = dict(tagger.measures)
+                profile.record_operation(
+                    operation,
+                    end - start,
+                    size=measures.get('compressed_size', measures.get('uncompressed_size')),
+                    cache_tier=dict(tagger.added_tags).get('cache_tier'),
+                )
+
 
 TIMER = QueryTimer(__name__, 0.01)
 
@@ -204,16 +226,139 @@ def structure_to_mongo(structure, course_context=None):
         return new_structure
 
 
+def copy_structure(structure):
+    """
+    Return a copy of the structure whose blocks can be loaded (which merges
+    their definition fields into their fields) without changing the original.
+
+    Only the blocks and their fields are copied, so the copy is much cheaper
+    than a deep copy or unpickling the structure.
+    """
+    structure_copy = dict(structure)
+    structure_copy['blocks'] = {}
+    for block_key, block in six.iteritems(structure['blocks']):
+        block_copy = copy(block)
+        block_copy.fields = dict(block.fields)
+        structure_copy['blocks'][block_key] = block_copy
+    return structure_copy
+
+
+class StructureProcessCache(object):
+    """
+    A thread-safe, least-recently-used cache of course structures in the
+    memory of the current process, keyed by structure id.
+
+    Structures are immutable by id, so cached entries never need to be
+    invalidated. The cache is bounded by the total size of the cached
+    structures, measured as the size of their uncompressed pickles.
+
+    Cached structures are shared by all the callers in the process, so the
+    cache stores and returns copies of them (see copy_structure), since
+    split modulestore merges the definitions of the blocks it loads into the
+    blocks of their structure.
+    """
+    def __init__(self, max_bytes):
+        """
+        Arguments:
+            max_bytes (int): The maximum total size of the cached structures.
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        Return a copy of the cached structure with the given id, or None.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries[key] = entry
+            self.hits += 1
+        return copy_structure(entry[0])
+
+    def set(self, key, structure, size):
+        """
+        Cache a copy of the given structure, whose pickle is `size` bytes long,
+        evicting the least recently used structures as needed. Structures
+        larger than the cache are not cached.
+        """
+        if size > self.max_bytes:
+            return
+        structure = copy_structure(structure)
+        with self._lock:
+            previous_entry = self._entries.pop(key, None)
+            if previous_entry is not None:
+                self.current_bytes -= previous_entry[1]
+            self._entries[key] = (structure, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Remove all cached structures and reset the metrics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """
+        Return a dict of the cache's current size and its cumulative hit, miss
+        and eviction counts.
+        """
+        return {
+            'structures': len(self._entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+_PROCESS_CACHE = None
+
+
+def get_process_cache():
+    """
+    Return the process-wide StructureProcessCache, or None if it's disabled,
+    which is the case when the COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES django
+    setting is not a positive number.
+    """
+    global _PROCESS_CACHE  # pylint: disable=global-statement
+    if not DJANGO_AVAILABLE:
+        return None
+    max_bytes = getattr(settings, 'COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES', 0)
+    if not max_bytes or max_bytes < 1:
+        return None
+    if _PROCESS_CACHE is None or _PROCESS_CACHE.max_bytes != max_bytes:
+        _PROCESS_CACHE = StructureProcessCache(max_bytes)
+    return _PROCESS_CACHE
+
+
 class CourseStructureCache(object):
     """
-    Wrapper around django cache object to cache course structure objects.
-    The course structures are pickled and compressed when cached.
+    Two-tier cache of course structure objects: a process-local
+    StructureProcessCache in front of a django cache.
+    The course structures are pickled and compressed when cached in the
+    django cache.
 
-    If the 'course_structure_cache' doesn't exist, then don't do anything for
-    for set and get.
+    If the 'course_structure_cache' doesn't exist and the process cache is
+    disabled, then don't do anything for set and get.
     """
     def __init__(self):
         self.cache = None
+        self.process_cache = get_process_cache()
         if DJANGO_AVAILABLE:
             try:
                 self.cache = get_cache('course_structure_cache')
@@ -221,44 +366,73 @@ class CourseStructureCache(object):
                 pass
 
     def get(self, key, course_context=None):
-        """Pull the compressed, pickled struct data from cache and deserialize."""
-        if self.cache is None:
+        """
+        Return the structure from the process cache if present, otherwise pull
+        the compressed, pickled struct data from cache and deserialize.
+        """
+        if self.cache is None and self.process_cache is None:
             return None
 
         with TIMER.timer("CourseStructureCache.get", course_context) as tagger:
+            if self.process_cache is not None:
+                structure = self.process_cache.get(key)
+                tagger.measure('process_cache_size', self.process_cache.current_bytes)
+                if structure is not None:
+                    tagger.tag(from_cache='true', cache_tier='process')
+                    return structure
+
+            if self.cache is None:
+                tagger.tag(from_cache='false', cache_tier='none')
+                tagger.sample_rate = 1
+                return None
+
             try:
                 compressed_pickled_data = self.cache.get(key)
                 tagger.tag(from_cache=str(compressed_pickled_data is not None).lower())
 
                 if compressed_pickled_data is None:
                     # Always log cache misses, because they are unexpected
+                    tagger.tag(cache_tier='none')
                     tagger.sample_rate = 1
                     return None
 
+                tagger.tag(cache_tier='django')
                 tagger.measure('compressed_size', len(compressed_pickled_data))
 
                 pickled_data = zlib.decompress(compressed_pickled_data)
                 tagger.measure('uncompressed_size', len(pickled_data))
 
                 if six.PY2:
-                    return pickle.loads(pickled_data)
+                    structure = pickle.loads(pickled_data)
                 else:
-                    return pickle.loads(pickled_data, encoding='latin-1')
+                    structure = pickle.loads(pickled_data, encoding='latin-1')
             except Exception:
                 # The cached data is corrupt in some way, get rid of it.
                 log.warning("CourseStructureCache: Bad data in cache for %s", course_context)
                 self.cache.delete(key)
                 return None
 
+            if self.process_cache is not None:
+                self.process_cache.set(key, structure, len(pickled_data))
+            return structure
+
     def set(self, key, structure, course_context=None):
-        """Given a structure, will pickle, compress, and write to cache."""
-        if self.cache is None:
+        """
+        Given a structure, will add it to the process cache, and pickle,
+        compress, and write it to cache.
+        """
+        if self.cache is None and self.process_cache is None:
             return None
 
         with TIMER.timer("CourseStructureCache.set", course_context) as tagger:
             pickled_data = pickle.dumps(structure, 4)  # Protocol can't be incremented until cache is cleared
             tagger.measure('uncompressed_size', len(pickled_data))
 
+            if self.process_cache is not None:
+                self.process_cache.set(key, structure, len(pickled_data))
+            if self.cache is None:
+                return None
+
             # 1 = Fastest (slightly larger results)
             compressed_pickled_data = zlib.compress(pickled_data, 1)
             tagger.measure('compressed_size', len(compressed_pickled_data))
@@ -315,6 +489,7 @@ class MongoConnection(object):
             structure = cache.get(key, course_context)
             tagger_get_structure.tag(from_cache=str(bool(structure)).lower())
             if not structure:
+                tagger_get_structure.tag(cache_tier='mongo')
                 # Always log cache misses, because they are unexpected
                 tagger_get_structure.sample_rate = 1
 
@@ -568,6 +743,34 @@ class MongoConnection(object):
             tagger.tag(block_type=definition['block_type'])
             self.definitions.insert_one(definition)
 
+    def insert_definitions(self, definitions, course_context=None):
+        """
+        Create the given definitions in the db, in batches of up to
+        DEFINITION_INSERT_BATCH_SIZE definitions, skipping the definitions
+        that are already in the db.
+
+        Returns the number of batches inserted.
+        """
+        batches = 0
+        with TIMER.timer("insert_definitions", course_context) as tagger:
+            tagger.measure('definitions', len(definitions))
+            for start in range(0, len(definitions), DEFINITION_INSERT_BATCH_SIZE):
+                batches += 1
+                try:
+                    self.definitions.insert_many(
+                        definitions[start:start + DEFINITION_INSERT_BATCH_SIZE], ordered=False
+                    )
+                except BulkWriteError as err:
+                    # Definitions are append only, so those which were already
+                    # written can be skipped.
+                    write_errors = err.details.get('writeErrors', [])
+                    if err.details.get('writeConcernErrors') or any(
+                            error.get('code') != DUPLICATE_KEY_ERROR_CODE for error in write_errors
+                    ):
+                        raise
+                    log.debug("Attempted to insert %d duplicate definitions", len(write_errors))
+        return batches
+
     def ensure_indexes(self):
         """
         Ensure that all appropriate indexes are created that are needed by this modulestore, or raise
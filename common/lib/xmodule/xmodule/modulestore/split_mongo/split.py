@@ -261,10 +261,13 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
         """
 
         dirty = False
+        round_trips = 0
 
         # If the content is dirty, then update the database
-        for _id in six.viewkeys(bulk_write_record.structures) - bulk_write_record.structures_in_db:
+        new_structure_ids = six.viewkeys(bulk_write_record.structures) - bulk_write_record.structures_in_db
+        for _id in new_structure_ids:
             dirty = True
+            round_trips += 1
 
             try:
                 self.db_connection.insert_structure(bulk_write_record.structures[_id], bulk_write_record.course_key)
@@ -274,20 +277,32 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
                 # append only, so if it's already been written, we can just keep going.
                 log.debug("Attempted to insert duplicate structure %s", _id)
 
-        for _id in six.viewkeys(bulk_write_record.definitions) - bulk_write_record.definitions_in_db:
+        new_definitions = [
+            bulk_write_record.definitions[_id]
+            for _id in six.viewkeys(bulk_write_record.definitions) - bulk_write_record.definitions_in_db
+        ]
+        if len(new_definitions) == 1:
             dirty = True
+            round_trips += 1
 
             try:
-                self.db_connection.insert_definition(bulk_write_record.definitions[_id], bulk_write_record.course_key)
+                self.db_connection.insert_definition(new_definitions[0], bulk_write_record.course_key)
             except DuplicateKeyError:
                 # We may not have looked up this definition inside this bulk operation, and thus
                 # didn't realize that it was already in the database. That's OK, the store is
                 # append only, so if it's already been written, we can just keep going.
-                log.debug("Attempted to insert duplicate definition %s", _id)
+                log.debug("Attempted to insert duplicate definition %s", new_definitions[0]['_id'])
+        elif new_definitions:
+            # Write the definitions created in the bulk operation, such as all the
+            # definitions of an imported course, with a few inserts of many definitions.
+            dirty = True
+            round_trips += self.db_connection.insert_definitions(new_definitions, bulk_write_record.course_key)
 
         if bulk_write_record.index is not None and bulk_write_record.index != bulk_write_record.initial_index:
             dirty = True
 
+            round_trips += 1
+
             if bulk_write_record.initial_index is None:
                 self.db_connection.insert_course_index(bulk_write_record.index, bulk_write_record.course_key)
             else:
@@ -297,6 +312,12 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
                     course_context=bulk_write_record.course_key
                 )
 
+        if dirty:
+            log.info(
+                u'Bulk operation on %s wrote %d structures and %d definitions in %d Mongo round trips',
+                structure_key, len(new_structure_ids), len(new_definitions), round_trips,
+            )
+
         return dirty
 
     def get_course_index(self, course_key, ignore_case=False):
@@ -816,6 +837,26 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             system.module_data.update(new_module_data)
             return system.module_data
 
+    def prefetch_definitions(self, xblocks, depth=0):
+        """
+        Loads the definitions of the given xblocks and of their descendants down
+        to `depth` (None for all descendants) with a single query per runtime, so
+        that rendering them, e.g. a vertical and its problems, doesn't load their
+        definitions one at a time. See CachingDescriptorSystem.prefetch_definitions.
+        """
+        block_keys_by_runtime = {}
+        for xblock in xblocks:
+            # The runtime of descriptors, even once they're bound to a user.
+            runtime = getattr(xblock, '_runtime', None)
+            if not isinstance(runtime, CachingDescriptorSystem):
+                continue
+            course_key = xblock.location.course_key
+            block_keys_by_runtime.setdefault(id(runtime), (runtime, course_key, []))[2].append(
+                BlockKey.from_usage_key(xblock.location)
+            )
+        for runtime, course_key, block_keys in six.itervalues(block_keys_by_runtime):
+            runtime.prefetch_definitions(block_keys, course_key, depth)
+
     @contract(course_entry=CourseEnvelope, block_keys="list(BlockKey)", depth="int | None")
     def _load_items(self, course_entry, block_keys, depth=0, **kwargs):
         """
@@ -194,3 +194,20 @@ class CountMongoCallsCourseTraversal(TestCase):
                     # and then subsequently retrieved with the lazy and depth=None values
                     course = modulestore.get_item(course.location, depth=None, lazy=False)
                     self._traverse_blocks_in_course(course, access_all_block_fields=True)
+
+    @ddt.data(
+        (MIXED_OLD_MONGO_MODULESTORE_BUILDER, 175),
+        # All the definitions are loaded with a single query
+        (MIXED_SPLIT_MODULESTORE_BUILDER, 4),
+    )
+    @ddt.unpack
+    def test_prefetch_definitions(self, store_builder, num_mongo_calls):
+        request_cache = MemoryCache()
+        with store_builder.build(request_cache=request_cache) as (content_store, modulestore):
+            course_key = self._import_course(content_store, modulestore)
+
+            with check_mongo_calls(num_mongo_calls):
+                with modulestore.bulk_operations(course_key):
+                    course = modulestore.get_course(course_key, depth=None, lazy=True)
+                    modulestore.prefetch_definitions([course], depth=None)
+                    self._traverse_blocks_in_course(course, access_all_block_fields=True)
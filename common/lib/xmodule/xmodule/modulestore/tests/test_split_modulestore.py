@@ -8,6 +8,7 @@ import os
 import random
 import re
 import unittest
+from copy import deepcopy
 from importlib import import_module
 
 import ddt
@@ -36,6 +37,7 @@ from xmodule.modulestore.exceptions import (
 )
 from xmodule.modulestore.inheritance import InheritanceMixin
 from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.mongo_connection import StructureProcessCache
 from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
 from xmodule.modulestore.tests.factories import check_mongo_calls
 from xmodule.modulestore.tests.mongo_connection import MONGO_HOST, MONGO_PORT_NUM
@@ -1013,6 +1015,41 @@ class TestCourseStructureCache(SplitModuleTest):
         # now make sure that you get the same structure
         self.assertEqual(cached_structure, not_cached_structure)
 
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_process_cache')
+    def test_process_cache(self, mock_get_process_cache):
+        process_cache = StructureProcessCache(max_bytes=10 * 1024 * 1024)
+        mock_get_process_cache.return_value = process_cache
+
+        with check_mongo_calls(1):
+            not_cached_structure = self._get_structure(self.new_course)
+
+        # Even though the test is using the dummy cache, the structure
+        # is now cached in the process
+        with check_mongo_calls(0):
+            cached_structure = self._get_structure(self.new_course)
+
+        self.assertEqual(cached_structure, not_cached_structure)
+        self.assertEqual(process_cache.hits, 1)
+        self.assertGreater(process_cache.current_bytes, 0)
+
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_process_cache')
+    def test_process_cache_unchanged_by_loading(self, mock_get_process_cache):
+        process_cache = StructureProcessCache(max_bytes=10 * 1024 * 1024)
+        mock_get_process_cache.return_value = process_cache
+
+        # Loading the course non-lazily merges the definitions of its blocks
+        # into the blocks of the structure it's given.
+        modulestore().get_course(self.new_course.id, depth=None, lazy=False)
+        cached_structures = [structure for structure, _ in process_cache._entries.values()]  # pylint: disable=protected-access
+        self.assertTrue(cached_structures)
+        expected_structures = deepcopy(cached_structures)
+        modulestore().get_course(self.new_course.id, depth=None, lazy=False)
+
+        self.assertEqual(cached_structures, expected_structures)
+        for structure in cached_structures:
+            for block in six.itervalues(structure['blocks']):
+                self.assertFalse(block.definition_loaded)
+
     def _get_structure(self, course):
         """
         Helper function to get a structure from a course.
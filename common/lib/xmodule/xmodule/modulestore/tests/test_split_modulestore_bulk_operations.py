@@ -47,6 +47,16 @@ class TestBulkWriteMixin(unittest.TestCase):
     def assertCacheNotCleared(self):
         self.assertFalse(self.clear_cache.called)
 
+    def assertInsertedDefinitions(self, conn_call, definitions):
+        """
+        Assert that conn_call inserts the given definitions, in any order, in bulk.
+        """
+        name, args, kwargs = conn_call
+        self.assertEqual(name, 'insert_definitions')
+        six.assertCountEqual(self, definitions, args[0])
+        self.assertEqual(args[1:], (self.course_key,))
+        self.assertEqual(kwargs, {})
+
 
 class TestBulkWriteMixinPreviousTransaction(TestBulkWriteMixin):
     """
@@ -206,19 +216,17 @@ class TestBulkWriteMixinClosed(TestBulkWriteMixin):
         other_definition = {'another': 'definition', '_id': ObjectId()}
         self.bulk.update_definition(self.course_key.replace(branch='b'), other_definition)
         self.bulk.insert_course_index(self.course_key, {'versions': {'a': self.definition['_id'], 'b': other_definition['_id']}})
+        self.conn.insert_definitions.return_value = 1
         self.bulk._end_bulk_operation(self.course_key)
-        six.assertCountEqual(
-            self,
-            [
-                call.insert_definition(self.definition, self.course_key),
-                call.insert_definition(other_definition, self.course_key),
-                call.update_course_index(
-                    {'versions': {'a': self.definition['_id'], 'b': other_definition['_id']}},
-                    from_index=original_index,
-                    course_context=self.course_key,
-                )
-            ],
-            self.conn.mock_calls
+        self.assertEqual(len(self.conn.mock_calls), 2)
+        self.assertInsertedDefinitions(self.conn.mock_calls[0], [self.definition, other_definition])
+        self.assertEqual(
+            self.conn.mock_calls[1],
+            call.update_course_index(
+                {'versions': {'a': self.definition['_id'], 'b': other_definition['_id']}},
+                from_index=original_index,
+                course_context=self.course_key,
+            )
         )
 
     def test_write_definition_on_close(self):
@@ -238,15 +246,10 @@ class TestBulkWriteMixinClosed(TestBulkWriteMixin):
         other_definition = {'another': 'definition', '_id': ObjectId()}
         self.bulk.update_definition(self.course_key.replace(branch='b'), other_definition)
         self.assertConnCalls()
+        self.conn.insert_definitions.return_value = 1
         self.bulk._end_bulk_operation(self.course_key)
-        six.assertCountEqual(
-            self,
-            [
-                call.insert_definition(self.definition, self.course_key),
-                call.insert_definition(other_definition, self.course_key)
-            ],
-            self.conn.mock_calls
-        )
+        self.assertEqual(len(self.conn.mock_calls), 1)
+        self.assertInsertedDefinitions(self.conn.mock_calls[0], [self.definition, other_definition])
 
     def test_write_index_and_structure_on_close(self):
         original_index = {'versions': {}}
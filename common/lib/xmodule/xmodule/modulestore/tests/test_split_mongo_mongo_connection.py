@@ -3,11 +3,14 @@
 
 import unittest
 
-from mock import patch
-from pymongo.errors import ConnectionFailure
+from mock import Mock, patch
+from pymongo.errors import BulkWriteError, ConnectionFailure
 
 from xmodule.exceptions import HeartbeatFailure
-from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo import mongo_connection
+from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection, StructureProcessCache
 
 
 class TestHeartbeatFailureException(unittest.TestCase):
@@ -23,3 +26,88 @@ class TestHeartbeatFailureException(unittest.TestCase):
 
             with self.assertRaises(HeartbeatFailure):
                 useless_conn.heartbeat()
+
+
+class TestStructureProcessCache(unittest.TestCase):
+    """ Test the size accounting and LRU eviction of StructureProcessCache """
+
+    def test_get_and_set(self):
+        cache = StructureProcessCache(max_bytes=100)
+        structure = {'_id': 'a', 'blocks': {}}
+        self.assertIsNone(cache.get('a'))
+        cache.set('a', structure, 10)
+        self.assertEqual(cache.get('a'), structure)
+        self.assertEqual(cache.stats()['bytes'], 10)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_copies(self):
+        cache = StructureProcessCache(max_bytes=100)
+        block_key = BlockKey('problem', 'p1')
+        structure = {'_id': 'a', 'blocks': {block_key: BlockData(fields={'weight': 1})}}
+        cache.set('a', structure, 10)
+
+        # Neither the structure that was cached nor the ones returned by the
+        # cache share their blocks with the cached structure.
+        structure['blocks'][block_key].fields['data'] = '<problem/>'
+        cached_structure = cache.get('a')
+        self.assertEqual(cached_structure['blocks'][block_key].fields, {'weight': 1})
+        cached_structure['blocks'][block_key].fields['data'] = '<problem/>'
+        cached_structure['blocks'][block_key].definition_loaded = True
+        cached_structure = cache.get('a')
+        self.assertEqual(cached_structure['blocks'][block_key].fields, {'weight': 1})
+        self.assertFalse(cached_structure['blocks'][block_key].definition_loaded)
+
+    def test_eviction(self):
+        cache = StructureProcessCache(max_bytes=100)
+        cache.set('a', {'_id': 'a', 'blocks': {}}, 40)
+        cache.set('b', {'_id': 'b', 'blocks': {}}, 40)
+        # Use 'a' so that 'b' is the least recently used.
+        cache.get('a')
+        cache.set('c', {'_id': 'c', 'blocks': {}}, 40)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('c'))
+        self.assertEqual(cache.current_bytes, 80)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_too_large(self):
+        cache = StructureProcessCache(max_bytes=100)
+        cache.set('a', {'_id': 'a', 'blocks': {}}, 101)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.current_bytes, 0)
+
+
+class TestInsertDefinitions(unittest.TestCase):
+    """ Test that definitions are inserted in batches """
+
+    @patch('pymongo.MongoClient')
+    @patch('pymongo.database.Database')
+    def setUp(self, *calls):  # pylint: disable=arguments-differ
+        # pylint: disable=W0613
+        super(TestInsertDefinitions, self).setUp()
+        with patch('mongodb_proxy.MongoProxy'):
+            self.conn = MongoConnection('useless', 'useless', 'useless')
+        self.conn.definitions = Mock()
+
+    @patch.object(mongo_connection, 'DEFINITION_INSERT_BATCH_SIZE', 2)
+    def test_batches(self):
+        definitions = [{'_id': index} for index in range(5)]
+        self.assertEqual(self.conn.insert_definitions(definitions), 3)
+        self.assertEqual(
+            [call[0][0] for call in self.conn.definitions.insert_many.call_args_list],
+            [definitions[0:2], definitions[2:4], definitions[4:5]],
+        )
+
+    def test_duplicate_definitions(self):
+        self.conn.definitions.insert_many.side_effect = BulkWriteError(
+            {'writeErrors': [{'code': mongo_connection.DUPLICATE_KEY_ERROR_CODE}]}
+        )
+        self.assertEqual(self.conn.insert_definitions([{'_id': 1}, {'_id': 2}]), 1)
+
+    def test_other_errors(self):
+        self.conn.definitions.insert_many.side_effect = BulkWriteError(
+            {'writeErrors': [{'code': mongo_connection.DUPLICATE_KEY_ERROR_CODE}, {'code': 2}]}
+        )
+        with self.assertRaises(BulkWriteError):
+            self.conn.insert_definitions([{'_id': 1}, {'_id': 2}])
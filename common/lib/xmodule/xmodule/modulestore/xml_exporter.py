@@ -3,20 +3,26 @@ Methods for exporting course data to XML
 """
 
 
+import calendar
 import logging
-import os
+import tarfile
 from abc import abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 from json import dumps
+from time import time
 
 import lxml.etree
 import six
+from fs.memoryfs import MemoryFS
 from fs.osfs import OSFS
 from opaque_keys.edx.locator import CourseLocator, LibraryLocator
 from six import text_type
 from xblock.fields import Reference, ReferenceList, ReferenceValueDict, Scope
 
 from xmodule.assetstore import AssetMetadata
-from xmodule.contentstore.content import StaticContent
+from xmodule.contentstore.content import StaticContent, StaticContentStream
 from xmodule.exceptions import NotFoundError
 from xmodule.modulestore import LIBRARY_ROOT, EdxJSONEncoder, ModuleStoreEnum
 from xmodule.modulestore.draft_and_published import DIRECT_ONLY_CATEGORIES
@@ -28,6 +34,13 @@ PUBLISHED_DIR = "published"
 
 DEFAULT_CONTENT_FIELDS = ['metadata', 'data']
 
+# Number of static assets read concurrently from the contentstore when exporting to a tar file
+EXPORT_ASSET_WORKERS = 4
+
+# Maximum number of bytes of static assets read ahead into memory when exporting to a tar file.
+# Larger assets are streamed from the contentstore into the tar file.
+EXPORT_ASSET_READ_AHEAD_BYTES = 16 * 1024 * 1024
+
 
 def _export_drafts(modulestore, course_key, export_fs, xml_centric_course_key):
     """
@@ -107,7 +120,7 @@ class ExportManager(object):
     """
     Manages XML exporting for courselike objects.
     """
-    def __init__(self, modulestore, contentstore, courselike_key, root_dir, target_dir):
+    def __init__(self, modulestore, contentstore, courselike_key, root_dir, target_dir, tar_file=None):
         """
         Export all modules from `modulestore` and content from `contentstore` as xml to `root_dir`.
 
@@ -116,12 +129,18 @@ class ExportManager(object):
         `courselike_key`: The Locator of the Descriptor to export
         `root_dir`: The directory to write the exported xml to
         `target_dir`: The name of the directory inside `root_dir` to write the content to
+        `tar_file`: If given, a `tarfile.TarFile` opened for writing, to which the exported xml and
+            static assets are added under `target_dir` instead of being written to `root_dir`. The
+            xml is kept in memory until it's added, while the static assets are streamed from
+            `contentstore` to the tar file, so that no scratch disk space is needed.
         """
         self.modulestore = modulestore
         self.contentstore = contentstore
         self.courselike_key = courselike_key
         self.root_dir = root_dir
         self.target_dir = text_type(target_dir)
+        self.tar_file = tar_file
+        self._streamed_assets = []
 
     @abstractmethod
     def get_key(self):
@@ -157,7 +176,7 @@ class ExportManager(object):
         """
         with self.modulestore.bulk_operations(self.courselike_key):
 
-            fsm = OSFS(self.root_dir)
+            fsm = OSFS(self.root_dir) if self.tar_file is None else MemoryFS()
             root = lxml.etree.Element('unknown')
 
             # export only the published content
@@ -175,12 +194,117 @@ class ExportManager(object):
             self.process_root(root, export_fs)
 
             # Process extra items-- drafts, assets, etc
-            root_courselike_dir = self.root_dir + '/' + self.target_dir
+            root_courselike_dir = self.root_dir + '/' + self.target_dir if self.tar_file is None else None
             self.process_extra(root, courselike, root_courselike_dir, xml_centric_courselike_key, export_fs)
 
             # Any last pass adjustments
             self.post_process(root, export_fs)
 
+            if self.tar_file is not None:
+                self._add_to_tar_file(fsm)
+                fsm.close()
+
+    def export_static_assets(self, export_fs, root_courselike_dir):
+        """
+        Export the static assets of the courselike and their policy file.
+        """
+        if self.tar_file is None:
+            self.contentstore.export_all_for_course(
+                self.courselike_key,
+                root_courselike_dir + '/static/',
+                root_courselike_dir + '/policies/assets.json',
+            )
+        else:
+            # The assets are streamed to the tar file once the xml is added to it.
+            self._streamed_assets, __ = self.contentstore.get_all_content_for_course(self.courselike_key)
+            with export_fs.makedir('policies', recreate=True).open(u'assets.json', 'w') as assets_policy_file:
+                assets_policy_file.write(text_type(dumps(
+                    self.contentstore.get_assets_policy(self._streamed_assets), sort_keys=True, indent=4,
+                )))
+
+    def _add_to_tar_file(self, fsm):
+        """
+        Add the exported xml in the given memory filesystem to the tar file,
+        followed by the static assets.  Up to EXPORT_ASSET_WORKERS threads read
+        ahead assets from the contentstore, with at most
+        EXPORT_ASSET_READ_AHEAD_BYTES of them in memory; the other assets are
+        streamed into the tar file.
+        """
+        for dir_path in fsm.walk.dirs():
+            tar_info = tarfile.TarInfo(dir_path.lstrip('/'))
+            tar_info.type = tarfile.DIRTYPE
+            tar_info.mode = 0o755
+            tar_info.mtime = int(time())
+            self.tar_file.addfile(tar_info)
+        for file_path in fsm.walk.files():
+            with fsm.openbin(file_path) as exported_file:
+                data = exported_file.read()
+                self._add_file_to_tar_file(file_path.lstrip('/'), BytesIO(data), len(data))
+
+        with ThreadPoolExecutor(max_workers=EXPORT_ASSET_WORKERS) as executor:
+            # The (future, read ahead length) of the assets to add, in order.
+            pending_contents = deque()
+            read_ahead_bytes = 0
+            for asset in self._streamed_assets:
+                length = asset.get('length') or 0
+                read_ahead = length <= EXPORT_ASSET_READ_AHEAD_BYTES
+                while pending_contents and (
+                    len(pending_contents) >= 2 * EXPORT_ASSET_WORKERS or
+                    (read_ahead and read_ahead_bytes + length > EXPORT_ASSET_READ_AHEAD_BYTES)
+                ):
+                    future, pending_length = pending_contents.popleft()
+                    self._add_static_content_to_tar_file(future.result())
+                    read_ahead_bytes -= pending_length
+                pending_contents.append((
+                    executor.submit(self._find_static_content, asset['asset_key'], read_ahead),
+                    length if read_ahead else 0,
+                ))
+                if read_ahead:
+                    read_ahead_bytes += length
+            while pending_contents:
+                future, __ = pending_contents.popleft()
+                self._add_static_content_to_tar_file(future.result())
+        self._streamed_assets = []
+
+    def _find_static_content(self, asset_key, read_ahead):
+        """
+        Return the static content of the given asset as a stream, read into
+        memory if read_ahead is True.
+        """
+        content = self.contentstore.find(asset_key, as_stream=True)
+        if read_ahead:
+            try:
+                return content.copy_to_in_mem()
+            finally:
+                content.close()
+        return content
+
+    def _add_static_content_to_tar_file(self, content):
+        """
+        Add the given static content to the static directory of the tar file.
+        """
+        name = u'{}/static/{}'.format(self.target_dir, self.contentstore.get_export_path(content))
+        mtime = content.last_modified_at
+        mtime = mtime and calendar.timegm(mtime.utctimetuple())
+        if isinstance(content, StaticContentStream):
+            try:
+                self._add_file_to_tar_file(name, content, content.length, mtime)
+            finally:
+                content.close()
+        else:
+            self._add_file_to_tar_file(name, BytesIO(content.data), len(content.data), mtime)
+
+    def _add_file_to_tar_file(self, name, file_obj, size, mtime=None):
+        """
+        Add a file with the given name, size and contents, read from the
+        given file object, to the tar file.
+        """
+        tar_info = tarfile.TarInfo(name)
+        tar_info.size = size
+        tar_info.mode = 0o644
+        tar_info.mtime = mtime or int(time())
+        self.tar_file.addfile(tar_info, file_obj)
+
 
 class CourseExportManager(ExportManager):
     """
@@ -205,26 +329,20 @@ class CourseExportManager(ExportManager):
 
     def process_extra(self, root, courselike, root_courselike_dir, xml_centric_courselike_key, export_fs):
         # Export the modulestore's asset metadata.
-        asset_dir = root_courselike_dir + '/' + AssetMetadata.EXPORTED_ASSET_DIR + '/'
-        if not os.path.isdir(asset_dir):
-            os.makedirs(asset_dir)
+        asset_dir = export_fs.makedir(AssetMetadata.EXPORTED_ASSET_DIR, recreate=True)
         asset_root = lxml.etree.Element(AssetMetadata.ALL_ASSETS_XML_TAG)
         course_assets = self.modulestore.get_all_asset_metadata(self.courselike_key, None)
         for asset_md in course_assets:
             # All asset types are exported using the "asset" tag - but their asset type is specified in each asset key.
             asset = lxml.etree.SubElement(asset_root, AssetMetadata.ASSET_XML_TAG)
             asset_md.to_xml(asset)
-        with OSFS(asset_dir).open(AssetMetadata.EXPORTED_ASSET_FILENAME, 'wb') as asset_xml_file:
+        with asset_dir.open(AssetMetadata.EXPORTED_ASSET_FILENAME, 'wb') as asset_xml_file:
             lxml.etree.ElementTree(asset_root).write(asset_xml_file, encoding='utf-8')
 
         # export the static assets
         policies_dir = export_fs.makedir('policies', recreate=True)
         if self.contentstore:
-            self.contentstore.export_all_for_course(
-                self.courselike_key,
-                root_courselike_dir + '/static/',
-                root_courselike_dir + '/policies/assets.json',
-            )
+            self.export_static_assets(export_fs, root_courselike_dir)
 
             # If we are using the default course image, export it to the
             # legacy location to support backwards compatibility.
@@ -239,10 +357,8 @@ class CourseExportManager(ExportManager):
                 except NotFoundError:
                     pass
                 else:
-                    output_dir = root_courselike_dir + '/static/images/'
-                    if not os.path.isdir(output_dir):
-                        os.makedirs(output_dir)
-                    with OSFS(output_dir).open(u'course_image.jpg', 'wb') as course_image_file:
+                    output_dir = export_fs.makedirs(u'static/images', recreate=True)
+                    with output_dir.open(u'course_image.jpg', 'wb') as course_image_file:
                         course_image_file.write(course_image.data)
 
         # export the static tabs
@@ -319,11 +435,7 @@ class LibraryExportManager(ExportManager):
         export_fs.makedir('policies', recreate=True)
 
         if self.contentstore:
-            self.contentstore.export_all_for_course(
-                self.courselike_key,
-                self.root_dir + '/' + self.target_dir + '/static/',
-                self.root_dir + '/' + self.target_dir + '/policies/assets.json',
-            )
+            self.export_static_assets(export_fs, root_courselike_dir)
 
     def post_process(self, root, export_fs):
         """
@@ -352,6 +464,22 @@ def export_library_to_xml(modulestore, contentstore, library_key, root_dir, libr
     LibraryExportManager(modulestore, contentstore, library_key, root_dir, library_dir).export()
 
 
+def export_course_to_tar(modulestore, contentstore, course_key, tar_file, course_dir):
+    """
+    Exports the course to the `course_dir` directory of the given `tarfile.TarFile`,
+    without writing it to disk. See ExportManager for details.
+    """
+    CourseExportManager(modulestore, contentstore, course_key, None, course_dir, tar_file=tar_file).export()
+
+
+def export_library_to_tar(modulestore, contentstore, library_key, tar_file, library_dir):
+    """
+    Exports the library to the `library_dir` directory of the given `tarfile.TarFile`,
+    without writing it to disk. See ExportManager for details.
+    """
+    LibraryExportManager(modulestore, contentstore, library_key, None, library_dir, tar_file=tar_file).export()
+
+
 def adapt_references(subtree, destination_course_key, export_fs):
     """
     Map every reference in the subtree into destination_course_key and set it back into the xblock fields
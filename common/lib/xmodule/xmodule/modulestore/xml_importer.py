@@ -22,13 +22,17 @@ Modulestore virtual   |          XML physical (draft, published)
 """
 
 
+import hashlib
 import json
 import io
 import logging
 import mimetypes
 import os
 import re
+import threading
 from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from time import time
 
 import six
 import xblock
@@ -83,11 +87,26 @@ class LocationMixin(XBlockMixin):
         )
 
 
+# Default number of static files imported concurrently
+DEFAULT_STATIC_IMPORT_WORKERS = 4
+
+
 class StaticContentImporter:
-    def __init__(self, static_content_store, course_data_path, target_id):
+    """
+    Imports the static files of a course into the content store.
+
+    Files are imported concurrently by up to `max_workers` threads, each of
+    which reads, hashes, thumbnails and saves one file at a time.  Files
+    whose content and metadata are identical to those of the asset already
+    in the content store, as when a course is imported again, are skipped.
+    The time spent in each stage and the number of imported and unchanged
+    files are accumulated in `stats`.
+    """
+    def __init__(self, static_content_store, course_data_path, target_id, max_workers=DEFAULT_STATIC_IMPORT_WORKERS):
         self.static_content_store = static_content_store
         self.target_id = target_id
         self.course_data_path = course_data_path
+        self.max_workers = max_workers
         try:
             with open(course_data_path / 'policies/assets.json') as f:
                 self.policy = json.load(f)
@@ -100,10 +119,23 @@ class StaticContentImporter:
         mimetypes.add_type('application/octet-stream', '.srt')
         self.mimetypes_list = list(mimetypes.types_map.values())
 
+        self.stats = {
+            'imported': 0,
+            'unchanged': 0,
+            'read_time': 0.0,
+            'hash_time': 0.0,
+            'thumbnail_time': 0.0,
+            'save_time': 0.0,
+        }
+        self._stats_lock = threading.Lock()
+        self._existing_assets = None
+        self._existing_assets_lock = threading.Lock()
+
     def import_static_content_directory(self, content_subdir=DEFAULT_STATIC_CONTENT_SUBDIR, verbose=False):
         remap_dict = {}
 
         static_dir = self.course_data_path / content_subdir
+        file_paths = []
         for dirname, _, filenames in os.walk(static_dir):
             for filename in filenames:
 
@@ -114,20 +146,33 @@ class StaticContentImporter:
                         log.debug('skipping static content %s...', file_path)
                     continue
 
-                if verbose:
-                    log.debug('importing static content %s...', file_path)
+                file_paths.append(file_path)
 
-                imported_file_attrs = self.import_static_file(file_path, base_dir=static_dir)
+        def import_file(file_path):
+            """
+            Import the static file at the given path.
+            """
+            if verbose:
+                log.debug('importing static content %s...', file_path)
+            return self.import_static_file(file_path, base_dir=static_dir)
 
-                if imported_file_attrs:
-                    # store the remapping information which will be needed
-                    # to subsitute in the module data
-                    remap_dict[imported_file_attrs[0]] = imported_file_attrs[1]
+        if self.max_workers > 1 and len(file_paths) > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                imported_files_attrs = list(executor.map(import_file, file_paths))
+        else:
+            imported_files_attrs = [import_file(file_path) for file_path in file_paths]
+
+        for imported_file_attrs in imported_files_attrs:
+            if imported_file_attrs:
+                # store the remapping information which will be needed
+                # to subsitute in the module data
+                remap_dict[imported_file_attrs[0]] = imported_file_attrs[1]
 
         return remap_dict
 
     def import_static_file(self, full_file_path, base_dir):
         filename = os.path.basename(full_file_path)
+        start_time = time()
         try:
             with open(full_file_path, 'rb') as f:
                 data = f.read()
@@ -138,6 +183,7 @@ class StaticContentImporter:
                 return None
             # Not a 'hidden file', then re-raise exception
             raise
+        start_time = self._add_stage_time('read_time', start_time)
 
         # strip away leading path from the name
         file_subpath = full_file_path.replace(base_dir, '')
@@ -158,6 +204,21 @@ class StaticContentImporter:
         # Check extracted contentType in list of all valid mimetypes
         if not mime_type or mime_type not in self.mimetypes_list:
             mime_type = mimetypes.guess_type(filename)[0]  # Assign guessed mimetype
+
+        content_digest = hashlib.md5(data).hexdigest()
+        start_time = self._add_stage_time('hash_time', start_time)
+        existing_asset = self._get_existing_assets().get(asset_key)
+        if existing_asset is not None and (
+                existing_asset.get('md5'),
+                existing_asset.get('displayname'),
+                existing_asset.get('contentType'),
+                existing_asset.get('locked', False),
+                existing_asset.get('import_path'),
+        ) == (content_digest, displayname, mime_type, locked, file_subpath):
+            # Importing the same asset again; keep it and its thumbnail.
+            self._add_stage_time(None, start_time, counter='unchanged')
+            return file_subpath, asset_key
+
         content = StaticContent(
             asset_key, displayname, mime_type, data,
             import_path=file_subpath, locked=locked
@@ -168,6 +229,7 @@ class StaticContentImporter:
 
         if thumbnail_content is not None:
             content.thumbnail_location = thumbnail_location
+        start_time = self._add_stage_time('thumbnail_time', start_time)
 
         # then commit the content
         try:
@@ -176,9 +238,39 @@ class StaticContentImporter:
             log.exception(u'Error importing {0}, error={1}'.format(
                 file_subpath, err
             ))
+        self._add_stage_time('save_time', start_time, counter='imported')
 
         return file_subpath, asset_key
 
+    def _get_existing_assets(self):
+        """
+        Returns a dict of the keys of the assets of the course already in the
+        content store to their attributes, including their md5 digest.
+        """
+        if self._existing_assets is None:
+            with self._existing_assets_lock:
+                if self._existing_assets is None:
+                    try:
+                        assets, __ = self.static_content_store.get_all_content_for_course(self.target_id)
+                        self._existing_assets = {asset['asset_key']: asset for asset in assets}
+                    except Exception:  # pylint: disable=broad-except
+                        log.warning(u'Could not list the existing assets of %s, importing all assets', self.target_id)
+                        self._existing_assets = {}
+        return self._existing_assets
+
+    def _add_stage_time(self, stage, start_time, counter=None):
+        """
+        Adds the time elapsed since start_time to the given stage in stats,
+        increments the given counter, if any, and returns the current time.
+        """
+        now = time()
+        with self._stats_lock:
+            if stage is not None:
+                self.stats[stage] += now - start_time
+            if counter is not None:
+                self.stats[counter] += 1
+        return now
+
 
 class ImportManager(object):
     """
@@ -221,6 +313,9 @@ class ImportManager(object):
         python_lib_filename: The filename of the courselike's python library. Course authors can optionally
             create this file to implement custom logic in their course.
 
+        static_import_stats: If given, a dict which is updated with the number of imported and
+            unchanged static files and the time spent reading, hashing, thumbnailing and saving them.
+
         default_class, load_error_modules: are arguments for constructing the XMLModuleStore (see its doc)
     """
     store_class = XMLModuleStore
@@ -234,6 +329,7 @@ class ImportManager(object):
             create_if_not_present=False, raise_on_failure=False,
             static_content_subdir=DEFAULT_STATIC_CONTENT_SUBDIR,
             python_lib_filename='python_lib.zip',
+            static_import_stats=None,
     ):
         self.store = store
         self.user_id = user_id
@@ -249,6 +345,7 @@ class ImportManager(object):
         self.do_import_python_lib = do_import_python_lib
         self.create_if_not_present = create_if_not_present
         self.raise_on_failure = raise_on_failure
+        self.static_import_stats = static_import_stats
         self.xml_module_store = self.store_class(
             data_dir,
             default_class=default_class,
@@ -319,6 +416,20 @@ class ImportManager(object):
                 content_subdir=simport, verbose=self.verbose
             )
 
+        log.info(
+            u'Imported static content of %s: %d files imported, %d unchanged; '
+            u'read %.2fs, hash %.2fs, thumbnail %.2fs, save %.2fs',
+            dest_id,
+            static_content_importer.stats['imported'],
+            static_content_importer.stats['unchanged'],
+            static_content_importer.stats['read_time'],
+            static_content_importer.stats['hash_time'],
+            static_content_importer.stats['thumbnail_time'],
+            static_content_importer.stats['save_time'],
+        )
+        if self.static_import_stats is not None:
+            self.static_import_stats.update(static_content_importer.stats)
+
     def import_asset_metadata(self, data_dir, course_id):
         """
         Read in assets XML file, parse it, and add all asset metadata to the modulestore.
@@ -0,0 +1,233 @@
+"""
+Profiler of the queries made by the modulestores and the contentstore.
+
+While a profile is active in a thread, it records:
+
+* every command sent to MongoDB from the thread, by the modulestores or the
+  contentstore, with its collection, duration and the number of documents
+  it returned, through COMMAND_LISTENER, which the modulestore and
+  contentstore factories register on their connections when profiling is
+  enabled (see `add_command_listener`);
+* every operation timed by split modulestore's QueryTimer, with the cache
+  tier that served it, if any, so that course structure cache hits show up
+  next to the round trips they saved.
+
+Profiles are meant to be scoped to a request (see
+openedx.core.lib.modulestore_profiler.ModulestoreQueryProfilerMiddleware)
+or to a block of code::
+
+    with profile_queries() as profile:
+        modulestore().get_course(course_key, depth=None)
+    print(profile.format_summary())
+
+When no profile is active, recording costs a thread-local lookup.  The
+size of replies is only measured by profiles started with
+measure_reply_size, since it requires encoding each reply again.
+"""
+
+
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from time import time
+
+import bson
+from pymongo import monitoring
+
+# A recorded query. `source` is 'mongo' for commands sent to MongoDB, and
+# 'split' for operations timed by split modulestore.  `size` is in bytes,
+# and None when it wasn't measured.
+ProfiledQuery = namedtuple(
+    'ProfiledQuery',
+    ['source', 'operation', 'collection', 'duration', 'size', 'documents', 'cache_tier', 'failed'],
+)
+
+_PROFILES = threading.local()
+
+
+class QueryProfile(object):
+    """
+    The queries recorded while the profile is active.
+    """
+    def __init__(self, measure_reply_size=False):
+        self.start_time = time()
+        self.measure_reply_size = measure_reply_size
+        self.queries = []
+        self._started_commands = {}
+
+    def command_started(self, event):
+        """
+        Records the start of the given pymongo CommandStartedEvent.
+        """
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = None
+        self._started_commands[event.request_id] = (event.command_name, collection)
+
+    def command_finished(self, event, failed=False):
+        """
+        Records the given pymongo CommandSucceededEvent or CommandFailedEvent.
+        """
+        command_name, collection = self._started_commands.pop(event.request_id, (event.command_name, None))
+        size = documents = None
+        if not failed:
+            documents = _count_documents(event.reply)
+            if self.measure_reply_size:
+                try:
+                    size = len(bson.BSON.encode(event.reply))
+                except Exception:  # pylint: disable=broad-except
+                    pass
+        self.queries.append(ProfiledQuery(
+            'mongo', command_name, collection, event.duration_micros / 1000000.0, size, documents, None, failed,
+        ))
+
+    def record_operation(self, operation, duration, size=None, cache_tier=None):
+        """
+        Records a modulestore operation, served by the given cache tier, if any.
+        """
+        self.queries.append(ProfiledQuery('split', operation, None, duration, size, None, cache_tier, False))
+
+    @property
+    def round_trips(self):
+        """
+        The recorded commands sent to MongoDB.
+        """
+        return [query for query in self.queries if query.source == 'mongo']
+
+    def summary(self):
+        """
+        Returns a dict summarizing the profile: the number of round trips to
+        MongoDB, their total duration, the documents they returned and
+        their reply size (0 unless measured), the number of structure
+        lookups served by each cache tier, and the round trips grouped by
+        operation and collection, most expensive first.
+        """
+        round_trips = self.round_trips
+        by_operation = {}
+        for query in round_trips:
+            key = u'{} {}'.format(query.operation, query.collection) if query.collection else query.operation
+            stats = by_operation.setdefault(key, {'count': 0, 'duration': 0.0, 'documents': 0, 'bytes': 0})
+            stats['count'] += 1
+            stats['duration'] += query.duration
+            stats['documents'] += query.documents or 0
+            stats['bytes'] += query.size or 0
+        cache_tiers = {}
+        for query in self.queries:
+            if query.cache_tier is not None:
+                cache_tiers[query.cache_tier] = cache_tiers.get(query.cache_tier, 0) + 1
+        return {
+            'round_trips': len(round_trips),
+            'failed': sum(1 for query in round_trips if query.failed),
+            'duration': sum(query.duration for query in round_trips),
+            'documents': sum(query.documents or 0 for query in round_trips),
+            'bytes': sum(query.size or 0 for query in round_trips),
+            'cache_tiers': cache_tiers,
+            'operations': sorted(
+                by_operation.items(), key=lambda item: (item[1]['duration'], item[1]['count']), reverse=True,
+            ),
+        }
+
+    def format_summary(self, max_operations=3):
+        """
+        Returns a one line summary of the profile, including its
+        `max_operations` most expensive operations.
+        """
+        summary = self.summary()
+        parts = [u'{} round trips, {:.1f}ms, {} documents'.format(
+            summary['round_trips'], summary['duration'] * 1000, summary['documents'],
+        )]
+        if self.measure_reply_size:
+            parts[0] += u', {} bytes'.format(summary['bytes'])
+        if summary['cache_tiers']:
+            parts.append(u'cache tiers: {}'.format(u' '.join(
+                u'{}={}'.format(tier, count) for tier, count in sorted(summary['cache_tiers'].items())
+            )))
+        if summary['operations']:
+            parts.append(u'top: {}'.format(u', '.join(
+                u'{} x{} {:.1f}ms'.format(operation, stats['count'], stats['duration'] * 1000)
+                for operation, stats in summary['operations'][:max_operations]
+            )))
+        return u'; '.join(parts)
+
+
+def _count_documents(reply):
+    """
+    Returns the number of documents in the given command reply, without
+    encoding it: the documents in the batch of a cursor, or the documents
+    written.
+    """
+    cursor = reply.get('cursor')
+    if isinstance(cursor, dict):
+        return len(cursor.get('firstBatch', cursor.get('nextBatch', ())))
+    return reply.get('n')
+
+
+def get_current_profile():
+    """
+    Returns the QueryProfile active in the current thread, if any.
+    """
+    return getattr(_PROFILES, 'profile', None)
+
+
+def start_profile(measure_reply_size=False):
+    """
+    Starts and returns a new QueryProfile in the current thread.
+    """
+    _PROFILES.profile = QueryProfile(measure_reply_size)
+    return _PROFILES.profile
+
+
+def stop_profile():
+    """
+    Stops and returns the QueryProfile active in the current thread, if any.
+    """
+    profile = get_current_profile()
+    _PROFILES.profile = None
+    return profile
+
+
+@contextmanager
+def profile_queries(measure_reply_size=False):
+    """
+    Context manager which profiles the queries made in its block, and yields the QueryProfile.
+    """
+    previous_profile = get_current_profile()
+    profile = start_profile(measure_reply_size)
+    try:
+        yield profile
+    finally:
+        _PROFILES.profile = previous_profile
+
+
+class ProfilingCommandListener(monitoring.CommandListener):
+    """
+    Records the MongoDB commands in the QueryProfile active in the thread which sends them.
+    """
+    def started(self, event):
+        profile = get_current_profile()
+        if profile is not None:
+            profile.command_started(event)
+
+    def succeeded(self, event):
+        profile = get_current_profile()
+        if profile is not None:
+            profile.command_finished(event)
+
+    def failed(self, event):
+        profile = get_current_profile()
+        if profile is not None:
+            profile.command_finished(event, failed=True)
+
+
+COMMAND_LISTENER = ProfilingCommandListener()
+
+
+def add_command_listener(doc_store_config):
+    """
+    Returns a copy of the given options of a MongoDB connection, as passed to
+    `xmodule.mongo_utils.connect_to_mongodb`, which also registers
+    COMMAND_LISTENER on the connection.
+    """
+    doc_store_config = dict(doc_store_config)
+    doc_store_config['event_listeners'] = [COMMAND_LISTENER] + list(doc_store_config.get('event_listeners', []))
+    return doc_store_config
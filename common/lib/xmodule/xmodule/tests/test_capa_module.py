@@ -1217,6 +1217,64 @@ class ProblemBlockTest(unittest.TestCase):
         # and that this is treated as the first attempt for grading purposes
         self.assertEqual(module.lcp.context['attempt'], 1)
 
+    def test_rescore_problem_grading_cache(self):
+        module = CapaFactory.create(attempts=1, done=True)
+        grading_cache = {}
+
+        with patch('capa.responsetypes.LoncapaResponse.evaluate_answers') as mock_evaluate_answers:
+            mock_evaluate_answers.return_value = CorrectMap(CapaFactory.answer_key(), 'correct')
+            module.update_correctness(grading_cache)
+            self.assertEqual(mock_evaluate_answers.call_count, 1)
+            self.assertEqual(len(grading_cache), 1)
+
+            # The same answers, with the same previous correctness, are only graded once
+            first_correct_map = module.lcp.correct_map.get_dict()
+            module.lcp.correct_map = CorrectMap()
+            module.update_correctness(grading_cache)
+            self.assertEqual(mock_evaluate_answers.call_count, 1)
+            self.assertEqual(module.lcp.correct_map.get_dict(), first_correct_map)
+
+            # Different answers are graded
+            module.lcp.correct_map = CorrectMap()
+            module.lcp.student_answers = {CapaFactory.answer_key(): '3.14'}
+            module.update_correctness(grading_cache)
+            self.assertEqual(mock_evaluate_answers.call_count, 2)
+            self.assertEqual(len(grading_cache), 2)
+
+    @ddt.data(
+        # Custom responses can be graded by any Python code.
+        textwrap.dedent("""
+            <problem>
+                <customresponse>
+                    <textline/>
+                    <answer type="loncapa/python">
+            correct = ['correct' if submission[0] == '4' else 'incorrect']
+                    </answer>
+                </customresponse>
+            </problem>
+        """),
+        # Python scripts can use any context, such as python_lib.zip.
+        textwrap.dedent("""
+            <problem>
+                <script type="loncapa/python">answer = 4</script>
+                <numericalresponse answer="$answer">
+                    <formulaequationinput/>
+                </numericalresponse>
+            </problem>
+        """),
+    )
+    def test_rescore_problem_grading_cache_not_used(self, xml):
+        module = CapaFactory.create(attempts=1, done=True, xml=xml)
+        self.assertIsNone(module.lcp.get_grading_key())
+
+        grading_cache = {}
+        with patch('capa.responsetypes.LoncapaResponse.evaluate_answers') as mock_evaluate_answers:
+            mock_evaluate_answers.return_value = CorrectMap()
+            module.update_correctness(grading_cache)
+            module.update_correctness(grading_cache)
+        self.assertEqual(mock_evaluate_answers.call_count, 2)
+        self.assertEqual(grading_cache, {})
+
     def test_rescore_problem_not_done(self):
         # Simulate that the problem is NOT done
         module = CapaFactory.create(done=False)
@@ -7,6 +7,7 @@ import unittest
 from datetime import datetime, timedelta
 
 import ddt
+import numpy
 from pytz import UTC
 import six
 from six import text_type
@@ -360,6 +361,64 @@ class GraderTest(unittest.TestCase):
             graders.grader_from_conf([invalid_conf])
         self.assertIn(expected_error_message, text_type(error.exception))
 
+    @ddt.data(
+        (12, 2, 7, 3),
+        (1, 0, 3, 1),
+        (0, 5, 0, 0),
+        (2, 0, 10, 8),
+    )
+    @ddt.unpack
+    def test_grade_batch(self, homework_min_count, homework_drop_count, lab_min_count, lab_drop_count):
+        weighted_grader = graders.WeightedSubsectionsGrader([
+            (graders.AssignmentFormatGrader("Homework", homework_min_count, homework_drop_count), "Homework", 0.25),
+            (graders.AssignmentFormatGrader("Lab", lab_min_count, lab_drop_count), "Lab", 0.35),
+            (graders.AssignmentFormatGrader("Midterm", 1, 0), "Midterm", 0.4),
+        ])
+        labs = self.test_gradesheet['Lab']
+        grade_sheets = [
+            self.test_gradesheet,
+            self.empty_gradesheet,
+            self.incomplete_gradesheet,
+            # Learners who can't see some of the labs.
+            dict(self.test_gradesheet, Lab={key: labs[key] for key in ('lab2', 'lab5', 'lab6')}),
+            dict(self.test_gradesheet, Lab={key: labs[key] for key in ('lab1', 'lab4')}),
+            # A learner with the same percent in all the labs.
+            dict(self.test_gradesheet, Lab={key: labs['lab2'] for key in labs}),
+        ]
+
+        score_matrix, subsection_formats = graders.score_matrix_from_grade_sheets(grade_sheets)
+        self.assertEqual(
+            weighted_grader.grade_batch(score_matrix, subsection_formats).tolist(),
+            [weighted_grader.grade(grade_sheet)['percent'] for grade_sheet in grade_sheets],
+        )
+
+    def test_score_matrix_from_grade_sheets(self):
+        labs = self.test_gradesheet['Lab']
+        score_matrix, subsection_formats = graders.score_matrix_from_grade_sheets([
+            {'Lab': {key: labs[key] for key in ('lab1', 'lab3')}},
+            {'Lab': {key: labs[key] for key in ('lab2', 'lab3', 'lab4')}, 'Midterm': self.test_gradesheet['Midterm']},
+            {'Lab': {key: labs[key] for key in ('lab1', 'lab2')}},
+        ])
+        self.assertEqual(subsection_formats, ['Lab'] * 4 + ['Midterm'])
+        lab1, lab2, lab3, lab4 = (labs[key].percent_graded for key in ('lab1', 'lab2', 'lab3', 'lab4'))
+        midterm = self.test_gradesheet['Midterm']['midterm'].percent_graded
+        self.assertEqual(
+            numpy.nan_to_num(score_matrix, nan=-1).tolist(),
+            [
+                [lab1, -1, lab3, -1, -1],
+                [-1, lab2, lab3, lab4, midterm],
+                [lab1, lab2, -1, -1, -1],
+            ],
+        )
+
+    def test_score_matrix_from_inconsistent_grade_sheets(self):
+        labs = self.test_gradesheet['Lab']
+        with self.assertRaises(ValueError):
+            graders.score_matrix_from_grade_sheets([
+                {'Lab': {key: labs[key] for key in ('lab1', 'lab2')}},
+                {'Lab': {key: labs[key] for key in ('lab2', 'lab1')}},
+            ])
+
 
 @ddt.ddt
 class ShowCorrectnessTest(unittest.TestCase):
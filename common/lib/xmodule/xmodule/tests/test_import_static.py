@@ -3,6 +3,7 @@ Tests that check that we ignore the appropriate files when importing courses.
 """
 
 
+import hashlib
 import unittest
 
 from mock import Mock
@@ -54,3 +55,58 @@ class IgnoredFilesTestCase(unittest.TestCase):
         self.assertNotIn("._example.txt", name_val)
         self.assertNotIn(".DS_Store", name_val)
         self.assertNotIn("example.txt~", name_val)
+
+
+class StaticContentReimportTestCase(unittest.TestCase):
+    """
+    Tests that unchanged static files aren't saved again when a course is re-imported
+    """
+    course_dir = DATA_DIR / "course_ignore"
+    course_id = CourseLocator("edX", "course_ignore", "2014_Fall")
+
+    def _import_static_content(self, existing_assets):
+        """
+        Imports the static content of the course into a mock content store
+        with the given existing assets, and returns the content store and
+        the importer.
+        """
+        content_store = Mock()
+        content_store.generate_thumbnail.return_value = ("content", "location")
+        content_store.get_all_content_for_course.return_value = (existing_assets, len(existing_assets))
+        static_content_importer = StaticContentImporter(
+            static_content_store=content_store,
+            course_data_path=self.course_dir,
+            target_id=self.course_id
+        )
+        static_content_importer.import_static_content_directory()
+        return content_store, static_content_importer
+
+    def test_reimport_unchanged(self):
+        content_store, static_content_importer = self._import_static_content([])
+        saved_static_content = [call[0][0] for call in content_store.save.call_args_list]
+        self.assertTrue(saved_static_content)
+        self.assertEqual(static_content_importer.stats['imported'], len(saved_static_content))
+        self.assertEqual(static_content_importer.stats['unchanged'], 0)
+
+        existing_assets = [
+            {
+                'asset_key': content.location,
+                'md5': hashlib.md5(content.data).hexdigest(),
+                'displayname': content.name,
+                'contentType': content.content_type,
+                'locked': content.locked,
+                'import_path': content.import_path,
+            }
+            for content in saved_static_content
+        ]
+        content_store, static_content_importer = self._import_static_content(existing_assets)
+        self.assertFalse(content_store.save.called)
+        self.assertFalse(content_store.generate_thumbnail.called)
+        self.assertEqual(static_content_importer.stats['imported'], 0)
+        self.assertEqual(static_content_importer.stats['unchanged'], len(saved_static_content))
+
+        # Changed content is imported again.
+        existing_assets[0]['md5'] = 'changed'
+        content_store, static_content_importer = self._import_static_content(existing_assets)
+        self.assertEqual(content_store.save.call_count, 1)
+        self.assertEqual(content_store.save.call_args[0][0].location, existing_assets[0]['asset_key'])
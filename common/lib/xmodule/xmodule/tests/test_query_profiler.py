@@ -0,0 +1,94 @@
+""" Test the recording and summaries of modulestore query profiles """
+
+
+import unittest
+
+from mock import Mock
+
+from xmodule.query_profiler import COMMAND_LISTENER, add_command_listener, get_current_profile, profile_queries
+from xmodule.modulestore.split_mongo.mongo_connection import TIMER
+
+
+def _command_events(request_id, command_name, collection, duration_micros, reply):
+    """
+    Returns mock started and succeeded events of the given command.
+    """
+    started = Mock(request_id=request_id, command_name=command_name, command={command_name: collection})
+    succeeded = Mock(request_id=request_id, command_name=command_name, duration_micros=duration_micros, reply=reply)
+    return started, succeeded
+
+
+class TestQueryProfiler(unittest.TestCase):
+    """ Test the queries recorded by QueryProfile """
+
+    def test_no_active_profile(self):
+        started, succeeded = _command_events(1, 'find', 'structures', 1000, {'ok': 1})
+        COMMAND_LISTENER.started(started)
+        COMMAND_LISTENER.succeeded(succeeded)
+        self.assertIsNone(get_current_profile())
+
+    def test_commands(self):
+        with profile_queries() as profile:
+            for request_id, (command_name, collection) in enumerate([
+                    ('find', 'structures'), ('find', 'definitions'), ('find', 'definitions'),
+            ]):
+                started, succeeded = _command_events(
+                    request_id, command_name, collection, 2000, {'cursor': {'firstBatch': [{}, {}]}, 'ok': 1},
+                )
+                COMMAND_LISTENER.started(started)
+                COMMAND_LISTENER.succeeded(succeeded)
+            COMMAND_LISTENER.started(Mock(request_id=3, command_name='insert', command={'insert': 'structures'}))
+            COMMAND_LISTENER.failed(Mock(request_id=3, command_name='insert', duration_micros=1000))
+        self.assertIsNone(get_current_profile())
+
+        summary = profile.summary()
+        self.assertEqual(summary['round_trips'], 4)
+        self.assertEqual(summary['failed'], 1)
+        self.assertAlmostEqual(summary['duration'], 0.007)
+        self.assertEqual(summary['documents'], 6)
+        self.assertEqual(summary['bytes'], 0)
+        self.assertEqual(
+            [(operation, stats['count']) for operation, stats in summary['operations']],
+            [('find definitions', 2), ('find structures', 1), ('insert structures', 1)],
+        )
+        self.assertIn(u'4 round trips', profile.format_summary())
+
+    def test_reply_size(self):
+        with profile_queries(measure_reply_size=True) as profile:
+            started, succeeded = _command_events(1, 'find', 'structures', 1000, {'cursor': {'nextBatch': [{}]}})
+            COMMAND_LISTENER.started(started)
+            COMMAND_LISTENER.succeeded(succeeded)
+        self.assertEqual(profile.summary()['documents'], 1)
+        self.assertGreater(profile.summary()['bytes'], 0)
+        self.assertIn(u'bytes', profile.format_summary())
+
+    def test_add_command_listener(self):
+        listener = Mock()
+        doc_store_config = {'db': 'xmodule', 'event_listeners': [listener]}
+        self.assertEqual(
+            add_command_listener(doc_store_config),
+            {'db': 'xmodule', 'event_listeners': [COMMAND_LISTENER, listener]},
+        )
+        self.assertEqual(doc_store_config['event_listeners'], [listener])
+
+    def test_nested_profiles(self):
+        with profile_queries() as outer_profile:
+            with profile_queries() as inner_profile:
+                self.assertIs(get_current_profile(), inner_profile)
+            self.assertIs(get_current_profile(), outer_profile)
+
+    def test_split_operations(self):
+        with profile_queries() as profile:
+            with TIMER.timer('get_structure', 'course-v1:org+course+run') as tagger:
+                tagger.tag(from_cache=True, cache_tier='process')
+            with TIMER.timer('get_structure', 'course-v1:org+course+run') as tagger:
+                tagger.tag(from_cache=False, cache_tier='mongo')
+                tagger.measure('compressed_size', 1234)
+
+        self.assertEqual(
+            [(query.operation, query.size, query.cache_tier) for query in profile.queries],
+            [('get_structure', None, 'process'), ('get_structure', 1234, 'mongo')],
+        )
+        self.assertEqual(profile.summary()['cache_tiers'], {'process': 1, 'mongo': 1})
+        # Split operations aren't round trips: their commands are recorded separately.
+        self.assertEqual(profile.summary()['round_trips'], 0)
@@ -0,0 +1,99 @@
+"""
+Command to benchmark rendering the course outline of a CCX
+"""
+
+
+from textwrap import dedent
+from time import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test.client import RequestFactory
+from edx_django_utils.cache import RequestCache
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+
+from lms.djangoapps.courseware.courses import get_course_by_id
+from lms.djangoapps.courseware.field_overrides import OverrideFieldData, OverrideModulestoreFieldData
+from lms.djangoapps.courseware.model_data import FieldDataCache
+from lms.djangoapps.courseware.module_render import toc_for_course
+
+
+class Command(BaseCommand):
+    """
+    Command to measure the time taken to render the course outline of a
+    course, typically a CCX, for a user, both when field override providers
+    are consulted for every field access, and when the overrides they find
+    are added to the per-request overrides table of OverrideFieldData.
+
+    Example:
+    ./manage.py lms benchmark_ccx_outline ccx-v1:edX+DemoX+Demo_Course+ccx@1 --username coach --iterations 20
+    """
+    help = dedent(__doc__).strip()
+
+    def add_arguments(self, parser):
+        """
+        Add arguments to the command parser.
+        """
+        parser.add_argument(
+            'course_id',
+            help='Id of the course, or CCX, whose outline is rendered.',
+        )
+        parser.add_argument(
+            '--username',
+            required=True,
+            help='Name of the user the outline is rendered for.',
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=10,
+            help='Number of times the outline is rendered in each mode.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            course_key = CourseKey.from_string(options['course_id'])
+        except InvalidKeyError:
+            raise CommandError(u'Invalid course id: {}'.format(options['course_id']))
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(u'Unknown user: {}'.format(options['username']))
+
+        request = RequestFactory().get('/')
+        request.user = user
+        request.session = {}
+
+        # CCX overrides are provided at the modulestore level, and other
+        # providers at the user level; toggle the table of both.
+        field_data_classes = (OverrideFieldData, OverrideModulestoreFieldData)
+        use_overrides_table = {cls: vars(cls).get('use_overrides_table') for cls in field_data_classes}
+        try:
+            for mode, use_table in ((u'providers', False), (u'table', True)):
+                for cls in field_data_classes:
+                    cls.use_overrides_table = use_table
+                durations = sorted(
+                    self._render_outline(course_key, user, request) for _ in range(options['iterations'])
+                )
+                self.stdout.write(u'{:<10} min: {:>8.1f} ms  median: {:>8.1f} ms'.format(
+                    mode, durations[0] * 1000, durations[len(durations) // 2] * 1000,
+                ))
+        finally:
+            for cls, use_table in use_overrides_table.items():
+                if use_table is None:
+                    del cls.use_overrides_table
+                else:
+                    cls.use_overrides_table = use_table
+
+    def _render_outline(self, course_key, user, request):
+        """
+        Renders the outline of the course for the user, as the courseware
+        page does, in a new request, and returns the number of seconds taken.
+        """
+        RequestCache.clear_all_namespaces()
+        start_time = time()
+        course = get_course_by_id(course_key, depth=2)
+        field_data_cache = FieldDataCache.cache_for_descriptor_descendents(course_key, user, course, depth=2)
+        toc_for_course(user, request, course, None, None, field_data_cache)
+        return time() - start_time
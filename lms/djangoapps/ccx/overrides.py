@@ -12,7 +12,7 @@ from django.db import transaction
 from opaque_keys.edx.keys import CourseKey, UsageKey
 
 from lms.djangoapps.ccx.models import CcxFieldOverride, CustomCourseForEdX
-from lms.djangoapps.courseware.field_overrides import FieldOverrideProvider
+from lms.djangoapps.courseware.field_overrides import FieldOverrideProvider, clear_overrides_table
 from openedx.core.lib.cache_utils import get_cache
 
 log = logging.getLogger(__name__)
@@ -24,6 +24,8 @@ class CustomCoursesForEdxOverrideProvider(FieldOverrideProvider):
     :class:`~courseware.field_overrides.FieldOverrideProvider` which allows for
     overrides to be made on a per user basis.
     """
+    uses_fallback_field_data = False
+
     def get(self, block, name, default):
         """
         Just call the get_override_for_ccx method if there is a ccx
@@ -176,6 +178,7 @@ def override_field_for_ccx(ccx, block, name, value):
 
     _get_overrides_for_ccx(ccx).setdefault(clean_ccx_key, {})[name] = value_json
     _get_overrides_for_ccx(ccx).setdefault(clean_ccx_key, {})[name + "_instance"] = override
+    clear_overrides_table()
 
 
 def clear_override_for_ccx(ccx, block, name):
@@ -201,6 +204,7 @@ def clear_ccx_field_info_from_ccx_map(ccx, block, name):
     """
     Remove field information from ccx overrides mapping dictionary
     """
+    clear_overrides_table()
     try:
         clean_ccx_key = _clean_ccx_key(block.location)
         ccx_override_map = _get_overrides_for_ccx(ccx).setdefault(clean_ccx_key, {})
@@ -103,3 +103,65 @@ def get_course_blocks(
         starting_block_usage_key,
         collected_block_structure,
     )
+
+
+def get_course_blocks_for_users(
+        users,
+        starting_block_usage_key,
+        transformers_for_user=None,
+        collected_block_structure=None,
+        allow_start_dates_in_future=False,
+):
+    """
+    A higher order function implemented on top of the
+    block_structure.get_transformed_for_usages function returning a
+    transformed block structure for each of the given users starting at
+    starting_block_usage_key.
+
+    The result for each user is the same as that of get_course_blocks.
+    However, the collected block structure is only loaded once, and the
+    parts of the transformations that are the same for several users
+    (for example, for all learners in the same partition groups and
+    enrollment track) are only applied once for all of them.  This makes
+    it suitable for computing course blocks for large numbers of users,
+    such as in instructor reports and bulk grading.
+
+    Arguments:
+        users (list[django.contrib.auth.models.User]) - User objects for
+            which the block structure is to be transformed.
+
+        starting_block_usage_key (UsageKey) - Specifies the starting block
+            of the block structure that is to be transformed.
+
+        transformers_for_user (function) - A function that returns the
+            list of transformers for a given user.  It must return the
+            same types of transformers for all users.  If None,
+            get_course_block_access_transformers is used.
+
+        collected_block_structure (BlockStructureBlockData) - A
+            block structure retrieved from a prior call to
+            BlockStructureManager.get_collected.  Can be optionally
+            provided if already available, for optimization.
+
+    Returns:
+        dict {int: BlockStructureBlockData} - A map of each user's id to
+            the block structure transformed for that user.  Users whose
+            transformations are entirely shared receive the same block
+            structure instance, so the returned block structures must
+            not be modified.
+    """
+    transformers_for_user = transformers_for_user or get_course_block_access_transformers
+    course_key = starting_block_usage_key.course_key
+
+    transformers_list = []
+    for user in users:
+        transformers = BlockStructureTransformers(transformers_for_user(user))
+        transformers.usage_info = CourseUsageInfo(course_key, user, allow_start_dates_in_future)
+        transformers_list.append(transformers)
+
+    block_structures = get_block_structure_manager(course_key).get_transformed_for_usages(
+        transformers_list,
+        starting_block_usage_key,
+        collected_block_structure,
+    )
+    return {user.id: block_structure for user, block_structure in zip(users, block_structures)}
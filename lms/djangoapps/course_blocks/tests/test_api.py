@@ -0,0 +1,108 @@
+"""
+Tests for the course_blocks API.
+"""
+
+
+from datetime import timedelta
+
+from django.utils.timezone import now
+from mock import patch
+
+from common.djangoapps.student.tests.factories import CourseEnrollmentFactory, UserFactory
+from lms.djangoapps.courseware.tests.factories import BetaTesterFactory
+
+from ..api import get_course_blocks, get_course_blocks_for_users
+from ..transformers.tests.helpers import BlockParentsMapTestCase, publish_course, update_block
+from ..transformers.start_date import StartDateTransformer
+from ..transformers.visibility import VisibilityTransformer
+
+
+class GetCourseBlocksForUsersTestCase(BlockParentsMapTestCase):
+    """
+    Tests for get_course_blocks_for_users.
+    """
+    TRANSFORMER_CLASS_TO_TEST = VisibilityTransformer
+
+    def setUp(self):
+        super(GetCourseBlocksForUsersTestCase, self).setUp()
+        for index in (1, 5):
+            block = self.get_block(index)
+            block.visible_to_staff_only = True
+            update_block(block)
+        publish_course(self.course)
+
+        self.other_student = UserFactory.create(password=self.password)
+        CourseEnrollmentFactory.create(user=self.other_student, course_id=self.course.id)
+
+    def _transformers_for_user(self, user):  # pylint: disable=unused-argument
+        """
+        Returns the transformers to apply for the given user.
+        """
+        return [VisibilityTransformer()]
+
+    def test_same_as_get_course_blocks(self):
+        users = [self.student, self.staff]
+        block_structures = get_course_blocks_for_users(
+            users, self.course.location, transformers_for_user=self._transformers_for_user,
+        )
+
+        self.assertEqual(set(block_structures), {user.id for user in users})
+        for user in users:
+            expected = get_course_blocks(user, self.course.location, self.transformers)
+            self.assertEqual(
+                set(block_structures[user.id].get_block_keys()),
+                set(expected.get_block_keys()),
+            )
+        self.assertNotIn(self.xblock_keys[1], block_structures[self.student.id])
+        self.assertIn(self.xblock_keys[1], block_structures[self.staff.id])
+
+    def test_shared_transform(self):
+        users = [self.student, self.other_student]
+        with patch.object(
+            VisibilityTransformer,
+            'transform_block_filters',
+            autospec=True,
+            side_effect=VisibilityTransformer.transform_block_filters,
+        ) as mock_transform_block_filters:
+            block_structures = get_course_blocks_for_users(
+                users, self.course.location, transformers_for_user=self._transformers_for_user,
+            )
+
+        # Both learners have the same batch key, so the transformer is
+        # applied once and its outcome is shared.
+        self.assertEqual(mock_transform_block_filters.call_count, 1)
+        self.assertEqual(set(block_structures), {user.id for user in users})
+        self.assertEqual(
+            set(block_structures[self.student.id].get_block_keys()),
+            set(block_structures[self.other_student.id].get_block_keys()),
+        )
+        self.assertNotIn(self.xblock_keys[1], block_structures[self.other_student.id])
+
+    def test_differing_batch_keys(self):
+        course = self.get_block(0)
+        course.days_early_for_beta = 33
+        update_block(course)
+        block = self.get_block(2)
+        block.start = now() + timedelta(days=10)
+        update_block(block)
+        publish_course(self.course)
+        beta_user = BetaTesterFactory(course_key=self.course.id)
+
+        users = [self.student, beta_user]
+        with patch.object(
+            StartDateTransformer,
+            'transform_block_filters',
+            autospec=True,
+            side_effect=StartDateTransformer.transform_block_filters,
+        ) as mock_transform_block_filters:
+            block_structures = get_course_blocks_for_users(
+                users,
+                self.course.location,
+                transformers_for_user=lambda user: [StartDateTransformer()],
+            )
+
+        # The beta tester has a different batch key than the learner,
+        # so the transformer is applied for each of them.
+        self.assertEqual(mock_transform_block_filters.call_count, 2)
+        self.assertNotIn(self.xblock_keys[2], block_structures[self.student.id])
+        self.assertIn(self.xblock_keys[2], block_structures[beta_user.id])
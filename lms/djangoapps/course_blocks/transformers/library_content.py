@@ -74,6 +74,10 @@ class ContentLibraryTransformer(FilteringTransformerMixin, BlockStructureTransfo
                 summary = summarize_block(child_key)
                 block_structure.set_transformer_block_field(child_key, cls, 'block_analytics_summary', summary)
 
+    def batch_key(self, usage_info, block_structure):
+        # Library content is selected separately for each user.
+        return None if _has_library_content(block_structure) else True
+
     def transform_block_filters(self, usage_info, block_structure):
         all_library_children = set()
         all_selected_children = set()
@@ -212,6 +216,10 @@ class ContentLibraryOrderTransformer(BlockStructureTransformer):
         # There is nothing to collect
         pass  # pylint:disable=unnecessary-pass
 
+    def batch_key(self, usage_info, block_structure):
+        # The order of library content is specific to each user.
+        return None if _has_library_content(block_structure) else True
+
     def transform(self, usage_info, block_structure):
         """
         Transforms the order of the children of the randomized content block
@@ -243,3 +251,14 @@ class ContentLibraryOrderTransformer(BlockStructureTransformer):
                 else:
                     ordering_data = {block[1]: position for position, block in enumerate(state_dict['selected'])}
                     library_children.sort(key=lambda block, data=ordering_data: data[block.block_id])
+
+
+def _has_library_content(block_structure):
+    """
+    Returns whether the given block structure contains any library_content
+    blocks with children.
+    """
+    return any(
+        block_key.block_type == 'library_content' and block_structure.get_children(block_key)
+        for block_key in block_structure
+    )
@@ -61,6 +61,10 @@ class VisibilityTransformer(FilteringTransformerMixin, BlockStructureTransformer
             merged_field_name=cls.MERGED_VISIBLE_TO_STAFF_ONLY,
         )
 
+    def batch_key(self, usage_info, block_structure):
+        # The outcome only depends on whether the user has staff access.
+        return usage_info.has_staff_access
+
     def transform_block_filters(self, usage_info, block_structure):
         # Users with staff access bypass the Visibility check.
         if usage_info.has_staff_access:
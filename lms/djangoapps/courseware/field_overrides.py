@@ -25,11 +25,14 @@ from django.conf import settings
 from edx_django_utils.cache import DEFAULT_REQUEST_CACHE
 from xblock.field_data import FieldData
 
+from openedx.core.lib.cache_utils import get_cache
 from xmodule.modulestore.inheritance import InheritanceMixin
 
 NOTSET = object()
+_NOT_IN_TABLE = object()
 ENABLED_OVERRIDE_PROVIDERS_KEY = u'courseware.field_overrides.enabled_providers.{course_id}'
 ENABLED_MODULESTORE_OVERRIDE_PROVIDERS_KEY = u'courseware.modulestore_field_overrides.enabled_providers.{course_id}'
+OVERRIDES_TABLE_NAMESPACE = u'courseware.field_overrides.overrides_table'
 
 
 def resolve_dotted(name):
@@ -94,6 +97,15 @@ def overrides_disabled():
     return bool(_OVERRIDES_DISABLED.disabled)
 
 
+def clear_overrides_table():
+    """
+    Clears the table of overrides found by `OverrideFieldData` during the
+    current request.  Must be called when overrides are changed, so that
+    the new values are used for the rest of the request.
+    """
+    get_cache(OVERRIDES_TABLE_NAMESPACE).clear()
+
+
 class FieldOverrideProvider(six.with_metaclass(ABCMeta, object)):
     """
     Abstract class which defines the interface that a `FieldOverrideProvider`
@@ -104,7 +116,14 @@ class FieldOverrideProvider(six.with_metaclass(ABCMeta, object)):
     A `FieldOverrideProvider` implementation is only responsible for looking up
     field overrides. To set overrides, there will be a domain specific API for
     the concrete override implementation being used.
+
+    Providers whose overrides don't depend on `fallback_field_data`, but
+    only on the user, block and field, should set
+    `uses_fallback_field_data` to False, so that the overrides they find
+    are shared by all the `OverrideFieldData` instances of the user during
+    the request.
     """
+    uses_fallback_field_data = True
 
     def __init__(self, user, fallback_field_data):
         self.user = user
@@ -147,9 +166,17 @@ class OverrideFieldData(FieldData):
     is important for this setting.  Override providers will tried in the order
     configured in the setting.  The first provider to find an override 'wins'
     for a particular field lookup.
+
+    The override found by each provider for each field of each block, if
+    any, is added to a per-request table of the provider and user, so that
+    the provider is only consulted once per field.  The table of a provider
+    which uses the fallback field data is also specific to the fallback.
     """
     provider_classes = None
 
+    # Whether overrides are added to the per-request overrides table.
+    use_overrides_table = True
+
     @classmethod
     def wrap(cls, user, course, wrapped):
         """
@@ -202,17 +229,40 @@ class OverrideFieldData(FieldData):
     def __init__(self, user, fallback, providers):
         self.fallback = fallback
         self.providers = tuple(provider(user, fallback) for provider in providers)
+        user_id = getattr(user, 'id', None)
+        self._overrides_table_keys = tuple(
+            (user_id, provider, fallback if provider.uses_fallback_field_data else None)
+            for provider in providers
+        )
 
     def get_override(self, block, name):
         """
         Checks for an override for the field identified by `name` in `block`.
         Returns the overridden value or `NOTSET` if no override is found.
         """
-        if not overrides_disabled():
+        if overrides_disabled():
+            return NOTSET
+        try:
+            field_key = (block.scope_ids.usage_id, name) if self.use_overrides_table else None
+        except AttributeError:
+            field_key = None
+        if field_key is None:
             for provider in self.providers:
                 value = provider.get(block, name, NOTSET)
                 if value is not NOTSET:
                     return value
+            return NOTSET
+
+        # The tables are looked up on each call, as modulestore blocks may
+        # outlive the request.
+        overrides_tables = get_cache(OVERRIDES_TABLE_NAMESPACE)
+        for provider, table_key in zip(self.providers, self._overrides_table_keys):
+            overrides_table = overrides_tables.setdefault(table_key, {})
+            value = overrides_table.get(field_key, _NOT_IN_TABLE)
+            if value is _NOT_IN_TABLE:
+                value = overrides_table[field_key] = provider.get(block, name, NOTSET)
+            if value is not NOTSET:
+                return value
         return NOTSET
 
     def get(self, block, name):
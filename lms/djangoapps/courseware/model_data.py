@@ -773,6 +773,11 @@ class FieldDataCache(object):
             return descriptors
 
         with modulestore().bulk_operations(descriptor.location.course_key):
+            if depth is None:
+                # The whole subtree is about to be rendered, e.g. a sequence and
+                # its problems: load their definitions at once rather than one
+                # at a time as they're rendered.
+                modulestore().prefetch_definitions([descriptor], depth)
             descriptors = get_child_descriptors(descriptor, depth, descriptor_filter)
 
         self.add_descriptors_to_cache(descriptors)
@@ -989,6 +994,31 @@ class ScoresClient(object):
         client.fetch_scores(scorable_locations)
         return client
 
+    @classmethod
+    def bulk_create_for_locations(cls, course_id, user_ids, scorable_locations):
+        """
+        Create ScoresClients for the given users with pre-fetched data for the
+        given locations, fetching the scores of all the users with a single query.
+
+        Returns a dict of user_id to ScoresClient.
+        """
+        clients = {user_id: cls(course_id, user_id) for user_id in user_ids}
+        scores_qset = StudentModule.objects.filter(
+            student_id__in=list(clients),
+            course_id=course_id,
+            module_state_key__in=set(scorable_locations),
+        )
+        for user_id, location, correct, total, created in scores_qset.values_list(
+                'student_id', 'module_state_key', 'grade', 'max_grade', 'created',
+        ):
+            # pylint: disable=protected-access
+            clients[user_id]._locations_to_scores[location.map_into_course(course_id)] = cls.Score(
+                correct, total, created,
+            )
+        for client in clients.values():
+            client._has_fetched = True  # pylint: disable=protected-access
+        return clients
+
 
 # @contract(user_id=int, usage_key=UsageKey, score="number|None", max_score="number|None")
 def set_score(user_id, usage_key, score, max_score):
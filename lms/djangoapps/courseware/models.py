@@ -22,11 +22,12 @@ from config_models.models import ConfigurationModel
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.db import models
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.utils.encoding import python_2_unicode_compatible
 from django.utils.translation import ugettext_lazy as _
 from model_utils.models import TimeStampedModel
 from opaque_keys.edx.django.models import BlockTypeKeyField, CourseKeyField, LearningContextKeyField, UsageKeyField
+from lms.djangoapps.courseware import student_module_cache
 from lms.djangoapps.courseware.fields import UnsignedBigIntAutoField
 from six import text_type
 from six.moves import range
@@ -178,6 +179,17 @@ class StudentModule(models.Model):
             )
 
 
+def record_student_module_change(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Records changes to StudentModules in the cross-request StudentModule cache.
+    """
+    student_module_cache.record_change(instance, deleted=kwargs.get('signal') is post_delete)
+
+
+post_save.connect(record_student_module_change, sender=StudentModule)
+post_delete.connect(record_student_module_change, sender=StudentModule)
+
+
 class BaseStudentModuleHistory(models.Model):
     """
     Abstract class containing most fields used by any class storing Student Module History
@@ -9,7 +9,7 @@ import json
 from lms.djangoapps.courseware.models import StudentFieldOverride
 from openedx.core.lib.xblock_utils import is_xblock_aside
 
-from .field_overrides import FieldOverrideProvider
+from .field_overrides import FieldOverrideProvider, clear_overrides_table
 
 
 class IndividualStudentOverrideProvider(FieldOverrideProvider):
@@ -18,6 +18,8 @@ class IndividualStudentOverrideProvider(FieldOverrideProvider):
     :class:`~courseware.field_overrides.FieldOverrideProvider` which allows for
     overrides to be made on a per user basis.
     """
+    uses_fallback_field_data = False
+
     def get(self, block, name, default):
         return get_override_for_user(self.user, block, name, default)
 
@@ -83,6 +85,7 @@ def override_field_for_user(user, block, name, value):
     field = block.fields[name]
     override.value = json.dumps(field.to_json(value))
     override.save()
+    clear_overrides_table()
 
 
 def clear_override_for_user(user, block, name):
@@ -98,5 +101,6 @@ def clear_override_for_user(user, block, name):
             student_id=user.id,
             location=block.location,
             field=name).delete()
+        clear_overrides_table()
     except StudentFieldOverride.DoesNotExist:
         pass
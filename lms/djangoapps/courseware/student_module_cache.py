@@ -0,0 +1,186 @@
+"""
+Cross-request cache of the StudentModule state of each user in each course.
+
+Rendering courseware loads the state of every block of a unit from the
+StudentModule table, even when the learner just navigates back and forth in
+a sequence.  This cache keeps, for each user and course, the state and
+modification date of the StudentModules that were looked up, as well as
+which blocks have no StudentModule, so that repeated renders skip the query.
+
+Entries are versioned: the cache key of the entry of a user in a course
+includes a version number which is incremented after every committed change
+to one of the user's StudentModules in the course (see the post_save and
+post_delete receivers connected in courseware.models).  Entries written for
+an earlier version are never read again, so a render that races with a
+change can't store stale state for the current version.  When possible, the
+change is also written through to the entry of the new version.  Until
+then, the cache is bypassed for the user in the course in the process that
+made the change, so that it reads its own uncommitted changes and never
+caches them.
+
+The cache is configured by the STUDENT_MODULE_STATE_CACHE setting:
+
+    ENABLED: Whether the cache is used.
+    READ_ONLY: If True, cached state is used but never added to the cache,
+        for instance for processes that read from a replica database whose
+        lag could otherwise store stale state.  Changes are still recorded.
+    CACHE_NAME: The name of the django cache to use.
+    TIMEOUT: The number of seconds for which entries are kept.
+
+Every process that changes StudentModules must be configured with the same
+cache, so that it records the changes.
+"""
+
+
+import logging
+import random
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from openedx.core.lib.cache_utils import get_cache
+
+log = logging.getLogger(__name__)
+
+# State cached for blocks that have no StudentModule.
+_ABSENT = None
+
+# RequestCache namespace of the (user_id, course_key) pairs with uncommitted changes.
+_UNCOMMITTED_CHANGES_NAMESPACE = u'courseware.student_module_cache.uncommitted_changes'
+
+
+def _config():
+    """
+    Returns the STUDENT_MODULE_STATE_CACHE setting.
+    """
+    return getattr(settings, 'STUDENT_MODULE_STATE_CACHE', {})
+
+
+def is_enabled():
+    """
+    Returns whether the cross-request StudentModule cache is enabled.
+    """
+    return bool(_config().get('ENABLED', False))
+
+
+def _cache():
+    return caches[_config().get('CACHE_NAME', 'default')]
+
+
+def _version_key(user_id, course_key):
+    return u'courseware.student_module_cache.version.{}.{}'.format(user_id, course_key)
+
+
+def _entry_key(user_id, course_key, version):
+    return u'courseware.student_module_cache.entry.{}.{}.{}'.format(user_id, course_key, version)
+
+
+def _get_version(cache, user_id, course_key):
+    """
+    Returns the current version of the entry of the user in the course.
+    """
+    version_key = _version_key(user_id, course_key)
+    version = cache.get(version_key)
+    if version is None:
+        # Start from a random version, so that entries written before the
+        # version was evicted from the cache aren't read again.
+        cache.add(version_key, random.randint(0, 2 ** 31), None)
+        version = cache.get(version_key)
+    return version
+
+
+class StudentModuleStateCache(object):
+    """
+    The cached StudentModule state of a user in a course.
+    """
+    def __init__(self, user_id, course_key):
+        self.user_id = user_id
+        self.course_key = course_key
+        self._cache = _cache()
+        if (user_id, course_key) in get_cache(_UNCOMMITTED_CHANGES_NAMESPACE):
+            self._version = None
+        else:
+            self._version = _get_version(self._cache, user_id, course_key)
+        self._entry = None
+
+    def get_many(self, usage_keys):
+        """
+        Returns a dict of each of the given usage keys whose state is cached
+        to a (state, modified) tuple, where state is the serialized state of
+        the StudentModule, or None if there is no StudentModule for the block.
+        """
+        if self._version is None:
+            return {}
+        if self._entry is None:
+            self._entry = self._cache.get(_entry_key(self.user_id, self.course_key, self._version)) or {}
+        cached = {}
+        for usage_key in usage_keys:
+            value = self._entry.get(usage_key)
+            if value is not None:
+                cached[usage_key] = value
+            elif usage_key in self._entry:
+                cached[usage_key] = (_ABSENT, None)
+        return cached
+
+    def set_many(self, states):
+        """
+        Adds the given dict of usage keys to (state, modified) tuples, as read
+        from the database, to the cache. Blocks that have no StudentModule
+        are given a state of None.
+        """
+        if self._version is None or _config().get('READ_ONLY', False):
+            return
+        if self._entry is None:
+            self.get_many([])
+        for usage_key, (state, modified) in states.items():
+            self._entry[usage_key] = None if state is _ABSENT else (state, modified)
+        self._cache.set(
+            _entry_key(self.user_id, self.course_key, self._version),
+            self._entry,
+            _config().get('TIMEOUT', 3600),
+        )
+
+
+def record_change(student_module, deleted=False):
+    """
+    Records a change to the given StudentModule once the current
+    transaction, if any, is committed.
+    """
+    if not is_enabled():
+        return
+    user_id = student_module.student_id
+    course_key = student_module.course_id
+    usage_key = student_module.module_state_key.map_into_course(course_key)
+    state = (_ABSENT, None) if deleted else (student_module.state, student_module.modified)
+
+    uncommitted_changes = get_cache(_UNCOMMITTED_CHANGES_NAMESPACE)
+    uncommitted_changes[(user_id, course_key)] = True
+
+    def on_commit():
+        uncommitted_changes.pop((user_id, course_key), None)
+        _record_change(user_id, course_key, usage_key, state)
+
+    transaction.on_commit(on_commit)
+
+
+def _record_change(user_id, course_key, usage_key, state):
+    """
+    Increments the version of the entry of the user in the course and, if the
+    entry of the previous version is cached, writes the change through to the
+    entry of the new version.
+    """
+    cache = _cache()
+    try:
+        version = cache.incr(_version_key(user_id, course_key))
+    except ValueError:
+        # The version isn't cached, so neither are any entries for it.
+        return
+    except Exception:  # pylint: disable=broad-except
+        log.exception(u'Failed to record a StudentModule change in the cache for user %s in %s', user_id, course_key)
+        return
+
+    previous_entry = cache.get(_entry_key(user_id, course_key, version - 1))
+    if previous_entry is not None:
+        previous_entry[usage_key] = None if state[0] is _ABSENT else state
+        cache.set(_entry_key(user_id, course_key, version), previous_entry, _config().get('TIMEOUT', 3600))
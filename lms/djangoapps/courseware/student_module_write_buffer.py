@@ -0,0 +1,365 @@
+"""
+Write-behind buffer of low-value StudentModule state changes.
+
+Some XBlock handlers save user state that changes often but matters little,
+such as the position and speed of a video, which the video player saves
+every time it's paused.  Saving each of those changes to the StudentModule
+table costs several queries.  When the buffer is enabled, changes to the
+designated fields are instead merged in memory, per user and block, and
+written to the database in bulk once they've been buffered for a while,
+when the user logs out and when the process exits.  There is no signal
+when a session expires, so the changes of users whose session expires
+without logging out are only written by the timer or at exit.
+
+Buffered changes are only visible to the process that buffered them, and
+are lost if it's killed before they're written, so only fields whose recent
+changes can safely be lost should be designated.  History is not saved for
+buffered changes.
+
+The buffer is configured by the STUDENT_MODULE_WRITE_BEHIND setting:
+
+    ENABLED: Whether changes to the designated fields are buffered.
+    FIELDS: A dict of block types to the names of their fields whose
+        changes are buffered.  Changes are only buffered when all the
+        changed fields are designated.
+    WINDOW: The number of seconds for which changes are buffered.
+"""
+
+
+import atexit
+import logging
+import os
+import threading
+from collections import OrderedDict, defaultdict
+from time import time
+
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_out
+from django.db import close_old_connections, transaction
+from django.dispatch import receiver
+from django.utils import timezone
+from edx_django_utils.monitoring import set_custom_attribute
+
+from lms.djangoapps.courseware import student_module_cache
+from lms.djangoapps.courseware.models import StudentModule
+
+try:
+    import simplejson as json
+except ImportError:
+    import json
+
+log = logging.getLogger(__name__)
+
+
+def _config():
+    """
+    Returns the STUDENT_MODULE_WRITE_BEHIND setting.
+    """
+    return getattr(settings, 'STUDENT_MODULE_WRITE_BEHIND', {})
+
+
+def is_enabled():
+    """
+    Returns whether changes to designated fields are buffered.
+    """
+    return bool(_config().get('ENABLED', False))
+
+
+def can_buffer(usage_key, state):
+    """
+    Returns whether the given state changes of the given block can be buffered.
+    """
+    fields = _config().get('FIELDS', {}).get(usage_key.block_type)
+    return bool(fields) and bool(state) and set(state).issubset(fields)
+
+
+class _PendingChange(object):
+    """
+    The buffered state changes of a user in a block.
+    """
+    __slots__ = ('user_id', 'buffered_at', 'modified', 'state', 'writes')
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.buffered_at = time()
+        self.modified = None
+        self.state = {}
+        self.writes = 0
+
+
+class StudentModuleWriteBuffer(object):
+    """
+    Process-wide buffer of StudentModule state changes, keyed by username and
+    usage key.  A background thread writes the changes that have been
+    buffered for longer than the configured window.
+
+    Changes being written are kept in an in-flight map until their write
+    commits, so that they remain readable in the meantime.
+    """
+    def __init__(self):
+        self._pending = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._closing = threading.Event()
+        self._thread = None
+        self._pid = None
+        self.writes = 0
+        self.flushed = 0
+        self.flushed_writes = 0
+        self.failed = 0
+
+    def add(self, user, usage_key, state):
+        """
+        Buffers the given changes to the state of the user in the block,
+        merging them with the changes already buffered, and reports the
+        buffer's stats as custom attributes of the current transaction.
+        """
+        self._ensure_thread()
+        with self._lock:
+            key = (user.username, usage_key)
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = self._pending[key] = _PendingChange(user.id)
+            pending.state.update(state)
+            pending.modified = timezone.now()
+            pending.writes += 1
+            self.writes += 1
+        for name, value in self.stats().items():
+            set_custom_attribute(u'student_module_write_buffer.{}'.format(name), value)
+
+    def get_many(self, username, usage_keys):
+        """
+        Returns a dict of each of the given usage keys with buffered changes
+        for the user to a (state, modified) tuple of the buffered changes,
+        including those being written.
+        """
+        if not self._pending and not self._in_flight:
+            return {}
+        buffered = {}
+        with self._lock:
+            for usage_key in usage_keys:
+                key = (username, usage_key)
+                in_flight = self._in_flight.get(key)
+                pending = self._pending.get(key)
+                if in_flight is None and pending is None:
+                    continue
+                state = dict(in_flight.state) if in_flight is not None else {}
+                if pending is not None:
+                    state.update(pending.state)
+                buffered[usage_key] = (state, (pending or in_flight).modified)
+        return buffered
+
+    def discard(self, username, usage_keys, fields=None):
+        """
+        Discards the buffered changes of the given fields, or of all fields
+        if fields is None, of the user in the given blocks, as they are
+        superseded by changes written to the database.
+        """
+        if not self._pending and not self._in_flight:
+            return
+        with self._lock:
+            for usage_key in usage_keys:
+                key = (username, usage_key)
+                for changes in (self._pending, self._in_flight):
+                    pending = changes.get(key)
+                    if pending is None:
+                        continue
+                    if fields is not None:
+                        for field in fields:
+                            pending.state.pop(field, None)
+                    if fields is None or not pending.state:
+                        del changes[key]
+
+    def flush(self, username=None, min_age=None):
+        """
+        Writes the buffered changes to the database, in bulk.
+
+        Arguments:
+            username (str): If given, only the changes of this user are written.
+            min_age (float): If given, only the changes that have been
+                buffered for at least this number of seconds are written.
+        """
+        with self._lock:
+            if min_age is not None:
+                max_buffered_at = time() - min_age
+            changes = []
+            for key, pending in list(self._pending.items()):
+                if username is not None and key[0] != username:
+                    continue
+                if min_age is not None and pending.buffered_at > max_buffered_at:
+                    # Changes are ordered by the time they were first buffered.
+                    if username is None:
+                        break
+                    continue
+                del self._pending[key]
+                # Keep a copy of the changes readable until they're written,
+                # merged with those of an earlier flush still being written.
+                in_flight = _PendingChange(pending.user_id)
+                previous = self._in_flight.get(key)
+                if previous is not None:
+                    in_flight.state.update(previous.state)
+                in_flight.state.update(pending.state)
+                in_flight.modified = pending.modified
+                self._in_flight[key] = in_flight
+                changes.append((key, pending, in_flight))
+
+        by_course = defaultdict(list)
+        for change in changes:
+            by_course[change[0][1].context_key].append(change)
+        for course_key, course_changes in by_course.items():
+            try:
+                _write_changes(course_key, [(key[1], pending) for key, pending, _ in course_changes])
+            except Exception:  # pylint: disable=broad-except
+                with self._lock:
+                    self.failed += len(course_changes)
+                    self._land(course_changes)
+                log.exception(u'Failed to write %d buffered StudentModule changes in %s', len(course_changes), course_key)
+            else:
+                with self._lock:
+                    self.flushed += len(course_changes)
+                    self.flushed_writes += sum(pending.writes for _, pending, _ in course_changes)
+                    self._land(course_changes)
+
+    def _land(self, changes):
+        """
+        Removes the given list of (key, _PendingChange, in-flight
+        _PendingChange) tuples of written changes from the in-flight map,
+        unless a later flush has replaced them.  Must be called with the
+        lock held.
+        """
+        for key, _, in_flight in changes:
+            if self._in_flight.get(key) is in_flight:
+                del self._in_flight[key]
+
+    def close(self):
+        """
+        Stops the background thread and writes all the buffered changes.
+        """
+        self._closing.set()
+        self.flush()
+
+    def stats(self):
+        """
+        Returns a dict of the number of pending changes, the cumulative number
+        of buffered changes, of StudentModules written and failed to be
+        written, and the coalescing ratio: the number of buffered changes
+        per StudentModule written.
+        """
+        return {
+            'pending': len(self._pending),
+            'writes': self.writes,
+            'flushed': self.flushed,
+            'failed': self.failed,
+            'coalescing_ratio': float(self.flushed_writes) / self.flushed if self.flushed else None,
+        }
+
+    def _ensure_thread(self):
+        """
+        Starts the background thread if it isn't running in this process.
+        """
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            if self._pid is not None:
+                # Forked: the parent process writes the changes it buffered.
+                self._pending.clear()
+                self._in_flight.clear()
+            self._closing.clear()
+            self._thread = threading.Thread(target=self._run, name='StudentModuleWriteBuffer')
+            self._thread.daemon = True
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        """
+        Writes the changes that have been buffered for longer than the
+        window until the buffer is closed.
+        """
+        while True:
+            window = _config().get('WINDOW', 60)
+            if self._closing.wait(window):
+                break
+            try:
+                self.flush(min_age=window)
+                stats = self.stats()
+                log.debug(
+                    u'StudentModule write buffer: %d pending, %d buffered, %d written, coalescing ratio %s',
+                    stats['pending'], stats['writes'], stats['flushed'], stats['coalescing_ratio'],
+                )
+            finally:
+                close_old_connections()
+
+
+def _write_changes(course_key, changes):
+    """
+    Writes the given list of (usage_key, _PendingChange) tuples of the course
+    to the database, with a query to read and lock the existing
+    StudentModules and a query to update them.
+    """
+    with transaction.atomic():
+        student_modules = StudentModule.objects.select_for_update().filter(
+            student_id__in={pending.user_id for _, pending in changes},
+            course_id=course_key,
+            module_state_key__in={usage_key for usage_key, _ in changes},
+        )
+        student_modules_by_key = {
+            (student_module.student_id, student_module.module_state_key.map_into_course(course_key)): student_module
+            for student_module in student_modules
+        }
+        updated = []
+        for usage_key, pending in changes:
+            student_module = student_modules_by_key.get((pending.user_id, usage_key))
+            if student_module is None:
+                # Rare, as blocks with buffered fields usually save state when
+                # they're first viewed; create the StudentModule as set_many does.
+                student_module, created = StudentModule.objects.get_or_create(
+                    student_id=pending.user_id,
+                    course_id=course_key,
+                    module_state_key=usage_key,
+                    defaults={
+                        'state': json.dumps(pending.state),
+                        'module_type': usage_key.block_type,
+                    },
+                )
+                if created:
+                    continue
+            current_state = json.loads(student_module.state) if student_module.state else {}
+            current_state.update(pending.state)
+            student_module.state = json.dumps(current_state)
+            student_module.modified = pending.modified
+            updated.append(student_module)
+
+        if updated:
+            StudentModule.objects.bulk_update(updated, ['state', 'modified'])
+            # bulk_update doesn't send post_save, so record the changes explicitly.
+            for student_module in updated:
+                student_module_cache.record_change(student_module)
+
+
+_WRITE_BUFFER = None
+_WRITE_BUFFER_LOCK = threading.Lock()
+
+
+def get_write_buffer():
+    """
+    Returns the StudentModuleWriteBuffer of the process.
+    """
+    global _WRITE_BUFFER  # pylint: disable=global-statement
+    if _WRITE_BUFFER is None:
+        with _WRITE_BUFFER_LOCK:
+            if _WRITE_BUFFER is None:
+                _WRITE_BUFFER = StudentModuleWriteBuffer()
+                atexit.register(_WRITE_BUFFER.close)
+    return _WRITE_BUFFER
+
+
+@receiver(user_logged_out)
+def flush_user_changes(sender, request, user, **kwargs):  # pylint: disable=unused-argument
+    """
+    Writes the buffered changes of the user when they log out.  Sessions
+    that expire send no signal, so their changes are written by the timer.
+    """
+    if user is not None and _WRITE_BUFFER is not None:
+        _WRITE_BUFFER.flush(username=user.username)
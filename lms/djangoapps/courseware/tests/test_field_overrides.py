@@ -4,6 +4,7 @@ Tests for `field_overrides` module.
 import unittest
 
 from django.test.utils import override_settings
+from edx_django_utils.cache import RequestCache
 from xblock.field_data import DictFieldData
 
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
@@ -13,6 +14,7 @@ from ..field_overrides import (
     FieldOverrideProvider,
     OverrideFieldData,
     OverrideModulestoreFieldData,
+    clear_overrides_table,
     disable_overrides,
     resolve_dotted
 )
@@ -43,6 +45,40 @@ class TestOverrideProvider(FieldOverrideProvider):
         return True
 
 
+class CountingOverrideProvider(FieldOverrideProvider):
+    """
+    A concrete implementation of `FieldOverrideProvider` which counts the
+    number of times it's consulted.
+    """
+    calls = 0
+    uses_fallback_field_data = False
+
+    def get(self, block, name, default):
+        CountingOverrideProvider.calls += 1
+        if name == 'foo':
+            return 'fu'
+        return default
+
+    @classmethod
+    def enabled_for(cls, course):
+        return True
+
+
+class FallbackOverrideProvider(FieldOverrideProvider):
+    """
+    A concrete implementation of `FieldOverrideProvider` whose overrides
+    depend on the fallback field data.
+    """
+    def get(self, block, name, default):
+        if name == 'foo':
+            return self.fallback_field_data.get(block, 'foo').upper()
+        return default
+
+    @classmethod
+    def enabled_for(cls, course):
+        return True
+
+
 class OverrideFieldBase(SharedModuleStoreTestCase):
     """
     Base class for field data override tests.  Using override_settings and
@@ -129,6 +165,76 @@ class OverrideFieldDataTests(OverrideFieldBase):
         self.assertIsInstance(data, DictFieldData)
 
 
+@override_settings(FIELD_OVERRIDE_PROVIDERS=(
+    'lms.djangoapps.courseware.tests.test_field_overrides.CountingOverrideProvider',))
+class OverridesTableTests(OverrideFieldBase):
+    """
+    Tests for the per-request table of overrides of `OverrideFieldData`.
+    """
+
+    def setUp(self):
+        super(OverridesTableTests, self).setUp()
+        OverrideFieldData.provider_classes = None
+        CountingOverrideProvider.calls = 0
+        RequestCache.clear_all_namespaces()
+
+    def tearDown(self):
+        super(OverridesTableTests, self).tearDown()
+        OverrideFieldData.provider_classes = None
+
+    def make_one(self):
+        """
+        Factory method.
+        """
+        return OverrideFieldData.wrap(TESTUSER, self.course, DictFieldData({
+            'foo': 'bar',
+            'bees': 'knees',
+        }))
+
+    def test_providers_consulted_once(self):
+        data = self.make_one()
+        other_data = self.make_one()
+        for _ in range(2):
+            self.assertEqual(data.get(self.course, 'foo'), 'fu')
+            self.assertEqual(other_data.get(self.course, 'foo'), 'fu')
+            self.assertEqual(data.get(self.course, 'bees'), 'knees')
+        self.assertEqual(CountingOverrideProvider.calls, 2)
+
+        with disable_overrides():
+            self.assertEqual(data.get(self.course, 'foo'), 'bar')
+        self.assertEqual(CountingOverrideProvider.calls, 2)
+
+    def test_clear_overrides_table(self):
+        data = self.make_one()
+        self.assertEqual(data.get(self.course, 'foo'), 'fu')
+        clear_overrides_table()
+        self.assertEqual(data.get(self.course, 'foo'), 'fu')
+        self.assertEqual(CountingOverrideProvider.calls, 2)
+
+    @override_settings(FIELD_OVERRIDE_PROVIDERS=(
+        'lms.djangoapps.courseware.tests.test_field_overrides.FallbackOverrideProvider',))
+    def test_fallback_dependent_provider(self):
+        data = OverrideFieldData.wrap(TESTUSER, self.course, DictFieldData({'foo': 'bar'}))
+        other_data = OverrideFieldData.wrap(TESTUSER, self.course, DictFieldData({'foo': 'baz'}))
+        self.assertEqual(data.get(self.course, 'foo'), 'BAR')
+        self.assertEqual(other_data.get(self.course, 'foo'), 'BAZ')
+
+    @override_settings(MODULESTORE_FIELD_OVERRIDE_PROVIDERS=(
+        'lms.djangoapps.courseware.tests.test_field_overrides.CountingOverrideProvider',))
+    def test_modulestore_field_data(self):
+        OverrideModulestoreFieldData.provider_classes = None
+        self.addCleanup(setattr, OverrideModulestoreFieldData, 'provider_classes', None)
+        data = OverrideModulestoreFieldData.wrap(self.course, DictFieldData({'foo': 'bar'}))
+        other_data = OverrideModulestoreFieldData.wrap(self.course, DictFieldData({'foo': 'baz'}))
+        self.assertEqual(data.get(self.course, 'foo'), 'fu')
+        self.assertEqual(other_data.get(self.course, 'foo'), 'fu')
+        self.assertEqual(CountingOverrideProvider.calls, 1)
+
+        RequestCache.clear_all_namespaces()
+        self.assertEqual(data.get(self.course, 'foo'), 'fu')
+        self.assertEqual(CountingOverrideProvider.calls, 2)
+
+
 @override_settings(
     MODULESTORE_FIELD_OVERRIDE_PROVIDERS=['lms.djangoapps.courseware.tests.test_field_overrides.TestOverrideProvider']
 )
@@ -4,13 +4,24 @@ defined in edx_user_state_client.
 """
 
 
+import json
 from collections import defaultdict
+from time import time
 
+from django.contrib.auth.signals import user_logged_out
+from django.core.cache import caches
 from django.db import connections
-
+from django.test import TestCase
+from django.test.utils import override_settings
+from edx_django_utils.cache import RequestCache
 from edx_user_state_client.tests import UserStateClientTestBase
+from mock import patch
+from opaque_keys.edx.locator import CourseLocator
 
-from lms.djangoapps.courseware.tests.factories import UserFactory
+from lms.djangoapps.courseware import student_module_write_buffer
+from lms.djangoapps.courseware.models import StudentModule
+from lms.djangoapps.courseware.student_module_write_buffer import StudentModuleWriteBuffer
+from lms.djangoapps.courseware.tests.factories import StudentModuleFactory, UserFactory
 from lms.djangoapps.courseware.user_state_client import DjangoXBlockUserStateClient
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 
@@ -36,3 +47,192 @@ class TestDjangoUserStateClient(UserStateClientTestBase, ModuleStoreTestCase):
         super(TestDjangoUserStateClient, self).setUp()
         self.client = DjangoXBlockUserStateClient()
         self.users = defaultdict(UserFactory.create)
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'csm_cache_tests'}},
+    STUDENT_MODULE_STATE_CACHE={'ENABLED': True, 'READ_ONLY': False, 'CACHE_NAME': 'default', 'TIMEOUT': 60},
+)
+class TestDjangoUserStateClientCache(TestCase):
+    """
+    Tests of the cross-request StudentModule cache used by DjangoUserStateClient.
+    """
+    databases = {alias for alias in connections}
+
+    def setUp(self):
+        super(TestDjangoUserStateClientCache, self).setUp()
+        caches['default'].clear()
+        self.user = UserFactory.create()
+        self.course_key = CourseLocator('org', 'course', 'run')
+        self.usage_keys = [self.course_key.make_usage_key('problem', name) for name in ('p1', 'p2')]
+        StudentModuleFactory.create(
+            student=self.user,
+            course_id=self.course_key,
+            module_state_key=self.usage_keys[0],
+            state=json.dumps({'answer': 1}),
+        )
+        # Changes are only recorded once committed, which never happens in a TestCase.
+        RequestCache.clear_all_namespaces()
+
+    def _get_state(self):
+        """
+        Returns the state of the user for each block, as a dict.
+        """
+        client = DjangoXBlockUserStateClient(self.user)
+        return {
+            user_state.block_key: user_state.state
+            for user_state in client.get_many(self.user.username, self.usage_keys)
+        }
+
+    def test_cached(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self._get_state(), {self.usage_keys[0]: {'answer': 1}})
+
+        # Both the existing and the missing StudentModules are cached
+        with self.assertNumQueries(0):
+            self.assertEqual(self._get_state(), {self.usage_keys[0]: {'answer': 1}})
+
+    @patch('lms.djangoapps.courseware.student_module_cache.transaction.on_commit', lambda func: func())
+    def test_write_through(self):
+        self._get_state()
+        DjangoXBlockUserStateClient(self.user).set_many(
+            self.user.username, {self.usage_keys[1]: {'answer': 2}},
+        )
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self._get_state(),
+                {self.usage_keys[0]: {'answer': 1}, self.usage_keys[1]: {'answer': 2}},
+            )
+
+    def test_uncommitted_change(self):
+        self._get_state()
+        # The change isn't committed, so the cache is bypassed.
+        DjangoXBlockUserStateClient(self.user).set_many(
+            self.user.username, {self.usage_keys[1]: {'answer': 2}},
+        )
+
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                self._get_state(),
+                {self.usage_keys[0]: {'answer': 1}, self.usage_keys[1]: {'answer': 2}},
+            )
+
+    def test_read_only(self):
+        with override_settings(STUDENT_MODULE_STATE_CACHE={'ENABLED': True, 'READ_ONLY': True}):
+            self._get_state()
+            with self.assertNumQueries(1):
+                self._get_state()
+
+
+@override_settings(STUDENT_MODULE_WRITE_BEHIND={'ENABLED': True, 'FIELDS': {'video': ['position']}, 'WINDOW': 60})
+class TestDjangoUserStateClientWriteBehind(TestCase):
+    """
+    Tests of the write-behind buffer used by DjangoUserStateClient.
+    """
+    databases = {alias for alias in connections}
+
+    def setUp(self):
+        super(TestDjangoUserStateClientWriteBehind, self).setUp()
+        self.write_buffer = StudentModuleWriteBuffer()
+        self.addCleanup(self.write_buffer.close)
+        patcher = patch.object(student_module_write_buffer, '_WRITE_BUFFER', self.write_buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.user = UserFactory.create()
+        self.client = DjangoXBlockUserStateClient(self.user)
+        self.usage_key = CourseLocator('org', 'course', 'run').make_usage_key('video', 'v1')
+
+    def _get_state(self):
+        """
+        Returns the state of the user in the video.
+        """
+        return self.client.get(self.user.username, self.usage_key).state
+
+    def _get_stored_state(self):
+        """
+        Returns the state of the user in the video stored in the database.
+        """
+        return json.loads(StudentModule.objects.get(student=self.user, module_state_key=self.usage_key).state)
+
+    def test_coalesced(self):
+        self.client.set_many(self.user.username, {self.usage_key: {'position': 1, 'other': 'a'}})
+        for position in range(2, 6):
+            with self.assertNumQueries(0):
+                self.client.set_many(self.user.username, {self.usage_key: {'position': position}})
+
+        self.assertEqual(self._get_state(), {'position': 5, 'other': 'a'})
+        self.assertEqual(self._get_stored_state(), {'position': 1, 'other': 'a'})
+
+        self.write_buffer.flush()
+        self.assertEqual(self._get_stored_state(), {'position': 5, 'other': 'a'})
+        self.assertEqual(self._get_state(), {'position': 5, 'other': 'a'})
+        stats = self.write_buffer.stats()
+        self.assertEqual(stats['writes'], 4)
+        self.assertEqual(stats['flushed'], 1)
+        self.assertEqual(stats['coalescing_ratio'], 4.0)
+
+    def test_buffered_without_student_module(self):
+        self.client.set_many(self.user.username, {self.usage_key: {'position': 2}})
+        self.assertEqual(self._get_state(), {'position': 2})
+        self.assertFalse(StudentModule.objects.filter(student=self.user).exists())
+
+        self.write_buffer.flush()
+        self.assertEqual(self._get_stored_state(), {'position': 2})
+
+    def test_superseded(self):
+        self.client.set_many(self.user.username, {self.usage_key: {'position': 2}})
+        self.client.set_many(self.user.username, {self.usage_key: {'position': 3, 'other': 'a'}})
+        self.assertEqual(self.write_buffer.stats()['pending'], 0)
+        self.assertEqual(self._get_stored_state(), {'position': 3, 'other': 'a'})
+
+        self.client.set_many(self.user.username, {self.usage_key: {'position': 4}})
+        self.client.delete_many(self.user.username, [self.usage_key])
+        self.assertEqual(self.write_buffer.stats()['pending'], 0)
+        with self.assertRaises(DjangoXBlockUserStateClient.DoesNotExist):
+            self._get_state()
+
+    def test_flush_min_age(self):
+        self.client.set_many(self.user.username, {self.usage_key: {'position': 2}})
+        self.write_buffer.flush(min_age=60)
+        self.assertEqual(self.write_buffer.stats()['pending'], 1)
+
+        with patch('lms.djangoapps.courseware.student_module_write_buffer.time', return_value=time() + 60):
+            self.write_buffer.flush(min_age=60)
+        self.assertEqual(self.write_buffer.stats()['pending'], 0)
+        self.assertEqual(self._get_stored_state(), {'position': 2})
+
+    def test_flush_on_logout(self):
+        self.client.set_many(self.user.username, {self.usage_key: {'position': 2}})
+        user_logged_out.send(sender=self.user.__class__, request=None, user=self.user)
+        self.assertEqual(self._get_stored_state(), {'position': 2})
+
+    def test_readable_while_flushing(self):
+        self.client.set_many(self.user.username, {self.usage_key: {'position': 2}})
+        write_changes = student_module_write_buffer._write_changes  # pylint: disable=protected-access
+        states_during_write = []
+
+        def _write_changes(course_key, changes):
+            states_during_write.append(self._get_state())
+            write_changes(course_key, changes)
+
+        with patch.object(student_module_write_buffer, '_write_changes', side_effect=_write_changes):
+            self.write_buffer.flush()
+        self.assertEqual(states_during_write, [{'position': 2}])
+        self.assertEqual(self._get_stored_state(), {'position': 2})
+        self.assertEqual(self._get_state(), {'position': 2})
+
+    def test_stats_reported(self):
+        self.client.set_many(self.user.username, {self.usage_key: {'position': 2}})
+        self.write_buffer.flush()
+        with patch.object(student_module_write_buffer, 'set_custom_attribute') as mock_set_custom_attribute:
+            for position in range(3, 6):
+                self.client.set_many(self.user.username, {self.usage_key: {'position': position}})
+        mock_set_custom_attribute.assert_any_call('student_module_write_buffer.pending', 1)
+        mock_set_custom_attribute.assert_any_call('student_module_write_buffer.writes', 4)
+        mock_set_custom_attribute.assert_any_call('student_module_write_buffer.coalescing_ratio', 1.0)
+
+        self.write_buffer.flush()
+        # 4 buffered changes were written in 2 StudentModule writes.
+        self.assertEqual(self.write_buffer.stats()['coalescing_ratio'], 2.0)
@@ -19,6 +19,7 @@ from edx_django_utils import monitoring as monitoring_utils
 from edx_user_state_client.interface import XBlockUserState, XBlockUserStateClient
 from xblock.fields import Scope
 
+from lms.djangoapps.courseware import student_module_cache, student_module_write_buffer
 from lms.djangoapps.courseware.models import BaseStudentModuleHistory, StudentModule
 
 try:
@@ -106,6 +107,79 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
                 usage_key = student_module.module_state_key.map_into_course(student_module.course_id)
                 yield (student_module, usage_key)
 
+    def _get_student_module_states(self, username, block_keys):
+        """
+        Retrieve the state and modification date of the :class:`~StudentModule`s for the
+        supplied ``username`` and ``block_keys``, using the cross-request StudentModule
+        cache when it's enabled and ``username`` is the user of this client.
+
+        Arguments:
+            username (str): The name of the user to load `StudentModule`s for.
+            block_keys (list of :class:`~UsageKey`): The set of XBlocks to load data for.
+
+        Yields:
+            (usage_key, state, modified) tuples for each existing `StudentModule`.
+        """
+        use_cache = (
+            student_module_cache.is_enabled() and
+            self.user is not None and
+            self.user.username == username and
+            not self.user.is_anonymous
+        )
+        if not use_cache:
+            for student_module, usage_key in self._get_student_modules(username, block_keys):
+                yield usage_key, student_module.state, student_module.modified
+            return
+
+        course_key_func = attrgetter('course_key')
+        by_course = itertools.groupby(
+            sorted(block_keys, key=course_key_func),
+            course_key_func,
+        )
+        for course_key, usage_keys in by_course:
+            usage_keys = list(usage_keys)
+            state_cache = student_module_cache.StudentModuleStateCache(self.user.id, course_key)
+            states = state_cache.get_many(usage_keys)
+            self._nr_stat_accumulate('get_many', 'blocks_cached', len(states))
+
+            missing_usage_keys = [usage_key for usage_key in usage_keys if usage_key not in states]
+            if missing_usage_keys:
+                fetched_states = {usage_key: (None, None) for usage_key in missing_usage_keys}
+                for student_module, usage_key in self._get_student_modules(username, missing_usage_keys):
+                    fetched_states[usage_key] = (student_module.state, student_module.modified)
+                state_cache.set_many(fetched_states)
+                states.update(fetched_states)
+
+            for usage_key, (state, modified) in states.items():
+                if state is not None:
+                    yield usage_key, state, modified
+
+    def _with_buffered_states(self, username, block_keys, module_states):
+        """
+        Overlay the changes buffered by the StudentModule write buffer for the supplied
+        ``username`` and ``block_keys`` over the supplied ``module_states``.
+
+        Arguments:
+            username (str): The name of the user the states were loaded for.
+            block_keys (list of :class:`~UsageKey`): The set of XBlocks the states were loaded for.
+            module_states: An iterable of (usage_key, state, modified) tuples.
+
+        Yields:
+            (usage_key, state, modified) tuples for each `StudentModule` with stored or buffered state.
+        """
+        buffered_states = student_module_write_buffer.get_write_buffer().get_many(username, block_keys)
+        self._nr_stat_accumulate('get_many', 'blocks_buffered', len(buffered_states))
+        for usage_key, module_state, modified in module_states:
+            if usage_key in buffered_states:
+                buffered_state, modified = buffered_states.pop(usage_key)
+                state = json.loads(module_state) if module_state else {}
+                state.update(buffered_state)
+                module_state = json.dumps(state)
+            yield usage_key, module_state, modified
+
+        for usage_key, (buffered_state, modified) in buffered_states.items():
+            yield usage_key, json.dumps(buffered_state), modified
+
     def _nr_attribute_name(self, function_name, stat_name, block_type=None):
         """
         Return an attribute name (string) representing the provided descriptors.
@@ -177,13 +251,15 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         # keep track of blocks requested
         self._nr_stat_accumulate('get_many', 'blocks_requested', len(block_keys))
 
-        modules = self._get_student_modules(username, block_keys)
-        for module, usage_key in modules:
-            if module.state is None:
+        module_states = self._get_student_module_states(username, block_keys)
+        if student_module_write_buffer.is_enabled():
+            module_states = self._with_buffered_states(username, block_keys, module_states)
+        for usage_key, module_state, modified in module_states:
+            if module_state is None:
                 continue
 
-            state = json.loads(module.state)
-            state_length = len(module.state)
+            state = json.loads(module_state)
+            state_length = len(module_state)
 
             # If the state is the empty dict, then it has been deleted, and so
             # conformant UserStateClients should treat it as if it doesn't exist.
@@ -202,7 +278,7 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
                     for field in fields
                     if field in state
                 }
-            yield XBlockUserState(username, usage_key, state, module.modified, scope)
+            yield XBlockUserState(username, usage_key, state, modified, scope)
 
         # The rest of this method exists only to report custom attributes.
         finish_time = time()
@@ -243,7 +319,17 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
 
         evt_time = time()
 
+        write_behind = student_module_write_buffer.is_enabled()
         for usage_key, state in block_keys_to_state.items():
+            if write_behind:
+                write_buffer = student_module_write_buffer.get_write_buffer()
+                if student_module_write_buffer.can_buffer(usage_key, state):
+                    write_buffer.add(user, usage_key, state)
+                    self._nr_block_stat_increment('set_many', usage_key.block_type, 'blocks_buffered')
+                    continue
+                # These changes supersede the buffered changes of the same fields.
+                write_buffer.discard(username, [usage_key], fields=list(state))
+
             try:
                 student_module, created = StudentModule.objects.get_or_create(
                     student=user,
@@ -325,6 +411,8 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
             raise ValueError("Only Scope.user_state is supported")
 
         evt_time = time()
+        if student_module_write_buffer.is_enabled():
+            student_module_write_buffer.get_write_buffer().discard(username, block_keys, fields=fields)
         student_modules = self._get_student_modules(username, block_keys)
         for student_module, _ in student_modules:
             if fields is None:
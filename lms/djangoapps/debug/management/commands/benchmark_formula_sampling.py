@@ -0,0 +1,85 @@
+"""
+Command to benchmark the numerical sampling of FormulaResponse answers
+"""
+
+
+import random
+from textwrap import dedent
+from time import time
+
+from calc import evaluator
+from django.core.management.base import BaseCommand, CommandError
+
+from capa.sampled_formula import parse_formula
+from capa.util import compare_many_with_tolerance, compare_with_tolerance, default_tolerance
+
+
+class Command(BaseCommand):
+    """
+    Command to measure the time taken to check a synthetic FormulaResponse
+    answer with many samples and variables, both when the answers are
+    evaluated with calc's evaluator for each sample and compared one sample
+    at a time, and when they are parsed once, evaluated over all the samples
+    at once and compared in bulk.  Also checks that both give the same results.
+
+    Example:
+    ./manage.py lms benchmark_formula_sampling --samples 1000 --variables 20
+    """
+    help = dedent(__doc__).strip()
+
+    def add_arguments(self, parser):
+        """
+        Add arguments to the command parser.
+        """
+        parser.add_argument(
+            '--samples',
+            type=int,
+            dest='samples',
+            default=200,
+            help='Number of samples of the variables.',
+        )
+        parser.add_argument(
+            '--variables',
+            type=int,
+            dest='variables',
+            default=10,
+            help='Number of variables of the formula.',
+        )
+
+    def handle(self, *args, **options):
+        if options['samples'] < 1 or options['variables'] < 1:
+            raise CommandError(u'At least one sample and one variable are needed.')
+        names = [u'v{}'.format(index) for index in range(options['variables'])]
+        # Equivalent formulas, written differently.
+        instructor_answer = u' + '.join(u'{0}^2*sin({0})/2'.format(name) for name in names)
+        student_answer = u' + '.join(u'sin({0})*{0}*{0}*0.5'.format(name) for name in names)
+        rand = random.Random(0)
+        var_dict_list = [
+            {name: rand.uniform(1, 10) for name in names}
+            for _ in range(options['samples'])
+        ]
+
+        start_time = time()
+        student_values = [evaluator(var_dict, {}, student_answer) for var_dict in var_dict_list]
+        instructor_values = [evaluator(var_dict, {}, instructor_answer) for var_dict in var_dict_list]
+        per_sample_results = [
+            compare_with_tolerance(student, instructor, default_tolerance)
+            for student, instructor in zip(student_values, instructor_values)
+        ]
+        per_sample_time = time() - start_time
+
+        parse_formula.cache_clear()
+        start_time = time()
+        bulk_student_values = parse_formula(student_answer).evaluate_samples(var_dict_list)
+        bulk_instructor_values = parse_formula(instructor_answer).evaluate_samples(var_dict_list)
+        bulk_results = compare_many_with_tolerance(bulk_student_values, bulk_instructor_values, default_tolerance)
+        bulk_time = time() - start_time
+
+        identical = (
+            bulk_student_values == student_values and
+            bulk_instructor_values == instructor_values and
+            bulk_results == per_sample_results
+        )
+        self.stdout.write(u'{:<11} time: {:>9.1f} ms'.format(u'per sample', 1000 * per_sample_time))
+        self.stdout.write(u'{:<11} time: {:>9.1f} ms'.format(u'vectorized', 1000 * bulk_time))
+        self.stdout.write(u'speedup: {:.1f}x, identical results: {}'.format(per_sample_time / bulk_time, identical))
@@ -0,0 +1,98 @@
+"""
+Command to benchmark the latency of running capa problem checks in the sandbox
+"""
+
+
+from textwrap import dedent
+from time import time
+
+from codejail import jail_code
+from codejail.django_integration import ConfigureCodeJailMiddleware
+from codejail.safe_exec import safe_exec as codejail_safe_exec
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management.base import BaseCommand, CommandError
+
+from capa.safe_exec.safe_exec import CODE_PROLOG, LAZY_IMPORTS, PRELOADED_MODULES
+from capa.safe_exec.worker_pool import SandboxWorkerPool
+
+# A typical CustomResponse check, using numpy.
+CHECK_CODE = dedent("""
+    def check(expect, ans):
+        return {'ok': bool(numpy.isclose(float(ans), float(expect))), 'msg': ''}
+
+    cfn_return = check(expect, ans)
+""")
+
+
+class Command(BaseCommand):
+    """
+    Command to measure the latency of running a typical CustomResponse check
+    in the sandbox, both when codejail spawns a sandboxed Python for every
+    check, and when the check is run by a pool of warm sandbox workers.
+    Codejail must be configured, as it is by the ConfigureCodeJailMiddleware.
+
+    Example:
+    ./manage.py lms benchmark_safe_exec --checks 200
+    """
+    help = dedent(__doc__).strip()
+
+    def add_arguments(self, parser):
+        """
+        Add arguments to the command parser.
+        """
+        parser.add_argument(
+            '--checks',
+            type=int,
+            dest='checks',
+            default=100,
+            help='Number of checks run in each mode.',
+        )
+        parser.add_argument(
+            '--max-jobs',
+            type=int,
+            dest='max_jobs',
+            default=100,
+            help='Number of checks after which a worker of the pool is replaced.',
+        )
+
+    def handle(self, *args, **options):
+        if options['checks'] < 1:
+            raise CommandError(u'At least one check must be run.')
+        # Apply the CODE_JAIL setting to codejail, as the middleware does.
+        try:
+            ConfigureCodeJailMiddleware()
+        except MiddlewareNotUsed:
+            pass
+        if not jail_code.is_configured('python'):
+            raise CommandError(u'Codejail is not configured: set CODE_JAIL["python_bin"].')
+
+        code = CODE_PROLOG % 17 + LAZY_IMPORTS + CHECK_CODE
+        pool = SandboxWorkerPool(size=1, max_jobs=options['max_jobs'], preload=PRELOADED_MODULES)
+        try:
+            for mode, run in (
+                (u'spawn', lambda globals_dict: codejail_safe_exec(code, globals_dict)),
+                (u'pool', lambda globals_dict: pool.run(code, globals_dict)),
+            ):
+                latencies = []
+                for check in range(options['checks']):
+                    globals_dict = {'expect': u'1.5', 'ans': u'{}'.format(1.5 + check % 2)}
+                    start_time = time()
+                    run(globals_dict)
+                    latencies.append(time() - start_time)
+                self._report(mode, latencies)
+        finally:
+            pool.close()
+        self.stdout.write(u'pool stats: {}'.format(pool.stats()))
+
+    def _report(self, mode, latencies):
+        """
+        Writes the mean and percentiles of the given latencies.
+        """
+        latencies = sorted(latencies)
+        self.stdout.write(u'{:<6} mean: {:>7.1f} ms  p50: {:>7.1f} ms  p95: {:>7.1f} ms  max: {:>7.1f} ms'.format(
+            mode,
+            1000 * sum(latencies) / len(latencies),
+            1000 * latencies[len(latencies) // 2],
+            1000 * latencies[int(len(latencies) * 0.95)],
+            1000 * latencies[-1],
+        ))
@@ -0,0 +1,126 @@
+"""
+Tests of the connection pool and the concurrent requests of the comment client,
+against a local stub of the comments service.
+"""
+
+
+import threading
+from time import sleep, time
+
+import six
+from django.test import TestCase
+from django.test.utils import override_settings
+from mock import patch
+from six.moves.BaseHTTPServer import BaseHTTPRequestHandler
+
+from common.djangoapps.terrain.stubs.comments import StubCommentsService, StubCommentsServiceHandler
+from lms.djangoapps.discussion.django_comment_client.tests.utils import ForumsEnableMixin
+from openedx.core.djangoapps.django_comment_common.comment_client import utils
+from openedx.core.djangoapps.django_comment_common.comment_client.thread import Thread
+from openedx.core.djangoapps.django_comment_common.models import ForumsConfig
+
+POOL_SETTINGS = {'ENABLED': True, 'POOL_MAXSIZE': 10, 'MAX_RETRIES': 0}
+
+
+class KeepAliveCommentsServiceHandler(StubCommentsServiceHandler):
+    """
+    Stub comments service handler which keeps connections alive and
+    delays its responses by the latency of the server.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super(KeepAliveCommentsServiceHandler, self).setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def send_response(self, status_code, content=None, headers=None):
+        sleep(self.server.latency)
+        content = content or ''
+        if isinstance(content, six.text_type):
+            content = content.encode('utf-8')
+        BaseHTTPRequestHandler.send_response(self, status_code)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class LatencyCommentsService(StubCommentsService):
+    """
+    Stub comments service which counts the connections made to it.
+    """
+    HANDLER_CLASS = KeepAliveCommentsServiceHandler
+
+    def __init__(self, latency=0):
+        self.latency = latency
+        self.connections = 0
+        self.lock = threading.Lock()
+        super(LatencyCommentsService, self).__init__()
+
+
+class CommentClientPoolTestCase(ForumsEnableMixin, TestCase):
+    """
+    Tests of the connection pool and the concurrent requests of the comment client.
+    """
+    latency = 0.2
+
+    def setUp(self):
+        super(CommentClientPoolTestCase, self).setUp()
+        self.server = LatencyCommentsService(latency=self.latency)
+        self.addCleanup(self.server.shutdown)
+        self.server.config['threads'] = {
+            u'thread{}'.format(index): {'id': u'thread{}'.format(index), 'title': u'Thread {}'.format(index)}
+            for index in range(5)
+        }
+
+        base_url = u'http://127.0.0.1:{}/api/v1/threads'.format(self.server.port)
+        for patcher in (patch.object(Thread, 'base_url', base_url), patch.object(utils, '_SESSION', None)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _threads(self):
+        return [Thread(id=thread_id) for thread_id in sorted(self.server.config['threads'])]
+
+    @override_settings(COMMENTS_SERVICE_HTTP_POOL=POOL_SETTINGS)
+    def test_connection_reused(self):
+        for thread in self._threads():
+            thread.retrieve()
+            self.assertEqual(thread.title, u'Thread {}'.format(thread.id[-1]))
+        self.assertEqual(self.server.connections, 1)
+
+    def test_pool_disabled(self):
+        for thread in self._threads():
+            thread.retrieve()
+        self.assertEqual(self.server.connections, 5)
+
+    def _retrieve_concurrently(self):
+        threads = self._threads()
+        utils.perform_concurrently(thread.retrieve for thread in threads)
+        return threads
+
+    @override_settings(COMMENTS_SERVICE_HTTP_POOL=POOL_SETTINGS)
+    def test_perform_concurrently(self):
+        start_time = time()
+        threads = self._retrieve_concurrently()
+        duration = time() - start_time
+
+        self.assertEqual(
+            [thread.title for thread in threads],
+            [u'Thread {}'.format(index) for index in range(5)],
+        )
+        # Retrieving the threads one at a time takes at least 5 times the latency.
+        self.assertLess(duration, 3 * self.latency)
+
+    @override_settings(COMMENTS_SERVICE_HTTP_POOL=POOL_SETTINGS)
+    def test_config_read_once(self):
+        with patch.object(ForumsConfig, 'current', wraps=ForumsConfig.current) as mock_current:
+            self._retrieve_concurrently()
+            self.assertEqual(mock_current.call_count, 1)
+
+            config = ForumsConfig.current()
+            config.enabled = False
+            config.save()
+            with self.assertRaises(utils.CommentClientMaintenanceError):
+                Thread(id=u'thread0').retrieve()
@@ -542,12 +542,18 @@ def create_user_profile_context(request, course_key, user_id):
     else:
         profiled_user = cc.User(id=user_id, course_id=course_key)
 
-    threads, page, num_pages = profiled_user.active_threads(query_params)
+    # The profiled user's threads and both users don't depend on each other,
+    # so they're retrieved with concurrent requests.
+    (threads, page, num_pages), _, _ = cc.utils.perform_concurrently([
+        lambda: profiled_user.active_threads(query_params),
+        user.retrieve,
+        profiled_user.retrieve,
+    ])
     query_params['page'] = page
     query_params['num_pages'] = num_pages
 
     with function_trace("get_metadata_for_threads"):
-        user_info = cc.User.from_django_user(request.user).to_dict()
+        user_info = user.to_dict()
         annotated_content_info = utils.get_metadata_for_threads(course_key, threads, request.user, user_info)
 
     is_staff = has_permission(request.user, 'openclose_thread', course.id)
@@ -652,12 +658,17 @@ def followed_threads(request, course_key, user_id):
         if group_id is not None:
             query_params['group_id'] = group_id
 
-        paginated_results = profiled_user.subscribed_threads(query_params)
+        # The followed threads and the requesting user are retrieved with concurrent requests.
+        cc_user = cc.User.from_django_user(request.user)
+        paginated_results, _ = cc.utils.perform_concurrently([
+            lambda: profiled_user.subscribed_threads(query_params),
+            cc_user.retrieve,
+        ])
         print("\n \n \n paginated results \n \n \n ")
         print(paginated_results)
         query_params['page'] = paginated_results.page
         query_params['num_pages'] = paginated_results.num_pages
-        user_info = cc.User.from_django_user(request.user).to_dict()
+        user_info = cc_user.to_dict()
 
         with function_trace("get_metadata_for_threads"):
             annotated_content_info = utils.get_metadata_for_threads(
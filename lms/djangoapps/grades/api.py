@@ -21,7 +21,7 @@ from lms.djangoapps.grades.course_grade_factory import CourseGradeFactory
 from lms.djangoapps.grades.models_api import *
 from lms.djangoapps.grades.signals import signals
 # TODO exposing functionality from Grades handlers seems fishy.
-from lms.djangoapps.grades.signals.handlers import disconnect_submissions_signal_receiver
+from lms.djangoapps.grades.signals.handlers import defer_subsection_updates, disconnect_submissions_signal_receiver
 from lms.djangoapps.grades.subsection_grade import CreateSubsectionGrade
 from lms.djangoapps.grades.subsection_grade_factory import SubsectionGradeFactory
 from lms.djangoapps.grades.tasks import compute_all_grades_for_course as task_compute_all_grades_for_course
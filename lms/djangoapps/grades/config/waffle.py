@@ -102,6 +102,20 @@ def waffle_switch(name):
     return WaffleSwitch(waffle(), name, module_name=__name__)
 
 
+# .. toggle_name: grades.bulk_grade_computation
+# .. toggle_implementation: WaffleSwitch
+# .. toggle_default: False
+# .. toggle_description: When enabled, CourseGradeFactory.iter grades users in batches: the course blocks of each batch
+#   of users are transformed together, and, when grades are computed rather than read, the users' scores in CSM are
+#   prefetched with one query per batch.  Scores stored by the Submissions API are still read per user.
+# .. toggle_use_cases: open_edx
+# .. toggle_creation_date: 2026-10-18
+# .. toggle_target_removal_date: None
+# .. toggle_warnings: None
+# .. toggle_tickets: None
+BULK_GRADE_COMPUTATION = WaffleSwitch(waffle(), u'bulk_grade_computation', module_name=__name__)
+
+
 def waffle_flags():
     """
     Returns the namespaced, cached, audited Waffle flags dictionary for Grades.
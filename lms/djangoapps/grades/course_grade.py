@@ -4,8 +4,9 @@ CourseGrade Class
 
 
 from abc import abstractmethod
-from collections import OrderedDict, defaultdict
+from collections import OrderedDict, defaultdict, namedtuple
 
+import numpy
 import six
 from ccx_keys.locator import CCXLocator
 from django.conf import settings
@@ -14,12 +15,16 @@ from lazy import lazy
 
 from openedx.core.lib.grade_utils import round_away_from_zero
 from xmodule import block_metadata_utils
+from xmodule.graders import score_matrix_from_grade_sheets
 
 from .config import assume_zero_if_absent
 from .scores import compute_percent
 from .subsection_grade import ZeroSubsectionGrade
 from .subsection_grade_factory import SubsectionGradeFactory
 
+# The grade of a learner computed by CourseGrade.grade_batch.
+BatchCourseGrade = namedtuple('BatchCourseGrade', ['percent', 'letter_grade', 'passed'])
+
 
 @python_2_unicode_compatible
 class CourseGradeBase(object):
@@ -269,6 +274,50 @@ class CourseGrade(CourseGradeBase):
         self.passed = self._compute_passed(grade_cutoffs, self.percent)
         return self
 
+    @classmethod
+    def update_batch(cls, course_grades):
+        """
+        Updates the grades of the given CourseGrades in the same course, as
+        update() does, but evaluating the course's grader over all of them
+        at once.  Returns the CourseGrades.
+        """
+        if settings.GENERATE_PROFILE_SCORES or not course_grades:
+            return [course_grade.update() for course_grade in course_grades]
+        batch_grades = cls.grade_batch(
+            course_grades[0].course_data.course,
+            [course_grade.graded_subsections_by_format for course_grade in course_grades],
+        )
+        for course_grade, batch_grade in zip(course_grades, batch_grades):
+            course_grade.percent, course_grade.letter_grade, course_grade.passed = batch_grade
+        return course_grades
+
+    @classmethod
+    def grade_batch(cls, course, grade_sheets):
+        """
+        Returns the list of the BatchCourseGrades of the learners with the
+        given grade sheets (as returned by graded_subsections_by_format),
+        evaluating the course's grader over all the learners at once.
+
+        The percent, letter_grade and passed of each BatchCourseGrade are the
+        same as those computed by update() for the learner's CourseGrade.
+        """
+        course = cls._prep_course_for_grading(course)
+        score_matrix, subsection_formats = score_matrix_from_grade_sheets(grade_sheets)
+        percents = cls._compute_percents(course.grader.grade_batch(score_matrix, subsection_formats))
+        letter_grades = cls._compute_letter_grades(course.grade_cutoffs, percents)
+
+        nonzero_cutoffs = [cutoff for cutoff in course.grade_cutoffs.values() if cutoff > 0]
+        success_cutoff = min(nonzero_cutoffs) if nonzero_cutoffs else None
+        if success_cutoff:
+            passed = (percents >= success_cutoff).tolist()
+        else:
+            passed = [success_cutoff] * len(percents)
+
+        return [
+            BatchCourseGrade(percent, letter_grade, learner_passed)
+            for percent, letter_grade, learner_passed in zip(percents.tolist(), letter_grades.tolist(), passed)
+        ]
+
     @lazy
     def attempted(self):
         """
@@ -329,6 +378,32 @@ class CourseGrade(CourseGradeBase):
         success_cutoff = min(nonzero_cutoffs) if nonzero_cutoffs else None
         return success_cutoff and percent >= success_cutoff
 
+    @staticmethod
+    def _compute_percents(grader_percents):
+        """
+        Computes and returns the array of the grade percentages of the
+        given array of percents from the grader, as _compute_percent does.
+        """
+        numbers = grader_percents * 100 + 0.05
+        # Round away from zero, as round_away_from_zero does.
+        return numpy.where(numbers >= 0, numpy.floor(numbers + 0.5), numpy.ceil(numbers - 0.5)) / 100
+
+    @staticmethod
+    def _compute_letter_grades(grade_cutoffs, percents):
+        """
+        Computes and returns the array of the course letter grades of the
+        given array of percents, as _compute_letter_grade does.
+        """
+        letter_grades = numpy.full(len(percents), None, dtype=object)
+
+        # Assign the possible grades in ascending order of score, so that the
+        # highest grade reached by each percent is assigned last.
+        descending_grades = sorted(grade_cutoffs, key=lambda x: grade_cutoffs[x], reverse=True)
+        for possible_grade in reversed(descending_grades):
+            letter_grades[percents >= grade_cutoffs[possible_grade]] = possible_grade
+
+        return letter_grades
+
 
 def _uniqueify_and_keep_order(iterable):
     return list(OrderedDict([(item, None) for item in iterable]).keys())
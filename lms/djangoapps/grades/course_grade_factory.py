@@ -4,11 +4,13 @@ Course Grade Factory Class
 
 
 from collections import namedtuple
+from itertools import islice
 from logging import getLogger
 
 import six
 from six import text_type
 
+from lms.djangoapps.course_blocks.api import get_course_blocks_for_users
 from openedx.core.djangoapps.signals.signals import (
     COURSE_GRADE_CHANGED,
     COURSE_GRADE_NOW_FAILED,
@@ -16,10 +18,12 @@ from openedx.core.djangoapps.signals.signals import (
 )
 
 from .config import assume_zero_if_absent, should_persist_grades
+from .config.waffle import BULK_GRADE_COMPUTATION
 from .course_data import CourseData
 from .course_grade import CourseGrade, ZeroCourseGrade
 from .models import PersistentCourseGrade
 from .models_api import prefetch_grade_overrides_and_visible_blocks
+from .subsection_grade_factory import SubsectionGradeFactory
 
 log = getLogger(__name__)
 
@@ -30,6 +34,10 @@ class CourseGradeFactory(object):
     """
     GradeResult = namedtuple('GradeResult', ['student', 'course_grade', 'error'])
 
+    # Number of users whose course structures are transformed and
+    # whose CSM scores are prefetched together in bulk mode.
+    BULK_BATCH_SIZE = 100
+
     def read(
             self,
             user,
@@ -109,15 +117,61 @@ class CourseGradeFactory(object):
             user=None, course=course, collected_block_structure=collected_block_structure, course_key=course_key,
         )
         stats_tags = [u'action:{}'.format(course_data.course_key)]
-        for user in users:
-            yield self._iter_grade_result(user, course_data, force_update)
+        if BULK_GRADE_COMPUTATION.is_enabled():
+            for grade_result in self._iter_bulk(users, course_data, force_update):
+                yield grade_result
+        else:
+            for user in users:
+                yield self._iter_grade_result(user, course_data, force_update)
 
-    def _iter_grade_result(self, user, course_data, force_update):
+    def _iter_bulk(self, users, course_data, force_update):
+        """
+        Yields a GradeResult for every student, computed in batches of
+        BULK_BATCH_SIZE users.  For each batch, the course structures of
+        all the users are transformed together, so that users with the
+        same transformed structure share it, and the CSM scores that are
+        needed to compute grades are prefetched with a single query
+        instead of one per user.  Scores stored by the Submissions API
+        are still read per user.  The course grades that are computed
+        rather than read are updated together, see _batch_grade_results.
+        """
+        prefetch_scores = force_update or not should_persist_grades(course_data.course_key)
+        users = iter(users)
+        while True:
+            batch = list(islice(users, self.BULK_BATCH_SIZE))
+            if not batch:
+                break
+            try:
+                course_structures = get_course_blocks_for_users(
+                    batch,
+                    course_data.location,
+                    collected_block_structure=course_data.collected_structure,
+                )
+                if prefetch_scores:
+                    SubsectionGradeFactory.prefetch_csm_scores(
+                        course_data.course_key, course_data.collected_structure, batch,
+                    )
+            except Exception:  # pylint: disable=broad-except
+                # Fall back to computing the grade of each student separately,
+                # so that errors are reported for the affected students only.
+                log.exception(
+                    u'Cannot compute grades in bulk for course %s, falling back to one student at a time',
+                    course_data.course_key,
+                )
+                course_structures = {}
+            try:
+                for grade_result in self._batch_grade_results(batch, course_data, force_update, course_structures):
+                    yield grade_result
+            finally:
+                SubsectionGradeFactory.clear_prefetched_csm_scores(course_data.course_key)
+
+    def _iter_grade_result(self, user, course_data, force_update, course_structure=None):
         try:
             kwargs = {
                 'user': user,
                 'course': course_data.course,
                 'collected_block_structure': course_data.collected_structure,
+                'course_structure': course_structure,
                 'course_key': course_data.course_key,
             }
             if force_update:
@@ -127,15 +181,82 @@ class CourseGradeFactory(object):
             course_grade = method(**kwargs)
             return self.GradeResult(user, course_grade, None)
         except Exception as exc:  # pylint: disable=broad-except
-            # Keep marching on even if this student couldn't be graded for
-            # some reason, but log it for future reference.
+            return self._error_grade_result(user, course_data, exc)
+
+    def _batch_grade_results(self, users, course_data, force_update, course_structures):
+        """
+        Returns the list of the GradeResults of the given users, as
+        _iter_grade_result does, using the given dict of the users' ids
+        to their course structures.  The course grades that are computed
+        rather than read, because they aren't persisted or force_update
+        is set, are updated with CourseGrade.update_batch, which evaluates
+        the course's grader over all of them at once.
+        """
+        grade_results = {}
+        course_grades = []
+        for user in users:
+            try:
+                user_course_data = CourseData(
+                    user,
+                    course_data.course,
+                    course_data.collected_structure,
+                    course_structures.get(user.id),
+                    course_data.course_key,
+                )
+                if not force_update:
+                    try:
+                        grade_results[user.id] = self.GradeResult(user, self._read(user, user_course_data), None)
+                        continue
+                    except PersistentCourseGrade.DoesNotExist:
+                        if assume_zero_if_absent(course_data.course_key):
+                            grade_results[user.id] = self.GradeResult(
+                                user, self._create_zero(user, user_course_data), None,
+                            )
+                            continue
+                course_grade = self._create(user, user_course_data, force_update_subsections=force_update)
+                # Compute the subsection grades now, so that errors are reported for the affected students only.
+                course_grade.graded_subsections_by_format  # pylint: disable=pointless-statement
+                course_grades.append(course_grade)
+            except Exception as exc:  # pylint: disable=broad-except
+                grade_results[user.id] = self._error_grade_result(user, course_data, exc)
+
+        try:
+            CourseGrade.update_batch(course_grades)
+        except Exception:  # pylint: disable=broad-except
             log.exception(
-                u'Cannot grade student %s in course %s because of exception: %s',
-                user.id,
+                u'Cannot update grades in bulk for course %s, falling back to one student at a time',
                 course_data.course_key,
-                text_type(exc)
             )
-            return self.GradeResult(user, None, exc)
+            updated = False
+        else:
+            updated = True
+        for course_grade in course_grades:
+            user = course_grade.user
+            try:
+                if not updated:
+                    course_grade.update()
+                grade_results[user.id] = self.GradeResult(
+                    user, self._save(user, course_grade.course_data, course_grade), None,
+                )
+            except Exception as exc:  # pylint: disable=broad-except
+                grade_results[user.id] = self._error_grade_result(user, course_data, exc)
+
+        return [grade_results[user.id] for user in users]
+
+    def _error_grade_result(self, user, course_data, exc):
+        """
+        Logs the exception raised while grading the user, and returns the
+        user's GradeResult with the exception.
+        """
+        # Keep marching on even if this student couldn't be graded for
+        # some reason, but log it for future reference.
+        log.exception(
+            u'Cannot grade student %s in course %s because of exception: %s',
+            user.id,
+            course_data.course_key,
+            text_type(exc)
+        )
+        return self.GradeResult(user, None, exc)
 
     @staticmethod
     def _create_zero(user, course_data):
@@ -174,18 +295,31 @@ class CourseGradeFactory(object):
         COURSE_GRADE_NOW_PASSED if learner has passed course or
         COURSE_GRADE_NOW_FAILED if learner is now failing course
         """
-        should_persist = should_persist_grades(course_data.course_key)
-        if should_persist and force_update_subsections:
+        course_grade = CourseGradeFactory._create(user, course_data, force_update_subsections).update()
+        return CourseGradeFactory._save(user, course_data, course_grade)
+
+    @staticmethod
+    def _create(user, course_data, force_update_subsections=False):
+        """
+        Returns a new CourseGrade object for the given user and course,
+        to be updated and then saved with _save.
+        """
+        if should_persist_grades(course_data.course_key) and force_update_subsections:
             prefetch_grade_overrides_and_visible_blocks(user, course_data.course_key)
 
-        course_grade = CourseGrade(
+        return CourseGrade(
             user,
             course_data,
             force_update_subsections=force_update_subsections
         )
-        course_grade = course_grade.update()
 
-        should_persist = should_persist and course_grade.attempted
+    @staticmethod
+    def _save(user, course_data, course_grade):
+        """
+        Saves and returns the given updated CourseGrade object, and sends
+        the signals of _update.
+        """
+        should_persist = should_persist_grades(course_data.course_key) and course_grade.attempted
         if should_persist:
             course_grade._subsection_grade_factory.bulk_create_unsaved()
             PersistentCourseGrade.update_or_create(
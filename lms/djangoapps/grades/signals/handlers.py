@@ -3,8 +3,10 @@ Grades related signals.
 """
 
 
+from collections import OrderedDict
 from contextlib import contextmanager
 from logging import getLogger
+from threading import local
 
 import six
 from django.dispatch import receiver
@@ -39,6 +41,9 @@ from .signals import (
 
 log = getLogger(__name__)
 
+# The subsection grade updates deferred by defer_subsection_updates, per thread.
+_DEFERRED_SUBSECTION_UPDATES = local()
+
 
 @receiver(score_set, dispatch_uid='submissions_score_set_handler')
 def submissions_score_set_handler(sender, **kwargs):  # pylint: disable=unused-argument
@@ -224,24 +229,58 @@ def enqueue_subsection_update(sender, **kwargs):  # pylint: disable=unused-argum
     context_key = LearningContextKey.from_string(kwargs['course_id'])
     if not context_key.is_course:
         return  # If it's not a course, it has no subsections, so skip the subsection grading update
+    task_kwargs = dict(
+        user_id=kwargs['user_id'],
+        anonymous_user_id=kwargs.get('anonymous_user_id'),
+        course_id=kwargs['course_id'],
+        usage_id=kwargs['usage_id'],
+        only_if_higher=kwargs.get('only_if_higher'),
+        expected_modified_time=to_timestamp(kwargs['modified']),
+        score_deleted=kwargs.get('score_deleted', False),
+        event_transaction_id=six.text_type(get_event_transaction_id()),
+        event_transaction_type=six.text_type(get_event_transaction_type()),
+        score_db_table=kwargs['score_db_table'],
+        force_update_subsections=kwargs.get('force_update_subsections', False),
+    )
+    deferred_updates = getattr(_DEFERRED_SUBSECTION_UPDATES, 'updates', None)
+    if deferred_updates is not None:
+        update_key = (task_kwargs['user_id'], task_kwargs['usage_id'])
+        deferred_updates.pop(update_key, None)
+        deferred_updates[update_key] = task_kwargs
+        return
     recalculate_subsection_grade_v3.apply_async(
-        kwargs=dict(
-            user_id=kwargs['user_id'],
-            anonymous_user_id=kwargs.get('anonymous_user_id'),
-            course_id=kwargs['course_id'],
-            usage_id=kwargs['usage_id'],
-            only_if_higher=kwargs.get('only_if_higher'),
-            expected_modified_time=to_timestamp(kwargs['modified']),
-            score_deleted=kwargs.get('score_deleted', False),
-            event_transaction_id=six.text_type(get_event_transaction_id()),
-            event_transaction_type=six.text_type(get_event_transaction_type()),
-            score_db_table=kwargs['score_db_table'],
-            force_update_subsections=kwargs.get('force_update_subsections', False),
-        ),
+        kwargs=task_kwargs,
         countdown=RECALCULATE_GRADE_DELAY_SECONDS,
     )
 
 
+@contextmanager
+def defer_subsection_updates():
+    """
+    Context manager which defers the subsection grade updates enqueued by
+    enqueue_subsection_update in the current thread until it exits, so that
+    bulk operations changing the scores of many users enqueue them in one
+    batch, once the scores are saved.  Repeated updates for the same user
+    and block are only enqueued once, with the arguments of the last one.
+    """
+    if getattr(_DEFERRED_SUBSECTION_UPDATES, 'updates', None) is not None:
+        # The outermost context enqueues the updates.
+        yield
+        return
+    _DEFERRED_SUBSECTION_UPDATES.updates = OrderedDict()
+    try:
+        yield
+    finally:
+        deferred_updates = _DEFERRED_SUBSECTION_UPDATES.updates
+        _DEFERRED_SUBSECTION_UPDATES.updates = None
+        log.info(u"Grades: Enqueueing %d deferred subsection grade updates", len(deferred_updates))
+        for task_kwargs in deferred_updates.values():
+            recalculate_subsection_grade_v3.apply_async(
+                kwargs=task_kwargs,
+                countdown=RECALCULATE_GRADE_DELAY_SECONDS,
+            )
+
+
 @receiver(SUBSECTION_SCORE_CHANGED)
 def recalculate_course_grade_only(sender, course, course_structure, user, **kwargs):  # pylint: disable=unused-argument
     """
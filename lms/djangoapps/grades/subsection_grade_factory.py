@@ -13,6 +13,7 @@ from lms.djangoapps.courseware.model_data import ScoresClient
 from lms.djangoapps.grades.config import assume_zero_if_absent, should_persist_grades
 from lms.djangoapps.grades.models import PersistentSubsectionGrade
 from lms.djangoapps.grades.scores import possibly_scored
+from openedx.core.lib.cache_utils import get_cache
 from openedx.core.lib.grade_utils import is_score_higher_or_equal
 from common.djangoapps.student.models import anonymous_id_for_user
 
@@ -26,6 +27,8 @@ class SubsectionGradeFactory(object):
     """
     Factory for Subsection Grades.
     """
+    _SCORES_CACHE_NAMESPACE = u'grades.subsection_grade_factory.SubsectionGradeFactory.scores'
+
     def __init__(self, student, course=None, course_structure=None, course_data=None):
         self.student = student
         self.course_data = course_data or CourseData(student, course=course, structure=course_structure)
@@ -106,12 +109,52 @@ class SubsectionGradeFactory(object):
 
         return calculated_grade
 
+    @classmethod
+    def prefetch_csm_scores(cls, course_key, collected_structure, users):
+        """
+        Prefetches the scores stored in CSM for the given users in the
+        course, with a single query, for use by the SubsectionGradeFactory
+        of each user.
+
+        The scores stored by the Submissions API are not prefetched: the
+        Submissions API has no read of the scores of several students, so
+        they are still read per user.
+        """
+        scorable_locations = [block_key for block_key in collected_structure if possibly_scored(block_key)]
+        get_cache(cls._SCORES_CACHE_NAMESPACE)[cls._scores_cache_key(course_key)] = (
+            ScoresClient.bulk_create_for_locations(course_key, [user.id for user in users], scorable_locations)
+        )
+
+    @classmethod
+    def clear_prefetched_csm_scores(cls, course_key):
+        """
+        Clears prefetched CSM scores for this course from the RequestCache.
+        """
+        get_cache(cls._SCORES_CACHE_NAMESPACE).pop(cls._scores_cache_key(course_key), None)
+
+    @staticmethod
+    def _scores_cache_key(course_key):
+        return u"subsection_grade_factory.scores.{}".format(course_key)
+
+    def _get_prefetched_csm_scores(self):
+        """
+        Returns the CSM scores prefetched for the student, or None if
+        they were not prefetched.
+        """
+        prefetched_scores = get_cache(self._SCORES_CACHE_NAMESPACE).get(
+            self._scores_cache_key(self.course_data.course_key), {},
+        )
+        return prefetched_scores.get(self.student.id)
+
     @lazy
     def _csm_scores(self):
         """
         Lazily queries and returns all the scores stored in the user
         state (in CSM) for the course, while caching the result.
         """
+        prefetched_scores = self._get_prefetched_csm_scores()
+        if prefetched_scores is not None:
+            return prefetched_scores
         scorable_locations = [block_key for block_key in self.course_data.structure if possibly_scored(block_key)]
         return ScoresClient.create_for_locations(self.course_data.course_key, self.student.id, scorable_locations)
 
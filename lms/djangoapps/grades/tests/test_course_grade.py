@@ -13,7 +13,7 @@ from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 
 from ..config.waffle import ASSUME_ZERO_GRADE_IF_ABSENT, waffle_switch
 from ..course_data import CourseData
-from ..course_grade import ZeroCourseGrade
+from ..course_grade import CourseGrade, ZeroCourseGrade
 from ..course_grade_factory import CourseGradeFactory
 from .base import GradeTestBase
 from .utils import answer_problem
@@ -57,6 +57,35 @@ class ZeroGradeTest(GradeTestBase):
                         self.assertEqual({}, section.problem_scores)
 
 
+class CourseGradeBatchTest(GradeTestBase):
+    """
+    Tests that CourseGrade.grade_batch grades learners as CourseGrade does.
+    """
+    def test_grade_batch(self):
+        self.grading_policy['GRADER'][0].update(min_count=3, drop_count=1)
+        self.grading_policy['GRADE_CUTOFFS'] = {'A': 0.9, 'B': 0.6, 'Pass': 0.3}
+        self.course.set_grading_policy(self.grading_policy)
+        self.store.update_item(self.course, 0)
+
+        course_grades = []
+        for score, score2 in ((0, 0), (1, 0), (3, 1), (2, 3), (3, 3)):
+            request = get_mock_request(UserFactory())
+            CourseEnrollment.enroll(request.user, self.course.id)
+            answer_problem(self.course, request, self.problem, score=score, max_value=3)
+            answer_problem(self.course, request, self.problem2, score=score2, max_value=3)
+            course_grades.append(CourseGradeFactory().update(request.user, self.course))
+
+        batch_grades = CourseGrade.grade_batch(
+            self.course,
+            [course_grade.graded_subsections_by_format for course_grade in course_grades],
+        )
+        self.assertEqual(
+            [(grade.percent, grade.letter_grade, grade.passed) for grade in batch_grades],
+            [(grade.percent, grade.letter_grade, grade.passed) for grade in course_grades],
+        )
+        self.assertEqual([grade.letter_grade for grade in batch_grades], [None, None, 'B', 'B', 'A'])
+
+
 class TestScoreForModule(SharedModuleStoreTestCase):
     """
     Test the method that calculates the score for a given block based on the
@@ -10,14 +10,17 @@ from django.conf import settings
 from mock import patch
 from six import text_type
 from edx_toggles.toggles.testutils import override_waffle_switch
+from submissions import api as submissions_api
 from lms.djangoapps.courseware.access import has_access
+from lms.djangoapps.courseware.model_data import ScoresClient
+from lms.djangoapps.courseware.tests.factories import StudentModuleFactory
 from lms.djangoapps.grades.config.tests.utils import persistent_grades_feature_flags
 from openedx.core.djangoapps.content.block_structure.factory import BlockStructureFactory
 from common.djangoapps.student.tests.factories import UserFactory
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
 
-from ..config.waffle import ASSUME_ZERO_GRADE_IF_ABSENT, waffle_switch
+from ..config.waffle import ASSUME_ZERO_GRADE_IF_ABSENT, BULK_GRADE_COMPUTATION, waffle_switch
 from ..course_grade import CourseGrade, ZeroCourseGrade
 from ..course_grade_factory import CourseGradeFactory
 from ..subsection_grade import ReadSubsectionGrade, ZeroSubsectionGrade
@@ -187,6 +190,47 @@ class TestCourseGradeFactory(GradeTestBase):
             ))
         self.assertEqual(mock_update.called, force_update)
 
+    def test_iter_bulk(self):
+        other_user = UserFactory()
+        for user in (self.request.user, other_user):
+            StudentModuleFactory.create(
+                student=user,
+                course_id=self.course.id,
+                module_state_key=self.problem.location,
+                grade=1,
+                max_grade=2,
+                state=u'{}',
+            )
+        users = [self.request.user, other_user]
+
+        with override_waffle_switch(BULK_GRADE_COMPUTATION, active=False):
+            expected = list(CourseGradeFactory().iter(users=users, course=self.course, force_update=True))
+        with override_waffle_switch(BULK_GRADE_COMPUTATION, active=True):
+            with patch.object(ScoresClient, 'create_for_locations') as mock_create_for_locations:
+                with patch(
+                    'lms.djangoapps.grades.subsection_grade_factory.submissions_api.get_scores',
+                    wraps=submissions_api.get_scores,
+                ) as mock_get_scores:
+                    with patch.object(CourseGrade, 'update') as mock_course_grade_update:
+                        actual = list(CourseGradeFactory().iter(users=users, course=self.course, force_update=True))
+
+        # The CSM scores of all users are prefetched instead of read per user,
+        # while the Submissions API is still asked for the scores of each user.
+        self.assertFalse(mock_create_for_locations.called)
+        self.assertEqual(mock_get_scores.call_count, len(users))
+        # The course grades are updated together, by CourseGrade.update_batch.
+        self.assertFalse(mock_course_grade_update.called)
+        self.assertEqual(
+            [
+                (result.student, result.course_grade.percent, result.course_grade.letter_grade, result.error)
+                for result in actual
+            ],
+            [
+                (result.student, result.course_grade.percent, result.course_grade.letter_grade, result.error)
+                for result in expected
+            ],
+        )
+
     def test_course_grade_summary(self):
         with mock_get_score(1, 2):
             self.subsection_grade_factory.update(self.course_structure[self.sequence.location])
@@ -16,7 +16,9 @@ from common.djangoapps.util.date_utils import to_timestamp
 
 from ..constants import ScoreDatabaseTableEnum
 from ..signals.handlers import (
+    defer_subsection_updates,
     disconnect_submissions_signal_receiver,
+    enqueue_subsection_update,
     problem_raw_score_changed_handler,
     submissions_score_reset_handler,
     submissions_score_set_handler
@@ -258,3 +260,42 @@ class ScoreChangedSignalRelayTest(TestCase):
         with self.assertRaises(ValueError):
             with disconnect_submissions_signal_receiver(PROBLEM_RAW_SCORE_CHANGED):
                 pass
+
+
+@patch('lms.djangoapps.grades.signals.handlers.events', MagicMock())
+@patch('lms.djangoapps.grades.signals.handlers.recalculate_subsection_grade_v3.apply_async')
+class DeferSubsectionUpdatesTest(TestCase):
+    """
+    Tests the defer_subsection_updates context manager.
+    """
+    def _score_changed(self, user_id, usage_id):
+        """
+        Handles a PROBLEM_WEIGHTED_SCORE_CHANGED signal for the given user and block.
+        """
+        kwargs = dict(
+            PROBLEM_WEIGHTED_SCORE_CHANGED_KWARGS,
+            user_id=user_id,
+            course_id='course-v1:org+course+run',
+            usage_id=usage_id,
+            modified=FROZEN_NOW_DATETIME,
+        )
+        enqueue_subsection_update(**kwargs)
+
+    def test_updates_enqueued_immediately(self, mock_apply_async):
+        self._score_changed(1, 'block-v1:org+course+run+type@problem+block@1')
+        mock_apply_async.assert_called_once()
+
+    def test_updates_deferred(self, mock_apply_async):
+        with defer_subsection_updates():
+            with defer_subsection_updates():
+                self._score_changed(1, 'block-v1:org+course+run+type@problem+block@1')
+            self._score_changed(2, 'block-v1:org+course+run+type@problem+block@1')
+            self._score_changed(1, 'block-v1:org+course+run+type@problem+block@1')
+            mock_apply_async.assert_not_called()
+        self.assertEqual(
+            [call[1]['kwargs']['user_id'] for call in mock_apply_async.call_args_list],
+            [2, 1],
+        )
+
+        self._score_changed(3, 'block-v1:org+course+run+type@problem+block@1')
+        self.assertEqual(mock_apply_async.call_count, 3)
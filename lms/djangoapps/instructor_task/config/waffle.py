@@ -12,6 +12,8 @@ WAFFLE_SWITCHES = WaffleSwitchNamespace(name=WAFFLE_NAMESPACE)
 
 # Waffle switches
 OPTIMIZE_GET_LEARNERS_FOR_COURSE = 'optimize_get_learners_for_course'
+PARALLEL_COURSE_GRADE_REPORT = 'parallel_course_grade_report'
+PARALLEL_RESCORE = 'parallel_rescore'
 
 # Course override flags
 GENERATE_PROBLEM_GRADE_REPORT_VERIFIED_ONLY = 'generate_problem_grade_report_verified_only'
@@ -43,6 +45,22 @@ def optimize_get_learners_switch_enabled():
     return WAFFLE_SWITCHES.is_enabled(OPTIMIZE_GET_LEARNERS_FOR_COURSE)
 
 
+def parallel_course_grade_report_enabled():
+    """
+    Returns True if course grade reports should be generated in
+    parallel shards across subtasks, otherwise False.
+    """
+    return WAFFLE_SWITCHES.is_enabled(PARALLEL_COURSE_GRADE_REPORT)
+
+
+def parallel_rescore_enabled():
+    """
+    Returns True if rescoring a problem for all students should be done in
+    parallel shards across subtasks, otherwise False.
+    """
+    return WAFFLE_SWITCHES.is_enabled(PARALLEL_RESCORE)
+
+
 def problem_grade_report_verified_only(course_id):
     """
     Returns True if problem grade reports should only
@@ -0,0 +1,98 @@
+"""
+Command to benchmark the memory used to upload a grade report
+"""
+
+
+import shutil
+import tempfile
+import tracemalloc
+from textwrap import dedent
+from time import time
+
+from django.core.management.base import BaseCommand
+from opaque_keys.edx.locator import CourseLocator
+
+from lms.djangoapps.instructor_task.models import DjangoStorageReportStore
+from lms.djangoapps.instructor_task.tasks_helper.grades import CourseGradeReport, _compile_rows
+from lms.djangoapps.instructor_task.tasks_helper.runner import TaskProgress
+
+
+class _BenchmarkContext(object):
+    """
+    Minimal report context providing the task progress updated while
+    compiling rows.
+    """
+    def __init__(self):
+        self.task_progress = TaskProgress(u'benchmarked', total=None, start_time=time())
+
+
+class Command(BaseCommand):
+    """
+    Command to measure the time and peak memory used to compile and upload
+    the rows of a grade report for a synthetic course, both when all rows
+    are compiled into a list before uploading, and when they are streamed
+    to the report store.  Reports are written to a temporary directory.
+
+    Example:
+    ./manage.py lms benchmark_report_upload --users 100000 --columns 200
+    """
+    help = dedent(__doc__).strip()
+
+    def add_arguments(self, parser):
+        """
+        Add arguments to the command parser.
+        """
+        parser.add_argument(
+            '--users',
+            type=int,
+            dest='users',
+            default=100000,
+            help='Number of learners in the synthetic course.',
+        )
+        parser.add_argument(
+            '--columns',
+            type=int,
+            dest='columns',
+            default=100,
+            help='Number of grade columns of each row.',
+        )
+
+    def handle(self, *args, **options):
+        course_id = CourseLocator(org='edX', course='Benchmark', run='Synthetic')
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            report_store = DjangoStorageReportStore(
+                storage_class='django.core.files.storage.FileSystemStorage',
+                storage_kwargs={'location': tmp_dir},
+            )
+            for mode, stream in ((u'list', False), (u'stream', True)):
+                batched_rows = self._synthetic_batched_rows(options['users'], options['columns'])
+                tracemalloc.start()
+                start_time = time()
+                try:
+                    success_rows, _ = _compile_rows(_BenchmarkContext(), batched_rows)
+                    if not stream:
+                        success_rows = list(success_rows)
+                    report_store.store_rows(course_id, u'{}.csv'.format(mode), success_rows)
+                    _, peak_memory = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+                self.stdout.write(u'{:<8} time: {:>8.1f} s  peak memory: {:>12} bytes'.format(
+                    mode, time() - start_time, peak_memory,
+                ))
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def _synthetic_batched_rows(self, num_users, num_columns):
+        """
+        Returns a generator of batches of (success_rows, error_rows) for
+        the given number of learners, as generated for grade reports.
+        """
+        batch_size = CourseGradeReport.USER_BATCH_SIZE
+        for batch_start in range(0, num_users, batch_size):
+            success_rows = [
+                [user_id, u'learner{}@example.com'.format(user_id), u'learner{}'.format(user_id)] +
+                [(user_id * column) % 101 / 100.0 for column in range(num_columns)]
+                for user_id in range(batch_start, min(batch_start + batch_size, num_users))
+            ]
+            yield success_rows, []
@@ -20,13 +20,14 @@ import hashlib
 import json
 import logging
 import os.path
+from tempfile import SpooledTemporaryFile
 from uuid import uuid4
 
 import six
 from boto.exception import BotoServerError
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.core.files.base import ContentFile
+from django.core.files.base import ContentFile, File
 from django.db import models, transaction
 from django.utils.encoding import python_2_unicode_compatible
 from django.utils.translation import ugettext as _
@@ -42,6 +43,10 @@ QUEUING = 'QUEUING'
 PROGRESS = 'PROGRESS'
 TASK_INPUT_LENGTH = 10000
 
+# Size in bytes up to which a report is kept in memory while its rows are
+# written, before it is spooled to a temporary file on disk.
+REPORT_SPOOL_MAX_SIZE = 4 * 1024 * 1024
+
 
 @python_2_unicode_compatible
 class InstructorTask(models.Model):
@@ -295,15 +300,45 @@ class DjangoStorageReportStore(ReportStore):
         """
         Given a course_id, filename, and rows (each row is an iterable of
         strings), write the rows to the storage backend in csv format.
+
+        `rows` may be a generator, in which case the rows are written as
+        they are generated.  The csv is spooled to a temporary file once it
+        exceeds REPORT_SPOOL_MAX_SIZE, and the storage backend reads the
+        file in chunks, so that memory use is bounded for large reports.
+        """
+        with SpooledTemporaryFile(max_size=REPORT_SPOOL_MAX_SIZE) as output_file:
+            if six.PY2:
+                # Adding unicode signature (BOM) for MS Excel 2013 compatibility
+                output_file.write(codecs.BOM_UTF8)
+                csvwriter = csv.writer(output_file)
+            else:
+                # Write utf-8 encoded bytes, as Boto doesn't play nice with
+                # unicode in python3 (see `store`).
+                csvwriter = csv.writer(codecs.getwriter('utf-8')(output_file))
+            csvwriter.writerows(self._get_utf8_encoded_rows(rows))
+            output_file.seek(0)
+            self.storage.save(self.path_to(course_id, filename), File(output_file))
+
+    def read_rows(self, course_id, filename):
+        """
+        Return a list of the rows of the csv file `filename` previously
+        stored for the given course_id with `store_rows`.
+        """
+        with self.storage.open(self.path_to(course_id, filename), 'rb') as csv_file:
+            contents = csv_file.read().decode('utf-8')
+        return list(csv.reader(six.StringIO(contents)))
+
+    def exists(self, course_id, filename):
+        """
+        Return whether the file `filename` is stored for the given course_id.
+        """
+        return self.storage.exists(self.path_to(course_id, filename))
+
+    def delete(self, course_id, filename):
+        """
+        Delete the file `filename` stored for the given course_id.
         """
-        output_buffer = ContentFile('')
-        # Adding unicode signature (BOM) for MS Excel 2013 compatibility
-        if six.PY2:
-            output_buffer.write(codecs.BOM_UTF8)
-        csvwriter = csv.writer(output_buffer)
-        csvwriter.writerows(self._get_utf8_encoded_rows(rows))
-        output_buffer.seek(0)
-        self.store(course_id, filename, output_buffer)
+        self.storage.delete(self.path_to(course_id, filename))
 
     def links_for(self, course_id):
         """
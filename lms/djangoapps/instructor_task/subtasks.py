@@ -355,6 +355,50 @@ def queue_subtasks_for_query(
     return progress
 
 
+def queue_subtasks(entry, action_name, create_subtask_fcn, item_lists, total_num_items):
+    """
+    Queues a subtask to execute each of the given lists of "items".
+
+    Unlike queue_subtasks_for_query, the items of every subtask are known
+    before any subtask is queued, so the InstructorTask expects exactly as
+    many subtasks as are queued.
+
+    Arguments:
+        `entry` : the InstructorTask object for which subtasks are being queued.
+        `action_name` : a past-tense verb that can be used for constructing readable status messages.
+        `create_subtask_fcn` : a function of two arguments that constructs the desired kind of subtask object.
+            Arguments are the list of items to be processed by this subtask, and a SubtaskStatus
+            object reflecting initial status (and containing the subtask's id).
+        `item_lists` : the list of the items to pass to each subtask.
+        `total_num_items` : total amount of items that will be processed by the subtasks
+
+    Returns:  the task progress as stored in the InstructorTask object.
+    """
+    task_id = entry.task_id
+    subtask_id_list = [str(uuid4()) for _ in item_lists]
+
+    TASK_LOG.info(
+        u"Task %s: updating InstructorTask %s with subtask info for %s subtasks to process %s items.",
+        task_id,
+        entry.id,
+        len(subtask_id_list),
+        total_num_items,
+    )
+    # Make sure this is committed to database before handing off subtasks to celery.
+    with outer_atomic():
+        progress = initialize_subtask_info(entry, action_name, total_num_items, subtask_id_list)
+
+    for subtask_id, item_list in zip(subtask_id_list, item_lists):
+        new_subtask = create_subtask_fcn(item_list, SubtaskStatus.create(subtask_id))
+        TASK_LOG.info(
+            u"Queueing Task: %s Subtask: %s at timestamp: %s",
+            task_id, subtask_id, datetime.now()
+        )
+        new_subtask.apply_async()
+
+    return progress
+
+
 def _acquire_subtask_lock(task_id):
     """
     Mark the specified task_id as being in progress.
@@ -459,7 +503,7 @@ def check_subtask_is_valid(entry_id, current_task_id, new_subtask_status):
         raise DuplicateTaskException(msg)
 
 
-def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_count=0):
+def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_count=0, complete_task=True):
     """
     Update the status of the subtask in the parent InstructorTask object tracking its progress.
 
@@ -470,16 +514,21 @@ def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_c
 
     The subtask lock acquired in the call to check_subtask_is_valid() is released here, only when
     the attempting of retries has concluded.
+
+    Returns True if this update completed the last of the subtasks of the InstructorTask, so
+    that the caller can perform any work that must follow the completion of all subtasks.
+    If `complete_task` is False, the InstructorTask is then left in PROGRESS, for the caller
+    to update its state once that work is done.
     """
     try:
-        _update_subtask_status(entry_id, current_task_id, new_subtask_status)
+        return _update_subtask_status(entry_id, current_task_id, new_subtask_status, complete_task)
     except DatabaseError:
         # If we fail, try again recursively.
         retry_count += 1
         if retry_count < MAX_DATABASE_LOCK_RETRIES:
             TASK_LOG.info(u"Retrying to update status for subtask %s of instructor task %d with status %s:  retry %d",
                           current_task_id, entry_id, new_subtask_status, retry_count)
-            update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_count)
+            return update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_count, complete_task)
         else:
             TASK_LOG.info(u"Failed to update status after %d retries for subtask %s of instructor task %d with status %s",
                           retry_count, current_task_id, entry_id, new_subtask_status)
@@ -492,7 +541,7 @@ def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_c
 
 
 @transaction.atomic
-def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
+def _update_subtask_status(entry_id, current_task_id, new_subtask_status, complete_task=True):
     """
     Update the status of the subtask in the parent InstructorTask object tracking its progress.
 
@@ -518,6 +567,9 @@ def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
     information for each subtask.  At the moment, the value for each subtask (keyed by its task_id)
     is the value of the SubtaskStatus.to_dict(), but could be expanded in future to store information
     about failure messages, progress made, etc.
+
+    Returns True if this update completed the last of the subtasks.  The InstructorTask is then
+    marked as having succeeded, unless `complete_task` is False.
     """
     TASK_LOG.info(u"Preparing to update status for subtask %s for instructor task %d with status %s",
                   current_task_id, entry_id, new_subtask_status)
@@ -568,7 +620,7 @@ def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
         # At present, we mark the task as having succeeded.  In future, we should see
         # if there was a catastrophic failure that occurred, and figure out how to
         # report that here.
-        if num_remaining <= 0:
+        if num_remaining <= 0 and complete_task:
             entry.task_state = SUCCESS
         entry.subtasks = json.dumps(subtask_dict)
         entry.task_output = InstructorTask.create_output_for_success(task_progress)
@@ -577,6 +629,7 @@ def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
         entry.save()
         TASK_LOG.info(u"Task output updated to %s for subtask %s of instructor task %d",
                       entry.task_output, current_task_id, entry_id)
+        return num_remaining <= 0
     except Exception:
         TASK_LOG.exception("Unexpected error while updating InstructorTask.")
         raise
@@ -28,6 +28,10 @@ from django.conf import settings
 from django.utils.translation import ugettext_noop
 
 from lms.djangoapps.bulk_email.tasks import perform_delegate_email_batches
+from lms.djangoapps.instructor_task.config.waffle import (
+    parallel_course_grade_report_enabled,
+    parallel_rescore_enabled
+)
 from lms.djangoapps.instructor_task.tasks_base import BaseInstructorTask
 from lms.djangoapps.instructor_task.tasks_helper.certs import generate_students_certificates
 from lms.djangoapps.instructor_task.tasks_helper.enrollments import (
@@ -46,7 +50,9 @@ from lms.djangoapps.instructor_task.tasks_helper.module_state import (
     delete_problem_module_state,
     override_score_module_state,
     perform_module_state_update,
+    rescore_problem_in_shards,
     rescore_problem_module_state,
+    rescore_student_modules_in_range,
     reset_attempts_module_state
 )
 from lms.djangoapps.instructor_task.tasks_helper.runner import run_main_task
@@ -75,12 +81,27 @@ def rescore_problem(entry_id, xmodule_instance_args):
     """
     # Translators: This is a past-tense verb that is inserted into task progress messages as {action}.
     action_name = ugettext_noop('rescored')
+    if parallel_rescore_enabled():
+        visit_fcn = partial(rescore_problem_in_shards, rescore_problem_shard, xmodule_instance_args)
+        return run_main_task(entry_id, visit_fcn, action_name)
+
     update_fcn = partial(rescore_problem_module_state, xmodule_instance_args)
 
     visit_fcn = partial(perform_module_state_update, update_fcn, None)
     return run_main_task(entry_id, visit_fcn, action_name)
 
 
+@task
+def rescore_problem_shard(entry_id, xmodule_instance_args, action_name, module_id_range, subtask_status_dict):
+    """
+    Rescores the StudentModules of a problem within the given range of ids.
+    Queued as a subtask of `rescore_problem`.
+    """
+    return rescore_student_modules_in_range(
+        entry_id, xmodule_instance_args, action_name, module_id_range, subtask_status_dict,
+    )
+
+
 @task(base=BaseInstructorTask)
 def override_problem_score(entry_id, xmodule_instance_args):
     """
@@ -187,10 +208,26 @@ def calculate_grades_csv(entry_id, xmodule_instance_args):
         xmodule_instance_args.get('task_id'), entry_id, action_name
     )
 
-    task_fn = partial(CourseGradeReport.generate, xmodule_instance_args)
+    if parallel_course_grade_report_enabled():
+        task_fn = partial(CourseGradeReport.generate_in_shards, calculate_grades_csv_shard, xmodule_instance_args)
+    else:
+        task_fn = partial(CourseGradeReport.generate, xmodule_instance_args)
     return run_main_task(entry_id, task_fn, action_name)
 
 
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)
+def calculate_grades_csv_shard(entry_id, xmodule_instance_args, action_name, shard_index, user_id_range,
+                               subtask_status_dict):
+    """
+    Grade the learners of a course within the given range of user ids and
+    store their rows of the grade report in a partial CSV.  Queued as a
+    subtask of `calculate_grades_csv`.
+    """
+    return CourseGradeReport.generate_shard(
+        entry_id, xmodule_instance_args, action_name, shard_index, user_id_range, subtask_status_dict,
+    )
+
+
 @task(base=BaseInstructorTask, routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)
 def calculate_problem_grade_report(entry_id, xmodule_instance_args):
     """
@@ -2,14 +2,17 @@
 Functionality for generating grade reports.
 """
 
+import json
 import logging
+import traceback
 from collections import OrderedDict, defaultdict
 from datetime import datetime
-from itertools import chain
+from itertools import chain, count
 from time import time
 
 import re
 import six
+from celery.states import FAILURE, SUCCESS
 from lms.djangoapps.course_blocks.api import get_course_blocks
 from django.conf import settings
 from django.contrib.auth import get_user_model
@@ -35,6 +38,13 @@ from lms.djangoapps.instructor_task.config.waffle import (
     optimize_get_learners_switch_enabled,
     problem_grade_report_verified_only,
 )
+from lms.djangoapps.instructor_task.models import InstructorTask, ReportStore
+from lms.djangoapps.instructor_task.subtasks import (
+    SubtaskStatus,
+    check_subtask_is_valid,
+    queue_subtasks,
+    update_subtask_status,
+)
 from lms.djangoapps.teams.models import CourseTeamMembership
 from lms.djangoapps.verify_student.services import IDVerificationService
 from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
@@ -71,6 +81,53 @@ def _flatten(iterable):
     return list(chain.from_iterable(iterable))
 
 
+def _compile_rows(context, batched_rows):
+    """
+    Compiles the given batched_rows of (success_rows, error_rows) into a
+    generator of all success rows and the list of all error rows.
+
+    The batches are only consumed as the success rows are generated, so
+    that the success rows can be written to the report without holding
+    all of them in memory.  The error rows, whose list is filled in while
+    the success rows are generated, and the metrics on task status are
+    only complete once the generator is exhausted.
+    """
+    error_rows = []
+
+    def success_rows():
+        """
+        Yields the success rows, collecting the error rows and updating
+        the metrics on task status after each batch.
+        """
+        num_succeeded = num_failed = 0
+        for batch_success_rows, batch_error_rows in batched_rows:
+            num_succeeded += len(batch_success_rows)
+            num_failed += len(batch_error_rows)
+            error_rows.extend(batch_error_rows)
+
+            context.task_progress.succeeded = num_succeeded
+            context.task_progress.failed = num_failed
+            context.task_progress.attempted = num_succeeded + num_failed
+            context.task_progress.total = context.task_progress.attempted
+            for row in batch_success_rows:
+                yield row
+
+    return success_rows(), error_rows
+
+
+def _enrolled_users(course_id, verified_only=False):
+    """
+    Returns a queryset of all the users enrolled in the given course,
+    including those with inactive enrollments.
+    """
+    filter_kwargs = {
+        'courseenrollment__course_id': course_id,
+    }
+    if verified_only:
+        filter_kwargs['courseenrollment__mode'] = CourseMode.VERIFIED
+    return get_user_model().objects.filter(**filter_kwargs)
+
+
 class GradeReportBase(object):
     """
     Base class for grade reports (ProblemGradeReport and CourseGradeReport).
@@ -167,28 +224,20 @@ class GradeReportBase(object):
 
     def _compile(self, context, batched_rows):
         """
-        Compiles and returns the complete list of (success_rows, error_rows) for
-        the given batched_rows and context.
+        Compiles and returns (success_rows, error_rows) for the given
+        batched_rows and context, where success_rows is a generator (see
+        _compile_rows).
         """
-        # partition and chain successes and errors
-        success_rows, error_rows = zip(*batched_rows)
-        success_rows = list(chain(*success_rows))
-        error_rows = list(chain(*error_rows))
-
-        # update metrics on task status
-        context.task_progress.succeeded = len(success_rows)
-        context.task_progress.failed = len(error_rows)
-        context.task_progress.attempted = context.task_progress.succeeded + context.task_progress.failed
-        context.task_progress.total = context.task_progress.attempted
-        return success_rows, error_rows
+        return _compile_rows(context, batched_rows)
 
-    def _upload(self, context, success_rows, error_rows):
+    def _upload(self, context, success_headers, success_rows, error_headers, error_rows):
         """
         Creates and uploads a CSV for the given headers and rows.
         """
         date = datetime.now(UTC)
-        upload_csv_to_report_store(success_rows, context.file_name, context.course_id, date)
-        if len(error_rows) > 1:
+        upload_csv_to_report_store(chain([success_headers], success_rows), context.file_name, context.course_id, date)
+        if len(error_rows) > 0:
+            error_rows = [error_headers] + error_rows
             upload_csv_to_report_store(error_rows, context.file_name + '_err', context.course_id, date)
 
     def log_additional_info_for_testing(self, context, message):
@@ -434,6 +483,183 @@ class CourseGradeReport(object):
 
         return context.update_status(u'Completed grades')
 
+    @classmethod
+    def generate_in_shards(cls, shard_task, _xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
+        """
+        Public method to generate a grade report in parallel.
+
+        Splits the learners enrolled in the course into shards of
+        consecutive user ids and queues a `shard_task` subtask for each,
+        which grades its learners and stores them in a partial CSV (see
+        generate_shard).  Once the last shard is done, the partial CSVs
+        are merged into the report.
+        """
+        entry = InstructorTask.objects.get(pk=_entry_id)
+        # Do not queue the shards again if the task is being rerun.
+        if len(entry.subtasks) > 0 and len(entry.task_output) > 0:
+            TASK_LOG.warning(u'Task %s: grade report shards have already been queued.', entry.task_id)
+            return json.loads(entry.task_output)
+
+        # Plan the shards before queueing any, so that the task expects exactly
+        # the shards that are queued, even if enrollments change meanwhile.
+        verified_only = course_grade_report_verified_only(course_id)
+        users = _enrolled_users(course_id, verified_only=verified_only).order_by('id')
+        user_id_ranges = []
+        total_num_users = 0
+        for user_id in users.values_list('id', flat=True).iterator():
+            if total_num_users % settings.COURSE_GRADE_REPORT_USERS_PER_TASK == 0:
+                user_id_ranges.append([user_id, user_id])
+            else:
+                user_id_ranges[-1][1] = user_id
+            total_num_users += 1
+        if total_num_users == 0:
+            return cls.generate(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name)
+
+        shard_indices = count()
+
+        def _create_shard_subtask(user_id_range, initial_subtask_status):
+            """
+            Creates a subtask to grade the given range of users.
+            """
+            return shard_task.subtask(
+                (
+                    _entry_id,
+                    _xmodule_instance_args,
+                    action_name,
+                    next(shard_indices),
+                    user_id_range,
+                    initial_subtask_status.to_dict(),
+                ),
+                task_id=initial_subtask_status.task_id,
+                routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY,
+            )
+
+        return queue_subtasks(entry, action_name, _create_shard_subtask, user_id_ranges, total_num_users)
+
+    @classmethod
+    def generate_shard(
+            cls, _entry_id, _xmodule_instance_args, action_name, shard_index, user_id_range, subtask_status_dict,
+    ):
+        """
+        Public method to generate the rows of a grade report for the enrolled
+        users whose ids are within the inclusive user_id_range, and store them
+        in a partial CSV for the shard_index.  The shard that completes last
+        merges all partial CSVs into the report.
+        """
+        subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+        current_task_id = subtask_status.task_id
+        check_subtask_is_valid(_entry_id, current_task_id, subtask_status)
+
+        entry = InstructorTask.objects.get(pk=_entry_id)
+        course_id = entry.course_id
+        context = _CourseGradeReportContext(
+            _xmodule_instance_args, _entry_id, course_id, json.loads(entry.task_input), action_name,
+        )
+        TASK_LOG.info(
+            u'%s, Task type: %s, Starting grades for shard %d, users %d to %d',
+            context.task_info_string, action_name, shard_index, user_id_range[0], user_id_range[1],
+        )
+
+        report = cls()
+        try:
+            with modulestore().bulk_operations(course_id):
+                success_rows, error_rows = [], []
+                for users in report._batch_users_in_range(context, user_id_range):
+                    batch_success_rows, batch_error_rows = report._rows_for_users(context, users)
+                    success_rows.extend(batch_success_rows)
+                    error_rows.extend(batch_error_rows)
+
+            report_store = ReportStore.from_config('GRADES_DOWNLOAD')
+            report_store.store_rows(course_id, cls._shard_file_name(entry.task_id, shard_index), success_rows)
+            if error_rows:
+                report_store.store_rows(course_id, cls._shard_file_name(entry.task_id, shard_index, u'_err'), error_rows)
+        except Exception:
+            TASK_LOG.exception(u'%s, Task type: %s, Grades for shard %d failed', context.task_info_string, action_name, shard_index)
+            num_users = _enrolled_users(course_id, verified_only=context.report_for_verified_only).filter(
+                id__gte=user_id_range[0],
+                id__lte=user_id_range[1],
+            ).count()
+            subtask_status.increment(failed=num_users, state=FAILURE)
+            if update_subtask_status(_entry_id, current_task_id, subtask_status, complete_task=False):
+                cls._merge_shards(_entry_id, _xmodule_instance_args, action_name)
+            raise
+
+        subtask_status.increment(succeeded=len(success_rows), failed=len(error_rows), state=SUCCESS)
+        # The task only succeeds once the shards are merged into the report.
+        if update_subtask_status(_entry_id, current_task_id, subtask_status, complete_task=False):
+            cls._merge_shards(_entry_id, _xmodule_instance_args, action_name)
+        return subtask_status.to_dict()
+
+    @classmethod
+    def _merge_shards(cls, _entry_id, _xmodule_instance_args, action_name):
+        """
+        Merges the partial CSVs of all the shards of the given task into the
+        grade report, in order of user id, deletes the partial CSVs, and marks
+        the task as having succeeded.
+
+        If any shard failed, no report is uploaded and the task is marked as
+        failed, since the report would be missing the learners of that shard.
+        """
+        entry = InstructorTask.objects.get(pk=_entry_id)
+        course_id = entry.course_id
+        subtask_dict = json.loads(entry.subtasks)
+        num_shards = subtask_dict['total']
+        report_store = ReportStore.from_config('GRADES_DOWNLOAD')
+        shard_file_names = [cls._shard_file_name(entry.task_id, index) for index in range(num_shards)]
+        error_file_names = [cls._shard_file_name(entry.task_id, index, u'_err') for index in range(num_shards)]
+
+        try:
+            if subtask_dict['failed'] > 0:
+                raise ValueError(
+                    u'{} of {} grade report shards failed.'.format(subtask_dict['failed'], num_shards)
+                )
+
+            with modulestore().bulk_operations(course_id):
+                context = _CourseGradeReportContext(
+                    _xmodule_instance_args, _entry_id, course_id, json.loads(entry.task_input), action_name,
+                )
+                report = cls()
+                success_headers = report._success_headers(context)
+                error_headers = report._error_headers()
+
+            success_rows = chain.from_iterable(
+                report_store.read_rows(course_id, file_name) for file_name in shard_file_names
+            )
+            error_rows = _flatten(
+                report_store.read_rows(course_id, file_name)
+                for file_name in error_file_names
+                if report_store.exists(course_id, file_name)
+            )
+            report._upload(context, success_headers, success_rows, error_headers, error_rows)
+            TASK_LOG.info(
+                u'%s, Task type: %s, Merged grades of %d shards',
+                context.task_info_string, action_name, num_shards,
+            )
+            entry.task_state = SUCCESS
+            entry.save_now()
+        except Exception as exc:  # pylint: disable=broad-except
+            TASK_LOG.exception(u'Task %s: failed to merge grade report shards.', entry.task_id)
+            entry.task_output = InstructorTask.create_output_for_failure(exc, traceback.format_exc())
+            entry.task_state = FAILURE
+            entry.save_now()
+        finally:
+            for file_name in shard_file_names + error_file_names:
+                if report_store.exists(course_id, file_name):
+                    report_store.delete(course_id, file_name)
+
+    @staticmethod
+    def _shard_file_name(task_id, shard_index, suffix=u''):
+        """
+        Returns the name of the partial CSV of the given shard of a report.
+        Partial CSVs are stored in a subdirectory, so they are not listed
+        among the course's reports.
+        """
+        return u'grade_report_shards/{task_id}/{shard_index:05d}{suffix}.csv'.format(
+            task_id=task_id,
+            shard_index=shard_index,
+            suffix=suffix,
+        )
+
     def _success_headers(self, context):
         """
         Returns a list of all applicable column headers for this grade report.
@@ -465,27 +691,18 @@ class CourseGradeReport(object):
 
     def _compile(self, context, batched_rows):
         """
-        Compiles and returns the complete list of (success_rows, error_rows) for
-        the given batched_rows and context.
+        Compiles and returns (success_rows, error_rows) for the given
+        batched_rows and context, where success_rows is a generator (see
+        _compile_rows).
         """
-        # partition and chain successes and errors
-        success_rows, error_rows = zip(*batched_rows)
-        success_rows = list(chain(*success_rows))
-        error_rows = list(chain(*error_rows))
-
-        # update metrics on task status
-        context.task_progress.succeeded = len(success_rows)
-        context.task_progress.failed = len(error_rows)
-        context.task_progress.attempted = context.task_progress.succeeded + context.task_progress.failed
-        context.task_progress.total = context.task_progress.attempted
-        return success_rows, error_rows
+        return _compile_rows(context, batched_rows)
 
     def _upload(self, context, success_headers, success_rows, error_headers, error_rows):
         """
         Creates and uploads a CSV for the given headers and rows.
         """
         date = datetime.now(UTC)
-        upload_csv_to_report_store([success_headers] + success_rows, 'grade_report', context.course_id, date)
+        upload_csv_to_report_store(chain([success_headers], success_rows), 'grade_report', context.course_id, date)
         if len(error_rows) > 0:
             error_rows = [error_headers] + error_rows
             upload_csv_to_report_store(error_rows, 'grade_report_err', context.course_id, date)
@@ -568,6 +785,19 @@ class CourseGradeReport(object):
         task_log_message = u'{}, Task type: {}'.format(context.task_info_string, context.action_name)
         return get_enrolled_learners_for_course(course_id=course_id, verified_only=context.report_for_verified_only)
 
+    def _batch_users_in_range(self, context, user_id_range):
+        """
+        Returns a generator of batches of the enrolled users whose ids are
+        within the given inclusive range.
+        """
+        users = _enrolled_users(context.course_id, verified_only=context.report_for_verified_only).filter(
+            id__gte=user_id_range[0],
+            id__lte=user_id_range[1],
+        )
+        user_ids = list(users.values_list('id', flat=True).order_by('id'))
+        for index in range(0, len(user_ids), self.USER_BATCH_SIZE):
+            yield users.filter(id__in=user_ids[index:index + self.USER_BATCH_SIZE]).select_related('profile')
+
     def _user_grades(self, course_grade, context):
         """
         Returns a list of grade results for the given course_grade corresponding
@@ -734,7 +964,7 @@ class ProblemGradeReport(GradeReportBase):
         context.update_status('ProblemGradeReport - 2: Compiling grades')
         success_rows, error_rows = self._compile(context, batched_rows)
         context.update_status('ProblemGradeReport - 3: Uploading grades')
-        self._upload(context, [success_headers] + success_rows, [error_headers] + error_rows)
+        self._upload(context, success_headers, success_rows, error_headers, error_rows)
 
         return context.update_status('ProblemGradeReport - 4: Completed problem grades')
 
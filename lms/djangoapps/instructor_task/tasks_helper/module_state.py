@@ -5,9 +5,12 @@ Instructor Tasks related to module state.
 
 import json
 import logging
+from functools import partial
 from time import time
 
 import six
+from celery.states import FAILURE, SUCCESS
+from django.conf import settings
 from django.utils.translation import ugettext_noop
 from opaque_keys.edx.keys import UsageKey
 from xblock.runtime import KvsFieldData
@@ -18,11 +21,20 @@ from lms.djangoapps.courseware.courses import get_course_by_id, get_problems_in_
 from lms.djangoapps.courseware.model_data import DjangoKeyValueStore, FieldDataCache
 from lms.djangoapps.courseware.models import StudentModule
 from lms.djangoapps.courseware.module_render import get_module_for_descriptor_internal
+from lms.djangoapps.grades.api import defer_subsection_updates
 from lms.djangoapps.grades.api import events as grades_events
+from lms.djangoapps.instructor_task.models import InstructorTask
+from lms.djangoapps.instructor_task.subtasks import (
+    SubtaskStatus,
+    check_subtask_is_valid,
+    queue_subtasks_for_query,
+    update_subtask_status
+)
 from common.djangoapps.student.models import get_user_by_username_or_email
 from common.djangoapps.track.event_transaction_utils import create_new_event_transaction_id, set_event_transaction_type
 from common.djangoapps.track.views import task_track
 from common.djangoapps.util.db import outer_atomic
+from xmodule.capa_base import CapaMixin
 from xmodule.modulestore.django import modulestore
 
 from ..exceptions import UpdateProblemModuleStateError
@@ -109,8 +121,132 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     return task_progress.update_task_state()
 
 
+def rescore_problem_in_shards(shard_task, xmodule_instance_args, _entry_id, course_id, task_input, action_name):
+    """
+    Rescores a problem for all students in parallel.
+
+    Splits the StudentModules of the problem into shards of consecutive ids
+    and queues a `shard_task` subtask for each, which rescores them (see
+    rescore_student_modules_in_range).  Rescoring the submission of a single
+    student, or the problems of an entrance exam, is done by this task with
+    perform_module_state_update.
+    """
+    if task_input.get('student') or not task_input.get('problem_url'):
+        update_fcn = partial(rescore_problem_module_state, xmodule_instance_args)
+        return perform_module_state_update(update_fcn, None, _entry_id, course_id, task_input, action_name)
+
+    entry = InstructorTask.objects.get(pk=_entry_id)
+    # Do not queue the shards again if the task is being rerun.
+    if len(entry.subtasks) > 0 and len(entry.task_output) > 0:
+        TASK_LOG.warning(u'Task %s: rescore shards have already been queued.', entry.task_id)
+        return json.loads(entry.task_output)
+
+    # Fail early if the problem doesn't exist.
+    usage_key = UsageKey.from_string(task_input['problem_url']).map_into_course(course_id)
+    modulestore().get_item(usage_key)
+
+    student_modules = _get_modules_to_update(course_id, [usage_key], None, None).order_by('id')
+    total_num_modules = student_modules.count()
+    if total_num_modules == 0:
+        update_fcn = partial(rescore_problem_module_state, xmodule_instance_args)
+        return perform_module_state_update(update_fcn, None, _entry_id, course_id, task_input, action_name)
+
+    def _create_shard_subtask(items, initial_subtask_status):
+        """
+        Creates a subtask to rescore the range of StudentModules spanned by the given items.
+        """
+        return shard_task.subtask(
+            (
+                _entry_id,
+                xmodule_instance_args,
+                action_name,
+                [items[0]['pk'], items[-1]['pk']],
+                initial_subtask_status.to_dict(),
+            ),
+            task_id=initial_subtask_status.task_id,
+        )
+
+    return queue_subtasks_for_query(
+        entry,
+        action_name,
+        _create_shard_subtask,
+        [student_modules],
+        [],
+        settings.RESCORE_STUDENT_MODULES_PER_TASK,
+        total_num_modules,
+    )
+
+
+def rescore_student_modules_in_range(_entry_id, xmodule_instance_args, action_name, module_id_range,
+                                     subtask_status_dict):
+    """
+    Rescores the StudentModules of the problem of the given task whose ids
+    are within the inclusive module_id_range, as a subtask queued by
+    rescore_problem_in_shards.
+
+    Identical answers are graded only once (see CapaMixin.update_correctness),
+    and the subsection grade updates of the rescored students are enqueued
+    once all the StudentModules of the shard are rescored.
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    check_subtask_is_valid(_entry_id, current_task_id, subtask_status)
+
+    entry = InstructorTask.objects.get(pk=_entry_id)
+    course_id = entry.course_id
+    task_input = json.loads(entry.task_input)
+    usage_key = UsageKey.from_string(task_input['problem_url']).map_into_course(course_id)
+    TASK_LOG.info(
+        u'Task %s: %s StudentModules %d to %d of %s',
+        entry.task_id, action_name, module_id_range[0], module_id_range[1], usage_key,
+    )
+
+    student_modules = list(
+        _get_modules_to_update(course_id, [usage_key], None, None).filter(
+            id__gte=module_id_range[0],
+            id__lte=module_id_range[1],
+        ).select_related('student').order_by('id')
+    )
+    grading_cache = {}
+    try:
+        with defer_subsection_updates():
+            module_descriptor = modulestore().get_item(usage_key)
+            for student_module in student_modules:
+                update_status = rescore_problem_module_state(
+                    xmodule_instance_args, module_descriptor, student_module, task_input, grading_cache,
+                )
+                if update_status == UPDATE_STATUS_SUCCEEDED:
+                    subtask_status.increment(succeeded=1)
+                elif update_status == UPDATE_STATUS_FAILED:
+                    subtask_status.increment(failed=1)
+                elif update_status == UPDATE_STATUS_SKIPPED:
+                    subtask_status.increment(skipped=1)
+                else:
+                    raise UpdateProblemModuleStateError(
+                        u"Unexpected update_status returned: {}".format(update_status)
+                    )
+    except Exception:
+        TASK_LOG.exception(
+            u'Task %s: failed to rescore StudentModules %d to %d',
+            entry.task_id, module_id_range[0], module_id_range[1],
+        )
+        num_not_rescored = len(student_modules) - subtask_status.attempted - subtask_status.skipped
+        subtask_status.increment(failed=num_not_rescored, state=FAILURE)
+        update_subtask_status(_entry_id, current_task_id, subtask_status)
+        raise
+
+    TASK_LOG.info(
+        u'Task %s: %s %d StudentModules with %d distinct answers',
+        entry.task_id, action_name, len(student_modules), len(grading_cache),
+    )
+    subtask_status.increment(state=SUCCESS)
+    update_subtask_status(_entry_id, current_task_id, subtask_status)
+    return subtask_status.to_dict()
+
+
 @outer_atomic
-def rescore_problem_module_state(xmodule_instance_args, module_descriptor, student_module, task_input):
+def rescore_problem_module_state(xmodule_instance_args, module_descriptor, student_module, task_input,
+                                 grading_cache=None):
     '''
     Takes an XModule descriptor and a corresponding StudentModule object, and
     performs rescoring on the student's problem submission.
@@ -119,6 +255,9 @@ def rescore_problem_module_state(xmodule_instance_args, module_descriptor, stude
     In particular, raises UpdateProblemModuleStateError if module fails to instantiate,
     or if the module doesn't support rescoring.
 
+    `grading_cache` is an optional dict shared by the rescoring of many StudentModules
+    of a capa problem, so that identical answers are graded only once.
+
     Returns True if problem was successfully rescored for the given student, and False
     if problem encountered some kind of error in rescoring.
     '''
@@ -169,7 +308,10 @@ def rescore_problem_module_state(xmodule_instance_args, module_descriptor, stude
 
         # specific events from CAPA are not propagated up the stack. Do we want this?
         try:
-            instance.rescore(only_if_higher=task_input['only_if_higher'])
+            if grading_cache is not None and isinstance(instance, CapaMixin):
+                instance.rescore(only_if_higher=task_input['only_if_higher'], grading_cache=grading_cache)
+            else:
+                instance.rescore(only_if_higher=task_input['only_if_higher'])
         except (LoncapaProblemError, StudentInputError, ResponseError):
             TASK_LOG.warning(
                 u"error processing rescore call for course %(course)s, problem %(loc)s "
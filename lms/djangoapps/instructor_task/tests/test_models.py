@@ -5,10 +5,13 @@ Tests for instructor_task/models.py.
 
 import copy
 import time
+
+import six
 from six import StringIO
 
 from django.conf import settings
 from django.test import SimpleTestCase, TestCase, override_settings
+from mock import patch
 from opaque_keys.edx.locator import CourseLocator
 
 from common.test.utils import MockS3BotoMixin
@@ -69,6 +72,22 @@ class ReportStoreTestMixin(object):
             ['new_file', 'middle_file', 'old_file']
         )
 
+    @patch('lms.djangoapps.instructor_task.models.REPORT_SPOOL_MAX_SIZE', 64)
+    def test_store_rows_from_generator(self):
+        """
+        Test that rows can be stored from a generator, including reports
+        that exceed the size held in memory.
+        """
+        report_store = self.create_report_store()
+        rows = [[u'Student ID', u'Username']] + [[index, u'ni\xf1o{}'.format(index)] for index in range(100)]
+
+        report_store.store_rows(self.course_id, 'report.csv', (row for row in rows))
+
+        self.assertEqual(
+            report_store.read_rows(self.course_id, 'report.csv'),
+            [[six.text_type(value) for value in row] for row in rows],
+        )
+
 
 class LocalFSReportStoreTestCase(ReportStoreTestMixin, TestReportMixin, SimpleTestCase):
     """
@@ -12,6 +12,7 @@ from uuid import uuid4
 
 import ddt
 from celery.states import FAILURE, SUCCESS
+from django.test.utils import override_settings
 from django.utils.translation import ugettext_noop
 from mock import MagicMock, Mock, patch
 from opaque_keys.edx.keys import i4xEncoder
@@ -32,6 +33,10 @@ from lms.djangoapps.instructor_task.tasks import (
     reset_problem_attempts
 )
 from lms.djangoapps.instructor_task.tasks_helper.misc import upload_ora2_data
+from lms.djangoapps.instructor_task.tasks_helper.module_state import (
+    rescore_problem_in_shards,
+    rescore_student_modules_in_range
+)
 from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import InstructorTaskModuleTestCase
 from xmodule.modulestore.exceptions import ItemNotFoundError
@@ -493,6 +498,50 @@ class TestRescoreInstructorTask(TestInstructorTasks):
         )
 
 
+    @override_settings(RESCORE_STUDENT_MODULES_PER_TASK=3)
+    def test_rescoring_in_shards(self):
+        """
+        Tests rescoring a problem for all students in shards of StudentModules.
+        """
+        mock_instance = MagicMock()
+        getattr(mock_instance, 'rescore').return_value = None
+        mock_instance.has_submitted_answer.return_value = True
+
+        num_students = 10
+        self._create_students_with_state(num_students)
+        task_entry = self._create_input_entry()
+
+        def _create_subtask(args, **kwargs):  # pylint: disable=unused-argument
+            return Mock(apply_async=lambda: rescore_student_modules_in_range(*args))
+
+        shard_task = Mock(subtask=Mock(side_effect=_create_subtask))
+        with patch(
+                'lms.djangoapps.instructor_task.tasks_helper.module_state.get_module_for_descriptor_internal'
+        ) as mock_get_module:
+            mock_get_module.return_value = mock_instance
+            rescore_problem_in_shards(
+                shard_task,
+                self._get_xmodule_instance_args(),
+                task_entry.id,
+                self.course.id,
+                json.loads(task_entry.task_input),
+                'rescored',
+            )
+
+        self.assertEqual(shard_task.subtask.call_count, 4)
+        self.assertEqual(mock_instance.rescore.call_count, num_students)
+        entry = InstructorTask.objects.get(id=task_entry.id)
+        self.assertEqual(entry.task_state, SUCCESS)
+        self.assert_task_output(
+            output=json.loads(entry.task_output),
+            total=num_students,
+            attempted=num_students,
+            succeeded=num_students,
+            skipped=0,
+            failed=0,
+            action_name='rescored'
+        )
+
 class TestResetAttemptsInstructorTask(TestInstructorTasks):
     """Tests instructor task that resets problem attempts."""
 
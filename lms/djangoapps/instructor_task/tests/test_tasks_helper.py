@@ -9,16 +9,19 @@ Unit tests for LMS instructor-initiated background tasks helper functions.
 """
 
 
+import json
 import os
 import shutil
 import tempfile
 from contextlib import contextmanager, ExitStack
 from datetime import datetime, timedelta
 from io import BytesIO
+from uuid import uuid4
 from zipfile import ZipFile
 
 import ddt
 import unicodecsv
+from celery.states import FAILURE, SUCCESS
 from django.conf import settings
 from django.test.utils import override_settings
 from django.urls import reverse
@@ -62,6 +65,7 @@ from lms.djangoapps.instructor_task.tasks_helper.misc import (
     upload_ora2_data,
     upload_ora2_submission_files
 )
+from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import (
     InstructorTaskCourseTestCase,
     InstructorTaskModuleTestCase,
@@ -83,7 +87,7 @@ from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory, check_mongo_calls
 from xmodule.partitions.partitions import Group, UserPartition
 
-from ..models import ReportStore
+from ..models import PROGRESS, InstructorTask, ReportStore
 from ..tasks_helper.utils import UPDATE_STATUS_FAILED, UPDATE_STATUS_SUCCEEDED
 
 _TEAMS_CONFIG = TeamsConfig({
@@ -139,6 +143,100 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
         num_students = len(emails)
         self.assertDictContainsSubset({'attempted': num_students, 'succeeded': num_students, 'failed': 0}, result)
 
+    def _generate_in_shards(self, before_shard=None):
+        """
+        Generates a course grade report in shards, running each shard
+        subtask synchronously, after calling before_shard with the index of
+        the shard, if given, and returns the reloaded InstructorTask.
+        """
+        entry = InstructorTaskFactory.create(course_id=self.course.id, task_id=str(uuid4()))
+
+        def _run_shard(args):
+            if before_shard:
+                before_shard(args[3])
+            return CourseGradeReport.generate_shard(*args)
+
+        def _create_subtask(args, **kwargs):  # pylint: disable=unused-argument
+            return Mock(apply_async=lambda: _run_shard(args))
+
+        self.shard_task = Mock(subtask=Mock(side_effect=_create_subtask))
+        CourseGradeReport.generate_in_shards(self.shard_task, None, entry.id, self.course.id, {}, 'graded')
+        entry.refresh_from_db()
+        return entry
+
+    @override_settings(COURSE_GRADE_REPORT_USERS_PER_TASK=2)
+    def test_generate_in_shards(self):
+        usernames = ['student{}'.format(index) for index in range(5)]
+        for username in usernames:
+            self.create_student(username, '{}@example.com'.format(username))
+
+        entry = self._generate_in_shards()
+
+        self.assertEqual(entry.task_state, SUCCESS)
+        self.assertEqual(json.loads(entry.subtasks)['succeeded'], 3)
+        self.assertDictContainsSubset(
+            {'attempted': 5, 'succeeded': 5, 'failed': 0, 'total': 5},
+            json.loads(entry.task_output),
+        )
+
+        # Only the merged report is listed, and the partial CSVs are deleted.
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        links = report_store.links_for(self.course.id)
+        self.assertEqual(len(links), 1)
+        self.assertFalse(os.listdir(report_store.path_to(self.course.id, 'grade_report_shards/' + entry.task_id)))
+
+        rows = report_store.read_rows(self.course.id, links[0][0])
+        self.assertEqual(rows[0][:3], ['Student ID', 'Email', 'Username'])
+        self.assertEqual([row[2] for row in rows[1:]], usernames)
+
+    @override_settings(COURSE_GRADE_REPORT_USERS_PER_TASK=2)
+    @patch('lms.djangoapps.instructor_task.tasks_helper.grades.CourseGradeReport._merge_shards')
+    def test_generate_in_shards_in_progress_until_merged(self, mock_merge_shards):
+        for index in range(3):
+            self.create_student('student{}'.format(index))
+
+        entry = self._generate_in_shards()
+
+        self.assertEqual(mock_merge_shards.call_count, 1)
+        self.assertEqual(entry.task_state, PROGRESS)
+        self.assertEqual(json.loads(entry.subtasks)['succeeded'], 2)
+
+    @override_settings(COURSE_GRADE_REPORT_USERS_PER_TASK=2)
+    def test_generate_in_shards_with_fewer_learners(self):
+        students = [self.create_student('student{}'.format(index)) for index in range(5)]
+
+        def _unenroll_last_student(shard_index):
+            if shard_index == 0:
+                CourseEnrollment.unenroll(students[-1], self.course.id)
+
+        entry = self._generate_in_shards(before_shard=_unenroll_last_student)
+
+        # The task expects the shards that were queued, including the last
+        # one, which no longer has any learners to grade.
+        self.assertEqual(entry.task_state, SUCCESS)
+        self.assertEqual(self.shard_task.subtask.call_count, 3)
+        self.assertEqual(json.loads(entry.subtasks)['total'], 3)
+        self.assertEqual(json.loads(entry.subtasks)['succeeded'], 3)
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        links = report_store.links_for(self.course.id)
+        self.assertEqual(len(links), 1)
+        rows = report_store.read_rows(self.course.id, links[0][0])
+        self.assertEqual([row[2] for row in rows[1:]], ['student{}'.format(index) for index in range(4)])
+
+    @override_settings(COURSE_GRADE_REPORT_USERS_PER_TASK=2)
+    @patch('lms.djangoapps.instructor_task.tasks_helper.grades.CourseGradeReport._rows_for_users')
+    def test_generate_in_shards_failure(self, mock_rows_for_users):
+        for index in range(3):
+            self.create_student('student{}'.format(index))
+        mock_rows_for_users.side_effect = [([], []), ValueError('Cannot grade shard')]
+
+        with self.assertRaises(ValueError):
+            self._generate_in_shards()
+
+        entry = InstructorTask.objects.get(course_id=self.course.id)
+        self.assertEqual(entry.task_state, FAILURE)
+        self.assertEqual(ReportStore.from_config(config_name='GRADES_DOWNLOAD').links_for(self.course.id), [])
+
     @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
     @patch('lms.djangoapps.grades.course_grade_factory.CourseGradeFactory.iter')
     def test_grading_failure(self, mock_grades_iter, _mock_current_task):
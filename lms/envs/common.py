@@ -840,6 +840,11 @@ CACHES = {
     },
 }
 
+# Maximum total size, in bytes of uncompressed pickles, of the split modulestore
+# course structures to keep in the memory of each process in front of the
+# 'course_structure_cache', or 0 to disable the per-process cache.
+COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES = 0
+
 ############################ OAUTH2 Provider ###################################
 OAUTH_EXPIRE_CONFIDENTIAL_CLIENT_DAYS = 365
 OAUTH_EXPIRE_PUBLIC_CLIENT_DAYS = 30
@@ -1277,6 +1282,18 @@ MODULESTORE = {
     }
 }
 
+# Profiler of the modulestore and contentstore queries made by each request.
+# See openedx.core.lib.modulestore_profiler.
+MODULESTORE_QUERY_PROFILER = {
+    'ENABLED': False,
+    # Add an X-Modulestore-Queries header summarizing the queries to responses.
+    'HEADER': False,
+    # Measure the size of each reply from MongoDB, which requires encoding it again.
+    'MEASURE_REPLY_SIZE': False,
+    # Log a summary of the queries of requests making at least this many round trips to MongoDB.
+    'LOG_THRESHOLD': 50,
+}
+
 DATABASES = {
     # edxapp's edxapp-migrate scripts and the edxapp_migrate play
     # will ensure that any DB not named read_replica will be migrated
@@ -1339,6 +1356,17 @@ CODE_JAIL = {
     # on the /debug/run_python page, the key is 'debug_run_python').
     # Values should be dictionaries that look like 'limits'.
     "limit_overrides": {},
+
+    # Pool of warm sandboxed Pythons running jailed code in forked children,
+    # instead of spawning a sandboxed Python per execution.
+    # See common/lib/capa/capa/safe_exec/worker_pool.py.
+    'worker_pool': {
+        'ENABLED': False,
+        # How many workers does each process start?
+        'SIZE': 2,
+        # How many jobs does a worker run before it's replaced?
+        'MAX_JOBS': 100,
+    },
 }
 
 # Some courses are allowed to run unsafe code. This is a list of regexes, one
@@ -1351,6 +1379,11 @@ CODE_JAIL = {
 #   ]
 COURSES_WITH_UNSAFE_CODE = []
 
+# Maximum total size, in bytes of serialized XML, of the parsed and pre-processed
+# capa problem trees to keep in the memory of each process, so that problems aren't
+# parsed again for every learner, or 0 to disable the cache.
+CAPA_PARSED_PROBLEM_CACHE_MAX_BYTES = 0
+
 ############################### DJANGO BUILT-INS ###############################
 # Change DEBUG in your environment settings files, not here
 DEBUG = False
@@ -1694,6 +1727,9 @@ MIDDLEWARE = [
     # Cookie monitoring
     'openedx.core.lib.request_utils.CookieMonitoringMiddleware',
 
+    # Modulestore query profiling
+    'openedx.core.lib.modulestore_profiler.ModulestoreQueryProfilerMiddleware',
+
     'lms.djangoapps.mobile_api.middleware.AppVersionUpgrade',
     'openedx.core.djangoapps.header_control.middleware.HeaderControlMiddleware',
     'lms.djangoapps.discussion.django_comment_client.middleware.AjaxExceptionMiddleware',
@@ -2364,6 +2400,11 @@ BLOCK_STRUCTURES_SETTINGS = dict(
 
     # Backend storage options
     PRUNING_ACTIVE=False,
+
+    # Maximum number of deserialized collected block structures to keep
+    # in the memory of each process, or 0 to disable the per-process cache.
+    # The cache is only used when storage backing is enabled.
+    PROCESS_CACHE_SIZE=0,
 )
 
 ################################ Bulk Email ###################################
@@ -3046,6 +3087,14 @@ BADGR_TIMEOUT = 10
 # the ones that contain information other than grades.
 GRADES_DOWNLOAD_ROUTING_KEY = HIGH_MEM_QUEUE
 
+# Number of learners graded by each subtask of a course grade report when
+# the instructor_task.parallel_course_grade_report waffle switch is enabled.
+COURSE_GRADE_REPORT_USERS_PER_TASK = 5000
+
+# Number of StudentModules rescored by each subtask of a problem rescore when
+# the instructor_task.parallel_rescore waffle switch is enabled.
+RESCORE_STUDENT_MODULES_PER_TASK = 2000
+
 POLICY_CHANGE_GRADES_ROUTING_KEY = 'edx.lms.core.default'
 
 RECALCULATE_GRADES_ROUTING_KEY = 'edx.lms.core.default'
@@ -3552,6 +3601,15 @@ CREDENTIALS_PUBLIC_SERVICE_URL = 'http://localhost:8005'
 
 COMMENTS_SERVICE_URL = 'http://localhost:18080'
 COMMENTS_SERVICE_KEY = 'password'
+# Pool of keep-alive connections to the comments service, used when ENABLED.  Only
+# idempotent requests are retried, up to MAX_RETRIES times.
+COMMENTS_SERVICE_HTTP_POOL = {
+    'ENABLED': False,
+    'POOL_CONNECTIONS': 1,
+    'POOL_MAXSIZE': 10,
+    'MAX_RETRIES': 2,
+    'BACKOFF_FACTOR': 0.1,
+}
 
 # Reverification checkpoint name pattern
 CHECKPOINT_PATTERN = r'(?P<checkpoint_name>[^/]+)'
@@ -3567,6 +3625,27 @@ FIELD_OVERRIDE_PROVIDERS = ()
 MODULESTORE_FIELD_OVERRIDE_PROVIDERS = ('openedx.features.content_type_gating.'
                                         'field_override.ContentTypeGatingFieldOverride',)
 
+# Cross-request cache of the StudentModule state of each user in each course, used
+# when rendering courseware.  See lms.djangoapps.courseware.student_module_cache.
+STUDENT_MODULE_STATE_CACHE = {
+    'ENABLED': False,
+    # Use cached state without adding state read from the database to the cache,
+    # for instance when reading from a replica database.
+    'READ_ONLY': False,
+    'CACHE_NAME': 'default',
+    'TIMEOUT': 60 * 60,
+}
+
+# Write-behind buffer of changes to low-value XBlock user state fields, which are
+# written to StudentModule in bulk.  See lms.djangoapps.courseware.student_module_write_buffer.
+STUDENT_MODULE_WRITE_BEHIND = {
+    'ENABLED': False,
+    'FIELDS': {
+        'video': ['saved_video_position', 'speed'],
+    },
+    'WINDOW': 60,
+}
+
 # PROFILE IMAGE CONFIG
 # WARNING: Certain django storage backends do not support atomic
 # file overwrites (including the default, OverwriteStorage) - instead
@@ -224,6 +224,9 @@ if ENV_TOKENS.get('SESSION_COOKIE_NAME', None):
     SESSION_COOKIE_NAME = str(ENV_TOKENS.get('SESSION_COOKIE_NAME'))
 
 CACHES = ENV_TOKENS['CACHES']
+COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES = ENV_TOKENS.get(
+    'COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES', COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES
+)
 # Cache used for location mapping -- called many times with the same key/value
 # in a given request.
 if 'loc_cache' not in CACHES:
@@ -334,6 +337,7 @@ LOGGING = get_logger_config(LOG_DIR,
 COURSE_LISTINGS = ENV_TOKENS.get('COURSE_LISTINGS', {})
 COMMENTS_SERVICE_URL = ENV_TOKENS.get("COMMENTS_SERVICE_URL", '')
 COMMENTS_SERVICE_KEY = ENV_TOKENS.get("COMMENTS_SERVICE_KEY", '')
+COMMENTS_SERVICE_HTTP_POOL.update(ENV_TOKENS.get('COMMENTS_SERVICE_HTTP_POOL', {}))
 CERT_QUEUE = ENV_TOKENS.get("CERT_QUEUE", 'test-pull')
 
 # git repo loading  environment
@@ -351,6 +355,9 @@ for name, value in ENV_TOKENS.get("CODE_JAIL", {}).items():
         CODE_JAIL[name] = value
 
 COURSES_WITH_UNSAFE_CODE = ENV_TOKENS.get("COURSES_WITH_UNSAFE_CODE", [])
+CAPA_PARSED_PROBLEM_CACHE_MAX_BYTES = ENV_TOKENS.get(
+    'CAPA_PARSED_PROBLEM_CACHE_MAX_BYTES', CAPA_PARSED_PROBLEM_CACHE_MAX_BYTES
+)
 
 # Event Tracking
 if "TRACKING_IGNORE_URL_PATTERNS" in ENV_TOKENS:
@@ -443,6 +450,9 @@ MODULESTORE_FIELD_OVERRIDE_PROVIDERS = ENV_TOKENS.get(
     MODULESTORE_FIELD_OVERRIDE_PROVIDERS
 )
 
+STUDENT_MODULE_STATE_CACHE.update(ENV_TOKENS.get('STUDENT_MODULE_STATE_CACHE', {}))
+STUDENT_MODULE_WRITE_BEHIND.update(ENV_TOKENS.get('STUDENT_MODULE_WRITE_BEHIND', {}))
+
 XBLOCK_FIELD_DATA_WRAPPERS = ENV_TOKENS.get(
     'XBLOCK_FIELD_DATA_WRAPPERS',
     XBLOCK_FIELD_DATA_WRAPPERS
@@ -498,6 +508,7 @@ XQUEUE_INTERFACE = AUTH_TOKENS['XQUEUE_INTERFACE']
 # Get the MODULESTORE from auth.json, but if it doesn't exist,
 # use the one from common.py
 MODULESTORE = convert_module_store_setting_if_needed(AUTH_TOKENS.get('MODULESTORE', MODULESTORE))
+MODULESTORE_QUERY_PROFILER.update(ENV_TOKENS.get('MODULESTORE_QUERY_PROFILER', {}))
 MONGODB_LOG = AUTH_TOKENS.get('MONGODB_LOG', {})
 
 EMAIL_HOST_USER = AUTH_TOKENS.get('EMAIL_HOST_USER', '')  # django default is ''
@@ -582,6 +593,16 @@ GRADES_DOWNLOAD_ROUTING_KEY = ENV_TOKENS.get('GRADES_DOWNLOAD_ROUTING_KEY', HIGH
 
 GRADES_DOWNLOAD = ENV_TOKENS.get("GRADES_DOWNLOAD", GRADES_DOWNLOAD)
 
+COURSE_GRADE_REPORT_USERS_PER_TASK = ENV_TOKENS.get(
+    'COURSE_GRADE_REPORT_USERS_PER_TASK',
+    COURSE_GRADE_REPORT_USERS_PER_TASK
+)
+
+RESCORE_STUDENT_MODULES_PER_TASK = ENV_TOKENS.get(
+    'RESCORE_STUDENT_MODULES_PER_TASK',
+    RESCORE_STUDENT_MODULES_PER_TASK
+)
+
 # Rate limit for regrading tasks that a grading policy change can kick off
 
 # financial reports
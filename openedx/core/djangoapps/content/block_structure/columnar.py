@@ -0,0 +1,448 @@
+"""
+Columnar serialization format for collected BlockStructures.
+
+The default serialization of a block structure (see store.py) is a single
+zlib-compressed pickle of the structure's relations, transformer data and
+block data map.  Loading it requires decompressing and unpickling every
+collected field of every block, even though a given request typically only
+reads a handful of fields.
+
+This module implements an alternative, versioned format in which:
+
+    * every usage key is stored exactly once, and all other sections refer
+      to blocks by their integer index into that key table;
+    * block relations are stored as flat integer arrays;
+    * each collected xBlock field and each transformer block field is stored
+      in its own independently compressed column.
+
+Columns are only decompressed and unpickled the first time one of their
+values is accessed, so the cost of loading a structure is proportional to
+the fields that are actually read rather than to all collected data.
+
+Layout (all integers are big-endian in the header and little-endian in the
+index arrays):
+
+    +--------+---------+------------+-----------------+------------------+
+    | MAGIC  | VERSION | TOC LENGTH | TOC (zpickle)   | SEGMENTS ...     |
+    | 4 bytes| uint16  | uint32     | TOC LENGTH bytes|                  |
+    +--------+---------+------------+-----------------+------------------+
+
+The table of contents maps each section to an (offset, length) pair relative
+to the start of the segments, so the serialized data can be read from any
+object supporting the buffer protocol (bytes, or an mmap of the stored file)
+without copying the undecoded columns.
+"""
+
+
+import pickle
+import struct
+import sys
+import zlib
+from array import array
+from copy import deepcopy
+
+from six.moves.collections_abc import MutableMapping  # pylint: disable=import-error
+
+from .block_structure import BlockData, TransformerData, _BlockRelations
+
+# Magic prefix identifying data serialized in the columnar format. It can
+# never be confused with the legacy zpickle format, which always starts with
+# a zlib header byte.
+MAGIC = b'BSCF'
+
+# The version of the columnar format. Increment whenever the layout changes.
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct('!4sHI')
+
+_PICKLE_PROTOCOL = 4
+
+# Typecode of the integer arrays used for block indices.
+_INDEX_TYPECODE = 'I'
+
+
+class ColumnarFormatError(Exception):
+    """
+    Raised when data cannot be parsed in the columnar format.
+    """
+    pass
+
+
+def is_columnar(serialized_data):
+    """
+    Returns whether the given serialized data is in the columnar format.
+    """
+    return bytes(serialized_data[:len(MAGIC)]) == MAGIC
+
+
+def serialize(block_structure):
+    """
+    Serializes the given block structure into the columnar format.
+
+    Arguments:
+        block_structure (BlockStructureBlockData) - The block structure
+            that is to be serialized.
+
+    Returns:
+        bytes - The serialized data.
+    """
+    # pylint: disable=protected-access
+    block_relations = block_structure._block_relations
+    block_data_map = block_structure._block_data_map
+
+    # Intern the usage keys; blocks with relations come first.
+    usage_keys = list(block_relations)
+    usage_keys.extend(key for key in block_data_map if key not in block_relations)
+    key_index = {usage_key: index for index, usage_key in enumerate(usage_keys)}
+
+    writer = _SegmentWriter()
+    toc = {
+        'keys': writer.add(_dumps(usage_keys)),
+        'num_related_blocks': len(block_relations),
+        'children': _write_relations(writer, key_index, usage_keys, block_relations, 'children'),
+        'parents': _write_relations(writer, key_index, usage_keys, block_relations, 'parents'),
+        'transformer_data': writer.add(_dumps(block_structure.transformer_data)),
+    }
+
+    data_blocks = []
+    field_columns = _ColumnBuilder()
+    transformer_blocks = {}
+    transformer_columns = {}
+    for usage_key, block_data in block_data_map.items():
+        index = key_index[usage_key]
+        data_blocks.append(index)
+        field_columns.add(index, block_data.fields)
+        for transformer_name, transformer_block_data in block_data.transformer_data.items():
+            transformer_blocks.setdefault(transformer_name, []).append(index)
+            transformer_columns.setdefault(transformer_name, _ColumnBuilder()).add(
+                index, transformer_block_data.fields,
+            )
+
+    toc['data_blocks'] = writer.add(_pack_indices(data_blocks))
+    toc['fields'] = field_columns.write(writer, len(data_blocks))
+    toc['transformer_blocks'] = {
+        transformer_name: writer.add(_pack_indices(indices))
+        for transformer_name, indices in transformer_blocks.items()
+    }
+    toc['transformer_fields'] = {
+        transformer_name: columns.write(writer, len(transformer_blocks[transformer_name]))
+        for transformer_name, columns in transformer_columns.items()
+    }
+
+    encoded_toc = _dumps(toc)
+    return b''.join(
+        [_HEADER.pack(MAGIC, FORMAT_VERSION, len(encoded_toc)), encoded_toc] + writer.segments
+    )
+
+
+def deserialize(serialized_data):
+    """
+    Deserializes data in the columnar format.
+
+    Block relations and the usage key table are decoded eagerly. The
+    collected fields of each block are exposed through lazy mappings that
+    decode a field's column the first time any of its values is read.
+
+    Arguments:
+        serialized_data (bytes-like) - Data previously returned by
+            serialize; may be any object supporting the buffer protocol.
+
+    Returns:
+        tuple - (block_relations, transformer_data, block_data_map), as
+            expected by BlockStructureFactory.create_new.
+
+    Raises:
+        ColumnarFormatError if the data is not in a supported format.
+    """
+    reader = _SegmentReader(serialized_data)
+    toc = reader.toc
+
+    usage_keys = _loads(reader.read(toc['keys']))
+    block_relations = {}
+    for index in range(toc['num_related_blocks']):
+        block_relations[usage_keys[index]] = _BlockRelations()
+    _read_relations(reader, toc['children'], usage_keys, block_relations, 'children')
+    _read_relations(reader, toc['parents'], usage_keys, block_relations, 'parents')
+
+    transformer_data = _loads(reader.read(toc['transformer_data']))
+
+    data_blocks = _unpack_indices(reader.read(toc['data_blocks']))
+    field_columns = _columns(reader, toc['fields'], data_blocks)
+
+    block_data_map = {}
+    for index in data_blocks:
+        block_data = BlockData(usage_keys[index])
+        block_data.fields = LazyFieldMap(field_columns, index)
+        block_data_map[usage_keys[index]] = block_data
+
+    for transformer_name, blocks_segment in toc['transformer_blocks'].items():
+        transformer_blocks = _unpack_indices(reader.read(blocks_segment))
+        columns = _columns(reader, toc['transformer_fields'][transformer_name], transformer_blocks)
+        for index in transformer_blocks:
+            transformer_block_data = TransformerData()
+            transformer_block_data.fields = LazyFieldMap(columns, index)
+            block_data_map[usage_keys[index]].transformer_data[transformer_name] = transformer_block_data
+
+    return block_relations, transformer_data, block_data_map
+
+
+class LazyFieldMap(MutableMapping):
+    """
+    A mapping of field name to value for a single block, backed by shared
+    lazily-decoded columns.
+
+    Writes and deletions are kept locally so that the underlying columns
+    are never mutated. Copying or pickling a LazyFieldMap materializes it
+    into a plain dict.
+    """
+    __slots__ = ('_columns', '_index', '_local', '_deleted')
+
+    def __init__(self, columns, index):
+        self._columns = columns
+        self._index = index
+        self._local = {}
+        self._deleted = set()
+
+    def __getitem__(self, field_name):
+        if field_name in self._local:
+            return self._local[field_name]
+        if field_name not in self._deleted:
+            column = self._columns.get(field_name)
+            if column is not None and column.contains(self._index):
+                return column.value(self._index)
+        raise KeyError(field_name)
+
+    def __contains__(self, field_name):
+        if field_name in self._local:
+            return True
+        if field_name in self._deleted:
+            return False
+        column = self._columns.get(field_name)
+        return column is not None and column.contains(self._index)
+
+    def __setitem__(self, field_name, value):
+        self._local[field_name] = value
+        self._deleted.discard(field_name)
+
+    def __delitem__(self, field_name):
+        if field_name not in self:
+            raise KeyError(field_name)
+        self._local.pop(field_name, None)
+        self._deleted.add(field_name)
+
+    def __iter__(self):
+        for field_name in self._local:
+            yield field_name
+        for field_name, column in self._columns.items():
+            if field_name not in self._local and field_name not in self._deleted and column.contains(self._index):
+                yield field_name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __deepcopy__(self, memo):
+        return deepcopy(dict(self), memo)
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class _Column(object):
+    """
+    A single collected field, stored for a subset of blocks.
+
+    Values are decompressed and unpickled the first time they are read.
+    """
+    def __init__(self, reader, values_segment, positions):
+        self._reader = reader
+        self._values_segment = values_segment
+        self._positions = positions
+        self._values = None
+
+    def contains(self, index):
+        """
+        Returns whether the block at the given index has a value in this column.
+        """
+        return index in self._positions
+
+    def value(self, index):
+        """
+        Returns the value of the block at the given index.
+        """
+        if self._values is None:
+            self._values = _loads(self._reader.read(self._values_segment))
+        return self._values[self._positions[index]]
+
+
+class _ColumnBuilder(object):
+    """
+    Accumulates the per-field columns for a set of blocks.
+    """
+    def __init__(self):
+        self._indices = {}
+        self._values = {}
+
+    def add(self, index, fields):
+        """
+        Adds the given fields of the block at the given index.
+        """
+        for field_name, value in fields.items():
+            self._indices.setdefault(field_name, []).append(index)
+            self._values.setdefault(field_name, []).append(value)
+
+    def write(self, writer, num_blocks):
+        """
+        Writes the columns with the given writer and returns their table
+        of contents, a dict mapping field name to a pair of
+        (indices segment, values segment).  The indices segment is None
+        for dense columns, which have a value for each of the num_blocks
+        blocks, in the order in which they were added.
+        """
+        toc = {}
+        for field_name, indices in self._indices.items():
+            indices_segment = None if len(indices) == num_blocks else writer.add(_pack_indices(indices))
+            toc[field_name] = (indices_segment, writer.add(_dumps(self._values[field_name])))
+        return toc
+
+
+class _SegmentWriter(object):
+    """
+    Accumulates serialized segments and tracks their offsets.
+    """
+    def __init__(self):
+        self.segments = []
+        self._offset = 0
+
+    def add(self, segment):
+        """
+        Adds the given segment and returns its (offset, length).
+        """
+        self.segments.append(segment)
+        location = (self._offset, len(segment))
+        self._offset += len(segment)
+        return location
+
+
+class _SegmentReader(object):
+    """
+    Provides access to the table of contents and the segments of
+    serialized columnar data.
+    """
+    def __init__(self, serialized_data):
+        view = memoryview(serialized_data)
+        try:
+            magic, version, toc_length = _HEADER.unpack_from(view)
+        except struct.error:
+            raise ColumnarFormatError(u'Serialized data is too short.')
+        if magic != MAGIC:
+            raise ColumnarFormatError(u'Serialized data is not in the columnar format.')
+        if version != FORMAT_VERSION:
+            raise ColumnarFormatError(u'Unsupported columnar format version {}.'.format(version))
+
+        toc_start = _HEADER.size
+        self.toc = _loads(view[toc_start:toc_start + toc_length])
+        self._segments = view[toc_start + toc_length:]
+
+    def read(self, location):
+        """
+        Returns a view of the segment at the given (offset, length).
+        """
+        offset, length = location
+        return self._segments[offset:offset + length]
+
+
+def _columns(reader, columns_toc, owner_indices):
+    """
+    Returns a dict of field name to _Column for the given table of
+    contents, where owner_indices are the indices of all blocks the
+    columns were written for.
+    """
+    dense_positions = None
+    columns = {}
+    for field_name, (indices_segment, values_segment) in columns_toc.items():
+        if indices_segment is None:
+            if dense_positions is None:
+                dense_positions = _positions(owner_indices)
+            positions = dense_positions
+        else:
+            positions = _positions(_unpack_indices(reader.read(indices_segment)))
+        columns[field_name] = _Column(reader, values_segment, positions)
+    return columns
+
+
+def _write_relations(writer, key_index, usage_keys, block_relations, relation_name):
+    """
+    Writes the given relation (children or parents) of all related blocks
+    as a pair of segments: the number of relatives of each block, and the
+    flattened indices of all relatives.
+    """
+    counts = []
+    relatives = []
+    for usage_key in usage_keys[:len(block_relations)]:
+        related_keys = getattr(block_relations[usage_key], relation_name)
+        counts.append(len(related_keys))
+        relatives.extend(key_index[related_key] for related_key in related_keys)
+    return writer.add(_pack_indices(counts)), writer.add(_pack_indices(relatives))
+
+
+def _read_relations(reader, relations_toc, usage_keys, block_relations, relation_name):
+    """
+    Reads the relation written by _write_relations into the given
+    block_relations.
+    """
+    counts_segment, relatives_segment = relations_toc
+    counts = _unpack_indices(reader.read(counts_segment))
+    relatives = _unpack_indices(reader.read(relatives_segment))
+    start = 0
+    for index, count in enumerate(counts):
+        setattr(
+            block_relations[usage_keys[index]],
+            relation_name,
+            [usage_keys[relative] for relative in relatives[start:start + count]],
+        )
+        start += count
+
+
+def _positions(indices):
+    """
+    Returns a map of block index to its position in the given indices.
+    """
+    return {index: position for position, index in enumerate(indices)}
+
+
+def _pack_indices(indices):
+    """
+    Returns the given list of non-negative integers as compressed bytes.
+    """
+    packed = array(_INDEX_TYPECODE, indices)
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return zlib.compress(packed.tobytes())
+
+
+def _unpack_indices(segment):
+    """
+    Returns the array of integers packed by _pack_indices.
+    """
+    unpacked = array(_INDEX_TYPECODE)
+    unpacked.frombytes(zlib.decompress(segment))
+    if sys.byteorder == 'big':
+        unpacked.byteswap()
+    return unpacked
+
+
+def _dumps(value):
+    """
+    Returns the compressed pickled serialization of the given value.
+    """
+    return zlib.compress(pickle.dumps(value, _PICKLE_PROTOCOL))
+
+
+def _loads(segment):
+    """
+    Returns the value serialized by _dumps.
+    """
+    return pickle.loads(zlib.decompress(segment))
@@ -0,0 +1,124 @@
+"""
+Command to compare the zpickle and columnar serialization formats of
+collected course blocks.
+"""
+
+
+import timeit
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+import openedx.core.djangoapps.content.block_structure.api as api
+from openedx.core.djangoapps.content.block_structure import columnar
+from openedx.core.lib.cache_utils import zpickle, zunpickle
+from openedx.core.lib.command_utils import parse_course_keys
+
+
+def _zpickle_serialize(block_structure):
+    """
+    Serializes the given block structure as done by the default store format.
+    """
+    # pylint: disable=protected-access
+    return zpickle((
+        block_structure._block_relations,
+        block_structure.transformer_data,
+        block_structure._block_data_map,
+    ))
+
+
+def _zpickle_deserialize(serialized_data):
+    """
+    Deserializes data in the default store format.
+    """
+    return zunpickle(serialized_data)
+
+
+FORMATS = (
+    (u'zpickle', _zpickle_serialize, _zpickle_deserialize),
+    (u'columnar', columnar.serialize, columnar.deserialize),
+)
+
+
+class Command(BaseCommand):
+    """
+    Reports, for each serialization format, the serialized size, the time to
+    serialize, the time to load the structure and read the requested fields
+    of every block, and the peak memory allocated while loading.
+
+    Example usage:
+        $ ./manage.py lms benchmark_block_structure_serialization --courses 'course-v1:edX+DemoX+Demo_Course'
+        $ ./manage.py lms benchmark_block_structure_serialization --courses 'course-v1:edX+DemoX+Demo_Course' \
+            --fields display_name start --iterations 20 --settings=devstack
+    """
+    help = u'Benchmarks the serialization formats of collected course blocks for one or more courses.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--courses',
+            dest='courses',
+            nargs='+',
+            required=True,
+            help=u'Benchmark course blocks of the list of courses provided.',
+        )
+        parser.add_argument(
+            '--fields',
+            dest='fields',
+            nargs='*',
+            default=[u'display_name', u'category', u'start'],
+            help=u'xBlock fields to read from every block after loading, mimicking a transformer.',
+        )
+        parser.add_argument(
+            '--iterations',
+            dest='iterations',
+            default=10,
+            type=int,
+            help=u'Number of times each measurement is repeated; the best time is reported.',
+        )
+
+    def handle(self, *args, **options):
+        for course_key in parse_course_keys(options['courses']):
+            block_structure = api.get_course_in_cache(course_key)
+            self.stdout.write(u'{}: {} blocks'.format(course_key, len(block_structure)))
+            for format_name, serialize, deserialize in FORMATS:
+                self._benchmark_format(
+                    format_name, serialize, deserialize, block_structure, options['fields'], options['iterations'],
+                )
+
+    def _benchmark_format(self, format_name, serialize, deserialize, block_structure, fields, iterations):
+        """
+        Benchmarks a single serialization format on the given block structure.
+        """
+        serialized_data = serialize(block_structure)
+
+        def load_and_read():
+            """
+            Loads the serialized data and reads the requested fields of all blocks.
+            """
+            _, _, block_data_map = deserialize(serialized_data)
+            for block_data in block_data_map.values():
+                for field_name in fields:
+                    getattr(block_data, field_name, None)
+
+        serialize_time = min(timeit.repeat(lambda: serialize(block_structure), number=1, repeat=iterations))
+        load_time = min(timeit.repeat(lambda: deserialize(serialized_data), number=1, repeat=iterations))
+        load_and_read_time = min(timeit.repeat(load_and_read, number=1, repeat=iterations))
+
+        tracemalloc.start()
+        try:
+            load_and_read()
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.stdout.write(
+            u'  {:<10} size: {:>10} bytes  serialize: {:>8.1f} ms  load: {:>8.1f} ms  '
+            u'load+read: {:>8.1f} ms  peak memory: {:>10} bytes'.format(
+                format_name,
+                len(serialized_data),
+                serialize_time * 1000,
+                load_time * 1000,
+                load_and_read_time * 1000,
+                peak_memory,
+            )
+        )
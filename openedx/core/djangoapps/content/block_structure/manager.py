@@ -11,6 +11,7 @@ import six
 from . import config
 from .exceptions import BlockStructureNotFound, TransformerDataIncompatible, UsageKeyNotInBlockStructure
 from .factory import BlockStructureFactory
+from .process_cache import get_process_cache
 from .store import BlockStructureStore
 from .transformers import BlockStructureTransformers
 
@@ -45,7 +46,8 @@ class BlockStructureManager(object):
         and modulestore, as needed.
 
         Details: Similar to the get_collected method, except the transformers'
-        transform methods are also called.
+        transform methods are also called.  The transformers are always
+        applied to a private copy of the collected block structure.
 
         Arguments:
             transformers (BlockStructureTransformers) - Collection of
@@ -64,7 +66,10 @@ class BlockStructureManager(object):
             BlockStructureBlockData - A transformed block structure,
                 starting at starting_block_usage_key.
         """
-        block_structure = collected_block_structure.copy() if collected_block_structure else self.get_collected()
+        if collected_block_structure:
+            block_structure = collected_block_structure.copy()
+        else:
+            block_structure = self._get_collected(private_copy=True)
 
         if starting_block_usage_key:
             # Override the root_block_usage_key so traversals start at the
@@ -80,6 +85,87 @@ class BlockStructureManager(object):
         transformers.transform(block_structure)
         return block_structure
 
+    def get_transformed_for_usages(
+            self, transformers_list, starting_block_usage_key=None, collected_block_structure=None,
+    ):
+        """
+        Returns the transformed Block Structures for the root_block_usage_key,
+        one for each of the given collections of transformers, each of which
+        is typically for a different user.
+
+        Details: Equivalent to calling get_transformed for each collection
+        of transformers, except that the collected block structure is only
+        loaded once, and transformers whose outcome is the same for several
+        usages (see BlockStructureTransformer.batch_key) are applied only
+        once for all those usages.  Only the remaining, usage-specific
+        transformers are applied separately for each usage.
+
+        Note: Usages for which all transformers are shared receive the
+        same block structure instance, which must therefore not be
+        modified by the caller.
+
+        Arguments:
+            transformers_list (list[BlockStructureTransformers]) - List of
+                collections of transformers to apply, each with its own
+                usage_info.
+
+            starting_block_usage_key (UsageKey) - Specifies the starting block
+                in the block structure that is to be transformed.
+                If None, root_block_usage_key is used.
+
+            collected_block_structure (BlockStructureBlockData) - A
+                block structure retrieved from a prior call to
+                get_collected.  Can be optionally provided if already available,
+                for optimization.
+
+        Returns:
+            list[BlockStructureBlockData] - The transformed block structures,
+                starting at starting_block_usage_key, in the same order as
+                transformers_list.
+        """
+        if collected_block_structure is None:
+            collected_block_structure = self.get_collected()
+        if starting_block_usage_key and starting_block_usage_key not in collected_block_structure:
+            raise UsageKeyNotInBlockStructure(
+                u"The requested usage_key '{0}' is not found in the block_structure with root '{1}'",
+                six.text_type(starting_block_usage_key),
+                six.text_type(self.root_block_usage_key),
+            )
+        starting_block_usage_key = starting_block_usage_key or collected_block_structure.root_block_usage_key
+
+        collected_snapshot = BlockStructureFactory.create_snapshot(collected_block_structure)
+        # Map of batch key to the block structure transformed by the
+        # shared transformers for that key.
+        shared_structures = {}
+        # Map of batch key to the snapshot of the shared block structure,
+        # created the first time a usage needs a copy to transform.
+        shared_snapshots = {}
+
+        block_structures = []
+        for transformers in transformers_list:
+            batch_key, shared, remaining = transformers.split_for_batch(collected_block_structure)
+            if batch_key not in shared_structures:
+                block_structure = BlockStructureFactory.create_from_snapshot(
+                    starting_block_usage_key, collected_snapshot,
+                )
+                block_structure.set_root_block(starting_block_usage_key)
+                shared.transform(block_structure)
+                shared_structures[batch_key] = block_structure
+
+            if remaining.is_empty():
+                block_structures.append(shared_structures[batch_key])
+                continue
+
+            if batch_key not in shared_snapshots:
+                shared_snapshots[batch_key] = BlockStructureFactory.create_snapshot(shared_structures[batch_key])
+            block_structure = BlockStructureFactory.create_from_snapshot(
+                starting_block_usage_key, shared_snapshots[batch_key],
+            )
+            remaining.transform(block_structure)
+            block_structures.append(block_structure)
+
+        return block_structures
+
     def get_collected(self):
         """
         Returns the collected Block Structure for the root_block_usage_key,
@@ -89,11 +175,58 @@ class BlockStructureManager(object):
         the modulestore is accessed if needed (at cache miss), and the
         transformers data is collected if needed.
 
+        When the per-process cache is enabled, the returned block
+        structure may be shared with other callers in this process and
+        must not be modified.
+
         Returns:
             BlockStructureBlockData - A collected block structure,
                 starting at root_block_usage_key, with collected data
                 from each registered transformer.
         """
+        return self._get_collected(private_copy=False)
+
+    def _get_collected(self, private_copy):
+        """
+        Returns the collected Block Structure for the root_block_usage_key,
+        first consulting the per-process cache, if enabled.
+
+        Arguments:
+            private_copy (bool) - Whether the caller intends to modify
+                the returned block structure, in which case a structure
+                from the per-process cache is copied before it is returned.
+        """
+        process_cache = get_process_cache()
+        if process_cache is None:
+            return self._get_collected_from_store()
+
+        version_key = self.store.get_version_key(self.root_block_usage_key)
+        if version_key is not None:
+            block_structure = process_cache.get(self.root_block_usage_key, version_key, private_copy)
+            if block_structure is not None:
+                try:
+                    BlockStructureTransformers.verify_versions(block_structure)
+                    return block_structure
+                except TransformerDataIncompatible:
+                    process_cache.delete(self.root_block_usage_key)
+
+        block_structure = self._get_collected_from_store()
+        if version_key is None:
+            # The structure may have just been collected and stored.
+            version_key = self.store.get_version_key(self.root_block_usage_key)
+        if version_key is not None and self.store.is_collected_from_version(block_structure, version_key):
+            # Structures that differ from the stored version, such as ones
+            # replaced by a concurrent update, are not retained.
+            block_structure = process_cache.add(
+                self.root_block_usage_key, version_key, block_structure, private_copy,
+            )
+        return block_structure
+
+    def _get_collected_from_store(self):
+        """
+        Returns the collected Block Structure for the root_block_usage_key
+        from the store, updating the store if needed.
+        """
         try:
             block_structure = BlockStructureFactory.create_from_store(
                 self.root_block_usage_key,
@@ -137,6 +270,9 @@ class BlockStructureManager(object):
         Removes data for the block structure associated with the given
         root block key.
         """
+        process_cache = get_process_cache()
+        if process_cache is not None:
+            process_cache.delete(self.root_block_usage_key)
         self.store.delete(self.root_block_usage_key)
 
     @contextmanager
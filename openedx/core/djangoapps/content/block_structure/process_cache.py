@@ -0,0 +1,185 @@
+"""
+Per-process cache of collected BlockStructures.
+
+Collected block structures only change when course content is published,
+yet every call to BlockStructureManager.get_collected fetches and
+deserializes the structure from the django cache (or storage). This module
+keeps a bounded, least-recently-used set of deserialized collected
+structures in the memory of the current process, keyed by the root block's
+usage key and validated against the version recorded in the block
+structure's model, so the cache requires storage backing to be enabled.
+Entries are also dropped when a course is published in this process.
+
+Cached structures are shared across requests and must therefore never be
+mutated. Callers that need to transform a structure must work on a
+private copy; see the private_copy argument of CollectedBlockStructureCache.get.
+"""
+
+
+from collections import OrderedDict
+from logging import getLogger
+from threading import Lock
+
+from django.conf import settings
+from edx_django_utils.monitoring import set_custom_attribute
+
+from .factory import BlockStructureFactory
+
+logger = getLogger(__name__)  # pylint: disable=C0103
+
+
+class _CacheEntry(object):
+    """
+    A cached collected block structure and the version of the content it
+    was collected from.
+    """
+    def __init__(self, version_key, block_structure):
+        self.version_key = version_key
+        self.block_structure = block_structure
+        self._snapshot = None
+
+    def copy(self):
+        """
+        Returns a private copy of the cached block structure, created from
+        a snapshot of the structure that is taken once per entry.
+        """
+        if self._snapshot is None:
+            self._snapshot = BlockStructureFactory.create_snapshot(self.block_structure)
+        return BlockStructureFactory.create_from_snapshot(self.block_structure.root_block_usage_key, self._snapshot)
+
+
+class CollectedBlockStructureCache(object):
+    """
+    A thread-safe, size-bounded LRU cache of collected block structures,
+    holding at most one version of the structure for each root block.
+    """
+    def __init__(self, max_size):
+        """
+        Arguments:
+            max_size (int) - The maximum number of block structures to
+                keep in the cache.
+        """
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, root_block_usage_key, version_key, private_copy=False):
+        """
+        Returns the cached block structure for the given root block and
+        content version, or None if it is not cached.
+
+        Arguments:
+            root_block_usage_key (UsageKey) - The usage key of the root
+                of the block structure.
+
+            version_key (tuple) - The version of the content the cached
+                block structure must have been collected from.
+
+            private_copy (bool) - If True, a private copy of the cached
+                block structure is returned, which the caller may modify.
+                Otherwise, the shared instance is returned.
+        """
+        entry = self._get_entry(root_block_usage_key, version_key)
+        if entry is None:
+            return None
+        return entry.copy() if private_copy else entry.block_structure
+
+    def add(self, root_block_usage_key, version_key, block_structure, private_copy=False):
+        """
+        Caches the given collected block structure for the given root
+        block and content version, replacing any other version and
+        evicting the least recently used structures as needed.
+
+        The cache takes ownership of the data of the given block
+        structure.  If private_copy is True, a private copy of it is
+        returned for the caller to modify; otherwise the shared instance
+        is returned.
+        """
+        # Only retain the collected data, and not any xBlocks referenced
+        # by a structure that was just collected from the modulestore.
+        # pylint: disable=protected-access
+        block_structure = BlockStructureFactory.create_new(
+            block_structure.root_block_usage_key,
+            block_structure._block_relations,
+            block_structure.transformer_data,
+            block_structure._block_data_map,
+        )
+        entry = _CacheEntry(version_key, block_structure)
+        with self._lock:
+            self._entries.pop(root_block_usage_key, None)
+            self._entries[root_block_usage_key] = entry
+            while len(self._entries) > self.max_size:
+                evicted_key, _ = self._entries.popitem(last=False)
+                self.evictions += 1
+                logger.info(u'BlockStructure: Evicted from process cache; %s.', evicted_key)
+        return entry.copy() if private_copy else block_structure
+
+    def delete(self, root_block_usage_key):
+        """
+        Removes any cached block structure for the given root block.
+        """
+        with self._lock:
+            self._entries.pop(root_block_usage_key, None)
+
+    def clear(self):
+        """
+        Removes all cached block structures and resets the metrics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """
+        Returns a dict of the cache's current size and its cumulative
+        hit, miss and eviction counts.
+        """
+        return {
+            u'size': len(self._entries),
+            u'max_size': self.max_size,
+            u'hits': self.hits,
+            u'misses': self.misses,
+            u'evictions': self.evictions,
+        }
+
+    def _get_entry(self, root_block_usage_key, version_key):
+        """
+        Returns the entry for the given root block if its version matches
+        the given version, updating the LRU order and the metrics.
+        """
+        with self._lock:
+            entry = self._entries.get(root_block_usage_key)
+            if entry is not None and entry.version_key == version_key:
+                self._entries.pop(root_block_usage_key)
+                self._entries[root_block_usage_key] = entry
+                self.hits += 1
+            else:
+                entry = None
+                self.misses += 1
+            stats = self.stats()
+
+        set_custom_attribute(u'block_structure.process_cache.hit', entry is not None)
+        for name, value in stats.items():
+            set_custom_attribute(u'block_structure.process_cache.{}'.format(name), value)
+        return entry
+
+
+_PROCESS_CACHE = None
+
+
+def get_process_cache():
+    """
+    Returns the process-wide CollectedBlockStructureCache, or None if the
+    cache is disabled, which is the case when the PROCESS_CACHE_SIZE
+    setting in BLOCK_STRUCTURES_SETTINGS is not a positive number.
+    """
+    global _PROCESS_CACHE  # pylint: disable=global-statement
+    max_size = settings.BLOCK_STRUCTURES_SETTINGS.get('PROCESS_CACHE_SIZE', 0)
+    if not max_size or max_size < 1:
+        return None
+    if _PROCESS_CACHE is None or _PROCESS_CACHE.max_size != max_size:
+        _PROCESS_CACHE = CollectedBlockStructureCache(max_size)
+    return _PROCESS_CACHE
@@ -9,11 +9,12 @@ from django.conf import settings
 from django.dispatch.dispatcher import receiver
 from opaque_keys.edx.locator import LibraryLocator
 
-from xmodule.modulestore.django import SignalHandler
+from xmodule.modulestore.django import SignalHandler, modulestore
 
 from . import config
 from .api import clear_course_from_cache
 from .models import BlockStructureNotFound
+from .process_cache import get_process_cache
 from .tasks import update_course_in_cache_v2
 
 log = logging.getLogger(__name__)
@@ -29,6 +30,10 @@ def update_block_structure_on_course_publish(sender, course_key, **kwargs):  # p
     if isinstance(course_key, LibraryLocator):
         return
 
+    process_cache = get_process_cache()
+    if process_cache is not None:
+        process_cache.delete(modulestore().make_course_usage_key(course_key))
+
     if config.waffle().is_enabled(config.INVALIDATE_CACHE_ON_PUBLISH):
         try:
             clear_course_from_cache(course_key)
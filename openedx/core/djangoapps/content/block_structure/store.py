@@ -11,7 +11,7 @@ import six
 from django.utils.encoding import python_2_unicode_compatible
 from openedx.core.lib.cache_utils import zpickle, zunpickle
 
-from . import config
+from . import columnar, config
 from .block_structure import BlockStructureBlockData
 from .exceptions import BlockStructureNotFound
 from .factory import BlockStructureFactory
@@ -131,6 +131,34 @@ class BlockStructureStore(object):
 
         return False
 
+    def get_version_key(self, root_block_usage_key):
+        """
+        Returns a hashable key identifying the version of the block
+        structure stored for the given root block, as recorded in its
+        model, or None if storage backing is disabled or no block
+        structure is stored.  Neither the stored data nor the
+        modulestore is read.
+        """
+        if not _is_storage_backing_enabled():
+            return None
+        try:
+            bs_model = self._get_model(root_block_usage_key)
+        except BlockStructureNotFound:
+            return None
+        return self._version_key(self._version_data_of_model(bs_model))
+
+    def is_collected_from_version(self, block_structure, version_key):
+        """
+        Returns whether the given collected block_structure was collected
+        from the data version identified by the given version_key, as
+        returned by get_version_key.
+        """
+        try:
+            root_block = block_structure[block_structure.root_block_usage_key]
+        except KeyError:
+            return False
+        return self._version_key(self._version_data_of_block(root_block)) == version_key
+
     def _get_model(self, root_block_usage_key):
         """
         Returns the model associated with the given key.
@@ -195,7 +223,13 @@ class BlockStructureStore(object):
     def _serialize(self, block_structure):
         """
         Serializes the data for the given block_structure.
+
+        Uses the columnar format when the columnar_serialization
+        waffle switch is enabled, and the zpickle format otherwise.
         """
+        if _is_columnar_serialization_enabled():
+            return columnar.serialize(block_structure)
+
         data_to_cache = (
             block_structure._block_relations,
             block_structure.transformer_data,
@@ -206,10 +240,17 @@ class BlockStructureStore(object):
     def _deserialize(self, serialized_data, root_block_usage_key):
         """
         Deserializes the given data and returns the parsed block_structure.
+
+        The format of the data is detected from its contents, so data
+        serialized in either format can be read regardless of the
+        current value of the columnar_serialization waffle switch.
         """
 
         try:
-            block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
+            if columnar.is_columnar(serialized_data):
+                block_relations, transformer_data, block_data_map = columnar.deserialize(serialized_data)
+            else:
+                block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
         except Exception:
             # Somehow failed to de-serialized the data, assume it's corrupt.
             bs_model = self._get_model(root_block_usage_key)
@@ -251,6 +292,20 @@ class BlockStructureStore(object):
             block_structure_schema_version=six.text_type(BlockStructureBlockData.VERSION),
         )
 
+    @staticmethod
+    def _version_key(version_data):
+        """
+        Returns the version of the content in the given version-relevant
+        data as a tuple.  Schema versions are left out, since they only
+        change with the code of the current process, and the data version
+        is compared as text, since that is how models store it.
+        """
+        data_version = version_data[u'data_version']
+        return (
+            six.text_type(data_version) if data_version is not None else None,
+            version_data[u'data_edit_timestamp'],
+        )
+
     @staticmethod
     def _version_data_of_model(bs_model):
         """
@@ -267,3 +322,10 @@ def _is_storage_backing_enabled():
     Returns whether storage backing for Block Structures is enabled.
     """
     return config.waffle().is_enabled(config.STORAGE_BACKING_FOR_CACHE)
+
+
+def _is_columnar_serialization_enabled():
+    """
+    Returns whether new block structures are serialized in the columnar format.
+    """
+    return config.waffle().is_enabled(config.COLUMNAR_SERIALIZATION)
@@ -0,0 +1,116 @@
+"""
+Tests for columnar.py
+"""
+
+
+import pickle
+# pylint: disable=protected-access
+from copy import deepcopy
+from unittest import TestCase
+
+import ddt
+
+from .. import columnar
+from ..block_structure import BlockStructureBlockData
+from ..factory import BlockStructureFactory
+from .helpers import ChildrenMapTestMixin, MockTransformer, UsageKeyFactoryMixin
+
+
+@ddt.ddt
+class TestColumnarSerialization(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
+    """
+    Tests for the columnar serialization format.
+    """
+    def _create_collected_structure(self, children_map):
+        """
+        Returns a block structure for the given children_map with
+        collected xBlock fields and transformer data.
+        """
+        block_structure = self.create_block_structure(children_map)
+        block_structure._add_transformer(MockTransformer)
+        for block_id in range(len(children_map)):
+            block_key = self.block_key_factory(block_id)
+            block_data = block_structure._get_or_create_block(block_key)
+            block_data.display_name = u'Block {}'.format(block_id)
+            if block_id % 2:
+                block_data.graded = True
+            block_structure.set_transformer_block_field(block_key, MockTransformer, 'index', block_id)
+        return block_structure
+
+    def _round_trip(self, block_structure):
+        """
+        Returns the given block structure after serializing and
+        deserializing it in the columnar format.
+        """
+        serialized_data = columnar.serialize(block_structure)
+        self.assertTrue(columnar.is_columnar(serialized_data))
+        return BlockStructureFactory.create_new(
+            block_structure.root_block_usage_key,
+            *columnar.deserialize(serialized_data)
+        )
+
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_round_trip(self, children_map):
+        block_structure = self._create_collected_structure(children_map)
+        deserialized = self._round_trip(block_structure)
+
+        self.assert_block_structure(deserialized, children_map)
+        self.assertEqual(
+            deserialized.get_transformer_data(MockTransformer, '_version'),
+            MockTransformer.WRITE_VERSION,
+        )
+        for block_id in range(len(children_map)):
+            block_key = self.block_key_factory(block_id)
+            self.assertEqual(deserialized[block_key].location, block_key)
+            self.assertEqual(
+                dict(deserialized[block_key].fields),
+                dict(block_structure[block_key].fields),
+            )
+            self.assertEqual(deserialized.get_xblock_field(block_key, 'graded'), True if block_id % 2 else None)
+            self.assertEqual(
+                deserialized.get_transformer_block_field(block_key, MockTransformer, 'index'),
+                block_id,
+            )
+
+    def test_lazy_field_writes(self):
+        block_structure = self._create_collected_structure(self.SIMPLE_CHILDREN_MAP)
+        deserialized = self._round_trip(block_structure)
+        first_key, second_key = self.block_key_factory(0), self.block_key_factory(1)
+
+        deserialized.override_xblock_field(first_key, 'display_name', u'Overridden')
+        del deserialized[second_key].graded
+
+        self.assertEqual(deserialized.get_xblock_field(first_key, 'display_name'), u'Overridden')
+        self.assertEqual(deserialized.get_xblock_field(second_key, 'display_name'), u'Block 1')
+        self.assertNotIn('graded', deserialized[second_key].fields)
+        self.assertEqual(set(deserialized[second_key].fields), {'display_name'})
+
+    def test_copy_and_pickle(self):
+        block_structure = self._create_collected_structure(self.SIMPLE_CHILDREN_MAP)
+        deserialized = self._round_trip(block_structure)
+        block_key = self.block_key_factory(1)
+
+        copied = deserialized.copy()
+        copied.override_xblock_field(block_key, 'display_name', u'Copy')
+        self.assertIsInstance(copied[block_key].fields, dict)
+        self.assertEqual(deserialized.get_xblock_field(block_key, 'display_name'), u'Block 1')
+
+        unpickled_fields = pickle.loads(pickle.dumps(deserialized[block_key].fields))
+        self.assertEqual(unpickled_fields, {'display_name': u'Block 1', 'graded': True})
+        self.assertEqual(deepcopy(deserialized[block_key].fields), unpickled_fields)
+
+    def test_empty_structure(self):
+        block_structure = BlockStructureBlockData(self.block_key_factory(0))
+        deserialized = self._round_trip(block_structure)
+        self.assertIn(self.block_key_factory(0), deserialized)
+        self.assertEqual(deserialized.get_children(self.block_key_factory(0)), [])
+
+    def test_unsupported_version(self):
+        serialized_data = bytearray(columnar.serialize(self._create_collected_structure(self.LINEAR_CHILDREN_MAP)))
+        serialized_data[len(columnar.MAGIC) + 1] += 1
+        with self.assertRaises(columnar.ColumnarFormatError):
+            columnar.deserialize(bytes(serialized_data))
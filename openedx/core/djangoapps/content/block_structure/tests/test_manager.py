@@ -5,13 +5,16 @@ Tests for manager.py
 
 import ddt
 import six
+from django.conf import settings
 from django.test import TestCase
+from mock import patch
 from edx_toggles.toggles.testutils import override_waffle_switch
 
 from ..block_structure import BlockStructureBlockData
 from ..config import RAISE_ERROR_WHEN_NOT_FOUND, STORAGE_BACKING_FOR_CACHE, waffle_switch
 from ..exceptions import BlockStructureNotFound, UsageKeyNotInBlockStructure
 from ..manager import BlockStructureManager
+from ..process_cache import get_process_cache
 from ..transformers import BlockStructureTransformers
 from .helpers import (
     ChildrenMapTestMixin,
@@ -173,6 +176,31 @@ class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, Test
             with self.assertRaises(UsageKeyNotInBlockStructure):
                 self.bs_manager.get_transformed(self.transformers, starting_block_usage_key=100)
 
+    @ddt.data(None, 'shared')
+    def test_get_transformed_for_usages(self, batch_key):
+        usages_transformers = []
+        with mock_registered_transformers(self.registered_transformers):
+            for _ in range(3):
+                usages_transformers.append(BlockStructureTransformers([TestTransformer1()]))
+            with patch.object(TestTransformer1, 'batch_key', return_value=batch_key):
+                with patch.object(TestTransformer1, 'transform', autospec=True, side_effect=TestTransformer1.transform):
+                    block_structures = self.bs_manager.get_transformed_for_usages(
+                        usages_transformers,
+                        starting_block_usage_key=self.block_key_factory(1),
+                    )
+                    transform_call_count = TestTransformer1.transform.call_count
+
+        assert len(block_structures) == 3
+        for block_structure in block_structures:
+            self.assert_block_structure(block_structure, [[], [3, 4], [], [], []], missing_blocks=[0, 2])
+            TestTransformer1.assert_transformed(block_structure)
+        if batch_key:
+            assert transform_call_count == 1
+            assert block_structures[0] is block_structures[1] is block_structures[2]
+        else:
+            assert transform_call_count == 3
+            assert len({id(block_structure) for block_structure in block_structures}) == 3
+
     def test_get_collected_cached(self):
         self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
         self.collect_and_verify(expect_modulestore_called=False, expect_cache_updated=False)
@@ -227,3 +255,92 @@ class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, Test
         self.bs_manager.clear()
         self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
         assert TestTransformer1.collect_call_count == 2
+
+
+@patch.dict(settings.BLOCK_STRUCTURES_SETTINGS, {'PROCESS_CACHE_SIZE': 2})
+@override_waffle_switch(waffle_switch(STORAGE_BACKING_FOR_CACHE), active=True)
+class TestBlockStructureManagerProcessCache(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
+    """
+    Tests for BlockStructureManager with the per-process cache enabled.
+    """
+
+    def setUp(self):
+        super(TestBlockStructureManagerProcessCache, self).setUp()
+
+        TestTransformer1.collect_call_count = 0
+        self.registered_transformers = [TestTransformer1()]
+        with mock_registered_transformers(self.registered_transformers):
+            self.transformers = BlockStructureTransformers(self.registered_transformers)
+
+        self.children_map = self.SIMPLE_CHILDREN_MAP
+        self.modulestore = MockModulestoreFactory.create(self.children_map, self.block_key_factory)
+        self.cache = MockCache()
+        self.bs_manager = BlockStructureManager(self.block_key_factory(0), self.modulestore, self.cache)
+
+        get_process_cache().clear()
+        self.addCleanup(get_process_cache().clear)
+
+    def test_get_collected_shared(self):
+        with mock_registered_transformers(self.registered_transformers):
+            first = self.bs_manager.get_collected()
+            self.cache.map.clear()
+            second = self.bs_manager.get_collected()
+        assert first is second
+        self.assert_block_structure(second, self.children_map)
+        assert get_process_cache().stats()['hits'] == 1
+        assert TestTransformer1.collect_call_count == 1
+
+    def test_get_collected_without_modulestore(self):
+        with mock_registered_transformers(self.registered_transformers):
+            self.bs_manager.get_collected()
+            self.modulestore.get_items_call_count = 0
+            self.bs_manager.get_collected()
+        assert self.modulestore.get_items_call_count == 0
+        assert get_process_cache().stats()['hits'] == 1
+
+    def test_get_collected_after_update(self):
+        with mock_registered_transformers(self.registered_transformers):
+            first = self.bs_manager.get_collected()
+            self.modulestore.blocks[self.block_key_factory(0)].field_map['course_version'] = u'new_version'
+            self.bs_manager.update_collected_if_needed()
+            second = self.bs_manager.get_collected()
+        assert first is not second
+        assert second[self.block_key_factory(0)].course_version == u'new_version'
+        assert TestTransformer1.collect_call_count == 2
+
+    def test_get_collected_without_storage_backing(self):
+        with override_waffle_switch(waffle_switch(STORAGE_BACKING_FOR_CACHE), active=False):
+            with mock_registered_transformers(self.registered_transformers):
+                first = self.bs_manager.get_collected()
+                second = self.bs_manager.get_collected()
+        assert first is not second
+        assert get_process_cache().stats()['size'] == 0
+
+    def test_get_transformed_does_not_modify_shared(self):
+        with mock_registered_transformers(self.registered_transformers):
+            collected = self.bs_manager.get_collected()
+            for _ in range(2):
+                transformed = self.bs_manager.get_transformed(
+                    self.transformers,
+                    starting_block_usage_key=self.block_key_factory(1),
+                )
+                assert transformed is not collected
+                TestTransformer1.assert_transformed(transformed)
+        self.assert_block_structure(collected, self.children_map)
+        with self.assertRaises(AssertionError):
+            TestTransformer1.assert_transformed(collected)
+
+    def test_clear(self):
+        with mock_registered_transformers(self.registered_transformers):
+            self.bs_manager.get_collected()
+            self.bs_manager.clear()
+            self.bs_manager.get_collected()
+        assert TestTransformer1.collect_call_count == 2
+        assert get_process_cache().stats()['hits'] == 0
+
+    def test_transformer_read_version(self):
+        with mock_registered_transformers(self.registered_transformers):
+            self.bs_manager.get_collected()
+            with patch.object(TestTransformer1, 'READ_VERSION', TestTransformer1.WRITE_VERSION + 1):
+                self.bs_manager.get_collected()
+        assert TestTransformer1.collect_call_count == 2
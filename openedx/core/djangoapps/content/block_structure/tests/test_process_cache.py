@@ -0,0 +1,79 @@
+"""
+Tests for process_cache.py
+"""
+
+
+from unittest import TestCase
+
+from ..process_cache import CollectedBlockStructureCache
+from .helpers import ChildrenMapTestMixin, MockTransformer
+
+
+class TestCollectedBlockStructureCache(ChildrenMapTestMixin, TestCase):
+    """
+    Tests for CollectedBlockStructureCache
+    """
+
+    def setUp(self):
+        super(TestCollectedBlockStructureCache, self).setUp()
+        self.cache = CollectedBlockStructureCache(max_size=2)
+
+    def _create_collected_structure(self, root_block_id):
+        """
+        Returns a block structure rooted at the given block id, with
+        collected transformer data.
+        """
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        block_structure.set_root_block(root_block_id)
+        for block_key in block_structure:
+            block_structure.set_transformer_block_field(block_key, MockTransformer, 'collected', block_key)
+        return block_structure
+
+    def test_get_and_add(self):
+        block_structure = self._create_collected_structure(0)
+        assert self.cache.get(0, 'v1') is None
+
+        shared = self.cache.add(0, 'v1', block_structure)
+        assert self.cache.get(0, 'v1') is shared
+        assert self.cache.get(0, 'v2') is None
+        assert self.cache.stats() == {'size': 1, 'max_size': 2, 'hits': 1, 'misses': 2, 'evictions': 0}
+
+    def test_new_version_replaces_old(self):
+        self.cache.add(0, 'v1', self._create_collected_structure(0))
+        shared = self.cache.add(0, 'v2', self._create_collected_structure(0))
+        assert self.cache.get(0, 'v1') is None
+        assert self.cache.get(0, 'v2') is shared
+        assert self.cache.stats()['size'] == 1
+
+    def test_private_copy(self):
+        shared = self.cache.add(0, 'v1', self._create_collected_structure(0))
+        private = self.cache.get(0, 'v1', private_copy=True)
+        assert private is not shared
+
+        private.set_transformer_block_field(1, MockTransformer, 'collected', 'modified')
+        private.remove_block(2, keep_descendants=False)
+        assert shared.get_transformer_block_field(1, MockTransformer, 'collected') == 1
+        self.assert_block_structure(shared, self.SIMPLE_CHILDREN_MAP)
+
+    def test_lru_eviction(self):
+        for root_block_id in range(2):
+            self.cache.add(root_block_id, 'v1', self._create_collected_structure(root_block_id))
+        # Access the first structure so the second one is least recently used.
+        assert self.cache.get(0, 'v1') is not None
+
+        self.cache.add(2, 'v1', self._create_collected_structure(2))
+        assert self.cache.get(1, 'v1') is None
+        assert self.cache.get(0, 'v1') is not None
+        assert self.cache.get(2, 'v1') is not None
+        assert self.cache.stats()['evictions'] == 1
+
+    def test_delete_and_clear(self):
+        self.cache.add(0, 'v1', self._create_collected_structure(0))
+        self.cache.add(1, 'v1', self._create_collected_structure(1))
+
+        self.cache.delete(0)
+        assert self.cache.get(0, 'v1') is None
+        assert self.cache.get(1, 'v1') is not None
+
+        self.cache.clear()
+        assert self.cache.stats() == {'size': 0, 'max_size': 2, 'hits': 0, 'misses': 0, 'evictions': 0}
@@ -82,3 +82,10 @@ class CourseBlocksSignalTest(ModuleStoreTestCase):
     def test_update_only_for_courses(self, key, expect_update_called, mock_update):
         update_block_structure_on_course_publish(sender=None, course_key=key)
         self.assertEqual(mock_update.called, expect_update_called)
+
+    @patch('openedx.core.djangoapps.content.block_structure.signals.get_process_cache')
+    def test_process_cache_invalidation(self, mock_get_process_cache):
+        self.course.display_name = "Padawan 101"
+        self.store.update_item(self.course, self.user.id)
+
+        mock_get_process_cache.return_value.delete.assert_called_with(self.course_usage_key)
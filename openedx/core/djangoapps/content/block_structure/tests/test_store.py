@@ -3,12 +3,14 @@ Tests for block_structure/cache.py
 """
 
 
+import itertools
+
 import ddt
 from edx_toggles.toggles.testutils import override_waffle_switch
 
 from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
 
-from ..config import STORAGE_BACKING_FOR_CACHE, waffle_switch
+from ..config import COLUMNAR_SERIALIZATION, STORAGE_BACKING_FOR_CACHE, waffle_switch
 from ..config.models import BlockStructureConfiguration
 from ..exceptions import BlockStructureNotFound
 from ..store import BlockStructureStore
@@ -60,6 +62,20 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
             self.assertIsNotNone(stored_value)
             self.assert_block_structure(stored_value, self.children_map)
 
+    @ddt.data(*itertools.product((True, False), (True, False)))
+    @ddt.unpack
+    def test_add_and_get_columnar(self, with_storage_backing, columnar_on_read):
+        with override_waffle_switch(waffle_switch(STORAGE_BACKING_FOR_CACHE), active=with_storage_backing):
+            with override_waffle_switch(waffle_switch(COLUMNAR_SERIALIZATION), active=True):
+                self.store.add(self.block_structure)
+            with override_waffle_switch(waffle_switch(COLUMNAR_SERIALIZATION), active=columnar_on_read):
+                stored_value = self.store.get(self.block_structure.root_block_usage_key)
+            self.assert_block_structure(stored_value, self.children_map)
+            self.assertEqual(
+                stored_value.get_transformer_block_field(self.block_key_factory(0), MockTransformer, 'test'),
+                u'{} val'.format(MockTransformer.name()),
+            )
+
     @ddt.data(True, False)
     def test_delete(self, with_storage_backing):
         with override_waffle_switch(waffle_switch(STORAGE_BACKING_FOR_CACHE), active=with_storage_backing):
@@ -5,6 +5,7 @@ Tests for transformers.py
 
 from unittest import TestCase
 
+import ddt
 from mock import MagicMock, patch
 
 from ..block_structure import BlockStructureModulestoreData
@@ -13,6 +14,7 @@ from ..transformers import BlockStructureTransformers
 from .helpers import ChildrenMapTestMixin, MockFilteringTransformer, MockTransformer, mock_registered_transformers
 
 
+@ddt.ddt
 class TestBlockStructureTransformers(ChildrenMapTestMixin, TestCase):
     """
     Test class for testing BlockStructureTransformers
@@ -82,3 +84,27 @@ class TestBlockStructureTransformers(ChildrenMapTestMixin, TestCase):
                 self.transformers.verify_versions(block_structure)
             self.transformers.collect(block_structure)
             self.assertTrue(self.transformers.verify_versions(block_structure))
+
+    @ddt.data(
+        # (filtering key, non-filtering key, expected batch key, shared indices, remaining indices)
+        ('f', 'n', (('MockFilteringTransformer', 'f'), ('MockTransformer', 'n')), [0, 1], []),
+        ('f', None, (('MockFilteringTransformer', 'f'),), [1], [0]),
+        (None, 'n', (), [], [0, 1]),
+        (None, None, (), [], [0, 1]),
+    )
+    @ddt.unpack
+    def test_split_for_batch(self, filter_key, no_filter_key, expected_batch_key, shared_indices, remaining_indices):
+        self.add_mock_transformer()
+        with mock_registered_transformers(self.registered_transformers):
+            with patch.object(MockFilteringTransformer, 'batch_key', return_value=filter_key):
+                with patch.object(MockTransformer, 'batch_key', return_value=no_filter_key):
+                    batch_key, shared, remaining = self.transformers.split_for_batch(block_structure=MagicMock())
+
+        self.assertEqual(batch_key, expected_batch_key)
+        for transformers, indices in ((shared, shared_indices), (remaining, remaining_indices)):
+            self.assertIs(transformers.usage_info, self.transformers.usage_info)
+            self.assertEqual(transformers.is_empty(), not indices)
+            self.assertEqual(
+                transformers._transformers['no_filter'] + transformers._transformers['supports_filter'],  # pylint: disable=protected-access
+                [self.registered_transformers[index] for index in indices],
+            )
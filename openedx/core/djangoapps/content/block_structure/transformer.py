@@ -158,6 +158,32 @@ class BlockStructureTransformer(object):
         """
         raise NotImplementedError
 
+    def batch_key(self, usage_info, block_structure):
+        """
+        Returns a hashable value that identifies the outcome of this
+        transformer's transform for the given usage_info, or None if the
+        outcome is specific to the given usage_info.
+
+        When the same collected block structure is transformed for many
+        usages at once (for example, for all learners in a course), usages
+        whose keys are equal are transformed only once and share the
+        result.  So two usage_infos may only return equal keys if
+        transforming the same block_structure for either of them yields
+        identical results.
+
+        Transformers that return None, which is the default, are applied
+        separately for each usage.
+
+        Arguments:
+            usage_info (any negotiated type) - The usage-specific object
+                that would be passed to the transform method.
+
+            block_structure (BlockStructureBlockData) - The collected
+                block structure that is to be transformed. It must not
+                be modified by this method.
+        """
+        return None
+
 
 class FilteringTransformerMixin(BlockStructureTransformer):
     """
@@ -12,6 +12,10 @@ from .transformer_registry import TransformerRegistry
 
 logger = getLogger(__name__)  # pylint: disable=C0103
 
+# xBlock fields collected for every block structure, from which the store
+# determines the version of the content the structure was collected from.
+VERSION_XBLOCK_FIELDS = (u'course_version', u'subtree_edited_on')
+
 
 class BlockStructureTransformers(object):
     """
@@ -76,6 +80,10 @@ class BlockStructureTransformers(object):
         """
         Collects data for each registered transformer.
         """
+        # Collect the fields identifying the version of the content, which
+        # the store records and compares collected structures against.
+        block_structure.request_xblock_fields(*VERSION_XBLOCK_FIELDS)
+
         for transformer in TransformerRegistry.get_registered_transformers():
             block_structure._add_transformer(transformer)  # pylint: disable=protected-access
             transformer.collect(block_structure)
@@ -119,6 +127,63 @@ class BlockStructureTransformers(object):
         # Prune the block structure to remove any unreachable blocks.
         block_structure._prune_unreachable()  # pylint: disable=protected-access
 
+    def split_for_batch(self, block_structure):
+        """
+        Splits this collection into the transformers whose outcome can be
+        shared with other usages and the transformers that must be applied
+        separately for this collection's usage_info, as determined by each
+        transformer's batch_key.
+
+        Filtering transformers are independent of each other, so any of
+        them may be shared.  The remaining transformers are only shared up
+        to the first one that can't be, to preserve their order, and only
+        if all filtering transformers are shared, since filters are always
+        applied before them.
+
+        Arguments:
+            block_structure (BlockStructureBlockData) - The collected
+                block structure that is to be transformed.
+
+        Returns:
+            tuple - (batch_key, shared, remaining), where shared and
+                remaining are BlockStructureTransformers for the same
+                usage_info, and batch_key identifies the outcome of
+                applying the shared transformers.  Applying shared and
+                then remaining has the same outcome as applying this
+                collection.
+        """
+        batch_key = []
+        shared = []
+        remaining = []
+
+        for transformer in self._transformers['supports_filter']:
+            transformer_key = transformer.batch_key(self.usage_info, block_structure)
+            if transformer_key is None:
+                remaining.append(transformer)
+            else:
+                shared.append(transformer)
+                batch_key.append((transformer.name(), transformer_key))
+
+        for transformer in self._transformers['no_filter']:
+            transformer_key = None if remaining else transformer.batch_key(self.usage_info, block_structure)
+            if transformer_key is None:
+                remaining.append(transformer)
+            else:
+                shared.append(transformer)
+                batch_key.append((transformer.name(), transformer_key))
+
+        return (
+            tuple(batch_key),
+            BlockStructureTransformers(shared, self.usage_info),
+            BlockStructureTransformers(remaining, self.usage_info),
+        )
+
+    def is_empty(self):
+        """
+        Returns whether this collection has no transformers.
+        """
+        return not (self._transformers['supports_filter'] or self._transformers['no_filter'])
+
     def _transform_with_filters(self, block_structure):
         """
         Transforms the given block_structure using the transform_block_filters
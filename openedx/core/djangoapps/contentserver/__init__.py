@@ -1,3 +1,5 @@
 """
 Serves course assets to end users.
 """
+
+default_app_config = 'openedx.core.djangoapps.contentserver.apps.ContentServerConfig'  # pylint: disable=invalid-name
@@ -0,0 +1,19 @@
+"""
+Configuration for contentserver Django app
+"""
+
+
+from django.apps import AppConfig
+
+
+class ContentServerConfig(AppConfig):
+    """
+    Configuration class for contentserver Django app
+    """
+    name = 'openedx.core.djangoapps.contentserver'
+    verbose_name = "Content Server"
+
+    def ready(self):
+        # Import signals to activate signal handler which removes
+        # assets from the cache every time they are changed.
+        from . import signals  # pylint: disable=unused-variable
@@ -9,7 +9,7 @@ from django.core.cache import caches
 from django.core.cache.backends.base import InvalidCacheBackendError
 from opaque_keys import InvalidKeyError
 
-from xmodule.contentstore.content import STATIC_CONTENT_VERSION
+from xmodule.contentstore.content import STATIC_CONTENT_VERSION, StaticContent
 
 # See if there's a "course_assets" cache configured, and if not, fallback to the default cache.
 CONTENT_CACHE = caches['default']
@@ -19,6 +19,19 @@ except InvalidCacheBackendError:
     pass
 
 
+# Cached in place of the metadata of assets that don't exist.
+ASSET_NOT_FOUND = u'asset_not_found'
+
+# Number of seconds for which the metadata of assets is cached.  Entries are
+# removed whenever the contentstore changes an asset, so the timeouts only bound
+# how long an entry can outlive a change made behind the contentstore's back,
+# e.g. directly in the database or by a process whose cache isn't shared.
+ASSET_METADATA_TIMEOUT = 5 * 60
+
+# Number of seconds for which assets that don't exist are remembered.
+ASSET_NOT_FOUND_TIMEOUT = 60
+
+
 def set_cached_content(content):
     """
     Stores the given piece of content in the cache, using its location as the key.
@@ -33,9 +46,51 @@ def get_cached_content(location):
     return CONTENT_CACHE.get(six.text_type(location).encode("utf-8"), version=STATIC_CONTENT_VERSION)
 
 
+def _metadata_key(location):
+    """
+    Returns the cache key of the metadata of the asset at the given location.
+    """
+    return u'asset_metadata:{}'.format(location).encode("utf-8")
+
+
+def set_cached_asset_metadata(content):
+    """
+    Stores the metadata of the given piece of content in the cache, without
+    its data: its digest, lock status, content type, length and last
+    modification date.
+    """
+    metadata = StaticContent(
+        content.location, content.name, content.content_type, None,
+        last_modified_at=content.last_modified_at, length=content.length,
+        locked=getattr(content, 'locked', False), content_digest=getattr(content, 'content_digest', None),
+    )
+    CONTENT_CACHE.set(
+        _metadata_key(content.location), metadata, ASSET_METADATA_TIMEOUT, version=STATIC_CONTENT_VERSION,
+    )
+
+
+def set_cached_asset_not_found(location):
+    """
+    Stores in the cache that there's no asset at the given location.
+    """
+    CONTENT_CACHE.set(
+        _metadata_key(location), ASSET_NOT_FOUND, ASSET_NOT_FOUND_TIMEOUT, version=STATIC_CONTENT_VERSION,
+    )
+
+
+def get_cached_asset_metadata(location):
+    """
+    Retrieves the metadata of the asset at the given location if cached, as a
+    StaticContent without data, or ASSET_NOT_FOUND if the asset is known not
+    to exist.
+    """
+    return CONTENT_CACHE.get(_metadata_key(location), version=STATIC_CONTENT_VERSION)
+
+
 def del_cached_content(location):
     """
-    Delete content for the given location, as well versions of the content without a run.
+    Delete content and metadata for the given location, as well versions of the content
+    without a run.
 
     It's possible that the content could have been cached without knowing the course_key,
     and so without having the run.
@@ -44,11 +99,12 @@ def del_cached_content(location):
         """Force the location to a Unicode string."""
         return six.text_type(loc).encode("utf-8")
 
-    locations = [location_str(location)]
+    locations = [location]
     try:
-        locations.append(location_str(location.replace(run=None)))
+        locations.append(location.replace(run=None))
     except InvalidKeyError:
         # although deprecated keys allowed run=None, new keys don't if there is no version.
         pass
 
-    CONTENT_CACHE.delete_many(locations, version=STATIC_CONTENT_VERSION)
+    keys = [location_str(loc) for loc in locations] + [_metadata_key(loc) for loc in locations]
+    CONTENT_CACHE.delete_many(keys, version=STATIC_CONTENT_VERSION)
@@ -13,7 +13,8 @@ from django.http import (
     HttpResponseForbidden,
     HttpResponseNotFound,
     HttpResponseNotModified,
-    HttpResponsePermanentRedirect
+    HttpResponsePermanentRedirect,
+    StreamingHttpResponse
 )
 from django.utils.deprecation import MiddlewareMixin
 from opaque_keys import InvalidKeyError
@@ -23,12 +24,19 @@ from six import text_type
 from openedx.core.djangoapps.header_control import force_header_for_response
 from common.djangoapps.student.models import CourseEnrollment
 from xmodule.assetstore.assetmgr import AssetManager
-from xmodule.contentstore.content import XASSET_LOCATION_TAG, StaticContent
+from xmodule.contentstore.content import XASSET_LOCATION_TAG, StaticContent, StaticContentStream
 from xmodule.exceptions import NotFoundError
 from xmodule.modulestore import InvalidLocationError
 from xmodule.modulestore.exceptions import ItemNotFoundError
 
-from .caching import get_cached_content, set_cached_content
+from .caching import (
+    ASSET_NOT_FOUND,
+    get_cached_asset_metadata,
+    get_cached_content,
+    set_cached_asset_metadata,
+    set_cached_asset_not_found,
+    set_cached_content
+)
 from .models import CdnUserAgentsConfig, CourseAssetCacheTtlConfig
 
 log = logging.getLogger(__name__)
@@ -43,6 +51,14 @@ except ImportError:
 
 HTTP_DATE_FORMAT = u"%a, %d %b %Y %H:%M:%S GMT"
 
+# Assets smaller than this are read in memory, and cached, when they are served.
+# We cap this at 1MB because it's the default for memcached and also we don't
+# want to do too much buffering in memory when we're serving an actual request.
+MAX_CACHED_ASSET_LENGTH = 1048576
+
+# Size of the chunks in which larger assets are streamed from the contentstore.
+ASSET_STREAM_CHUNK_SIZE = 64 * 1024
+
 
 class StaticContentServer(MiddlewareMixin):
     """
@@ -79,14 +95,24 @@ class StaticContentServer(MiddlewareMixin):
             except (InvalidLocationError, InvalidKeyError):
                 return HttpResponseBadRequest()
 
-            # Attempt to load the asset to make sure it exists, and grab the asset digest
-            # if we're able to load it.
-            actual_digest = None
-            try:
-                content = self.load_asset_from_location(loc)
-                actual_digest = getattr(content, "content_digest", None)
-            except (ItemNotFoundError, NotFoundError):
+            # Attempt to load the metadata of the asset to make sure it exists, and grab
+            # the asset digest if we're able to load it.  The metadata is cached apart from
+            # the content of the asset, including for assets that don't exist, so that
+            # conditional requests and requests for missing assets are answered without
+            # reading the asset from the contentstore.
+            content = None
+            metadata = get_cached_asset_metadata(loc)
+            if metadata == ASSET_NOT_FOUND:
                 return HttpResponseNotFound()
+            if metadata is None:
+                try:
+                    content = self.load_asset_from_location(loc, load_content=False)
+                except (ItemNotFoundError, NotFoundError):
+                    set_cached_asset_not_found(loc)
+                    return HttpResponseNotFound()
+                set_cached_asset_metadata(content)
+                metadata = content
+            actual_digest = getattr(metadata, "content_digest", None)
 
             # If this was a versioned asset, and the digest doesn't match, redirect
             # them to the actual version.
@@ -111,20 +137,32 @@ class StaticContentServer(MiddlewareMixin):
                 newrelic.agent.add_custom_parameter('contentserver.from_cdn', is_from_cdn)
 
                 # Check if this content is locked or not.
-                locked = self.is_content_locked(content)
+                locked = self.is_content_locked(metadata)
                 newrelic.agent.add_custom_parameter('contentserver.locked', locked)
 
             # Check that user has access to the content.
-            if not self.is_user_authorized(request, content, loc):
+            if not self.is_user_authorized(request, metadata, loc):
                 return HttpResponseForbidden('Unauthorized')
 
             # Figure out if the client sent us a conditional request, and let them know
-            # if this asset has changed since then.
-            last_modified_at_str = content.last_modified_at.strftime(HTTP_DATE_FORMAT)
-            if 'HTTP_IF_MODIFIED_SINCE' in request.META:
+            # if this asset has changed since then.  If-None-Match takes precedence
+            # over If-Modified-Since.
+            etag = self.get_etag(metadata)
+            if 'HTTP_IF_NONE_MATCH' in request.META:
+                if etag is not None and etag_matches(request.META['HTTP_IF_NONE_MATCH'], etag):
+                    return self.not_modified_response(metadata, etag)
+            elif 'HTTP_IF_MODIFIED_SINCE' in request.META:
+                last_modified_at_str = metadata.last_modified_at.strftime(HTTP_DATE_FORMAT)
                 if_modified_since = request.META['HTTP_IF_MODIFIED_SINCE']
                 if if_modified_since == last_modified_at_str:
-                    return HttpResponseNotModified()
+                    return self.not_modified_response(metadata, etag)
+
+            if content is None:
+                try:
+                    content = self.load_asset_from_location(loc, load_content=False)
+                except (ItemNotFoundError, NotFoundError):
+                    return HttpResponseNotFound()
+            content = self.cache_asset_content(content)
 
             # *** File streaming within a byte range ***
             # If a Range is provided, parse Range attribute of the request
@@ -134,10 +172,6 @@ class StaticContentServer(MiddlewareMixin):
             # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.35
             response = None
             if request.META.get('HTTP_RANGE'):
-                # If we have a StaticContent, get a StaticContentStream.  Can't manipulate the bytes otherwise.
-                if isinstance(content, StaticContent):
-                    content = AssetManager.find(loc, as_stream=True)
-
                 header_value = request.META['HTTP_RANGE']
                 try:
                     unit, ranges = parse_range_header(header_value, content.length)
@@ -163,7 +197,12 @@ class StaticContentServer(MiddlewareMixin):
 
                         if 0 <= first <= last < content.length:
                             # If the byte range is satisfiable
-                            response = HttpResponse(content.stream_data_in_range(first, last))
+                            if isinstance(content, StaticContentStream):
+                                response = StreamingHttpResponse(stream_and_close(
+                                    content, content.stream_data_in_range(first, last, ASSET_STREAM_CHUNK_SIZE)
+                                ))
+                            else:
+                                response = HttpResponse(content.data[first:last + 1])
                             response['Content-Range'] = u'bytes {first}-{last}/{length}'.format(
                                 first=first, last=last, length=content.length
                             )
@@ -181,7 +220,12 @@ class StaticContentServer(MiddlewareMixin):
 
             # If Range header is absent or syntactically invalid return a full content response.
             if response is None:
-                response = HttpResponse(content.stream_data())
+                if isinstance(content, StaticContentStream):
+                    response = StreamingHttpResponse(stream_and_close(
+                        content, content.stream_data(ASSET_STREAM_CHUNK_SIZE)
+                    ))
+                else:
+                    response = HttpResponse(content.data)
                 response['Content-Length'] = content.length
 
             if newrelic:
@@ -192,6 +236,8 @@ class StaticContentServer(MiddlewareMixin):
             response['Accept-Ranges'] = 'bytes'
             response['Content-Type'] = content.content_type
             response['X-Frame-Options'] = 'ALLOW'
+            if etag is not None:
+                response['ETag'] = etag
 
             # Set any caching headers, and do any response cleanup needed.  Based on how much
             # middleware we have in place, there's no easy way to use the built-in Django
@@ -201,6 +247,28 @@ class StaticContentServer(MiddlewareMixin):
 
             return response
 
+    def not_modified_response(self, content, etag):
+        """
+        Returns a 304 Not Modified response for the given content, with the
+        headers that would be sent with a full response.
+        """
+        response = HttpResponseNotModified()
+        if etag is not None:
+            response['ETag'] = etag
+        self.set_caching_headers(content, response)
+        return response
+
+    @staticmethod
+    def get_etag(content):
+        """
+        Returns the strong entity tag of the given content, based on its digest,
+        or None if the content doesn't have a digest.
+        """
+        content_digest = getattr(content, "content_digest", None)
+        if not content_digest:
+            return None
+        return u'"{}"'.format(content_digest)
+
     def set_caching_headers(self, content, response):
         """
         Sets caching headers based on whether or not the asset is locked.
@@ -280,10 +348,14 @@ class StaticContentServer(MiddlewareMixin):
 
         return True
 
-    def load_asset_from_location(self, location):
+    def load_asset_from_location(self, location, load_content=True):
         """
         Loads an asset based on its location, either retrieving it from a cache
         or loading it directly from the contentstore.
+
+        If load_content is False, assets that aren't cached are returned as a
+        StaticContentStream of which only the metadata has been loaded; see
+        cache_asset_content.
         """
 
         # See if we can load this item from cache.
@@ -295,16 +367,55 @@ class StaticContentServer(MiddlewareMixin):
             except (ItemNotFoundError, NotFoundError):
                 raise
 
-            # Now that we fetched it, let's go ahead and try to cache it. We cap this at 1MB
-            # because it's the default for memcached and also we don't want to do too much
-            # buffering in memory when we're serving an actual request.
-            if content.length is not None and content.length < 1048576:
+            if load_content:
+                content = self.cache_asset_content(content)
+
+        return content
+
+    def cache_asset_content(self, content):
+        """
+        Reads the content of the given asset in memory and caches it, if
+        it was loaded from the contentstore and is small enough.  Larger
+        assets are left to be streamed from the contentstore.
+        """
+        if isinstance(content, StaticContentStream):
+            if content.length is not None and content.length < MAX_CACHED_ASSET_LENGTH:
                 content = content.copy_to_in_mem()
                 set_cached_content(content)
-
         return content
 
 
+def stream_and_close(content, chunks):
+    """
+    Yields the given chunks of the given StaticContentStream, and closes
+    the stream once they have been sent, or the response is closed.
+    """
+    try:
+        for chunk in chunks:
+            yield chunk
+    finally:
+        content.close()
+
+
+def etag_matches(if_none_match, etag):
+    """
+    Returns whether the value of an If-None-Match header matches the given
+    entity tag, using the weak comparison function.
+
+    See spec for details: https://tools.ietf.org/html/rfc7232#section-3.2
+    """
+    if if_none_match.strip() == '*':
+        return True
+    etag = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
 def parse_range_header(header_value, content_length):
     """
     Returns the unit and a list of (start, end) tuples of ranges.
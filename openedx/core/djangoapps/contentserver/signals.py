@@ -0,0 +1,19 @@
+"""
+Signal handler for invalidating cached course assets.
+"""
+
+
+from django.dispatch.dispatcher import receiver
+
+from xmodule.contentstore.django import ASSET_CHANGED
+
+from .caching import del_cached_content
+
+
+@receiver(ASSET_CHANGED)
+def _listen_for_asset_change(sender, location, **kwargs):  # pylint: disable=unused-argument
+    """
+    Removes the content and metadata of an asset from the cache when the
+    asset is saved, deleted or has its attributes changed.
+    """
+    del_cached_content(location)
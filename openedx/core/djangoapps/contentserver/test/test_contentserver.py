@@ -19,7 +19,7 @@ from django.test.utils import override_settings
 from mock import patch
 
 from xmodule.contentstore.django import contentstore
-from xmodule.contentstore.content import StaticContent, VERSIONED_ASSETS_PREFIX
+from xmodule.contentstore.content import StaticContent, StaticContentStream, VERSIONED_ASSETS_PREFIX
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from xmodule.modulestore.xml_importer import import_course_from_xml
@@ -30,7 +30,8 @@ from xmodule.modulestore.exceptions import ItemNotFoundError
 from common.djangoapps.student.models import CourseEnrollment
 from common.djangoapps.student.tests.factories import UserFactory, AdminFactory
 
-from ..middleware import parse_range_header, HTTP_DATE_FORMAT, StaticContentServer
+from ..caching import ASSET_NOT_FOUND, get_cached_asset_metadata
+from ..middleware import etag_matches, parse_range_header, HTTP_DATE_FORMAT, StaticContentServer
 
 log = logging.getLogger(__name__)
 
@@ -284,6 +285,122 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
             first=(self.length_unlocked), last=(self.length_unlocked)))
         self.assertEqual(resp.status_code, 416)
 
+    @patch('openedx.core.djangoapps.contentserver.middleware.MAX_CACHED_ASSET_LENGTH', 0)
+    def test_streamed_asset(self):
+        """
+        Test that assets that are too large to be cached are streamed.
+        """
+        expected_content = self.contentstore.find(self.unlocked_asset).data
+        resp = self.client.get(self.url_unlocked)
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.streaming)
+        self.assertEqual(b''.join(resp.streaming_content), expected_content)
+        self.assertEqual(resp['Content-Length'], str(self.length_unlocked))
+
+    @patch('openedx.core.djangoapps.contentserver.middleware.MAX_CACHED_ASSET_LENGTH', 0)
+    def test_streamed_range_request(self):
+        """
+        Test that a range request for an asset that is too large to be cached
+        streams the requested bytes.
+        """
+        expected_content = self.contentstore.find(self.unlocked_asset).data
+        first_byte = self.length_unlocked // 4
+        last_byte = self.length_unlocked // 2
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes={first}-{last}'.format(
+            first=first_byte, last=last_byte))
+
+        self.assertEqual(resp.status_code, 206)
+        self.assertTrue(resp.streaming)
+        self.assertEqual(b''.join(resp.streaming_content), expected_content[first_byte:last_byte + 1])
+
+    def test_etag_header_sent(self):
+        """
+        Test that the digest of the asset is sent as its ETag.
+        """
+        content = AssetManager.find(self.unlocked_asset, as_stream=True)
+        resp = self.client.get(self.url_unlocked)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['ETag'], u'"{}"'.format(content.content_digest))
+
+    @ddt.data(
+        (u'"{digest}"', 304),
+        (u'W/"{digest}"', 304),
+        (u'"{fake}", "{digest}"', 304),
+        (u'*', 304),
+        (u'"{fake}"', 200),
+    )
+    @ddt.unpack
+    def test_if_none_match(self, if_none_match, expected_status_code):
+        """
+        Test that conditional requests with an If-None-Match header are answered
+        without reading the content of the asset when the ETag matches.
+        """
+        content = AssetManager.find(self.unlocked_asset, as_stream=True)
+        if_none_match = if_none_match.format(digest=content.content_digest, fake=FAKE_MD5_HASH)
+
+        with patch.object(StaticContentStream, 'copy_to_in_mem', autospec=True,
+                          side_effect=StaticContentStream.copy_to_in_mem) as mock_copy_to_in_mem:
+            with patch('openedx.core.djangoapps.contentserver.middleware.get_cached_content', return_value=None):
+                resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH=if_none_match)
+
+        self.assertEqual(resp.status_code, expected_status_code)
+        self.assertEqual(resp['ETag'], u'"{}"'.format(content.content_digest))
+        self.assertEqual(mock_copy_to_in_mem.called, expected_status_code == 200)
+
+    def test_cached_asset_not_found(self):
+        """
+        Test that assets that are known not to exist are not looked up in the contentstore.
+        """
+        with patch('openedx.core.djangoapps.contentserver.middleware.get_cached_asset_metadata',
+                   return_value=ASSET_NOT_FOUND):
+            with patch.object(AssetManager, 'find') as mock_find:
+                resp = self.client.get(self.url_unlocked)
+        self.assertEqual(resp.status_code, 404)
+        self.assertFalse(mock_find.called)
+
+    def test_cached_asset_metadata(self):
+        """
+        Test that conditional requests are answered from the cached metadata of assets.
+        """
+        metadata = AssetManager.find(self.unlocked_asset, as_stream=True)
+        with patch('openedx.core.djangoapps.contentserver.middleware.get_cached_asset_metadata',
+                   return_value=metadata):
+            with patch.object(AssetManager, 'find') as mock_find:
+                resp = self.client.get(
+                    self.url_unlocked, HTTP_IF_NONE_MATCH=u'"{}"'.format(metadata.content_digest),
+                )
+        self.assertEqual(resp.status_code, 304)
+        self.assertFalse(mock_find.called)
+
+    def test_asset_change_clears_cached_metadata(self):
+        """
+        Test that the cached metadata of assets is removed whenever the contentstore changes them.
+        """
+        resp = self.client.get(self.url_unlocked)
+        self.assertEqual(resp.status_code, 200)
+        self.assertIsNotNone(get_cached_asset_metadata(self.unlocked_asset))
+
+        self.contentstore.set_attr(self.unlocked_asset, 'locked', False)
+        self.assertIsNone(get_cached_asset_metadata(self.unlocked_asset))
+
+    def test_saved_asset_clears_cached_not_found(self):
+        """
+        Test that assets saved after being looked up, e.g. by a course import, are served at once.
+        """
+        asset_key = self.course_key.make_asset_key('asset', 'imported_later.txt')
+        url = six.text_type(asset_key)
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 404)
+        self.assertEqual(get_cached_asset_metadata(asset_key), ASSET_NOT_FOUND)
+
+        self.contentstore.save(StaticContent(asset_key, 'imported_later.txt', 'text/plain', b'imported'))
+        self.addCleanup(self.contentstore.delete, asset_key)
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+
+        self.contentstore.delete(asset_key)
+        self.assertIsNone(get_cached_asset_metadata(asset_key))
+
     def test_vary_header_sent(self):
         """
         Tests that we're properly setting the Vary header to ensure browser requests don't get
@@ -446,3 +563,22 @@ class ParseRangeHeaderTestCase(unittest.TestCase):
         self.assertRaisesRegex(
             exception_class, exception_message_regex, parse_range_header, header_value, self.content_length
         )
+
+
+@ddt.ddt
+class EtagMatchesTestCase(unittest.TestCase):
+    """
+    Tests for the etag_matches function.
+    """
+
+    @ddt.data(
+        ('"abc"', '"abc"', True),
+        ('W/"abc"', '"abc"', True),
+        ('"xyz", W/"abc"', '"abc"', True),
+        ('*', '"abc"', True),
+        ('"xyz"', '"abc"', False),
+        ('abc', '"abc"', False),
+    )
+    @ddt.unpack
+    def test_etag_matches(self, if_none_match, etag, expected_result):
+        self.assertEqual(etag_matches(if_none_match, etag), expected_result)
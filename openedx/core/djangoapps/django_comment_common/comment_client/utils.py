@@ -3,16 +3,26 @@
 
 
 import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from uuid import uuid4
 
 import requests
 import six
-from django.utils.translation import get_language
+from django.conf import settings
+from django.db.models.signals import post_save
+from django.utils.translation import get_language, override
+from edx_django_utils.cache import RequestCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from .settings import SERVICE_HOST as COMMENTS_SERVICE
 
 log = logging.getLogger(__name__)
 
+FORUMS_CONFIG_CACHE_NAMESPACE = u'comment_client.forums_config'
+
 
 def strip_none(dic):
     return dict([(k, v) for k, v in six.iteritems(dic) if v is not None])
@@ -31,11 +41,78 @@ def extract(dic, keys):
         return strip_none({k: dic.get(k) for k in keys})
 
 
-def perform_request(method, url, data_or_params=None, raw=False,
-                    metric_action=None, metric_tags=None, paged_results=False):
+def get_forums_config():
+    """
+    Returns the current ForumsConfig, read once per request.
+    """
     # To avoid dependency conflict
     from openedx.core.djangoapps.django_comment_common.models import ForumsConfig
+    cached_response = RequestCache(FORUMS_CONFIG_CACHE_NAMESPACE).get_cached_response('config')
+    if cached_response.is_found:
+        return cached_response.value
     config = ForumsConfig.current()
+    RequestCache(FORUMS_CONFIG_CACHE_NAMESPACE).set('config', config)
+    return config
+
+
+def _clear_forums_config(sender, **kwargs):
+    """
+    Clears the ForumsConfig read during the request when it's changed.
+    """
+    RequestCache(FORUMS_CONFIG_CACHE_NAMESPACE).clear()
+
+
+post_save.connect(_clear_forums_config, sender='django_comment_common.ForumsConfig')
+
+
+def _pool_settings():
+    """
+    Returns the COMMENTS_SERVICE_HTTP_POOL setting.
+    """
+    return getattr(settings, 'COMMENTS_SERVICE_HTTP_POOL', {})
+
+
+_SESSION = None
+_SESSION_PID = None
+_SESSION_LOCK = threading.Lock()
+
+
+def get_session():
+    """
+    Returns the requests Session of the process used to send requests to the
+    comments service, which keeps connections alive in a pool, or None if
+    the pool is disabled.
+    """
+    global _SESSION, _SESSION_PID  # pylint: disable=global-statement
+    pool_settings = _pool_settings()
+    if not pool_settings.get('ENABLED', False):
+        return None
+    if _SESSION is None or _SESSION_PID != os.getpid():
+        with _SESSION_LOCK:
+            if _SESSION is None or _SESSION_PID != os.getpid():
+                # Connections of the parent process aren't shared after a fork.
+                session = requests.Session()
+                retries = Retry(
+                    total=pool_settings.get('MAX_RETRIES', 2),
+                    backoff_factor=pool_settings.get('BACKOFF_FACTOR', 0.1),
+                    # Only idempotent requests are retried, per urllib3's defaults.
+                    status_forcelist=(502, 504),
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=pool_settings.get('POOL_CONNECTIONS', 1),
+                    pool_maxsize=pool_settings.get('POOL_MAXSIZE', 10),
+                    max_retries=retries,
+                )
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _SESSION, _SESSION_PID = session, os.getpid()
+    return _SESSION
+
+
+def perform_request(method, url, data_or_params=None, raw=False,
+                    metric_action=None, metric_tags=None, paged_results=False):
+    config = get_forums_config()
 
     if not config.enabled:
         raise CommentClientMaintenanceError('service disabled')
@@ -63,7 +140,8 @@ def perform_request(method, url, data_or_params=None, raw=False,
         data = None
         params = data_or_params.copy()
         params.update(request_id_dict)
-    response = requests.request(
+    session = get_session()
+    response = (session or requests).request(
         method,
         url,
         data=data,
@@ -102,6 +180,38 @@ def perform_request(method, url, data_or_params=None, raw=False,
             return data
 
 
+def perform_concurrently(funcs, max_workers=None):
+    """
+    Calls the given functions, which perform requests to the comments
+    service, concurrently, so that the requests take about one round-trip
+    when connections to the service are pooled.  Returns the list of their
+    results, in order, and raises the first exception raised by one of them.
+
+    The functions are called with the forums config and the language of the
+    calling thread.
+    """
+    funcs = list(funcs)
+    if len(funcs) <= 1:
+        return [func() for func in funcs]
+
+    config = get_forums_config()
+    language = get_language()
+
+    def call(func):
+        RequestCache(FORUMS_CONFIG_CACHE_NAMESPACE).set('config', config)
+        try:
+            with override(language):
+                return func()
+        finally:
+            RequestCache(FORUMS_CONFIG_CACHE_NAMESPACE).clear()
+
+    if max_workers is None:
+        max_workers = _pool_settings().get('POOL_MAXSIZE', 10)
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(funcs))) as executor:
+        futures = [executor.submit(call, func) for func in funcs]
+    return [future.result() for future in futures]
+
+
 class CommentClientError(Exception):
     pass
 
@@ -0,0 +1,96 @@
+"""
+profile_modulestore_queries
+===========================
+
+Django command to request a list of URLs and report the ones making the
+most modulestore and contentstore queries.
+
+The URLs are read from a file, one per line, and requested in this process,
+as the given user if any, so that every MongoDB round trip they make is
+recorded.  MODULESTORE_QUERY_PROFILER['ENABLED'] must be set, so that the
+MongoDB connections record their commands.  Example:
+
+    ./manage.py lms profile_modulestore_queries urls.txt --username staff --top 10
+"""
+
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test.client import Client
+
+from xmodule.query_profiler import profile_queries
+
+
+class Command(BaseCommand):
+    """profile_modulestore_queries command"""
+
+    help = "Request a list of URLs and report the ones making the most modulestore and contentstore queries."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'url_file',
+            help='A file of the URLs to request, one per line. Blank lines and lines starting with # are ignored.'
+        )
+        parser.add_argument(
+            '--username',
+            help='The user to request the URLs as. URLs are requested anonymously by default.'
+        )
+        parser.add_argument(
+            '--host',
+            default='localhost',
+            help='The host to request the URLs from, which must be one of the ALLOWED_HOSTS.'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=1,
+            help='The number of times to request each URL; the queries of the last request are reported, '
+                 'so that caches are warm.'
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=20,
+            help='The number of URLs to report.'
+        )
+
+    def handle(self, *args, **options):
+        if not getattr(settings, 'MODULESTORE_QUERY_PROFILER', {}).get('ENABLED', False):
+            raise CommandError(u"MODULESTORE_QUERY_PROFILER['ENABLED'] must be set to record MongoDB queries.")
+        try:
+            with open(options['url_file']) as url_file:
+                urls = [line.strip() for line in url_file]
+        except IOError as error:
+            raise CommandError(u'Cannot read {}: {}'.format(options['url_file'], error))
+        urls = [url for url in urls if url and not url.startswith('#')]
+
+        client = Client(HTTP_HOST=options['host'])
+        if options['username']:
+            try:
+                user = get_user_model().objects.get(username=options['username'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(u'User {} does not exist.'.format(options['username']))
+            client.force_login(user)
+
+        results = []
+        for url in urls:
+            for _ in range(max(options['repeat'], 1)):
+                with profile_queries(measure_reply_size=True) as profile:
+                    response = client.get(url)
+            results.append((url, response.status_code, profile))
+            self.stdout.write(u'{} {}: {}'.format(response.status_code, url, profile.format_summary()))
+
+        results.sort(key=lambda result: len(result[2].round_trips), reverse=True)
+        self.stdout.write(u'\nWorst {} of {} URLs by MongoDB round trips:'.format(
+            min(options['top'], len(results)), len(results),
+        ))
+        for url, status_code, profile in results[:options['top']]:
+            summary = profile.summary()
+            self.stdout.write(u'{:6d} round trips {:9.1f}ms {:10d} bytes  {} {}'.format(
+                summary['round_trips'], summary['duration'] * 1000, summary['bytes'], status_code, url,
+            ))
+            for operation, stats in summary['operations'][:3]:
+                self.stdout.write(u'        {:6d} x {} ({:.1f}ms)'.format(
+                    stats['count'], operation, stats['duration'] * 1000,
+                ))
@@ -0,0 +1,71 @@
+"""
+Middleware profiling the modulestore and contentstore queries made by each request.
+
+The profiler is configured by the MODULESTORE_QUERY_PROFILER setting:
+
+    ENABLED: Whether the queries of each request are profiled.  The command
+        listener recording MongoDB commands is only registered on the
+        connections of the modulestores and the contentstore when enabled.
+    MEASURE_REPLY_SIZE: Whether the size of each MongoDB reply is measured,
+        which requires encoding it again.
+    HEADER: Whether a summary of the queries is added to responses, in the
+        X-Modulestore-Queries header.
+    LOG_THRESHOLD: Requests making at least this many round trips to MongoDB
+        are logged with a summary of their queries.
+
+See xmodule.query_profiler for what is profiled, and the
+profile_modulestore_queries management command to profile a list of URLs.
+"""
+
+
+import logging
+
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+from edx_django_utils.monitoring import set_custom_attribute
+
+from xmodule.query_profiler import get_current_profile, start_profile, stop_profile
+
+log = logging.getLogger(__name__)
+
+QUERIES_HEADER = 'X-Modulestore-Queries'
+
+
+def _config():
+    """
+    Returns the MODULESTORE_QUERY_PROFILER setting.
+    """
+    return getattr(settings, 'MODULESTORE_QUERY_PROFILER', {})
+
+
+class ModulestoreQueryProfilerMiddleware(MiddlewareMixin):
+    """
+    Profiles the modulestore and contentstore queries made by each request,
+    when enabled.
+    """
+    def process_request(self, request):
+        """
+        Starts profiling the request, unless its queries are already profiled,
+        for instance by the profile_modulestore_queries management command.
+        """
+        if _config().get('ENABLED', False) and get_current_profile() is None:
+            request.modulestore_query_profile = start_profile(_config().get('MEASURE_REPLY_SIZE', False))
+
+    def process_response(self, request, response):
+        """
+        Reports the queries made by the request, if it was profiled.
+        """
+        if getattr(request, 'modulestore_query_profile', None) is None:
+            return response
+        profile = stop_profile()
+
+        config = _config()
+        summary = profile.summary()
+        set_custom_attribute('modulestore_round_trips', summary['round_trips'])
+        set_custom_attribute('modulestore_query_time', summary['duration'])
+        if config.get('HEADER', False):
+            response[QUERIES_HEADER] = profile.format_summary()
+        threshold = config.get('LOG_THRESHOLD')
+        if threshold is not None and summary['round_trips'] >= threshold:
+            log.info(u'Modulestore queries of %s %s: %s', request.method, request.path, profile.format_summary())
+        return response
@@ -69,6 +69,14 @@ class ContentTypeGateTransformer(BlockStructureTransformer):
             current_access = block_structure.get_xblock_field(block_key, 'group_access')
         return current_access or {}
 
+    def batch_key(self, usage_info, block_structure):
+        # The outcome only depends on whether gating is enabled for the
+        # user's enrollment.
+        return ContentTypeGatingConfig.enabled_for_enrollment(
+            user=usage_info.user,
+            course_key=usage_info.course_key,
+        )
+
     def transform(self, usage_info, block_structure):
         if not ContentTypeGatingConfig.enabled_for_enrollment(
             user=usage_info.user,